@@ -13,7 +13,6 @@ from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-from .database import init_database
 from .config import get_config, Config
 from .utils.logging_utils import LoggerManager
 from .logging_config import setup_logging
@@ -135,24 +134,41 @@ def create_app(config_name=None, test_config=None):
     version = config_class.VERSION if hasattr(config_class, 'VERSION') else '2.1.0'
     logger.info(f"TVS TCMS v{version} starting up (environment: {environment})")
     
-    # Initialize database
-    init_database()
-    
-    # Run database migrations
-    from .services.migration_runner import run_migrations
-    logger.info("Running database migrations...")
-    migration_success, migration_count = run_migrations()
-    if not migration_success:
-        logger.error("Database migrations failed - application may not function correctly")
+    # Prepare the database once: the gunicorn master does it before the
+    # workers fork, otherwise the first process to take the lock does
+    from .services.startup import prepare_database, database_prepared, claim_background_services
+    if database_prepared(app.config['DATABASE_PATH']):
+        logger.info("Database prepared by the server process - skipping migrations")
     else:
-        if migration_count > 0:
-            logger.info(f"Database migrations completed successfully - {migration_count} migration(s) applied")
+        logger.info("Running database migrations...")
+        migration_success, migration_count = prepare_database(lock=not app.testing)
+        if not migration_success:
+            logger.error("Database migrations failed - application may not function correctly")
         else:
-            logger.info("Database migrations up to date - no new migrations to apply")
-    
-    # Start auto-sync by default
-    from app.services.periodic_sync import periodic_sync_service
+            if migration_count > 0:
+                logger.info(f"Database migrations completed successfully - {migration_count} migration(s) applied")
+            else:
+                logger.info("Database migrations up to date - no new migrations to apply")
+
+    # Stats reconcile and the file catalogue watcher run in one process only
+    if app.testing or claim_background_services(app.config.get('BACKGROUND_SERVICES', 'auto')):
+        if not app.testing:
+            from .services.table_stats import start_reconcile_worker
+            start_reconcile_worker(app.config.get('TABLE_STATS_RECONCILE_HOURS', 6) * 3600)
+
+        # File catalogue: watch the document folders and rescan them in the background
+        if not app.testing and app.config.get('FILE_CATALOGUE_WATCH', True):
+            from .services.file_catalogue import catalogue_watcher
+            catalogue_watcher.rescan_seconds = app.config.get('FILE_CATALOGUE_RESCAN_MINUTES', 15) * 60
+            catalogue_watcher.start()
+    else:
+        logger.info(f"Background services running in another process (pid {os.getpid()} skipped them)")
+
+    # Start auto-sync by default. It runs in every process, so uploads in any
+    # worker can wake it; the scheduler's database lease picks the one
+    # process that runs the jobs (services/sync_scheduler.py).
     if app.config.get('AUTO_SYNC_ENABLED', True):
+        from app.services.periodic_sync import periodic_sync_service
         periodic_sync_service.start_periodic_sync()
         app.logger.info("Auto-sync started automatically")
     
@@ -190,6 +206,7 @@ def create_app(config_name=None, test_config=None):
     from .routes.api_route_planning import route_planning_bp
     from .routes.api_hmrc import hmrc_bp
     from .routes.api_wages_analytics import wages_analytics_bp
+    from .routes.api_metrics import metrics_bp
     from .routes.health import health_bp
 
     app.register_blueprint(auth_bp)
@@ -221,6 +238,7 @@ def create_app(config_name=None, test_config=None):
     app.register_blueprint(route_planning_bp)
     app.register_blueprint(hmrc_bp)
     app.register_blueprint(wages_analytics_bp)
+    app.register_blueprint(metrics_bp)
     app.register_blueprint(health_bp)
 
     # HMRC sandbox-only helper endpoints (test users, create-test-business, etc.).
@@ -78,7 +78,17 @@ class Config:
     # enabled. This keeps the visible scope of the application aligned with the
     # answers given on the HMRC Software Approvals Production Checklist.
     HMRC_PROPERTY_ENABLED = os.environ.get('HMRC_PROPERTY_ENABLED', 'false').lower() == 'true'
-    
+
+    # HMRC HTTP session (see app/services/hmrc_http.py)
+    HMRC_HTTP_TIMEOUT = int(os.environ.get('HMRC_HTTP_TIMEOUT', '30'))
+    HMRC_HTTP_POOL_SIZE = int(os.environ.get('HMRC_HTTP_POOL_SIZE', '10'))
+    HMRC_HTTP_RETRIES = int(os.environ.get('HMRC_HTTP_RETRIES', '3'))
+    HMRC_HTTP_BACKOFF = float(os.environ.get('HMRC_HTTP_BACKOFF', '0.5'))  # 0.5s, 1s, 2s...
+    HMRC_HTTP_MAX_RETRY_AFTER = int(os.environ.get('HMRC_HTTP_MAX_RETRY_AFTER', '30'))
+    HMRC_GET_CACHE_TTL = int(os.environ.get('HMRC_GET_CACHE_TTL', '60'))  # 0 disables
+    HMRC_RATE_LIMIT_PER_SECOND = float(os.environ.get('HMRC_RATE_LIMIT_PER_SECOND', '3'))  # per API, 0 disables
+    HMRC_FANOUT_WORKERS = int(os.environ.get('HMRC_FANOUT_WORKERS', '4'))
+
     @property
     def HMRC_API_BASE_URL(self):
         """Get HMRC API base URL based on environment."""
@@ -108,6 +118,19 @@ class Config:
     # Performance Configuration
     CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', '300'))  # 5 minutes
     DATABASE_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    TABLE_STATS_RECONCILE_HOURS = float(os.environ.get('TABLE_STATS_RECONCILE_HOURS', '6'))  # 0 disables
+    FILE_CATALOGUE_WATCH = os.environ.get('FILE_CATALOGUE_WATCH', 'true').lower() == 'true'
+    FILE_CATALOGUE_RESCAN_MINUTES = float(os.environ.get('FILE_CATALOGUE_RESCAN_MINUTES', '15'))  # 0 disables
+    # Which process runs the stats reconcile and the file watcher:
+    # 'auto' = the first to start (one per database), 'on' / 'off' to force
+    BACKGROUND_SERVICES = os.environ.get('BACKGROUND_SERVICES', 'auto').lower()
+    # PDF report jobs (see app/services/report_jobs.py). REPORT_CACHE_DIR
+    # defaults to report_cache/ beside the database.
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '2'))
+    REPORT_WAIT_SECONDS = float(os.environ.get('REPORT_WAIT_SECONDS', '60'))
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', '')
+    REPORT_CACHE_MAX_MB = float(os.environ.get('REPORT_CACHE_MAX_MB', '200'))
+    REPORT_CACHE_MAX_AGE_DAYS = float(os.environ.get('REPORT_CACHE_MAX_AGE_DAYS', '14'))
     
     # Feature Flags
     FEATURE_ADVANCED_ANALYTICS = os.environ.get('FEATURE_ADVANCED_ANALYTICS', 'true').lower() == 'true'
@@ -202,6 +225,8 @@ class TestingConfig(Config):
     
     # Disable external integrations in tests
     AUTO_SYNC_ENABLED = False
+    TABLE_STATS_RECONCILE_HOURS = 0
+    FILE_CATALOGUE_WATCH = False
     FEATURE_INTELLIGENT_SYNC = False
 
     # Disable CSRF and rate limiting for the test client.
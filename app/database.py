@@ -3,7 +3,11 @@ Database utilities and connection management.
 Extracted from web_app.py to centralize database operations.
 """
 
+import logging
+import re
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
 from .config import Config
@@ -11,10 +15,97 @@ from .config import Config
 # Database configuration - use Config for centralized path management
 DB_PATH = Config.DATABASE_PATH
 
+logger = logging.getLogger(__name__)
+
+
+# Per-thread query timer. The request middleware starts it for each request
+# and reads the total when the response goes out; while it is off the
+# timing wrappers below cost one attribute lookup per call.
+#
+# The timer also counts schema changes. Schema belongs in migrations
+# (see services/migration_runner.py), so a CREATE/ALTER/DROP while a
+# request is being served is logged as a warning and shows up in the
+# request's log record.
+_query_timer = threading.local()
+
+_DDL_RE = re.compile(r'(?:^|;)\s*(?:CREATE|ALTER|DROP)\b', re.IGNORECASE)
+
+
+def start_query_timer():
+    """Start accumulating time spent in SQLite calls on this thread."""
+    _query_timer.total = 0.0
+    _query_timer.ddl = 0
+
+
+def query_timer_ddl():
+    """Number of DDL statements issued since the timer started."""
+    return getattr(_query_timer, 'ddl', 0)
+
+
+def stop_query_timer():
+    """Stop the timer and return the seconds spent in SQLite calls."""
+    total = getattr(_query_timer, 'total', None)
+    _query_timer.total = None
+    return total or 0.0
+
+
+def _timed(method):
+    def wrapper(self, *args, **kwargs):
+        if getattr(_query_timer, 'total', None) is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _query_timer.total += time.perf_counter() - started
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+def _timed_statement(method):
+    timed = _timed(method)
+
+    def wrapper(self, sql, *args, **kwargs):
+        if getattr(_query_timer, 'total', None) is not None and _DDL_RE.search(sql):
+            _query_timer.ddl += 1
+            logger.warning(f"DDL issued while serving a request: {' '.join(sql.split())[:120]}")
+        return timed(self, sql, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that adds execute/fetch time to the per-thread query timer."""
+
+    execute = _timed_statement(sqlite3.Cursor.execute)
+    executemany = _timed_statement(sqlite3.Cursor.executemany)
+    executescript = _timed_statement(sqlite3.Cursor.executescript)
+    fetchone = _timed(sqlite3.Cursor.fetchone)
+    fetchmany = _timed(sqlite3.Cursor.fetchmany)
+    fetchall = _timed(sqlite3.Cursor.fetchall)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including ``conn.execute``) are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters, /):
+        return self.cursor().executemany(sql, parameters)
+
+    def executescript(self, sql_script, /):
+        return self.cursor().executescript(sql_script)
+
+    commit = _timed(sqlite3.Connection.commit)
+
 
 def get_db():
     """Get database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TimedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
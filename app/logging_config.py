@@ -1,14 +1,141 @@
 """
 Central logging configuration for TVS TCMS.
 Provides consistent logging setup across all modules.
+
+Loggers never write to files or the console on the calling thread. Each
+real handler is wrapped by :func:`queued_handler`, which puts the record
+on a shared in-memory queue. One background ``QueueListener`` thread
+drains it and hands each record to the handler it was meant for. Request
+threads therefore never block on disk I/O or rotation.
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import sys
+import threading
 from pathlib import Path
 
 
+# ---------------------------------------------------------------------------
+# Queue pipeline
+# ---------------------------------------------------------------------------
+
+class _TargetedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that tags each record with the handler that should emit it."""
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+        self.setLevel(target.level)
+
+    def prepare(self, record):
+        # prepare() merges args and exception text into a copy of the record,
+        # so the target's formatter sees the final message.
+        record = super().prepare(record)
+        record._log_target = self.target
+        return record
+
+
+class _DispatchingQueueListener(logging.handlers.QueueListener):
+    """Single listener thread that routes records to their target handler."""
+
+    def handle(self, record):
+        target = record.__dict__.pop('_log_target', None)
+        if target is None or record.levelno < target.level:
+            return
+        try:
+            target.handle(record)
+        except Exception:
+            target.handleError(record)
+
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                _listener = _DispatchingQueueListener(_log_queue)
+                _listener.start()
+                atexit.register(stop_log_listener)
+
+
+def queued_handler(handler):
+    """Wrap ``handler`` so records reach it through the background listener.
+
+    Args:
+        handler: A fully configured handler (formatter, level, filters).
+
+    Returns:
+        logging.Handler to attach to the logger in place of ``handler``.
+    """
+    _ensure_listener()
+    return _TargetedQueueHandler(_log_queue, handler)
+
+
+def flush_logs(timeout=5.0):
+    """Block until every record queued so far has been written.
+
+    Returns:
+        True if the queue drained within ``timeout`` seconds.
+    """
+    if _listener is None:
+        return True
+    done = threading.Event()
+    marker = logging.makeLogRecord({'msg': '', 'levelno': logging.CRITICAL})
+    marker._log_target = _EventHandler(done)
+    _log_queue.put(marker)
+    return done.wait(timeout)
+
+
+class _EventHandler(logging.Handler):
+    """Sets an event when the listener reaches it (used by flush_logs)."""
+
+    def __init__(self, event):
+        super().__init__()
+        self.event = event
+
+    def emit(self, record):
+        self.event.set()
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """StreamHandler bound to ``sys.stdout``/``sys.stderr`` as they are at emit time.
+
+    Queued records are written some time after they were logged, by which
+    point the stream captured at construction may have been replaced or
+    closed (test runners, daemonised processes).
+    """
+
+    def __init__(self, stream_name='stderr'):
+        self._stream_name = stream_name
+        super().__init__()
+
+    @property
+    def stream(self):
+        return getattr(sys, self._stream_name)
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def stop_log_listener():
+    """Drain the queue and stop the listener thread (runs at exit)."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
 def setup_logging(log_dir='logs', log_level='INFO', environment='production'):
     """
     Configure application-wide logging.
@@ -36,10 +163,10 @@ def setup_logging(log_dir='logs', log_level='INFO', environment='production'):
     
     # Console handler (development only)
     if environment == 'development':
-        console_handler = logging.StreamHandler()
+        console_handler = ConsoleHandler()
         console_handler.setFormatter(formatter)
         console_handler.setLevel(numeric_level)
-        root_logger.addHandler(console_handler)
+        root_logger.addHandler(queued_handler(console_handler))
     
     # Error log - captures ERROR and above from all loggers
     error_handler = logging.handlers.RotatingFileHandler(
@@ -49,7 +176,7 @@ def setup_logging(log_dir='logs', log_level='INFO', environment='production'):
     )
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
-    root_logger.addHandler(error_handler)
+    root_logger.addHandler(queued_handler(error_handler))
     
     # Configure specialized loggers
     _setup_app_logger(log_dir, formatter, numeric_level)
@@ -72,7 +199,7 @@ def _setup_app_logger(log_dir, formatter, level):
         backupCount=5
     )
     handler.setFormatter(formatter)
-    app_logger.addHandler(handler)
+    app_logger.addHandler(queued_handler(handler))
 
 
 def _setup_migration_logger(log_dir, formatter, level):
@@ -87,7 +214,7 @@ def _setup_migration_logger(log_dir, formatter, level):
         backupCount=5
     )
     handler.setFormatter(formatter)
-    migration_logger.addHandler(handler)
+    migration_logger.addHandler(queued_handler(handler))
 
 
 def _setup_hmrc_logger(log_dir, formatter, level):
@@ -102,7 +229,7 @@ def _setup_hmrc_logger(log_dir, formatter, level):
         backupCount=5
     )
     handler.setFormatter(formatter)
-    hmrc_logger.addHandler(handler)
+    hmrc_logger.addHandler(queued_handler(handler))
 
 
 def _setup_periodic_sync_logger(log_dir, formatter, level):
@@ -122,7 +249,7 @@ def _setup_periodic_sync_logger(log_dir, formatter, level):
         backupCount=5,
     )
     handler.setFormatter(formatter)
-    sync_logger.addHandler(handler)
+    sync_logger.addHandler(queued_handler(handler))
 
 
 def get_logger(name):
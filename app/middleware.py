@@ -11,6 +11,8 @@ from flask import request, jsonify, g
 
 from .utils.logging_utils import log_api_request, log_error
 from .config import FeatureFlags
+from .database import start_query_timer, stop_query_timer, query_timer_ddl
+from .services.request_metrics import record_request
 
 
 def register_middleware(app):
@@ -19,7 +21,8 @@ def register_middleware(app):
     @app.before_request
     def before_request():
         """Execute before each request."""
-        g.start_time = time.time()
+        g.start_time = time.perf_counter()
+        start_query_timer()
         g.request_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(request)}"
     
     @app.after_request
@@ -27,14 +30,26 @@ def register_middleware(app):
         """Execute after each request."""
         try:
             # Calculate request duration
-            duration_ms = (time.time() - g.get('start_time', time.time())) * 1000
-            
+            duration_ms = (time.perf_counter() - g.get('start_time', time.perf_counter())) * 1000
+            ddl_statements = query_timer_ddl()
+            db_ms = stop_query_timer() * 1000
+
+            record_request(
+                endpoint=request.endpoint or '<unmatched>',
+                method=request.method,
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                db_ms=db_ms,
+            )
+
             # Log API request
             log_api_request(
                 endpoint=request.endpoint or request.path,
                 method=request.method,
                 status_code=response.status_code,
                 duration_ms=duration_ms,
+                db_ms=round(db_ms, 2),
+                ddl_statements=ddl_statements,
                 user_agent=request.headers.get('User-Agent'),
                 request_id=getattr(g, 'request_id', 'unknown'),
                 ip_address=request.remote_addr
@@ -42,6 +57,7 @@ def register_middleware(app):
             
             # Add performance headers
             response.headers['X-Response-Time'] = f"{duration_ms:.2f}ms"
+            response.headers['Server-Timing'] = f"app;dur={duration_ms:.2f}, db;dur={db_ms:.2f}"
             response.headers['X-Request-ID'] = getattr(g, 'request_id', 'unknown')
             
             # Add security headers for HMRC compliance
@@ -4,6 +4,7 @@ Parses RBS CSV files and categorizes transactions for expense import.
 """
 
 import csv
+import io
 import logging
 import re
 from datetime import datetime
@@ -11,7 +12,29 @@ from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
-from .recurring_template import RecurringTemplateModel
+from .recurring_template import RecurringTemplateModel, TemplateMatcher
+
+
+def _load_pandas():
+    """pandas, or None when it is not installed (large statements then use the csv path)."""
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+def _to_float(value: str) -> float:
+    """float() for a statement value, NaN when it is not a number."""
+    try:
+        return float(value)
+    except ValueError:
+        return float('nan')
+
+
+def _contains_any(series, patterns):
+    """Boolean Series: which strings contain any of ``patterns`` (upper-cased)."""
+    return series.str.contains('|'.join(re.escape(p.upper()) for p in patterns), regex=True)
 
 
 class BankStatementParser:
@@ -51,13 +74,34 @@ class BankStatementParser:
         'RESTAURANT', 'TAKEAWAY', 'PIZZA', 'MCDONALDS', 'KFC'  # Food (not claimable)
     ]
     
+    # Statements with at least this many lines take the pandas path when
+    # pandas is installed. Below it the csv module is faster.
+    PANDAS_MIN_ROWS = 2000
+    
+    DATE_FORMATS = ['%d %b %Y', '%d-%b-%y', '%d/%m/%Y']
+    
     @staticmethod
-    def parse_rbs_csv(file_content: str) -> List[Dict]:
+    def parse_rbs_csv(file_content: str, templates: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Parse RBS CSV format.
         
         Expected columns: Date, Type, Description, Value, Balance, Account Name, Account Number
+        
+        Every row is matched through one TemplateMatcher over the active
+        recurring templates (or ``templates``). Large statements are parsed
+        column-wise with pandas when it is available, with the same result.
         """
+        matcher = RecurringTemplateModel.matcher(templates)
+        
+        if file_content.count('\n') >= BankStatementParser.PANDAS_MIN_ROWS:
+            pd = _load_pandas()
+            if pd is not None:
+                try:
+                    return BankStatementParser._parse_rbs_frame(pd, file_content, matcher)
+                except (KeyError, ValueError) as e:
+                    # Ragged or unusual files: the row-by-row parser skips bad rows.
+                    logger.warning(f"Falling back to row-by-row statement parsing: {e}")
+        
         transactions = []
         
         # Parse CSV
@@ -67,17 +111,7 @@ class BankStatementParser:
         for row in reader:
             try:
                 # Parse date (format: "06 Apr 2023" or "06-Apr-23")
-                date_str = row['Date'].strip()
-                
-                # Try different date formats
-                date_obj = None
-                for fmt in ['%d %b %Y', '%d-%b-%y', '%d/%m/%Y']:
-                    try:
-                        date_obj = datetime.strptime(date_str, fmt)
-                        break
-                    except ValueError:
-                        continue
-                
+                date_obj = BankStatementParser._parse_date(row['Date'].strip())
                 if not date_obj:
                     continue  # Skip if can't parse date
                 
@@ -93,37 +127,20 @@ class BankStatementParser:
                     description = row['Description'].strip()
                     trans_type = row['Type'].strip()
                     
+                    # Check if should be excluded
+                    if BankStatementParser._should_exclude(description):
+                        continue
+                    
                     # Try to match to recurring template first
-                    template_id, confidence = RecurringTemplateModel.match_transaction(
-                        description, amount, formatted_date
-                    )
+                    template, confidence = matcher.match(description, amount, formatted_date)
                     
                     # Categorize transaction
                     category = BankStatementParser._categorize_transaction(description, trans_type)
                     
-                    # If matched to template, use template's category
-                    template = None
-                    if template_id:
-                        template = RecurringTemplateModel.get_template_by_id(template_id)
-                        if template:
-                            category = template['category_name']
-                    
-                    # Check if should be excluded
-                    if not BankStatementParser._should_exclude(description):
-                        transactions.append({
-                            'date': formatted_date,
-                            'description': description,
-                            'amount': amount,
-                            'type': trans_type,
-                            'category': category,
-                            'suggested': category is not None,  # True if auto-categorized
-                            'selected': category is not None,  # Pre-select if categorized
-                            'template_id': template_id,  # Matched template ID
-                            'template_name': template['name'] if template else None,
-                            'confidence': confidence,  # Match confidence score
-                            'is_recurring': template_id is not None,  # Flag as recurring
-                            'auto_import': template['auto_import'] if template else False
-                        })
+                    transactions.append(BankStatementParser._transaction(
+                        formatted_date, description, amount, trans_type, category,
+                        template, confidence
+                    ))
             except Exception as e:
                 # Skip malformed rows
                 logger.warning(f"Error parsing row: {e}")
@@ -131,6 +148,92 @@ class BankStatementParser:
         
         return transactions
     
+    @staticmethod
+    def _parse_date(date_str: str) -> Optional[datetime]:
+        """Parse a statement date in any of DATE_FORMATS, or None."""
+        for fmt in BankStatementParser.DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        return None
+    
+    @staticmethod
+    def _transaction(date, description, amount, trans_type, category, template, confidence) -> Dict:
+        """Build the transaction dict the import page expects."""
+        # If matched to template, use template's category
+        if template:
+            category = template['category_name']
+        return {
+            'date': date,
+            'description': description,
+            'amount': amount,
+            'type': trans_type,
+            'category': category,
+            'suggested': category is not None,  # True if auto-categorized
+            'selected': category is not None,  # Pre-select if categorized
+            'template_id': template['id'] if template else None,  # Matched template ID
+            'template_name': template['name'] if template else None,
+            'confidence': confidence,  # Match confidence score
+            'is_recurring': template is not None,  # Flag as recurring
+            'auto_import': template['auto_import'] if template else False
+        }
+    
+    @staticmethod
+    def _parse_rbs_frame(pd, file_content: str, matcher: TemplateMatcher) -> List[Dict]:
+        """
+        pandas version of parse_rbs_csv for large statements.
+        
+        Dates are parsed once per distinct value, and exclusion and
+        categorisation are evaluated a column at a time. Raises KeyError or
+        ValueError for files it cannot read the same way as the csv module
+        (missing columns, ragged rows).
+        """
+        import numpy as np
+        
+        frame = pd.read_csv(io.StringIO(file_content.strip()), dtype=object,
+                            keep_default_na=False, index_col=False)
+        frame = frame[['Date', 'Type', 'Description', 'Value']]
+        
+        dates = frame['Date'].str.strip()
+        parsed = {d: BankStatementParser._parse_date(d) for d in dates.unique()}
+        date_objs = dates.map(parsed)
+        values = frame['Value'].str.strip().map(_to_float)
+        
+        # Only debits (expenses) with a valid date and value
+        debit = date_objs.notna() & (values < 0)
+        descriptions = frame['Description'][debit].str.strip()
+        upper = descriptions.str.upper()
+        keep = ~_contains_any(upper, BankStatementParser.EXCLUDE_PATTERNS)
+        
+        descriptions = descriptions[keep]
+        upper = upper[keep]
+        types = frame['Type'][debit][keep].str.strip()
+        date_objs = date_objs[debit][keep]
+        amounts = (-values[debit][keep]).tolist()
+        
+        # Categorize: first matching rule wins, as in _categorize_transaction
+        rules = [(category, _contains_any(upper, patterns))
+                 for category, patterns in BankStatementParser.CATEGORY_RULES.items()]
+        direct_debit = types.isin(['DPC', 'DD'])
+        rules.append(('Vehicle Costs', direct_debit & _contains_any(upper, ['FINANCE', 'LOAN', 'INSURANCE'])))
+        rules.append(('Admin Costs', direct_debit & _contains_any(upper, ['PHONE', 'MOBILE', 'BROADBAND'])))
+        categories = [None] * len(upper)
+        for category, matched in reversed(rules):
+            for i in np.flatnonzero(matched.to_numpy(dtype=bool)):
+                categories[i] = category
+        
+        formatted = [d.strftime('%Y-%m-%d') for d in date_objs]
+        matches = matcher.match_all(zip(descriptions, amounts, formatted))
+        
+        transactions = []
+        for date, description, amount, trans_type, category, (template, confidence) in zip(
+                formatted, descriptions, amounts, types, categories, matches):
+            transactions.append(BankStatementParser._transaction(
+                date, description, amount, trans_type, category, template, confidence
+            ))
+        return transactions
+    
     @staticmethod
     def _categorize_transaction(description: str, trans_type: str) -> Optional[str]:
         """
@@ -4,17 +4,62 @@ Handles customer name mapping and consolidation
 """
 
 import sqlite3
-from pathlib import Path
+import threading
 
+from .. import database as _db_module
 from ..database import get_db_connection
+from ..services.data_versions import get_versions
+
+# The mapping table as a dict, keyed on the database and the
+# customer_mappings version. The model's own writes clear it, and writes
+# from other processes bump the version (see services/data_versions.py).
+_mapping_cache = {}
+_mapping_cache_lock = threading.Lock()
+
+
+def clear_mapping_cache():
+    """Forget the cached mapping table."""
+    with _mapping_cache_lock:
+        _mapping_cache.clear()
+
 
 class CustomerMappingModel:
-    def __init__(self):
-        self.db_path = Path(__file__).parent.parent.parent / 'data/database/payslips.db'
-    
     def get_db_connection(self):
-        """Get database connection."""
-        return sqlite3.connect(self.db_path)
+        """Get a connection to the app database."""
+        return get_db_connection()
+    
+    def get_mapping_table(self):
+        """
+        Return ``{original_customer: mapped_customer}`` for every mapping.
+        
+        Served from an in-process cache while the mappings are unchanged,
+        at the cost of one version lookup. Treat it as read-only: it is
+        shared between callers.
+        """
+        with self.get_db_connection() as conn:
+            versions = get_versions(conn, 'customer_mappings')
+            key = (_db_module.DB_PATH, versions)
+            if versions is not None:
+                with _mapping_cache_lock:
+                    if key in _mapping_cache:
+                        return _mapping_cache[key]
+            
+            table = {
+                row[0]: row[1] for row in conn.execute(
+                    "SELECT original_customer, mapped_customer FROM customer_mappings"
+                )
+            }
+        
+        if versions is not None:
+            with _mapping_cache_lock:
+                _mapping_cache.clear()
+                _mapping_cache[key] = table
+        return table
+    
+    def resolve_customers(self, names):
+        """Map each name to its mapped customer, or itself when unmapped."""
+        table = self.get_mapping_table()
+        return {name: table.get(name, name) if name else name for name in names}
     
     def get_all_mappings(self):
         """Get all customer mappings."""
@@ -42,17 +87,8 @@ class CustomerMappingModel:
         """Get the mapped customer name or return original if no mapping exists."""
         if not original_customer:
             return original_customer
-            
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT mapped_customer 
-                FROM customer_mappings 
-                WHERE original_customer = ?
-            """, (original_customer,))
-            
-            result = cursor.fetchone()
-            return result[0] if result else original_customer
+        
+        return self.get_mapping_table().get(original_customer, original_customer)
     
     def add_mapping(self, original_customer, mapped_customer, notes=None):
         """Add a new customer mapping."""
@@ -64,6 +100,7 @@ class CustomerMappingModel:
                     VALUES (?, ?, ?)
                 """, (original_customer, mapped_customer, notes))
                 conn.commit()
+                clear_mapping_cache()
                 return {'success': True, 'id': cursor.lastrowid}
         except sqlite3.IntegrityError:
             return {'success': False, 'error': 'Mapping already exists for this customer'}
@@ -85,6 +122,7 @@ class CustomerMappingModel:
                     return {'success': False, 'error': 'Mapping not found'}
                 
                 conn.commit()
+                clear_mapping_cache()
                 return {'success': True}
         except sqlite3.IntegrityError:
             return {'success': False, 'error': 'Mapping already exists for this customer'}
@@ -102,6 +140,7 @@ class CustomerMappingModel:
                     return {'success': False, 'error': 'Mapping not found'}
                 
                 conn.commit()
+                clear_mapping_cache()
                 return {'success': True}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -121,35 +160,78 @@ class CustomerMappingModel:
     
     def get_mapping_suggestions(self):
         """Get suggested mappings based on similar customer names."""
-        customers = self.get_unique_customers()
-        suggestions = []
+        return self._group_similar(self.get_unique_customers())
+    
+    def _group_similar(self, customers):
+        """
+        Group similar customers (basic fuzzy matching).
         
-        # Group similar customers (basic fuzzy matching)
-        processed = set()
+        Two customers are similar when one base name contains the other
+        (case-insensitive) or they share a significant word (see
+        _similar_names). Customers are taken in order. Each one that is not
+        yet grouped collects every ungrouped customer similar to it.
         
+        Each name is normalised once, and the base names each base name
+        contains are found by walking a prefix set. Candidates come from
+        indexes by significant word and by base name, and grouped customers
+        are dropped from the indexes. The groups are the ones a comparison
+        of every pair would give.
+        """
+        names = []
         for customer in customers:
-            if customer in processed:
+            base = self._extract_base_name(customer)
+            names.append((base.lower(), self._significant_words(base)) if base else None)
+        
+        bases = {name[0] for name in names if name}
+        prefixes = {base[:end] for base in bases for end in range(1, len(base) + 1)}
+        
+        # Unprocessed positions by significant word, by base name, and by
+        # each base name that occurs inside their own.
+        by_word = {}
+        by_base = {}
+        by_contained = {}
+        contained = []
+        for position, name in enumerate(names):
+            if name is None:
+                contained.append(())
+                continue
+            base, words = name
+            inside = set()
+            for start in range(len(base)):
+                for end in range(start + 1, len(base) + 1):
+                    piece = base[start:end]
+                    if piece not in prefixes:
+                        break
+                    if piece in bases:
+                        inside.add(piece)
+            contained.append(inside)
+            by_base.setdefault(base, set()).add(position)
+            for piece in inside:
+                by_contained.setdefault(piece, set()).add(position)
+            for word in words:
+                by_word.setdefault(word, set()).add(position)
+        
+        suggestions = []
+        processed = [False] * len(customers)
+        
+        for position, customer in enumerate(customers):
+            if processed[position] or names[position] is None:
                 continue
-                
-            # Find similar customers
-            similar = []
-            base_name = self._extract_base_name(customer)
             
-            for other_customer in customers:
-                if other_customer != customer and other_customer not in processed:
-                    other_base = self._extract_base_name(other_customer)
-                    
-                    # Check if they share a common base name
-                    if base_name and other_base and (
-                        base_name.lower() in other_base.lower() or 
-                        other_base.lower() in base_name.lower() or
-                        self._similar_names(base_name, other_base)
-                    ):
-                        similar.append(other_customer)
+            # Find similar customers
+            base, words = names[position]
+            candidates = set(by_contained[base])
+            for piece in contained[position]:
+                candidates |= by_base[piece]
+            for word in words:
+                candidates |= by_word[word]
+            candidates.discard(position)
             
-            if similar:
+            if candidates:
+                similar = sorted(candidates)
+                
                 # Suggest the shortest name as the mapped name
-                all_names = [customer] + similar
+                all_names = [customer] + [customers[other] for other in similar]
                 mapped_name = min(all_names, key=len)
                 
                 suggestions.append({
@@ -158,8 +240,14 @@ class CustomerMappingModel:
                 })
                 
                 # Mark all as processed
-                processed.add(customer)
-                processed.update(similar)
+                for member in [position] + similar:
+                    processed[member] = True
+                    member_base, member_words = names[member]
+                    by_base[member_base].discard(member)
+                    for piece in contained[member]:
+                        by_contained[piece].discard(member)
+                    for word in member_words:
+                        by_word[word].discard(member)
         
         return suggestions
     
@@ -185,16 +273,12 @@ class CustomerMappingModel:
     
     def _similar_names(self, name1, name2):
         """Check if two names are similar (basic similarity check)."""
-        name1_words = set(name1.upper().split())
-        name2_words = set(name2.upper().split())
-        
-        # Check if they share significant words
-        common_words = name1_words.intersection(name2_words)
-        
-        # Consider similar if they share at least one significant word (length > 3)
-        significant_common = [word for word in common_words if len(word) > 3]
-        
-        return len(significant_common) > 0
+        # Consider similar if they share at least one significant word
+        return bool(self._significant_words(name1) & self._significant_words(name2))
+    
+    def _significant_words(self, name):
+        """Upper-cased words of a name longer than 3 characters."""
+        return {word for word in name.upper().split() if len(word) > 3}
     
     def get_mapping_stats(self):
         """Get statistics about customer mappings."""
@@ -10,6 +10,13 @@ from ..database import get_db_connection, execute_query
 class ExpenseModel:
     """Model for expense data operations."""
     
+    _INSERT = """
+        INSERT INTO expenses 
+        (date, category_id, description, amount, vat_amount, receipt_file, 
+         is_recurring, recurring_frequency, tax_year)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
     @staticmethod
     def get_categories(active_only=True):
         """Get all expense categories."""
@@ -40,33 +47,90 @@ class ExpenseModel:
         return result['count'] > 0
     
     @staticmethod
-    def add_expense(date, category_id, amount, description=None, vat_amount=0, 
-                   receipt_file=None, is_recurring=False, recurring_frequency=None):
-        """Add a new expense."""
-        # Calculate tax year (April 6 - April 5)
-        # Handle both YYYY-MM-DD (from parse_date) and DD/MM/YYYY formats
+    def transactions_exist(transactions):
+        """
+        Duplicate detection for a whole statement.
+        
+        Same rule as transaction_exists, answered from one query over the
+        statement's date range (covered by idx_expenses_dedup). Returns a
+        list of booleans in the order of ``transactions``.
+        """
+        if not transactions:
+            return []
+        dates = [t['date'] for t in transactions]
+        query = """
+            SELECT date, amount, description
+            FROM expenses
+            WHERE date BETWEEN ? AND ?
+        """
+        rows = execute_query(query, (min(dates), max(dates)), fetch_all=True)
+        
+        exact = set()
+        with_notes = set()
+        for row in rows:
+            description = row['description']
+            if description is None:
+                continue
+            exact.add((row['date'], row['amount'], description))
+            # "<description> - <notes>": LIKE is case-insensitive, so keep
+            # every upper-cased prefix that precedes a " - ".
+            start = description.find(' - ')
+            while start != -1:
+                with_notes.add((row['date'], row['amount'], description[:start].upper()))
+                start = description.find(' - ', start + 1)
+        
+        return [
+            (t['date'], t['amount'], t['description']) in exact
+            or (t['date'], t['amount'], t['description'].upper()) in with_notes
+            for t in transactions
+        ]
+    
+    @staticmethod
+    def get_tax_year(date):
+        """Tax year (April 6 - April 5) for a YYYY-MM-DD or DD/MM/YYYY date."""
         try:
             expense_date = datetime.strptime(date, '%Y-%m-%d')
         except ValueError:
             expense_date = datetime.strptime(date, '%d/%m/%Y')
         if expense_date.month >= 4 and expense_date.day >= 6:
-            tax_year = f"{expense_date.year}/{expense_date.year + 1}"
-        else:
-            tax_year = f"{expense_date.year - 1}/{expense_date.year}"
+            return f"{expense_date.year}/{expense_date.year + 1}"
+        return f"{expense_date.year - 1}/{expense_date.year}"
+    
+    @staticmethod
+    def add_expense(date, category_id, amount, description=None, vat_amount=0, 
+                   receipt_file=None, is_recurring=False, recurring_frequency=None):
+        """Add a new expense."""
+        tax_year = ExpenseModel.get_tax_year(date)
         
-        query = """
-            INSERT INTO expenses 
-            (date, category_id, description, amount, vat_amount, receipt_file, 
-             is_recurring, recurring_frequency, tax_year)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (date, category_id, description, amount, vat_amount, 
-                                  receipt_file, is_recurring, recurring_frequency, tax_year))
+            cursor.execute(ExpenseModel._INSERT, (date, category_id, description, amount, vat_amount, 
+                                                  receipt_file, is_recurring, recurring_frequency, tax_year))
             conn.commit()
             return cursor.lastrowid
     
+    @staticmethod
+    def add_expenses(expenses):
+        """
+        Add many expenses in one transaction.
+        
+        ``expenses`` is a list of dicts with the add_expense arguments.
+        Either every row is inserted or, on error, none is. Returns the
+        number of rows inserted.
+        """
+        params = [
+            (e['date'], e['category_id'], e.get('description'), e['amount'],
+             e.get('vat_amount', 0), e.get('receipt_file'), e.get('is_recurring', False),
+             e.get('recurring_frequency'), ExpenseModel.get_tax_year(e['date']))
+            for e in expenses
+        ]
+        if not params:
+            return 0
+        with get_db_connection() as conn:
+            conn.executemany(ExpenseModel._INSERT, params)
+            conn.commit()
+        return len(params)
+    
     @staticmethod
     def get_expenses(start_date=None, end_date=None, category_id=None, tax_year=None):
         """Get expenses with optional filters."""
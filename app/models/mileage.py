@@ -1,9 +1,9 @@
 """
-Mileage model for managing mileage entries and detecting missing data
+Mileage model for managing mileage entries and detecting missing data.
+
+The mileage_entries table is created by migration 019.
 """
 
-import os
-import sqlite3
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
@@ -12,44 +12,11 @@ from ..database import get_db_connection
 class MileageModel:
     """Model for managing mileage entries."""
     
-    @staticmethod
-    def get_db_path():
-        """Get the database path."""
-        return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'database', 'wages.db')
-    
-    @staticmethod
-    def init_db():
-        """Initialize the mileage table if it doesn't exist."""
-        db_path = MileageModel.get_db_path()
-        
-        with sqlite3.connect(db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS mileage_entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    start_mileage REAL DEFAULT 0,
-                    end_mileage REAL DEFAULT 0,
-                    total_miles REAL NOT NULL,
-                    fuel_cost REAL DEFAULT 0,
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date)
-                )
-            ''')
-            
-            # Create index on date for faster queries
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_mileage_date ON mileage_entries(date)')
-            conn.commit()
-    
     @staticmethod
     def create_entry(date: str, start_mileage: float = 0, end_mileage: float = 0, 
                     total_miles: float = 0, fuel_cost: float = 0, notes: str = '') -> int:
         """Create a new mileage entry."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
-        with sqlite3.connect(db_path) as conn:
+        with get_db_connection() as conn:
             cursor = conn.execute('''
                 INSERT OR REPLACE INTO mileage_entries 
                 (date, start_mileage, end_mileage, total_miles, fuel_cost, notes, updated_at)
@@ -62,9 +29,6 @@ class MileageModel:
     @staticmethod
     def get_entries(limit: int = 50, offset: int = 0, year: str = None, month: str = None) -> List[Dict]:
         """Get mileage entries with optional filtering."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
         query = '''
             SELECT id, date, start_mileage, end_mileage, total_miles, fuel_cost, notes, 
                    created_at, updated_at
@@ -88,8 +52,7 @@ class MileageModel:
         query += ' ORDER BY date DESC LIMIT ? OFFSET ?'
         params.extend([limit, offset])
         
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with get_db_connection() as conn:
             cursor = conn.execute(query, params)
             
             entries = []
@@ -111,11 +74,7 @@ class MileageModel:
     @staticmethod
     def get_entry_by_id(entry_id: int) -> Optional[Dict]:
         """Get a specific mileage entry by ID."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with get_db_connection() as conn:
             cursor = conn.execute('''
                 SELECT id, date, start_mileage, end_mileage, total_miles, fuel_cost, notes,
                        created_at, updated_at
@@ -142,9 +101,6 @@ class MileageModel:
     @staticmethod
     def update_entry(entry_id: int, **kwargs) -> bool:
         """Update a mileage entry."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
         # Build update query dynamically based on provided fields
         update_fields = []
         params = []
@@ -166,7 +122,7 @@ class MileageModel:
             WHERE id = ?
         '''
         
-        with sqlite3.connect(db_path) as conn:
+        with get_db_connection() as conn:
             cursor = conn.execute(query, params)
             conn.commit()
             return cursor.rowcount > 0
@@ -174,10 +130,7 @@ class MileageModel:
     @staticmethod
     def delete_entry(entry_id: int) -> bool:
         """Delete a mileage entry."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
-        with sqlite3.connect(db_path) as conn:
+        with get_db_connection() as conn:
             cursor = conn.execute('DELETE FROM mileage_entries WHERE id = ?', (entry_id,))
             conn.commit()
             return cursor.rowcount > 0
@@ -185,11 +138,7 @@ class MileageModel:
     @staticmethod
     def get_missing_mileage_dates(year: str = None, month: str = None) -> List[str]:
         """Get dates that have job data but no mileage entries (same logic as weekly summary)."""
-        MileageModel.init_db()
-        
         with get_db_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            
             # Get all dates with jobs (working days) - filter out invalid dates
             job_dates_query = '''
                 SELECT 
@@ -246,13 +195,8 @@ class MileageModel:
                 WHERE date IN ({placeholders})
             '''
             
-            try:
-                cursor = conn.execute(mileage_entries_query, work_dates)
-                dates_with_entries = set(row[0] for row in cursor.fetchall())
-                dates_with_mileage.update(dates_with_entries)
-            except sqlite3.OperationalError:
-                # mileage_entries table doesn't exist yet, that's ok
-                pass
+            cursor = conn.execute(mileage_entries_query, work_dates)
+            dates_with_mileage.update(row[0] for row in cursor.fetchall())
             
             # Find missing dates (days with jobs but no mileage data)
             missing_dates = []
@@ -265,9 +209,6 @@ class MileageModel:
     @staticmethod
     def get_summary(year: str = None, month: str = None) -> Dict:
         """Get mileage summary statistics."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
         query = '''
             SELECT 
                 COUNT(*) as total_entries,
@@ -294,8 +235,7 @@ class MileageModel:
                 query += ' AND substr(date, 6, 2) = ?'
                 params.append(f'{month:0>2}')
         
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with get_db_connection() as conn:
             cursor = conn.execute(query, params)
             row = cursor.fetchone()
             
@@ -325,9 +265,6 @@ class MileageModel:
     @staticmethod
     def has_mileage_for_date(date: str) -> bool:
         """Check if mileage entry exists for a specific date."""
-        MileageModel.init_db()
-        db_path = MileageModel.get_db_path()
-        
-        with sqlite3.connect(db_path) as conn:
+        with get_db_connection() as conn:
             cursor = conn.execute('SELECT 1 FROM mileage_entries WHERE date = ?', (date,))
             return cursor.fetchone() is not None
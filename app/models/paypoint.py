@@ -12,81 +12,18 @@ from ..database import get_db_connection, execute_query
 class PaypointModel:
     """Model for Paypoint stock management operations."""
     
+    TABLES = ('paypoint_stock', 'paypoint_deployments', 'paypoint_returns', 'paypoint_audit_log')
+    
     @staticmethod
-    def init_tables():
-        """Initialize Paypoint-related database tables."""
+    def missing_tables():
+        """Return the Paypoint tables that do not exist (they are created by migration 019)."""
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Paypoint stock items table - individual devices with serial/TID
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS paypoint_stock (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    paypoint_type TEXT NOT NULL,  -- 'PP One', 'PP Mini', 'P-Pod', 'Rp10', 'Zebra Printer'
-                    serial_ptid TEXT NOT NULL UNIQUE,  -- Serial number or TID
-                    trace_stock TEXT NOT NULL,  -- Trace/Stock number
-                    status TEXT DEFAULT 'available',  -- 'available', 'deployed', 'returned'
-                    current_job_number TEXT,  -- Job number if deployed
-                    deployment_date TIMESTAMP,
-                    return_date TIMESTAMP,
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            existing = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'paypoint_%'"
                 )
-            """)
-            
-            # Paypoint deployments table (when devices are deployed to jobs)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS paypoint_deployments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    stock_item_id INTEGER NOT NULL,
-                    job_number TEXT NOT NULL,
-                    paypoint_type TEXT NOT NULL,
-                    serial_ptid TEXT NOT NULL,
-                    trace_stock TEXT NOT NULL,
-                    deployment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    customer TEXT,
-                    location TEXT,
-                    installation_notes TEXT,
-                    status TEXT DEFAULT 'deployed',  -- 'deployed', 'returned'
-                    FOREIGN KEY (stock_item_id) REFERENCES paypoint_stock(id)
-                )
-            """)
-            
-            # Paypoint returns table (when devices are returned from jobs)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS paypoint_returns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    deployment_id INTEGER NOT NULL,
-                    stock_item_id INTEGER NOT NULL,
-                    job_number TEXT NOT NULL,
-                    paypoint_type TEXT NOT NULL,
-                    return_serial_ptid TEXT NOT NULL,  -- Serial/TID being returned
-                    return_trace TEXT NOT NULL,  -- Return trace number
-                    return_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    return_reason TEXT,
-                    return_notes TEXT,
-                    FOREIGN KEY (deployment_id) REFERENCES paypoint_deployments(id),
-                    FOREIGN KEY (stock_item_id) REFERENCES paypoint_stock(id)
-                )
-            """)
-            
-            # Paypoint audit log table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS paypoint_audit_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    action TEXT NOT NULL,
-                    table_name TEXT NOT NULL,
-                    record_id INTEGER,
-                    old_values TEXT,  -- JSON string
-                    new_values TEXT,  -- JSON string
-                    user_id TEXT DEFAULT 'system',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            conn.commit()
-            print("✅ Paypoint database tables initialized")
+            }
+        return [table for table in PaypointModel.TABLES if table not in existing]
     
     @staticmethod
     def get_all_stock_items():
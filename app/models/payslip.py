@@ -14,24 +14,31 @@ class PayslipModel:
     @staticmethod
     def get_summary():
         """Get overall summary statistics."""
+        from ..services import table_stats
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Overall stats
+            # Counts and totals are trigger-maintained; MIN/MAX use
+            # idx_payslips_net_payment.
+            stats = table_stats.get_stats(conn)
+            total_weeks = stats.get('payslips.rows', 0)
+            total_earnings = stats.get('payslips.net_payment_total', 0)
+            paid_weeks = stats.get('payslips.with_net_payment', 0)
             cursor.execute("""
                 SELECT 
-                    COUNT(*) as total_weeks,
-                    SUM(net_payment) as total_earnings,
-                    AVG(net_payment) as avg_weekly,
-                    MIN(net_payment) as min_weekly,
-                    MAX(net_payment) as max_weekly
-                FROM payslips
+                    (SELECT MIN(net_payment) FROM payslips) as min_weekly,
+                    (SELECT MAX(net_payment) FROM payslips) as max_weekly
             """)
-            overall = dict(cursor.fetchone())
-            
-            # Total jobs
-            cursor.execute("SELECT COUNT(*) as total_jobs FROM job_items")
-            overall['total_jobs'] = cursor.fetchone()['total_jobs']
+            extremes = cursor.fetchone()
+            overall = {
+                'total_weeks': total_weeks,
+                'total_earnings': total_earnings if paid_weeks else None,
+                'avg_weekly': total_earnings / paid_weeks if paid_weeks else None,
+                'min_weekly': extremes['min_weekly'],
+                'max_weekly': extremes['max_weekly'],
+                'total_jobs': stats.get('job_items.rows', 0),
+            }
             
             # Current tax year
             cursor.execute("""
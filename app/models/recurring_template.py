@@ -3,6 +3,7 @@ Recurring Payment Template Model
 Manages templates for recurring expenses with smart matching
 """
 
+from bisect import bisect_right
 from datetime import datetime, timedelta
 
 from ..database import get_db_connection, execute_query
@@ -143,60 +144,25 @@ class RecurringTemplateModel:
             return cursor.rowcount > 0
     
     @staticmethod
-    def match_transaction(description, amount, date):
+    def matcher(templates=None):
+        """
+        A TemplateMatcher over the active templates (or ``templates``).
+        
+        Build one per import and match every transaction through it.
+        """
+        if templates is None:
+            templates = RecurringTemplateModel.get_templates(active_only=True)
+        return TemplateMatcher(templates)
+    
+    @staticmethod
+    def match_transaction(description, amount, date, templates=None):
         """
         Try to match a transaction to a recurring template.
         
         Returns: (template_id, confidence_score) or (None, 0)
         """
-        templates = RecurringTemplateModel.get_templates(active_only=True)
-        
-        best_match = None
-        best_score = 0
-        
-        for template in templates:
-            score = 0
-            
-            # Check merchant pattern match (case-insensitive)
-            pattern = template['merchant_pattern'].upper()
-            desc_upper = description.upper()
-            
-            if pattern in desc_upper:
-                score += 50  # Strong match
-            elif any(word in desc_upper for word in pattern.split()):
-                score += 25  # Partial match
-            
-            # Check amount match (within tolerance)
-            amount_diff = abs(amount - template['expected_amount'])
-            if amount_diff <= template['tolerance_amount']:
-                score += 30
-                # Bonus for exact match
-                if amount_diff == 0:
-                    score += 10
-            
-            # Check date proximity to expected date
-            if template['next_expected_date']:
-                try:
-                    expected = datetime.strptime(template['next_expected_date'], '%Y-%m-%d')
-                    actual = datetime.strptime(date, '%Y-%m-%d')
-                    days_diff = abs((actual - expected).days)
-                    
-                    if days_diff <= 3:
-                        score += 20
-                    elif days_diff <= 7:
-                        score += 10
-                except:
-                    pass
-            
-            if score > best_score:
-                best_score = score
-                best_match = template['id']
-        
-        # Require minimum confidence of 60% to match
-        if best_score >= 60:
-            return best_match, best_score
-        
-        return None, 0
+        template, score = RecurringTemplateModel.matcher(templates).match(description, amount, date)
+        return (template['id'], score) if template else (None, 0)
     
     @staticmethod
     def update_last_matched(template_id, matched_date):
@@ -231,20 +197,7 @@ class RecurringTemplateModel:
         """Get templates that are due for payment (within next 7 days)."""
         today = datetime.now()
         week_ahead = today + timedelta(days=7)
-        
-        templates = RecurringTemplateModel.get_templates(active_only=True)
-        due_templates = []
-        
-        for template in templates:
-            if template['next_expected_date']:
-                try:
-                    expected = datetime.strptime(template['next_expected_date'], '%Y-%m-%d')
-                    if today <= expected <= week_ahead:
-                        due_templates.append(template)
-                except:
-                    pass
-        
-        return due_templates
+        return RecurringTemplateModel.matcher().due_between(today, week_ahead)
     
     @staticmethod
     def _calculate_next_date(frequency, day_of_month=None):
@@ -296,3 +249,164 @@ class RecurringTemplateModel:
         
         row = execute_query(query, fetch_one=True)
         return dict(row) if row else {}
+
+
+class TemplateMatcher:
+    """
+    Scores transactions against a fixed list of recurring templates.
+    
+    Everything match_transaction used to work out per template and per
+    transaction is prepared once: upper-cased patterns and their words,
+    parsed next expected dates and the amount band each template accepts.
+    An inverted index from pattern words to templates, consulted per
+    description token, limits scoring to templates that can reach
+    MATCH_THRESHOLD. A template needs merchant text or an amount within
+    tolerance for that, since the date alone scores at most 20.
+    Scores are exactly those of the original per-template loop.
+    """
+    
+    SCORE_PATTERN = 50        # whole merchant pattern in the description
+    SCORE_PATTERN_WORD = 25   # any word of it
+    SCORE_AMOUNT = 30         # amount within tolerance
+    SCORE_EXACT_AMOUNT = 10   # ... and exactly the expected amount
+    SCORE_DATE_NEAR = 20      # within 3 days of the next expected date
+    SCORE_DATE_WEEK = 10      # within 7 days
+    MATCH_THRESHOLD = 60
+    
+    def __init__(self, templates):
+        self.templates = list(templates)
+        self._patterns = []
+        self._expected = []
+        self._word_index = {}     # pattern word -> template positions
+        self._unindexed = []      # templates whose pattern has no words
+        self._bands = []          # (low, high, position), sorted by low
+        self._token_cache = {}    # description token -> template positions
+        self._date_cache = {}
+        
+        for position, template in enumerate(self.templates):
+            pattern = template['merchant_pattern'].upper()
+            words = pattern.split()
+            self._patterns.append((pattern, words))
+            for word in words:
+                self._word_index.setdefault(word, set()).add(position)
+            if not words:
+                self._unindexed.append(position)
+            
+            expected = None
+            if template['next_expected_date']:
+                try:
+                    expected = datetime.strptime(template['next_expected_date'], '%Y-%m-%d')
+                except (TypeError, ValueError):
+                    pass
+            self._expected.append(expected)
+            
+            # Widened a little so float rounding never drops a candidate;
+            # scoring applies the exact tolerance test.
+            expected_amount = template['expected_amount']
+            tolerance = template['tolerance_amount']
+            margin = 1e-9 * (abs(expected_amount) + abs(tolerance) + 1)
+            self._bands.append((expected_amount - tolerance - margin,
+                                expected_amount + tolerance + margin, position))
+        self._bands.sort()
+        self._band_lows = [low for low, _, _ in self._bands]
+    
+    def match(self, description, amount, date):
+        """
+        Best template for one transaction.
+        
+        Returns: (template, confidence_score) or (None, 0)
+        """
+        desc_upper = description.upper()
+        best_match = None
+        best_score = 0
+        actual = None
+        
+        for position in self._candidates(desc_upper, amount):
+            if actual is None and self._expected[position] is not None:
+                actual = self._parse_date(date)
+            score = self._score(position, desc_upper, amount, actual)
+            if score > best_score:
+                best_score = score
+                best_match = self.templates[position]
+        
+        if best_score >= self.MATCH_THRESHOLD:
+            return best_match, best_score
+        
+        return None, 0
+    
+    def match_all(self, transactions):
+        """match() for each (description, amount, date) in ``transactions``, in order."""
+        return [self.match(description, amount, date)
+                for description, amount, date in transactions]
+    
+    def due_between(self, start, end):
+        """Templates whose next expected date falls between ``start`` and ``end``."""
+        return [template for template, expected in zip(self.templates, self._expected)
+                if expected is not None and start <= expected <= end]
+    
+    def _candidates(self, desc_upper, amount):
+        """Positions, in template order, of templates that can reach the threshold."""
+        positions = set(self._unindexed)
+        
+        # A pattern word has no whitespace, so it occurs in the description
+        # only inside one of its tokens.
+        for token in set(desc_upper.split()):
+            found = self._token_cache.get(token)
+            if found is None:
+                found = set()
+                for word, word_positions in self._word_index.items():
+                    if word in token:
+                        found |= word_positions
+                self._token_cache[token] = found
+            positions |= found
+        
+        for low, high, position in self._bands[:bisect_right(self._band_lows, amount)]:
+            if amount <= high:
+                positions.add(position)
+        
+        return sorted(positions)
+    
+    def _score(self, position, desc_upper, amount, actual):
+        template = self.templates[position]
+        pattern, words = self._patterns[position]
+        score = 0
+        
+        # Check merchant pattern match (case-insensitive)
+        if pattern in desc_upper:
+            score += self.SCORE_PATTERN  # Strong match
+        elif any(word in desc_upper for word in words):
+            score += self.SCORE_PATTERN_WORD  # Partial match
+        
+        # Check amount match (within tolerance)
+        amount_diff = abs(amount - template['expected_amount'])
+        if amount_diff <= template['tolerance_amount']:
+            score += self.SCORE_AMOUNT
+            # Bonus for exact match
+            if amount_diff == 0:
+                score += self.SCORE_EXACT_AMOUNT
+        
+        # Check date proximity to expected date
+        expected = self._expected[position]
+        if expected is not None and actual:
+            days_diff = abs((actual - expected).days)
+            if days_diff <= 3:
+                score += self.SCORE_DATE_NEAR
+            elif days_diff <= 7:
+                score += self.SCORE_DATE_WEEK
+        
+        return score
+    
+    def _parse_date(self, date):
+        """The transaction date as a datetime, or False when it is not YYYY-MM-DD."""
+        try:
+            return self._date_cache[date]
+        except KeyError:
+            pass
+        except TypeError:
+            return False
+        try:
+            parsed = datetime.strptime(date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            parsed = False
+        self._date_cache[date] = parsed
+        return parsed
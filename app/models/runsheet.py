@@ -71,91 +71,78 @@ class RunsheetModel:
     @staticmethod
     def get_runsheets_list(page=1, per_page=20, sort_column='date', sort_order='desc', 
                           filter_year='', filter_month='', filter_week='', filter_day=''):
-        """Get paginated list of run sheets with filters and sorting."""
+        """Get paginated list of run sheets with filters and sorting.
+
+        Reads the trigger-maintained ``runsheet_day_status`` table (see
+        ``app/services/runsheet_status_index.py``) rather than grouping
+        ``run_sheet_jobs`` on every call.
+        """
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
             offset = (page - 1) * per_page
             
-            # Validate sort parameters
-            valid_columns = ['date', 'job_count']
-            if sort_column not in valid_columns:
-                sort_column = 'date'
-            if sort_order.upper() not in ['ASC', 'DESC']:
-                sort_order = 'DESC'
-            
             # Build WHERE clause for filters with parameterized queries
             # Exclude dates that have attendance entries (absent days)
-            where_conditions = [
-                "r.date IS NOT NULL",
-                "NOT EXISTS (SELECT 1 FROM attendance a WHERE a.date = r.date)"
-            ]
+            where_conditions = ["is_absent = 0"]
             params = []
             
             if filter_year:
-                where_conditions.append("substr(r.date, 7, 4) = ?")
+                where_conditions.append("year = ?")
                 params.append(str(filter_year))
             
             if filter_month:
-                where_conditions.append("substr(r.date, 4, 2) = ?")
+                where_conditions.append("month = ?")
                 params.append(str(filter_month))
             
             if filter_week and filter_week.strip():
-                # Calculate week number from date
                 try:
                     week_num = int(filter_week)
-                    where_conditions.append("CAST(strftime('%U', substr(r.date, 7, 4) || '-' || substr(r.date, 4, 2) || '-' || substr(r.date, 1, 2)) AS INTEGER) = ?")
+                    where_conditions.append("week_of_year = ?")
                     params.append(week_num - 1)
                 except ValueError:
                     pass  # Invalid week number, skip filter
             
             if filter_day:
                 # Day of week (0=Sunday, 1=Monday, etc.)
-                where_conditions.append("CAST(strftime('%w', substr(r.date, 7, 4) || '-' || substr(r.date, 4, 2) || '-' || substr(r.date, 1, 2)) AS INTEGER) = ?")
+                where_conditions.append("weekday = ?")
                 params.append(int(filter_day))
             
             where_clause = " AND ".join(where_conditions)
             
             # Get total count with filters
-            count_query = f"SELECT COUNT(DISTINCT r.date) FROM run_sheet_jobs r WHERE {where_clause}"
-            cursor.execute(count_query, params)
+            cursor.execute(f"SELECT COUNT(*) FROM runsheet_day_status WHERE {where_clause}", params)
             total = cursor.fetchone()[0]
             
-            # Get run sheets grouped by date with sorting and filters
             # Whitelist allowed sort columns to prevent SQL injection
-            ALLOWED_SORT_COLUMNS = {'date', 'job_count', 'daily_pay', 'mileage', 'fuel_cost'}
-            if sort_column not in ALLOWED_SORT_COLUMNS:
-                sort_column = 'date'
+            ALLOWED_SORT_COLUMNS = {
+                'date': 'sort_date',
+                'job_count': 'total_jobs',
+                'daily_pay': 'daily_pay',
+                'mileage': 'mileage',
+                'fuel_cost': 'fuel_cost',
+            }
+            order_column = ALLOWED_SORT_COLUMNS.get(sort_column, 'sort_date')
             
             # Validate sort order
             if sort_order.upper() not in ('ASC', 'DESC'):
                 sort_order = 'DESC'
             
-            if sort_column == 'date':
-                order_clause = f"substr(r.date, 7, 4) || '-' || substr(r.date, 4, 2) || '-' || substr(r.date, 1, 2) {sort_order.upper()}"
-            else:
-                order_clause = f"{sort_column} {sort_order.upper()}"
-            
-            query = f"""
+            cursor.execute(f"""
                 SELECT 
-                    r.date,
-                    COUNT(*) as job_count,
-                    GROUP_CONCAT(DISTINCT r.customer) as customers,
-                    GROUP_CONCAT(DISTINCT r.activity) as activities,
-                    ROUND(SUM(r.pay_amount), 2) as daily_pay,
-                    COUNT(CASE WHEN r.pay_amount IS NOT NULL THEN 1 END) as jobs_with_pay,
-                    d.mileage,
-                    d.fuel_cost
-                FROM run_sheet_jobs r
-                LEFT JOIN runsheet_daily_data d ON r.date = d.date
+                    date,
+                    total_jobs as job_count,
+                    customers,
+                    activities,
+                    daily_pay,
+                    jobs_with_pay,
+                    mileage,
+                    fuel_cost
+                FROM runsheet_day_status
                 WHERE {where_clause}
-                GROUP BY r.date, d.mileage, d.fuel_cost
-                ORDER BY {order_clause}
+                ORDER BY {order_column} {sort_order.upper()}
                 LIMIT ? OFFSET ?
-            """
-            # Combine params with pagination params
-            query_params = params + [per_page, offset]
-            cursor.execute(query, query_params)
+            """, params + [per_page, offset])
             
             runsheets = [dict(row) for row in cursor.fetchall()]
             
@@ -362,45 +349,30 @@ class RunsheetModel:
     
     @staticmethod
     def get_completion_status():
-        """Get completion status for all run sheet dates."""
+        """Get completion status for all run sheet dates.
+
+        A date is ``completed`` when every job has an action selected and
+        mileage is recorded, ``in_progress`` when either has started, and
+        ``not_started`` otherwise. The status is maintained per date in
+        ``runsheet_day_status``.
+        """
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get completion status for each date
             cursor.execute("""
-                SELECT 
-                    r.date,
-                    COUNT(*) as total_jobs,
-                    COUNT(CASE WHEN r.status IS NOT NULL AND r.status != 'pending' THEN 1 END) as jobs_with_actions,
-                    CASE WHEN d.mileage IS NOT NULL THEN 1 ELSE 0 END as has_mileage
-                FROM run_sheet_jobs r
-                LEFT JOIN runsheet_daily_data d ON r.date = d.date
-                GROUP BY r.date, d.mileage
-                ORDER BY r.date DESC
+                SELECT date, status, total_jobs, jobs_with_actions, has_mileage
+                FROM runsheet_day_status
+                ORDER BY sort_date DESC
             """)
             
-            results = cursor.fetchall()
-            status_map = {}
-            
-            for row in results:
-                date, total, jobs_with_actions, has_mileage = row
-                
-                # Determine status based on action selections and mileage
-                if jobs_with_actions == total and has_mileage:
-                    status = 'completed'  # All jobs have actions selected + mileage recorded
-                elif jobs_with_actions > 0 or has_mileage:
-                    status = 'in_progress'  # Some jobs have actions selected OR mileage recorded
-                else:
-                    status = 'not_started'  # No actions selected AND no mileage
-                
-                status_map[date] = {
-                    'status': status,
-                    'total_jobs': total,
-                    'jobs_with_actions': jobs_with_actions,
-                    'has_mileage': has_mileage
+            return {
+                row['date']: {
+                    'status': row['status'],
+                    'total_jobs': row['total_jobs'],
+                    'jobs_with_actions': row['jobs_with_actions'],
+                    'has_mileage': row['has_mileage']
                 }
-            
-            return status_map
+                for row in cursor.fetchall()
+            }
     
     @staticmethod
     def update_job_pay_info():
@@ -408,17 +380,6 @@ class RunsheetModel:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Add pay columns to run_sheet_jobs if they don't exist
-            try:
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_amount REAL")
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_rate REAL") 
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_units REAL")
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_week INTEGER")
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_year TEXT")
-                cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN pay_updated_at TIMESTAMP")
-            except:
-                pass  # Columns already exist
-            
             # Update runsheet jobs with payslip data
             cursor.execute("""
                 UPDATE run_sheet_jobs 
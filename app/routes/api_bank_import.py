@@ -35,16 +35,10 @@ def api_parse_statement():
         # Parse transactions
         transactions = BankStatementParser.parse_rbs_csv(content)
         
-        # Filter out already imported transactions
-        filtered_transactions = []
-        duplicate_count = 0
-        
-        for trans in transactions:
-            # Check if this transaction already exists in expenses
-            if not ExpenseModel.transaction_exists(trans['date'], trans['description'], trans['amount']):
-                filtered_transactions.append(trans)
-            else:
-                duplicate_count += 1
+        # Filter out already imported transactions (one query for the whole statement)
+        exists = ExpenseModel.transactions_exist(transactions)
+        filtered_transactions = [trans for trans, found in zip(transactions, exists) if not found]
+        duplicate_count = len(transactions) - len(filtered_transactions)
         
         # Get summary
         summary = BankStatementParser.get_summary(filtered_transactions)
@@ -72,7 +66,6 @@ def api_import_transactions():
             return jsonify({'success': False, 'error': 'No transactions provided'}), 400
         
         transactions = data['transactions']
-        imported_count = 0
         auto_imported_count = 0
         errors = []
         
@@ -80,6 +73,8 @@ def api_import_transactions():
         categories = ExpenseModel.get_categories()
         category_map = {cat['name']: cat['id'] for cat in categories}
         
+        expenses = []
+        last_matched = {}
         for trans in transactions:
             try:
                 # Only import if selected
@@ -92,40 +87,38 @@ def api_import_transactions():
                     errors.append(f"Unknown category for: {trans['description']}")
                     continue
                 
-                category_id = category_map[category_name]
-                
-                # Check if this is a recurring transaction
-                is_recurring = trans.get('is_recurring', False)
-                template_id = trans.get('template_id')
-                
                 # Build description with notes if provided
                 description = trans['description']
                 if trans.get('notes'):
                     description = f"{trans['description']} - {trans['notes']}"
                 
-                # Add expense
-                ExpenseModel.add_expense(
-                    date=trans['date'],
-                    category_id=category_id,
-                    amount=trans['amount'],
-                    description=description,
-                    vat_amount=0,
-                    receipt_file=None,
-                    is_recurring=is_recurring,
-                    recurring_frequency=None
-                )
+                # Validate the date now so one bad row cannot fail the batch
+                ExpenseModel.get_tax_year(trans['date'])
                 
-                # Update template's last matched date if matched
+                expenses.append({
+                    'date': trans['date'],
+                    'category_id': category_map[category_name],
+                    'amount': trans['amount'],
+                    'description': description,
+                    'is_recurring': trans.get('is_recurring', False),
+                })
+                
+                # Templates are updated once, with the last date matched
+                template_id = trans.get('template_id')
                 if template_id:
-                    RecurringTemplateModel.update_last_matched(template_id, trans['date'])
+                    last_matched[template_id] = trans['date']
                     if trans.get('auto_import', False):
                         auto_imported_count += 1
-                
-                imported_count += 1
             
             except Exception as e:
                 errors.append(f"Error importing {trans['description']}: {str(e)}")
         
+        # All selected rows go in with one executemany in one transaction
+        imported_count = ExpenseModel.add_expenses(expenses)
+        
+        for template_id, matched_date in last_matched.items():
+            RecurringTemplateModel.update_last_matched(template_id, matched_date)
+        
         return jsonify({
             'success': True,
             'imported_count': imported_count,
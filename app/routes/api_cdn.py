@@ -11,7 +11,7 @@ from flask import Blueprint, jsonify, request
 scripts_dir = Path(__file__).parent.parent.parent / 'scripts'
 sys.path.insert(0, str(scripts_dir))
 
-from check_cdn_versions import CDNVersionChecker
+# The checkers (and requests) are imported inside the routes, on first use.
 
 api_cdn_bp = Blueprint('api_cdn', __name__)
 
@@ -19,6 +19,7 @@ api_cdn_bp = Blueprint('api_cdn', __name__)
 def check_versions():
     """Check for CDN library updates"""
     try:
+        from check_cdn_versions import CDNVersionChecker
         checker = CDNVersionChecker()
         results = checker.check_all_versions()
         checker.save_version_check(results)
@@ -37,6 +38,7 @@ def check_versions():
 def get_status():
     """Get last version check results"""
     try:
+        from check_cdn_versions import CDNVersionChecker
         checker = CDNVersionChecker()
         data = checker.load_version_check()
         
@@ -69,6 +71,7 @@ def update_library():
                 'error': 'No libraries specified'
             }), 400
         
+        from check_cdn_versions import CDNVersionChecker
         checker = CDNVersionChecker()
         
         # Get latest versions for requested libraries
@@ -107,6 +110,7 @@ def update_library():
 def update_all():
     """Update all CDN libraries with available updates"""
     try:
+        from check_cdn_versions import CDNVersionChecker
         checker = CDNVersionChecker()
         
         # Check for updates
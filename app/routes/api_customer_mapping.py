@@ -153,6 +153,31 @@ def api_resolve_customer(customer_name):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@customer_mapping_bp.route('/resolve', methods=['POST'])
+def api_resolve_customers():
+    """Resolve many customer names to their mapped equivalents in one request."""
+    try:
+        data = request.get_json(silent=True) or {}
+        customers = data.get('customers')
+
+        if not isinstance(customers, list) or not all(isinstance(name, str) for name in customers):
+            return jsonify({
+                'success': False,
+                'error': 'customers must be a list of names'
+            }), 400
+
+        model = CustomerMappingModel()
+        resolved = model.resolve_customers(customers)
+
+        return jsonify({
+            'success': True,
+            'mappings': resolved,
+            'mapped_count': sum(1 for name, mapped in resolved.items() if mapped != name)
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @customer_mapping_bp.route('/bulk-add', methods=['POST'])
 def api_bulk_add_mappings():
     """Add multiple customer mappings at once."""
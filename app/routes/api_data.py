@@ -20,12 +20,19 @@ from ..models.payslip import PayslipModel
 from ..models.runsheet import RunsheetModel
 from ..models.attendance import AttendanceModel
 from ..models.settings import SettingsModel
+from ..config import Config
 from ..services.data_service import DataService
+from ..services import report_jobs, table_stats
 from ..database import get_db_connection, DB_PATH
 from ..utils.logging_utils import log_settings_action
+from ..utils import log_reader
 
 logger = logging.getLogger(__name__)
 
+# Written by the periodic_sync logger (app.logging_config), whose lines
+# during a sync are tagged "[run <id>]" by PeriodicSyncService.
+SYNC_LOG_PATH = Path(Config.LOG_DIR) / 'periodic_sync.log'
+
 data_bp = Blueprint('data_api', __name__, url_prefix='/api/data')
 
 
@@ -775,25 +782,12 @@ def api_database_info():
         else:
             size_bytes = 0
         
-        # Get record counts
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Count payslips
-            cursor.execute("SELECT COUNT(*) FROM payslips")
-            payslips_count = cursor.fetchone()[0]
-            
-            # Count run sheets
-            cursor.execute("SELECT COUNT(*) FROM run_sheet_jobs")
-            runsheets_count = cursor.fetchone()[0]
-            
-            # Count unique jobs
-            cursor.execute("SELECT COUNT(DISTINCT job_number) FROM run_sheet_jobs WHERE job_number IS NOT NULL AND job_number != ''")
-            jobs_count = cursor.fetchone()[0]
-            
-            # Count attendance records
-            cursor.execute("SELECT COUNT(*) FROM attendance")
-            attendance_count = cursor.fetchone()[0]
+        # Record counts are maintained by triggers (see services/table_stats.py)
+        stats = table_stats.get_stats()
+        payslips_count = stats.get('payslips.rows', 0)
+        runsheets_count = stats.get('run_sheet_jobs.rows', 0)
+        jobs_count = stats.get('run_sheet_jobs.job_numbers', 0)
+        attendance_count = stats.get('attendance.rows', 0)
         
         return jsonify({
             'success': True,
@@ -821,26 +815,16 @@ def api_database_info():
 def api_get_stats():
     """Get database statistics for the settings page."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get payslips count
-        cursor.execute("SELECT COUNT(*) FROM payslips")
-        payslips_count = cursor.fetchone()[0]
-        
-        # Get runsheets count
-        cursor.execute("SELECT COUNT(DISTINCT date) FROM run_sheet_jobs WHERE date IS NOT NULL AND date != ''")
-        runsheets_count = cursor.fetchone()[0]
-        
-        # Get total jobs count
-        cursor.execute("SELECT COUNT(*) FROM run_sheet_jobs")
-        jobs_count = cursor.fetchone()[0]
-        
-        # Get database size
-        cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-        db_size_bytes = cursor.fetchone()[0]
-        
-        conn.close()
+        with get_db_connection() as conn:
+            stats = table_stats.get_stats(conn)
+            payslips_count = stats.get('payslips.rows', 0)
+            runsheets_count = stats.get('run_sheet_jobs.dates', 0)
+            jobs_count = stats.get('run_sheet_jobs.rows', 0)
+            
+            # Get database size
+            db_size_bytes = conn.execute(
+                "SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()"
+            ).fetchone()[0]
         
         # Format database size
         if db_size_bytes < 1024:
@@ -1941,89 +1925,72 @@ def api_generate_custom_report():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@data_bp.route('/reports/custom/pdf', methods=['POST'])
-def api_generate_custom_report_pdf():
-    """Generate PDF for custom reports."""
-    try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter, A4, landscape
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from io import BytesIO
-        from datetime import datetime, timedelta
-        
-        data = request.json
-        report_type = data.get('report_type', '')
-        year = data.get('year', '')
-        week = data.get('week', '')
-        month = data.get('month', '')
-        
-        if not report_type:
-            return jsonify({'success': False, 'error': 'Report type is required'}), 400
-        
-        # Build date filter - same logic as main report.
-        # IMPORTANT: year / week / month come from request JSON. Cast and
-        # parameterise every value before it reaches SQL.
-        date_filter = ""
-        week_dates_filter = None
-        extra_filter_params = []
-
-        if year and week:
-            year_int = int(year)
-            week_int = int(week)
-            jan1 = datetime(year_int, 1, 1)
-            days_to_monday = (7 - jan1.weekday()) % 7
-            week_start = jan1 + timedelta(days=days_to_monday + (week_int - 1) * 7)
-            week_end = week_start + timedelta(days=6)
-
-            week_dates = []
-            current = week_start
-            while current <= week_end:
-                week_dates.append(current.strftime('%d/%m/%Y'))
-                current += timedelta(days=1)
-
-            date_placeholders = ','.join(['?' for _ in week_dates])
-            date_filter = f"AND date IN ({date_placeholders})"
-            week_dates_filter = week_dates
-        elif year and month:
-            date_filter = "AND substr(date, 7, 4) = ? AND substr(date, 4, 2) = ?"
-            extra_filter_params = [str(int(year)), f"{int(month):02d}"]
-        elif year:
-            date_filter = "AND substr(date, 7, 4) = ?"
-            extra_filter_params = [str(int(year))]
+def _custom_report_data(report_type, year, week, month):
+    """Data for a custom report PDF ('dnco' or 'paypoint')."""
+    # Build date filter - same logic as main report.
+    # IMPORTANT: year / week / month come from request JSON. Cast and
+    # parameterise every value before it reaches SQL.
+    date_filter = ""
+    week_dates_filter = None
+    extra_filter_params = []
+
+    if year and week:
+        year_int = int(year)
+        week_int = int(week)
+        jan1 = datetime(year_int, 1, 1)
+        days_to_monday = (7 - jan1.weekday()) % 7
+        week_start = jan1 + timedelta(days=days_to_monday + (week_int - 1) * 7)
+        week_end = week_start + timedelta(days=6)
+
+        week_dates = []
+        current = week_start
+        while current <= week_end:
+            week_dates.append(current.strftime('%d/%m/%Y'))
+            current += timedelta(days=1)
+
+        date_placeholders = ','.join(['?' for _ in week_dates])
+        date_filter = f"AND date IN ({date_placeholders})"
+        week_dates_filter = week_dates
+    elif year and month:
+        date_filter = "AND substr(date, 7, 4) = ? AND substr(date, 4, 2) = ?"
+        extra_filter_params = [str(int(year)), f"{int(month):02d}"]
+    elif year:
+        date_filter = "AND substr(date, 7, 4) = ?"
+        extra_filter_params = [str(int(year))]
+    
+    # Get report data
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        # Get report data
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        if report_type == 'dnco':
+            if year and week:
+                cursor.execute(f"""
+                    SELECT date, job_number, customer, job_address, pay_amount
+                    FROM run_sheet_jobs
+                    WHERE UPPER(status) = 'DNCO'
+                    {date_filter}
+                    ORDER BY date DESC
+                """, week_dates_filter)
+            else:
+                cursor.execute(f"""
+                    SELECT date, job_number, customer, job_address, pay_amount
+                    FROM run_sheet_jobs
+                    WHERE UPPER(status) = 'DNCO'
+                    {date_filter}
+                    ORDER BY date DESC
+                """, extra_filter_params)
+            dnco_jobs = cursor.fetchall()
             
-            if report_type == 'dnco':
-                if year and week:
-                    cursor.execute(f"""
-                        SELECT date, job_number, customer, job_address, pay_amount
-                        FROM run_sheet_jobs
-                        WHERE UPPER(status) = 'DNCO'
-                        {date_filter}
-                        ORDER BY date DESC
-                    """, week_dates_filter)
-                else:
-                    cursor.execute(f"""
-                        SELECT date, job_number, customer, job_address, pay_amount
-                        FROM run_sheet_jobs
-                        WHERE UPPER(status) = 'DNCO'
-                        {date_filter}
-                        ORDER BY date DESC
-                    """, extra_filter_params)
-                dnco_jobs = cursor.fetchall()
-                
-                # Calculate estimated loss
-                total_loss = 0
-                dnco_jobs_with_estimates = []
+            # Calculate estimated loss (customer averages looked up once each)
+            total_loss = 0
+            dnco_jobs_with_estimates = []
+            customer_averages = {}
+            
+            for job in dnco_jobs:
+                estimated_amount = job[4]
                 
-                for job in dnco_jobs:
-                    estimated_amount = job[4]
-                    
-                    if not estimated_amount:
+                if not estimated_amount:
+                    if job[2] not in customer_averages:
                         cursor.execute("""
                             SELECT AVG(pay_amount)
                             FROM run_sheet_jobs
@@ -2031,286 +1998,94 @@ def api_generate_custom_report_pdf():
                             AND UPPER(status) != 'DNCO'
                         """, (job[2],))
                         avg_result = cursor.fetchone()
-                        
-                        if avg_result and avg_result[0]:
-                            estimated_amount = round(avg_result[0], 2)
-                        else:
-                            estimated_amount = 15.0
-                    
-                    total_loss += estimated_amount
-                    dnco_jobs_with_estimates.append({
-                        'date': job[0],
-                        'job': job[1],
-                        'customer': job[2],
-                        'address': job[3],
-                        'amount': estimated_amount
-                    })
-                
-                report_data = {
-                    'summary': {
-                        'total_dnco': len(dnco_jobs),
-                        'estimated_loss': round(total_loss, 2)
-                    },
-                    'dnco_jobs': dnco_jobs_with_estimates
-                }
-                
-            elif report_type == 'paypoint':
-                # Paypoint Report - Get stock, deployments, and returns
-                from app.models.paypoint import PaypointModel
-                
-                stock_summary = PaypointModel.get_stock_summary()
-                deployments = PaypointModel.get_deployments(limit=100)
-                returns = PaypointModel.get_returns(limit=100)
+                        customer_averages[job[2]] = (
+                            round(avg_result[0], 2) if avg_result and avg_result[0] else 15.0
+                        )
+                    estimated_amount = customer_averages[job[2]]
                 
-                report_data = {
-                    'summary': {
-                        'total_stock': stock_summary.get('total_devices', 0),
-                        'available_stock': stock_summary.get('available_devices', 0),
-                        'deployments_count': len(deployments),
-                        'returns_count': len(returns)
-                    },
-                    'deployments': deployments,
-                    'returns': returns
-                }
-                
-            else:
-                return jsonify({'success': False, 'error': f'PDF export not supported for {report_type}'}), 400
-        
-        # Create PDF in landscape
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Professional Header
-        # Build date range text
-        date_range_text = ""
-        if year and week:
-            date_range_text = f"Week {week}, {year}"
-        elif year and month:
-            month_names = ['', 'January', 'February', 'March', 'April', 'May', 'June', 
-                          'July', 'August', 'September', 'October', 'November', 'December']
-            date_range_text = f"{month_names[int(month)]} {year}"
-        elif year:
-            date_range_text = f"Year {year}"
-        else:
-            date_range_text = "All Time"
-        
-        # Try to load logo
-        from pathlib import Path as PDFPath
-        logo_png_path = PDFPath(__file__).parent.parent.parent / 'static' / 'images' / 'logo.png'
-        
-        logo_element = None
-        if logo_png_path.exists():
-            try:
-                from reportlab.platypus import Image as PDFImage
-                logo_element = PDFImage(str(logo_png_path), width=40, height=40)
-            except:
-                pass
-        
-        # Header table with logo, branding and date info
-        report_title = "DNCO Report" if report_type == 'dnco' else "Paypoint Stock Report"
-        
-        if logo_element:
-            header_data = [
-                [logo_element,
-                 Paragraph(f'<b><font size=14 color="#1a73e8">TVS - Technical Courier Management System</font></b><br/><font size=12>{report_title}</font>', styles['Normal']), 
-                 Paragraph(f'<b>Period:</b> {date_range_text}<br/><b>Generated:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}', styles['Normal'])]
-            ]
-            header_table = Table(header_data, colWidths=[0.6*inch, 4.4*inch, 3*inch])
-        else:
-            header_data = [
-                [Paragraph(f'<b><font size=14 color="#1a73e8">TVS - Technical Courier Management System</font></b><br/><font size=12>{report_title}</font>', styles['Normal']), 
-                 Paragraph(f'<b>Period:</b> {date_range_text}<br/><b>Generated:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}', styles['Normal'])]
-            ]
-            header_table = Table(header_data, colWidths=[5*inch, 3*inch])
-        
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (-1, 0), (-1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 5))
-        
-        # Compact Summary and Warning in one row
-        if 'summary' in report_data and report_type == 'dnco':
-            combined_data = [[
-                Paragraph(f'<b>Summary:</b> Estimated Loss: £{report_data["summary"]["estimated_loss"]:,.2f} | Total DNCO: {report_data["summary"]["total_dnco"]}', styles['Normal']),
-                Paragraph(f'<b>⚠ Jobs Not Completed</b> - These jobs represent potential lost earnings', styles['Normal'])
-            ]]
-            combined_table = Table(combined_data, colWidths=[4*inch, 4*inch])
-            combined_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#d1ecf1')),
-                ('BACKGROUND', (1, 0), (1, 0), colors.HexColor('#fff3cd')),
-                ('TEXTCOLOR', (0, 0), (0, 0), colors.black),
-                ('TEXTCOLOR', (1, 0), (1, 0), colors.HexColor('#856404')),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
-            elements.append(combined_table)
-            elements.append(Spacer(1, 8))
-        
-        # DNCO jobs table
-        if report_type == 'dnco' and 'dnco_jobs' in report_data:
-            jobs_data = [['Date', 'Job Number', 'Customer', 'Address', 'Est. Loss']]
-            for job in report_data['dnco_jobs']:
-                customer = job.get('customer') or ''
-                address = job.get('address') or ''
-                
-                jobs_data.append([
-                    job.get('date', ''),
-                    job.get('job', ''),
-                    customer[:30] if len(customer) > 30 else customer,
-                    address[:40] if len(address) > 40 else address,
-                    f"£{job.get('amount', 0):.2f}"
-                ])
+                total_loss += estimated_amount
+                dnco_jobs_with_estimates.append({
+                    'date': job[0],
+                    'job': job[1],
+                    'customer': job[2],
+                    'address': job[3],
+                    'amount': estimated_amount
+                })
+            
+            report_data = {
+                'summary': {
+                    'total_dnco': len(dnco_jobs),
+                    'estimated_loss': round(total_loss, 2)
+                },
+                'dnco_jobs': dnco_jobs_with_estimates
+            }
             
-            jobs_table = Table(jobs_data, colWidths=[0.9*inch, 1.1*inch, 2*inch, 3*inch, 0.9*inch])
-            jobs_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#343a40')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('TOPPADDING', (0, 0), (-1, 0), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
-                ('TOPPADDING', (0, 1), (-1, -1), 3),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ]))
-            elements.append(jobs_table)
-        
-        # Paypoint report content
         elif report_type == 'paypoint':
-            # Summary section
-            if 'summary' in report_data:
-                summary_data = [[
-                    Paragraph(f'<b>Stock Summary:</b> Total: {report_data["summary"]["total_stock"]} | Available: {report_data["summary"]["available_stock"]}', styles['Normal']),
-                    Paragraph(f'<b>Activity:</b> Deployments: {report_data["summary"]["deployments_count"]} | Returns: {report_data["summary"]["returns_count"]}', styles['Normal'])
-                ]]
-                summary_table = Table(summary_data, colWidths=[4*inch, 4*inch])
-                summary_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#d1ecf1')),
-                    ('BACKGROUND', (1, 0), (1, 0), colors.HexColor('#d4edda')),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                    ('TOPPADDING', (0, 0), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
-                elements.append(summary_table)
-                elements.append(Spacer(1, 8))
+            # Paypoint Report - Get stock, deployments, and returns
+            from app.models.paypoint import PaypointModel
             
-            # Deployments table
-            if 'deployments' in report_data and report_data['deployments']:
-                elements.append(Paragraph('<b>Recent Deployments</b>', styles['Heading2']))
-                elements.append(Spacer(1, 4))
-                
-                deploy_data = [['Date', 'Job Number', 'Customer', 'Device Type', 'Serial/TID', 'Trace/Stock', 'Status']]
-                for deployment in report_data['deployments']:  # Include all deployments
-                    deploy_date = deployment.get('deployment_date', '')
-                    if deploy_date:
-                        try:
-                            deploy_date = datetime.fromisoformat(deploy_date.replace('Z', '+00:00')).strftime('%d/%m/%Y')
-                        except:
-                            pass
-                    
-                    customer = deployment.get('customer', '')[:20] if deployment.get('customer') else ''
-                    
-                    deploy_data.append([
-                        deploy_date,
-                        deployment.get('job_number', ''),
-                        customer,
-                        deployment.get('paypoint_type', ''),
-                        deployment.get('serial_ptid', ''),
-                        deployment.get('trace_stock', ''),
-                        deployment.get('status', '')
-                    ])
-                
-                deploy_table = Table(deploy_data, colWidths=[0.7*inch, 0.9*inch, 1.5*inch, 0.9*inch, 1*inch, 1*inch, 0.7*inch])
-                deploy_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#343a40')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 8),
-                    ('FONTSIZE', (0, 1), (-1, -1), 7),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ]))
-                elements.append(deploy_table)
-                elements.append(Spacer(1, 8))
+            stock_summary = PaypointModel.get_stock_summary()
+            deployments = PaypointModel.get_deployments(limit=100)
+            returns = PaypointModel.get_returns(limit=100)
             
-            # Returns table
-            if 'returns' in report_data and report_data['returns']:
-                elements.append(Paragraph('<b>Recent Returns</b>', styles['Heading2']))
-                elements.append(Spacer(1, 4))
-                
-                return_data = [['Return Date', 'Job Number', 'Device Type', 'Return Serial/TID', 'Return Trace', 'Reason']]
-                for return_item in report_data['returns']:  # Include all returns
-                    return_date = return_item.get('return_date', '')
-                    if return_date:
-                        try:
-                            return_date = datetime.fromisoformat(return_date.replace('Z', '+00:00')).strftime('%d/%m/%Y')
-                        except:
-                            pass
-                    
-                    reason = return_item.get('return_reason', '')[:25] if return_item.get('return_reason') else ''
-                    
-                    return_data.append([
-                        return_date,
-                        return_item.get('job_number', ''),
-                        return_item.get('paypoint_type', ''),
-                        return_item.get('return_serial_ptid', ''),
-                        return_item.get('return_trace', ''),
-                        reason
-                    ])
-                
-                return_table = Table(return_data, colWidths=[0.9*inch, 0.9*inch, 0.9*inch, 1.2*inch, 1.2*inch, 1.7*inch])
-                return_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#343a40')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 8),
-                    ('FONTSIZE', (0, 1), (-1, -1), 7),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ]))
-                elements.append(return_table)
-        
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        # Generate filename
-        filename = f'{report_type}_report'
-        if year and week:
-            filename += f'_{year}_week{week}'
-        elif year and month:
-            filename += f'_{year}_{month}'
-        elif year:
-            filename += f'_{year}'
-        filename += '.pdf'
+            report_data = {
+                'summary': {
+                    'total_stock': stock_summary.get('total_devices', 0),
+                    'available_stock': stock_summary.get('available_devices', 0),
+                    'deployments_count': len(deployments),
+                    'returns_count': len(returns)
+                },
+                'deployments': deployments,
+                'returns': returns
+            }
+    
+    return report_data
+
+
+def _render_custom_report(params):
+    from ..services.custom_report_pdf import build_custom_report_pdf, period_text
+
+    year, week, month = params['year'], params['week'], params['month']
+    report_data = _custom_report_data(params['report_type'], year, week, month)
+    return build_custom_report_pdf(params['report_type'], report_data, period_text(year, week, month))
+
+
+def _custom_report_filename(params):
+    filename = f"{params['report_type']}_report"
+    if params['year'] and params['week']:
+        filename += f"_{params['year']}_week{params['week']}"
+    elif params['year'] and params['month']:
+        filename += f"_{params['year']}_{params['month']}"
+    elif params['year']:
+        filename += f"_{params['year']}"
+    return filename + '.pdf'
+
+
+report_jobs.register(
+    'custom-report',
+    ('run_sheet_jobs', 'paypoint_stock', 'paypoint_deployments', 'paypoint_returns'),
+    _render_custom_report, _custom_report_filename,
+)
+
+
+@data_bp.route('/reports/custom/pdf', methods=['POST'])
+def api_generate_custom_report_pdf():
+    """Generate PDF for custom reports."""
+    try:
+        data = request.json
+        report_type = data.get('report_type', '')
         
-        return send_file(
-            buffer,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=filename
-        )
+        if not report_type:
+            return jsonify({'success': False, 'error': 'Report type is required'}), 400
+        if report_type not in ('dnco', 'paypoint'):
+            return jsonify({'success': False, 'error': f'PDF export not supported for {report_type}'}), 400
+        
+        return report_jobs.send_report('custom-report', {
+            'report_type': report_type,
+            'year': data.get('year', ''),
+            'week': data.get('week', ''),
+            'month': data.get('month', ''),
+        })
         
     except Exception as e:
         logger.error(f'Error generating PDF report: {e}')
@@ -2466,24 +2241,52 @@ def api_latest_sync_data():
 
 @data_bp.route('/sync-log', methods=['GET'])
 def api_sync_log():
-    """Get the sync log contents."""
+    """Get the tail of the sync log.
+
+    Query params:
+        lines: number of lines to return (default 100, max 2000).
+        level: only entries at this level or above (e.g. WARNING).
+        run_id: only entries from one sync run.
+        since: cursor from a previous response; returns only lines
+            appended after it (live tailing).
+    """
     try:
-        # Use unified sync log
-        log_path = Path(__file__).parent.parent.parent / 'logs' / 'sync.log'
-        
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                # Read last 100 lines
-                lines = f.readlines()
-                log_content = ''.join(lines[-100:]) if lines else 'No log entries'
-        else:
-            log_content = 'Log file not found - sync may not have run yet'
-        
+        lines = min(max(request.args.get('lines', 100, type=int), 1), 2000)
+        level = request.args.get('level') or None
+        run_id = request.args.get('run_id') or None
+        since = request.args.get('since') or None
+
+        if not SYNC_LOG_PATH.exists():
+            return jsonify({
+                'success': True,
+                'log': 'Log file not found - sync may not have run yet',
+                'lines': [],
+                'cursor': None,
+            })
+
+        if since:
+            result = log_reader.read_since(SYNC_LOG_PATH, since, level=level, run_id=run_id)
+            return jsonify({
+                'success': True,
+                'log': '\n'.join(result['lines']),
+                'lines': result['lines'],
+                'cursor': result['cursor'],
+                'rotated': result['rotated'],
+                'more': result['more'],
+            })
+
+        # Take the cursor first so nothing written while tailing is missed.
+        cursor = log_reader.current_cursor(SYNC_LOG_PATH)
+        tail = log_reader.tail(SYNC_LOG_PATH, lines, level=level, run_id=run_id)
         return jsonify({
             'success': True,
-            'log': log_content
+            'log': '\n'.join(tail) if tail else 'No log entries',
+            'lines': tail,
+            'cursor': cursor,
         })
-        
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f'Error reading sync log: {e}')
         return jsonify({
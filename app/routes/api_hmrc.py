@@ -1672,21 +1672,35 @@ def final_declaration_status():
     
     Query params:
         tax_year: Tax year (e.g., '2024/2025')
+        nino: Optional. When given, HMRC's final declaration obligations
+            and calculation list for the year are fetched concurrently and
+            returned under ``hmrc``.
     
     Returns:
         Status of quarterly submissions and final declaration
     """
     try:
         tax_year = request.args.get('tax_year')
+        nino = request.args.get('nino')
         
         if not tax_year:
             return jsonify({'success': False, 'error': 'tax_year is required'}), 400
         
         try:
             tax_year = validate_tax_year(tax_year)
+            if nino:
+                nino = validate_nino(nino)
         except ValueError as e:
             return jsonify({'success': False, 'error': str(e)}), 400
         
+        hmrc_data = None
+        if nino:
+            client = HMRCClient()
+            hmrc_data = client.fetch_concurrently({
+                'final_declaration_obligations': lambda: client.get_final_declaration_obligations(nino),
+                'calculations': lambda: client.list_calculations(nino, tax_year),
+            })
+        
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
@@ -1722,7 +1736,8 @@ def final_declaration_status():
                 'quarters_detail': quarters,
                 'calculation_id': declaration_data.get('calculation_id') if declaration_data else None,
                 'declaration_status': declaration_data.get('status') if declaration_data else 'not_started',
-                'declaration': declaration_data
+                'declaration': declaration_data,
+                **({'hmrc': hmrc_data} if hmrc_data is not None else {})
             }
         })
     except Exception as e:
@@ -1730,6 +1745,69 @@ def final_declaration_status():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@hmrc_bp.route('/dashboard')
+@limiter.limit("60 per hour", override_defaults=True)
+def hmrc_dashboard():
+    """
+    Everything the HMRC page loads from HMRC, in one round trip.
+
+    The reads are independent, so they are issued concurrently through
+    ``HMRCClient.fetch_concurrently``: wall time is roughly the slowest
+    single call rather than the sum. Each section carries its own
+    ``_make_request`` envelope, so one failing API does not hide the rest.
+
+    Query params:
+        tax_year: Tax year (e.g., '2024/2025')
+        nino: National Insurance Number (optional in sandbox - auto-resolved
+            from the active test user)
+        business_id: Optional. Adds the business's periods of account.
+
+    Returns:
+        ``{'success': True, 'data': {section: envelope}}`` with sections
+        obligations, final_declaration_obligations, businesses,
+        calculations, bsas, losses and (with business_id) periods_of_account.
+    """
+    try:
+        tax_year = request.args.get('tax_year')
+        nino = request.args.get('nino')
+        business_id = request.args.get('business_id')
+
+        if not tax_year:
+            return jsonify({'success': False, 'error': 'tax_year is required'}), 400
+
+        if not nino and current_app.config.get('HMRC_ENVIRONMENT') == 'sandbox':
+            sandbox_user = _get_sandbox_nino()
+            if sandbox_user:
+                nino = sandbox_user['nino']
+                business_id = business_id or sandbox_user.get('business_id')
+        if not nino:
+            return jsonify({'success': False, 'error': 'NINO is required'}), 400
+
+        try:
+            tax_year = validate_tax_year(tax_year)
+            nino = validate_nino(nino)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        client = HMRCClient()
+        hmrc_tax_year = client._normalise_tax_year(tax_year)
+        calls = {
+            'obligations': lambda: client.get_obligations(nino),
+            'final_declaration_obligations': lambda: client.get_final_declaration_obligations(nino),
+            'businesses': lambda: client.get_business_details(nino),
+            'calculations': lambda: client.list_calculations(nino, tax_year),
+            'bsas': lambda: client.list_bsas_summaries(nino, hmrc_tax_year),
+            'losses': lambda: client.list_losses(nino, tax_year=hmrc_tax_year),
+        }
+        if business_id:
+            calls['periods_of_account'] = lambda: client.list_periods_of_account(nino, business_id)
+
+        return jsonify({'success': True, 'data': client.fetch_concurrently(calls)})
+    except Exception as e:
+        logger.error(f'Error loading HMRC dashboard: {e}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @hmrc_bp.route('/final-declaration/calculate', methods=['POST'])
 @limiter.limit("20 per hour", override_defaults=True)
 def calculate_final_declaration():
@@ -0,0 +1,43 @@
+"""
+Admin metrics API.
+
+Exposes the request metrics collected by the middleware (per-endpoint
+latency percentiles, status counts and DB time), merged across the
+gunicorn workers, so slow routes can be found without grepping api.log.
+"""
+
+from flask import Blueprint, jsonify, request
+
+from ..auth_decorator import admin_required
+from ..services.request_metrics import request_metrics
+
+metrics_bp = Blueprint('api_metrics', __name__, url_prefix='/api/admin/metrics')
+
+
+@metrics_bp.route('', methods=['GET'])
+@admin_required
+def api_get_metrics():
+    """Return per-endpoint request metrics for every running worker.
+
+    ``workers`` lists the process ids covered. Figures from workers other
+    than the one answering can be a few seconds old.
+
+    Query params:
+        sort: per-endpoint field to sort by, descending (default p95_ms).
+        limit: maximum number of endpoints to return.
+    """
+    sort = request.args.get('sort', 'p95_ms')
+    limit = request.args.get('limit', type=int)
+    return jsonify({
+        'success': True,
+        'metrics': request_metrics.snapshot(sort=sort, limit=limit),
+    })
+
+
+@metrics_bp.route('/reset', methods=['POST'])
+@admin_required
+def api_reset_metrics():
+    """Clear the collected metrics in every worker and start a new window."""
+    request_metrics.reset()
+    return jsonify({'success': True})
+
@@ -360,13 +360,19 @@ def api_delete_return(return_id):
 
 @paypoint_bp.route('/initialize', methods=['POST'])
 def api_initialize_tables():
-    """Initialize Paypoint database tables."""
+    """Check the Paypoint tables exist. They are created by migrations, not here."""
     try:
-        PaypointModel.init_tables()
+        missing = PaypointModel.missing_tables()
+        
+        if missing:
+            return jsonify({
+                'success': False,
+                'error': f"Paypoint tables missing, run migrations: {', '.join(missing)}"
+            }), 500
         
         return jsonify({
             'success': True,
-            'message': 'Paypoint tables initialized successfully'
+            'message': 'Paypoint tables are present'
         })
         
     except Exception as e:
@@ -11,7 +11,7 @@ from flask import Blueprint, jsonify, request
 scripts_dir = Path(__file__).parent.parent.parent / 'scripts'
 sys.path.insert(0, str(scripts_dir))
 
-from check_python_deps import PythonDependencyChecker
+# The checkers (and requests) are imported inside the routes, on first use.
 
 api_python_deps_bp = Blueprint('api_python_deps', __name__)
 
@@ -19,6 +19,7 @@ api_python_deps_bp = Blueprint('api_python_deps', __name__)
 def check_dependencies():
     """Check for Python dependency updates"""
     try:
+        from check_python_deps import PythonDependencyChecker
         checker = PythonDependencyChecker()
         results = checker.check_all_packages()
         checker.save_check_results(results)
@@ -51,6 +52,7 @@ def check_dependencies():
 def get_status():
     """Get last dependency check results"""
     try:
+        from check_python_deps import PythonDependencyChecker
         checker = PythonDependencyChecker()
         data = checker.load_check_results()
         
@@ -74,6 +76,7 @@ def get_status():
 def get_package_info(package_name):
     """Get detailed information about a specific package"""
     try:
+        from check_python_deps import PythonDependencyChecker
         checker = PythonDependencyChecker()
         info = checker.get_package_info(package_name)
         
@@ -106,6 +109,7 @@ def update_packages():
                 'error': 'No packages specified'
             }), 400
         
+        from check_python_deps import PythonDependencyChecker
         checker = PythonDependencyChecker()
         results = checker.update_multiple_packages(packages)
         
@@ -131,6 +135,7 @@ def update_by_type():
         data = request.get_json()
         update_type = data.get('type', 'patch')  # patch, minor, major, all
         
+        from check_python_deps import PythonDependencyChecker
         checker = PythonDependencyChecker()
         
         # Check for updates
@@ -140,14 +140,13 @@ def api_match_transaction():
         if not data or not all(k in data for k in ['description', 'amount', 'date']):
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
         
-        template_id, confidence = RecurringTemplateModel.match_transaction(
+        template, confidence = RecurringTemplateModel.matcher().match(
             data['description'],
             float(data['amount']),
             data['date']
         )
         
-        if template_id:
-            template = RecurringTemplateModel.get_template_by_id(template_id)
+        if template:
             return jsonify({
                 'success': True,
                 'matched': True,
@@ -4,13 +4,18 @@ Extracted from web_app.py to improve code organization.
 """
 
 import logging
+from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
+from ..models.customer_mapping import CustomerMappingModel
 from ..models.payslip import PayslipModel
 from ..models.runsheet import RunsheetModel
 from ..database import get_db_connection
+from ..services import report_jobs
 from ..services.report_service import ReportService
+from ..services.weekly_summary_service import WeeklySummaryService
+from ..utils.company_calendar import company_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -344,30 +349,30 @@ def api_client_heatmap():
             if tax_year:
                 query = """
                     SELECT 
-                        ji.client,
+                        ji.canonical_customer as client,
                         p.tax_year,
                         CAST((p.week_number - 1) / 4.33 AS INTEGER) + 1 as month,
                         COUNT(*) as job_count,
                         SUM(ji.amount) as total_amount
                     FROM job_items ji
                     JOIN payslips p ON ji.payslip_id = p.id
-                    WHERE ji.client IS NOT NULL AND p.tax_year = ?
-                    GROUP BY ji.client, p.tax_year, month
+                    WHERE ji.canonical_customer IS NOT NULL AND p.tax_year = ?
+                    GROUP BY ji.canonical_customer, p.tax_year, month
                     ORDER BY total_amount DESC
                 """
                 cursor.execute(query, (tax_year,))
             else:
                 query = """
                     SELECT 
-                        ji.client,
+                        ji.canonical_customer as client,
                         p.tax_year,
                         CAST((p.week_number - 1) / 4.33 AS INTEGER) + 1 as month,
                         COUNT(*) as job_count,
                         SUM(ji.amount) as total_amount
                     FROM job_items ji
                     JOIN payslips p ON ji.payslip_id = p.id
-                    WHERE ji.client IS NOT NULL
-                    GROUP BY ji.client, p.tax_year, month
+                    WHERE ji.canonical_customer IS NOT NULL
+                    GROUP BY ji.canonical_customer, p.tax_year, month
                     ORDER BY total_amount DESC
                 """
                 cursor.execute(query)
@@ -376,10 +381,10 @@ def api_client_heatmap():
             
             # Get top 10 clients overall
             cursor.execute("""
-                SELECT client, SUM(amount) as total
+                SELECT canonical_customer as client, SUM(amount) as total
                 FROM job_items
-                WHERE client IS NOT NULL
-                GROUP BY client
+                WHERE canonical_customer IS NOT NULL
+                GROUP BY canonical_customer
                 ORDER BY total DESC
                 LIMIT 10
             """)
@@ -902,143 +907,157 @@ def api_recent_mileage():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _monthly_mileage_rows(cursor):
+    """Days worked, miles and fuel cost per month from runsheet_daily_data."""
+    cursor.execute("""
+        SELECT 
+            substr(date, 4, 7) as month,
+            COUNT(*) as days_worked,
+            SUM(mileage) as total_miles,
+            AVG(mileage) as avg_miles_per_day,
+            SUM(fuel_cost) as total_fuel_cost,
+            AVG(fuel_cost) as avg_fuel_per_day
+        FROM runsheet_daily_data 
+        WHERE mileage IS NOT NULL
+        GROUP BY substr(date, 4, 7)
+        ORDER BY substr(date, 7, 4), substr(date, 4, 2)
+    """)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def _render_monthly_mileage(params):
+    from ..services.pdf_report_service import MileagePDFReportService
+
+    with get_db_connection() as conn:
+        data = _monthly_mileage_rows(conn.cursor())
+    return MileagePDFReportService().create_monthly_mileage_pdf(data)
+
+
+report_jobs.register(
+    'monthly-mileage', ('runsheet_daily_data',), _render_monthly_mileage,
+    lambda params: 'monthly_mileage_report.pdf',
+)
+
+
 @reports_bp.route('/data/reports/monthly-mileage', methods=['POST'])
 def api_generate_monthly_mileage_report():
     """Generate monthly mileage report."""
     try:
         format_type = request.json.get('format', 'csv') if request.json else 'csv'
         
+        if format_type.lower() == 'pdf':
+            return report_jobs.send_report('monthly-mileage')
+        
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            data = _monthly_mileage_rows(conn.cursor())
             
-            cursor.execute("""
-                SELECT 
-                    substr(date, 4, 7) as month,
-                    COUNT(*) as days_worked,
-                    SUM(mileage) as total_miles,
-                    AVG(mileage) as avg_miles_per_day,
-                    SUM(fuel_cost) as total_fuel_cost,
-                    AVG(fuel_cost) as avg_fuel_per_day
-                FROM runsheet_daily_data 
-                WHERE mileage IS NOT NULL
-                GROUP BY substr(date, 4, 7)
-                ORDER BY substr(date, 7, 4), substr(date, 4, 2)
-            """)
+            # Generate CSV report
+            import csv
+            import io
+            from flask import make_response
             
-            data = [dict(row) for row in cursor.fetchall()]
+            output = io.StringIO()
+            writer = csv.writer(output)
             
-            if format_type.lower() == 'pdf':
-                # Generate PDF report
-                from ..services.pdf_report_service import MileagePDFReportService
-                from flask import send_file
-                
-                pdf_service = MileagePDFReportService()
-                pdf_path = pdf_service.create_monthly_mileage_pdf(data)
-                
-                return send_file(pdf_path, as_attachment=True,
-                               download_name='monthly_mileage_report.pdf',
-                               mimetype='application/pdf')
-            else:
-                # Generate CSV report
-                import csv
-                import io
-                from flask import make_response
-                
-                output = io.StringIO()
-                writer = csv.writer(output)
-                
-                # Write header
-                writer.writerow(['Month', 'Days Worked', 'Total Miles', 'Avg Miles/Day', 'Total Fuel Cost', 'Avg Fuel/Day', 'Cost per Mile'])
-                
-                # Write data
-                for row in data:
-                    cost_per_mile = 0
-                    if row['total_miles'] > 0 and row['total_fuel_cost'] > 0:
-                        cost_per_mile = row['total_fuel_cost'] / row['total_miles']
-                    
-                    writer.writerow([
-                        row['month'],
-                        row['days_worked'],
-                        f"{row['total_miles']:.1f}",
-                        f"{row['avg_miles_per_day']:.1f}",
-                        f"£{row['total_fuel_cost']:.2f}",
-                        f"£{row['avg_fuel_per_day']:.2f}",
-                        f"£{cost_per_mile:.3f}"
-                    ])
-                
-                # Create response
-                response = make_response(output.getvalue())
-                response.headers['Content-Type'] = 'text/csv'
-                response.headers['Content-Disposition'] = 'attachment; filename=monthly_mileage_report.csv'
+            # Write header
+            writer.writerow(['Month', 'Days Worked', 'Total Miles', 'Avg Miles/Day', 'Total Fuel Cost', 'Avg Fuel/Day', 'Cost per Mile'])
+            
+            # Write data
+            for row in data:
+                cost_per_mile = 0
+                if row['total_miles'] > 0 and row['total_fuel_cost'] > 0:
+                    cost_per_mile = row['total_fuel_cost'] / row['total_miles']
                 
-                return response
+                writer.writerow([
+                    row['month'],
+                    row['days_worked'],
+                    f"{row['total_miles']:.1f}",
+                    f"{row['avg_miles_per_day']:.1f}",
+                    f"£{row['total_fuel_cost']:.2f}",
+                    f"£{row['avg_fuel_per_day']:.2f}",
+                    f"£{cost_per_mile:.3f}"
+                ])
             
+            # Create response
+            response = make_response(output.getvalue())
+            response.headers['Content-Type'] = 'text/csv'
+            response.headers['Content-Disposition'] = 'attachment; filename=monthly_mileage_report.csv'
+            
+            return response
+        
     except Exception as e:
         logger.error(f'Error generating mileage report: {e}')
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _high_mileage_rows(cursor):
+    """Days of 200+ miles, highest first, with their fuel cost per mile."""
+    cursor.execute("""
+        SELECT date, mileage, fuel_cost,
+               CASE 
+                   WHEN fuel_cost > 0 AND mileage > 0 THEN fuel_cost / mileage
+                   ELSE 0
+               END as cost_per_mile
+        FROM runsheet_daily_data 
+        WHERE mileage >= 200
+        ORDER BY mileage DESC
+    """)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def _render_high_mileage(params):
+    from ..services.pdf_report_service import MileagePDFReportService
+
+    with get_db_connection() as conn:
+        data = _high_mileage_rows(conn.cursor())
+    return MileagePDFReportService().create_high_mileage_pdf(data)
+
+
+report_jobs.register(
+    'high-mileage-days', ('runsheet_daily_data',), _render_high_mileage,
+    lambda params: 'high_mileage_days.pdf',
+)
+
+
 @reports_bp.route('/data/reports/high-mileage-days', methods=['POST'])
 def api_generate_high_mileage_report():
     """Generate high mileage days report."""
     try:
         format_type = request.json.get('format', 'csv') if request.json else 'csv'
         
+        if format_type.lower() == 'pdf':
+            return report_jobs.send_report('high-mileage-days')
+        
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            data = _high_mileage_rows(conn.cursor())
             
-            cursor.execute("""
-                SELECT date, mileage, fuel_cost,
-                       CASE 
-                           WHEN fuel_cost > 0 AND mileage > 0 THEN fuel_cost / mileage
-                           ELSE 0
-                       END as cost_per_mile
-                FROM runsheet_daily_data 
-                WHERE mileage >= 200
-                ORDER BY mileage DESC
-            """)
+            # Generate CSV report
+            import csv
+            import io
+            from flask import make_response
             
-            data = [dict(row) for row in cursor.fetchall()]
+            output = io.StringIO()
+            writer = csv.writer(output)
             
-            if format_type.lower() == 'pdf':
-                # Generate PDF report
-                from ..services.pdf_report_service import MileagePDFReportService
-                from flask import send_file
-                
-                pdf_service = MileagePDFReportService()
-                pdf_path = pdf_service.create_high_mileage_pdf(data)
-                
-                return send_file(pdf_path, as_attachment=True,
-                               download_name='high_mileage_days.pdf',
-                               mimetype='application/pdf')
-            else:
-                # Generate CSV report
-                import csv
-                import io
-                from flask import make_response
-                
-                output = io.StringIO()
-                writer = csv.writer(output)
-                
-                # Write header
-                writer.writerow(['Date', 'Miles', 'Fuel Cost', 'Cost per Mile'])
-                
-                # Write data
-                for row in data:
-                    writer.writerow([
-                        row['date'],
-                        f"{row['mileage']:.1f}",
-                        f"£{row['fuel_cost']:.2f}",
-                        f"£{row['cost_per_mile']:.3f}"
-                    ])
-                
-                # Create response
-                response = make_response(output.getvalue())
-                response.headers['Content-Type'] = 'text/csv'
-                response.headers['Content-Disposition'] = 'attachment; filename=high_mileage_days.csv'
-                
-                return response
+            # Write header
+            writer.writerow(['Date', 'Miles', 'Fuel Cost', 'Cost per Mile'])
             
+            # Write data
+            for row in data:
+                writer.writerow([
+                    row['date'],
+                    f"{row['mileage']:.1f}",
+                    f"£{row['fuel_cost']:.2f}",
+                    f"£{row['cost_per_mile']:.3f}"
+                ])
+            
+            # Create response
+            response = make_response(output.getvalue())
+            response.headers['Content-Type'] = 'text/csv'
+            response.headers['Content-Disposition'] = 'attachment; filename=high_mileage_days.csv'
+            
+            return response
+        
     except Exception as e:
         logger.error(f'Error generating high mileage report: {e}')
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1347,207 +1366,180 @@ def api_generate_fuel_efficiency_report():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _missing_mileage_data(cursor):
+    """Working days without mileage and mileage days without fuel cost.
+
+    Returns ``(missing_mileage, missing_fuel_cost, summary_stats)``.
+    """
+    # Get all run sheet dates (working days)
+    cursor.execute("""
+        SELECT DISTINCT date 
+        FROM run_sheet_jobs 
+        WHERE date IS NOT NULL AND date != ''
+        ORDER BY substr(date, 7, 4), substr(date, 4, 2), substr(date, 1, 2)
+    """)
+    
+    runsheet_dates = [row['date'] for row in cursor.fetchall()]
+    
+    # Get all mileage dates
+    cursor.execute("""
+        SELECT DISTINCT date 
+        FROM runsheet_daily_data 
+        WHERE mileage IS NOT NULL
+    """)
+    
+    mileage_dates = set(row['date'] for row in cursor.fetchall())
+    
+    # Find missing dates
+    missing_mileage = []
+    for date in runsheet_dates:
+        if date not in mileage_dates:
+            missing_mileage.append(date)
+    
+    # Find dates with mileage but no fuel cost
+    cursor.execute("""
+        SELECT date, mileage
+        FROM runsheet_daily_data 
+        WHERE mileage IS NOT NULL AND (fuel_cost IS NULL OR fuel_cost = 0)
+        ORDER BY substr(date, 7, 4), substr(date, 4, 2), substr(date, 1, 2)
+    """)
+    
+    missing_fuel_cost = [dict(row) for row in cursor.fetchall()]
+    
+    # Summary statistics
+    summary_stats = {
+        'total_working_days': len(runsheet_dates),
+        'days_with_mileage': len(mileage_dates),
+        'missing_mileage': len(missing_mileage),
+        'missing_fuel_cost': len(missing_fuel_cost)
+    }
+    return missing_mileage, missing_fuel_cost, summary_stats
+
+
+def _render_missing_mileage(params):
+    from ..services.pdf_report_service import MileagePDFReportService
+
+    with get_db_connection() as conn:
+        data = _missing_mileage_data(conn.cursor())
+    return MileagePDFReportService().create_missing_data_pdf(*data)
+
+
+report_jobs.register(
+    'missing-mileage-data', ('run_sheet_jobs', 'runsheet_daily_data'), _render_missing_mileage,
+    lambda params: 'missing_mileage_data_report.pdf',
+)
+
+
 @reports_bp.route('/data/reports/missing-mileage-data', methods=['POST'])
 def api_generate_missing_mileage_report():
     """Generate missing mileage data report."""
     try:
         format_type = request.json.get('format', 'csv') if request.json else 'csv'
         
+        if format_type.lower() == 'pdf':
+            return report_jobs.send_report('missing-mileage-data')
+        
         with get_db_connection() as conn:
-            cursor = conn.cursor()
+            missing_mileage, missing_fuel_cost, summary_stats = _missing_mileage_data(conn.cursor())
             
-            # Get all run sheet dates (working days)
-            cursor.execute("""
-                SELECT DISTINCT date 
-                FROM run_sheet_jobs 
-                WHERE date IS NOT NULL AND date != ''
-                ORDER BY substr(date, 7, 4), substr(date, 4, 2), substr(date, 1, 2)
-            """)
-            
-            runsheet_dates = [row['date'] for row in cursor.fetchall()]
+            # Generate CSV report
+            import csv
+            import io
+            from flask import make_response
             
-            # Get all mileage dates
-            cursor.execute("""
-                SELECT DISTINCT date 
-                FROM runsheet_daily_data 
-                WHERE mileage IS NOT NULL
-            """)
+            output = io.StringIO()
+            writer = csv.writer(output)
             
-            mileage_dates = set(row['date'] for row in cursor.fetchall())
+            # Write missing mileage section
+            writer.writerow(['MISSING MILEAGE DATA'])
+            writer.writerow(['Date', 'Issue'])
             
-            # Find missing dates
-            missing_mileage = []
-            for date in runsheet_dates:
-                if date not in mileage_dates:
-                    missing_mileage.append(date)
+            for date in missing_mileage:
+                writer.writerow([date, 'No mileage recorded'])
             
-            # Find dates with mileage but no fuel cost
-            cursor.execute("""
-                SELECT date, mileage
-                FROM runsheet_daily_data 
-                WHERE mileage IS NOT NULL AND (fuel_cost IS NULL OR fuel_cost = 0)
-                ORDER BY substr(date, 7, 4), substr(date, 4, 2), substr(date, 1, 2)
-            """)
+            writer.writerow([])  # Empty row
+            writer.writerow(['MISSING FUEL COST DATA'])
+            writer.writerow(['Date', 'Miles', 'Issue'])
             
-            missing_fuel_cost = [dict(row) for row in cursor.fetchall()]
+            for row in missing_fuel_cost:
+                writer.writerow([row['date'], f"{row['mileage']:.1f}", 'No fuel cost recorded'])
             
-            # Summary statistics
-            summary_stats = {
-                'total_working_days': len(runsheet_dates),
-                'days_with_mileage': len(mileage_dates),
-                'missing_mileage': len(missing_mileage),
-                'missing_fuel_cost': len(missing_fuel_cost)
-            }
+            # Summary
+            writer.writerow([])
+            writer.writerow(['SUMMARY'])
+            writer.writerow(['Total working days', summary_stats['total_working_days']])
+            writer.writerow(['Days with mileage data', summary_stats['days_with_mileage']])
+            writer.writerow(['Missing mileage data', summary_stats['missing_mileage']])
+            writer.writerow(['Missing fuel cost data', summary_stats['missing_fuel_cost']])
+            writer.writerow(['Data completeness', f"{(summary_stats['days_with_mileage'] / summary_stats['total_working_days'] * 100):.1f}%" if summary_stats['total_working_days'] else '0%'])
             
-            if format_type.lower() == 'pdf':
-                # Generate PDF report
-                from ..services.pdf_report_service import MileagePDFReportService
-                from flask import send_file
-                
-                pdf_service = MileagePDFReportService()
-                pdf_path = pdf_service.create_missing_data_pdf(missing_mileage, missing_fuel_cost, summary_stats)
-                
-                return send_file(pdf_path, as_attachment=True,
-                               download_name='missing_mileage_data_report.pdf',
-                               mimetype='application/pdf')
-            else:
-                # Generate CSV report
-                import csv
-                import io
-                from flask import make_response
-                
-                output = io.StringIO()
-                writer = csv.writer(output)
-                
-                # Write missing mileage section
-                writer.writerow(['MISSING MILEAGE DATA'])
-                writer.writerow(['Date', 'Issue'])
-                
-                for date in missing_mileage:
-                    writer.writerow([date, 'No mileage recorded'])
-                
-                writer.writerow([])  # Empty row
-                writer.writerow(['MISSING FUEL COST DATA'])
-                writer.writerow(['Date', 'Miles', 'Issue'])
-                
-                for row in missing_fuel_cost:
-                    writer.writerow([row['date'], f"{row['mileage']:.1f}", 'No fuel cost recorded'])
-                
-                # Summary
-                writer.writerow([])
-                writer.writerow(['SUMMARY'])
-                writer.writerow(['Total working days', summary_stats['total_working_days']])
-                writer.writerow(['Days with mileage data', summary_stats['days_with_mileage']])
-                writer.writerow(['Missing mileage data', summary_stats['missing_mileage']])
-                writer.writerow(['Missing fuel cost data', summary_stats['missing_fuel_cost']])
-                writer.writerow(['Data completeness', f"{(summary_stats['days_with_mileage'] / summary_stats['total_working_days'] * 100):.1f}%" if summary_stats['total_working_days'] else '0%'])
-                
-                # Create response
-                response = make_response(output.getvalue())
-                response.headers['Content-Type'] = 'text/csv'
-                response.headers['Content-Disposition'] = 'attachment; filename=missing_mileage_data_report.csv'
-                
-                return response
+            # Create response
+            response = make_response(output.getvalue())
+            response.headers['Content-Type'] = 'text/csv'
+            response.headers['Content-Disposition'] = 'attachment; filename=missing_mileage_data_report.csv'
             
+            return response
+        
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _render_weekly_summary(params):
+    """Weekly summary PDF, from the same summary as /api/weekly-summary."""
+    from ..services.weekly_summary_pdf_service import WeeklySummaryPDFService
+
+    summary = WeeklySummaryService.get_week(company_calendar.parse_date_string(params['week_start']))
+    if summary is None:
+        raise RuntimeError(f"No data for the week starting {params['week_start']}")
+    return WeeklySummaryPDFService().create_weekly_summary_pdf(summary.to_dict())
+
+
+report_jobs.register(
+    'weekly-summary',
+    ('payslips', 'job_items', 'run_sheet_jobs', 'runsheet_daily_data', 'attendance'),
+    _render_weekly_summary,
+    lambda params: f"weekly_summary_week{params['week_number']}.pdf",
+)
+
+
+def _parse_week_start(value):
+    """A week_start parameter (YYYY-MM-DD, or DD/MM/YYYY) as a datetime, or None."""
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
 @reports_bp.route('/weekly-summary/export-pdf', methods=['POST'])
 def api_weekly_summary_export_pdf():
     """Export weekly summary as PDF."""
     try:
-        from datetime import datetime, timedelta
-        from flask import send_file
-        from ..services.weekly_summary_pdf_service import WeeklySummaryPDFService
-        from datetime import datetime, timedelta
-        
-        # Get the week_start parameter
         week_start_param = request.json.get('week_start') if request.json else None
         
-        # Get week data (duplicate logic from api_weekly_summary to avoid HTTP call)
-        if not week_start_param:
+        if week_start_param:
+            start_dt = _parse_week_start(week_start_param)
+            if start_dt is None:
+                return jsonify({'error': 'Invalid week_start format'}), 400
+        else:
             # Default to the most recent payslip's week
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT period_end
-                    FROM payslips
-                    ORDER BY period_end DESC
-                    LIMIT 1
-                """)
-                result = cursor.fetchone()
-                
-                if result and result['period_end']:
-                    try:
-                        saturday = datetime.strptime(result['period_end'], '%d/%m/%Y')
-                        sunday = saturday - timedelta(days=6)
-                        week_start_param = sunday.strftime('%Y-%m-%d')
-                    except:
-                        return jsonify({'error': 'No valid payslip data found'}), 404
-                else:
-                    return jsonify({'error': 'No payslip data found'}), 404
-        
-        # Convert to DD/MM/YYYY
-        try:
-            dt = datetime.strptime(week_start_param, '%Y-%m-%d')
-            week_start = dt.strftime('%d/%m/%Y')
-        except:
-            week_start = week_start_param
-        
-        # Calculate week end
-        start_dt = datetime.strptime(week_start, '%d/%m/%Y')
-        end_dt = start_dt + timedelta(days=6)
-        week_end = end_dt.strftime('%d/%m/%Y')
-        
-        # Check if payslip exists for this week
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT week_number, tax_year
-                FROM payslips
-                WHERE period_end = ?
-                LIMIT 1
-            """, (week_end,))
-            
-            payslip_info = cursor.fetchone()
-            
-            if not payslip_info:
-                return jsonify({
-                    'error': 'No payslip found for this week',
-                    'message': f'Week ending {week_end} does not have a payslip. PDF can only be generated for weeks with payslip records.'
-                }), 404
+            start_dt = WeeklySummaryService.latest_week_start()
+            if start_dt is None:
+                return jsonify({'error': 'No payslip data found'}), 404
         
-        # If we get here, we have a valid week with a payslip
-        # Make internal request to get full data (disable SSL verification for localhost)
-        import requests
-        import urllib3
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        
-        base_url = request.url_root.rstrip('/')
-        
-        try:
-            response = requests.get(
-                f"{base_url}/api/weekly-summary?week_start={week_start_param}",
-                verify=False,  # Disable SSL verification for localhost
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as req_err:
+        summary = WeeklySummaryService.get_week(start_dt)
+        if summary is None or not summary.has_payslip:
+            week_end = company_calendar.format_date_string(start_dt + timedelta(days=6))
             return jsonify({
-                'error': 'Failed to fetch weekly data',
-                'message': str(req_err)
-            }), 500
+                'error': 'No payslip found for this week',
+                'message': f'Week ending {week_end} does not have a payslip. PDF can only be generated for weeks with payslip records.'
+            }), 404
         
-        # Generate PDF
-        pdf_service = WeeklySummaryPDFService()
-        pdf_path = pdf_service.create_weekly_summary_pdf(data)
-        
-        return send_file(pdf_path, 
-                        as_attachment=True,
-                        download_name=f"weekly_summary_week{data.get('week_number', 'XX')}.pdf",
-                        mimetype='application/pdf')
+        return report_jobs.send_report('weekly-summary', {
+            'week_start': summary.week_start,
+            'week_number': summary.week_number,
+        })
         
     except Exception as e:
         import traceback
@@ -1564,545 +1556,82 @@ def api_weekly_summary_export_pdf():
 def api_weekly_summary():
     """Get weekly summary report (Sunday to Saturday)."""
     try:
-        from datetime import datetime, timedelta
-        from ..utils.company_calendar import company_calendar
-        
         # Get week parameter (format: YYYY-MM-DD for the Sunday of the week)
         week_start = request.args.get('week_start')
         
         if not week_start:
-            # Default to the most recent payslip's week using company calendar
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT period_end, week_number, tax_year
-                    FROM payslips 
-                    WHERE period_end IS NOT NULL 
-                    ORDER BY tax_year DESC, week_number DESC 
-                    LIMIT 1
-                """)
-                result = cursor.fetchone()
-                
-                if result and result['period_end']:
-                    # Use company calendar to get proper week dates
-                    week_number = result['week_number']
-                    tax_year = result['tax_year']
-                    sunday, saturday = company_calendar.get_week_dates(week_number, tax_year)
-                    week_start = company_calendar.format_date_string(sunday)
-                else:
-                    # Fallback to current week
-                    current_week, current_year = company_calendar.get_current_week()
-                    sunday, saturday = company_calendar.get_week_dates(current_week, current_year)
-                    week_start = company_calendar.format_date_string(sunday)
+            # Default to the most recent payslip's week, else the current week
+            start_dt = WeeklySummaryService.latest_week_start()
+            if start_dt is None:
+                current_week, current_year = company_calendar.get_current_week()
+                start_dt, _ = company_calendar.get_week_dates(current_week, current_year)
         else:
-            # Convert from YYYY-MM-DD to DD/MM/YYYY
             try:
-                dt = datetime.strptime(week_start, '%Y-%m-%d')
-                week_start = dt.strftime('%d/%m/%Y')
-            except:
+                start_dt = datetime.strptime(week_start, '%Y-%m-%d')
+            except ValueError:
                 return jsonify({'error': 'Invalid week_start format'}), 400
         
-        # Calculate week end using company calendar (ensures Sunday-Saturday)
-        try:
-            start_dt = company_calendar.parse_date_string(week_start)
-            # Validate it's a Sunday
-            if start_dt.weekday() != 6:  # Sunday = 6
-                return jsonify({'error': 'Week start must be a Sunday'}), 400
-            
-            end_dt = start_dt + timedelta(days=6)
-            week_end = company_calendar.format_date_string(end_dt)
-        except:
-            return jsonify({'error': 'Invalid week_start format'}), 400
+        if start_dt.weekday() != 6:  # Sunday = 6
+            return jsonify({'error': 'Week start must be a Sunday'}), 400
         
+        summary = WeeklySummaryService.get_week(start_dt)
+        if summary is not None:
+            return jsonify(summary.to_dict())
+        
+        # No payslip or runsheet jobs - redirect to the latest available week
+        end_dt = start_dt + timedelta(days=6)
+        week_start = company_calendar.format_date_string(start_dt)
+        week_end = company_calendar.format_date_string(end_dt)
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get all dates in the week range
-            dates_in_week = []
-            current = start_dt
-            while current <= end_dt:
-                dates_in_week.append(current.strftime('%d/%m/%Y'))
-                current += timedelta(days=1)
-            
-            placeholders = ','.join('?' * len(dates_in_week))
-            
-            # Job statistics by status
-            cursor.execute(f"""
-                SELECT 
-                    status,
-                    COUNT(*) as count,
-                    SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as total_pay
-                FROM run_sheet_jobs
-                WHERE date IN ({placeholders})
-                GROUP BY status
-            """, dates_in_week)
-            
-            status_breakdown = {}
-            total_jobs = 0
-            total_earnings = 0
-            dnco_count = 0
-            
-            for row in cursor.fetchall():
-                status = row['status'] or 'unknown'
-                count = row['count']
-                pay = row['total_pay'] or 0
-                
-                # Normalize DNCO to uppercase
-                if status.upper() == 'DNCO':
-                    status = 'DNCO'
-                    pay = 0  # DNCO jobs should always show £0 earnings
-                    dnco_count += count
-                
-                # Aggregate counts if status already exists (handles case variations)
-                if status in status_breakdown:
-                    status_breakdown[status]['count'] += count
-                    status_breakdown[status]['earnings'] += round(pay, 2)
-                else:
-                    status_breakdown[status] = {
-                        'count': count,
-                        'earnings': round(pay, 2)
-                    }
-                
-                total_jobs += count
-                if status not in ['DNCO', 'missed']:
-                    total_earnings += pay
-            
-            # Get deductions from payslip for this week
-            cursor.execute("""
-                SELECT 
-                    ji.client,
-                    SUM(ji.amount) as total_amount
-                FROM job_items ji
-                JOIN payslips p ON ji.payslip_id = p.id
-                WHERE p.period_end = ?
-                AND ji.client IN ('Deduction', 'Company Margin')
-                GROUP BY ji.client
-            """, (week_end,))
-            
-            deduction_amount = 0
-            company_margin_amount = 0
-            
-            for row in cursor.fetchall():
-                if row['client'] == 'Deduction':
-                    deduction_amount = abs(row['total_amount'] or 0)
-                    status_breakdown['PDA Licence'] = {
-                        'count': 1,
-                        'earnings': -deduction_amount
-                    }
-                elif row['client'] == 'Company Margin':
-                    company_margin_amount = abs(row['total_amount'] or 0)
-                    status_breakdown['SASER Auto Billing'] = {
-                        'count': 1,
-                        'earnings': -company_margin_amount
-                    }
-            
-            # Subtract deductions from total earnings
-            total_deductions = deduction_amount + company_margin_amount
-            total_earnings = total_earnings - total_deductions
-            
-            # Reorder status_breakdown to show in specific order
-            # Order: Completed, Extra, DNCO, PDA Licence, SASER Auto Billing, Missed, Pending
-            from collections import OrderedDict
-            ordered_status_breakdown = OrderedDict()
-            
-            # Add in specific order (DNCO is now always uppercase)
-            if 'completed' in status_breakdown:
-                ordered_status_breakdown['completed'] = status_breakdown['completed']
-            if 'extra' in status_breakdown:
-                ordered_status_breakdown['extra'] = status_breakdown['extra']
-            if 'DNCO' in status_breakdown:
-                ordered_status_breakdown['DNCO'] = status_breakdown['DNCO']
-            if 'PDA Licence' in status_breakdown:
-                ordered_status_breakdown['PDA Licence'] = status_breakdown['PDA Licence']
-            if 'SASER Auto Billing' in status_breakdown:
-                ordered_status_breakdown['SASER Auto Billing'] = status_breakdown['SASER Auto Billing']
-            if 'missed' in status_breakdown:
-                ordered_status_breakdown['missed'] = status_breakdown['missed']
-            if 'pending' in status_breakdown:
-                ordered_status_breakdown['pending'] = status_breakdown['pending']
-            
-            status_breakdown = dict(ordered_status_breakdown)
-            
-            # Estimate lost earnings from DNCO jobs using customer + activity specific historical averages
-            estimated_dnco_loss = 0
-            if dnco_count > 0:
-                # Get all DNCO jobs for this week with customer and activity
-                cursor.execute(f"""
-                    SELECT customer, activity, pay_amount
-                    FROM run_sheet_jobs
-                    WHERE date IN ({placeholders})
-                    AND (UPPER(status) = 'DNCO')
-                """, dates_in_week)
-                dnco_jobs = cursor.fetchall()
-                
-                # Calculate estimated loss for each DNCO job based on customer + activity history
-                jobs_with_history = 0
-                jobs_with_activity_history = 0
-                jobs_with_default = 0
-                
-                for dnco_job in dnco_jobs:
-                    customer = dnco_job['customer']
-                    activity = dnco_job['activity']
-                    pay_amount = dnco_job['pay_amount']
-                    
-                    if pay_amount and pay_amount > 0:
-                        # Use actual pay_amount if available (shouldn't happen for DNCO)
-                        estimated_dnco_loss += pay_amount
-                    elif customer and activity:
-                        # First try: Look up average pay for this customer + activity combination
-                        cursor.execute("""
-                            SELECT AVG(pay_amount) as avg_pay
-                            FROM run_sheet_jobs
-                            WHERE customer = ? AND activity = ?
-                            AND pay_amount IS NOT NULL 
-                            AND pay_amount > 0
-                            AND status = 'completed'
-                        """, (customer, activity))
-                        avg_result = cursor.fetchone()
-                        
-                        if avg_result and avg_result['avg_pay']:
-                            estimated_dnco_loss += avg_result['avg_pay']
-                            jobs_with_activity_history += 1
-                        else:
-                            # Second try: Look up average pay for just this customer (any activity)
-                            cursor.execute("""
-                                SELECT AVG(pay_amount) as avg_pay
-                                FROM run_sheet_jobs
-                                WHERE customer = ? 
-                                AND pay_amount IS NOT NULL 
-                                AND pay_amount > 0
-                                AND status = 'completed'
-                            """, (customer,))
-                            avg_result = cursor.fetchone()
-                            
-                            if avg_result and avg_result['avg_pay']:
-                                estimated_dnco_loss += avg_result['avg_pay']
-                                jobs_with_history += 1
-                            else:
-                                # If no historical data, use £15 default
-                                estimated_dnco_loss += 15.0
-                                jobs_with_default += 1
-                    elif customer:
-                        # No activity, just use customer average
-                        cursor.execute("""
-                            SELECT AVG(pay_amount) as avg_pay
-                            FROM run_sheet_jobs
-                            WHERE customer = ? 
-                            AND pay_amount IS NOT NULL 
-                            AND pay_amount > 0
-                            AND status = 'completed'
-                        """, (customer,))
-                        avg_result = cursor.fetchone()
-                        
-                        if avg_result and avg_result['avg_pay']:
-                            estimated_dnco_loss += avg_result['avg_pay']
-                            jobs_with_history += 1
-                        else:
-                            estimated_dnco_loss += 15.0
-                            jobs_with_default += 1
-                    else:
-                        # No customer name, use default
-                        estimated_dnco_loss += 15.0
-                        jobs_with_default += 1
-                
-                estimated_dnco_loss = round(estimated_dnco_loss, 2)
-                
-                # Log for debugging
-                import logging
-                logger = logging.getLogger('api')
-                logger.info(f"DNCO Loss Calculation: {dnco_count} jobs, {jobs_with_activity_history} with customer+activity history, {jobs_with_history} with customer history only, {jobs_with_default} with default, Total: £{estimated_dnco_loss}")
-                
-                # Add estimated loss to DNCO status breakdown
-                for status_key in ['DNCO', 'dnco']:
-                    if status_key in status_breakdown:
-                        status_breakdown[status_key]['estimated_loss'] = estimated_dnco_loss
-            
-            # Daily breakdown - maintain Sunday-Saturday order
-            cursor.execute(f"""
-                SELECT 
-                    date,
-                    COUNT(*) as jobs,
-                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                    SUM(CASE WHEN status = 'extra' THEN 1 ELSE 0 END) as extra,
-                    SUM(CASE WHEN status = 'DNCO' OR status = 'dnco' THEN 1 ELSE 0 END) as dnco,
-                    SUM(CASE WHEN status = 'missed' THEN 1 ELSE 0 END) as missed,
-                    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                    SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as earnings
-                FROM run_sheet_jobs
-                WHERE date IN ({placeholders})
-                GROUP BY date
-            """, dates_in_week)
-            
-            # Create a dict for quick lookup
-            daily_data = {row['date']: row for row in cursor.fetchall()}
-            
-            # Build daily breakdown in correct order (Sunday to Saturday)
-            # Only include days where you actually worked (had jobs)
-            daily_breakdown = []
-            for date_str in dates_in_week:
-                if date_str in daily_data:
-                    row = daily_data[date_str]
-                    # Only add days with jobs > 0
-                    if row['jobs'] > 0:
-                        daily_breakdown.append({
-                            'date': row['date'],
-                            'day_name': datetime.strptime(row['date'], '%d/%m/%Y').strftime('%A'),
-                            'jobs': row['jobs'],
-                            'completed': row['completed'],
-                            'extra': row['extra'],
-                            'dnco': row['dnco'],
-                            'missed': row['missed'],
-                            'pending': row['pending'],
-                            'earnings': round(row['earnings'] or 0, 2)
-                        })
-                # Skip days with no jobs (absent days)
-            
-            # Mileage data
-            cursor.execute(f"""
-                SELECT 
-                    date,
-                    mileage,
-                    fuel_cost
-                FROM runsheet_daily_data
-                WHERE date IN ({placeholders})
-                ORDER BY date
-            """, dates_in_week)
-            
-            mileage_data = []
-            mileage_dict = {}
-            total_mileage = 0
-            total_fuel_cost = 0
-            days_with_mileage = 0
-            
-            for row in cursor.fetchall():
-                date = row['date']
-                mileage = row['mileage'] or 0
-                fuel_cost = row['fuel_cost'] or 0
-                
-                # Only include mileage data for days where you actually worked
-                if date in daily_data and daily_data[date]['jobs'] > 0:
-                    if mileage > 0:
-                        days_with_mileage += 1
-                        total_mileage += mileage
-                        total_fuel_cost += fuel_cost
-                    
-                    mileage_dict[date] = {
-                        'date': date,
-                        'mileage': mileage,
-                        'fuel_cost': round(fuel_cost, 2)
-                    }
-                    
-                    mileage_data.append({
-                        'date': date,
-                        'mileage': mileage,
-                        'fuel_cost': round(fuel_cost, 2)
-                    })
-            
-            # Check for days with jobs but missing mileage
-            # Exclude days with attendance entries (absent days)
-            cursor.execute(f"""
-                SELECT date FROM attendance 
-                WHERE date IN ({placeholders})
-            """, dates_in_week)
-            attendance_dates = set(row['date'] for row in cursor.fetchall())
-            
-            missing_mileage_dates = []
-            for day in daily_breakdown:
-                # Skip if day has attendance entry (absent)
-                if day['date'] in attendance_dates:
-                    continue
-                    
-                if day['jobs'] > 0:  # Day has jobs
-                    mileage_info = mileage_dict.get(day['date'])
-                    # Only flag as missing if no record exists (not if mileage is 0 - could be working from home)
-                    if not mileage_info:
-                        missing_mileage_dates.append(day['date'])
-            
-            # Top customers this week
-            cursor.execute(f"""
-                SELECT 
-                    customer,
-                    COUNT(*) as jobs,
-                    SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as earnings
-                FROM run_sheet_jobs
-                WHERE date IN ({placeholders})
-                AND customer IS NOT NULL
-                GROUP BY customer
-                ORDER BY jobs DESC
-                LIMIT 10
-            """, dates_in_week)
-            
-            top_customers = []
-            for row in cursor.fetchall():
-                top_customers.append({
-                    'customer': row['customer'],
-                    'jobs': row['jobs'],
-                    'earnings': round(row['earnings'] or 0, 2)
-                })
-            
-            # Job types breakdown
-            cursor.execute(f"""
-                SELECT 
-                    activity,
-                    COUNT(*) as count
-                FROM run_sheet_jobs
-                WHERE date IN ({placeholders})
-                AND activity IS NOT NULL
-                GROUP BY activity
-                ORDER BY count DESC
-                LIMIT 10
-            """, dates_in_week)
-            
-            job_types = []
-            for row in cursor.fetchall():
-                job_types.append({
-                    'type': row['activity'],
-                    'count': row['count']
-                })
-            
-            # Calculate averages and metrics
-            working_days = len([d for d in daily_breakdown if d['jobs'] > 0])
-            avg_jobs_per_day = round(total_jobs / working_days, 1) if working_days > 0 else 0
-            avg_earnings_per_day = round(total_earnings / working_days, 2) if working_days > 0 else 0
-            avg_earnings_per_job = round(total_earnings / total_jobs, 2) if total_jobs > 0 else 0
-            avg_mileage_per_day = round(total_mileage / days_with_mileage, 1) if days_with_mileage > 0 else 0
-            
-            # Fuel efficiency
-            cost_per_mile = round(total_fuel_cost / total_mileage, 3) if total_mileage > 0 else 0
-            earnings_per_mile = round(total_earnings / total_mileage, 2) if total_mileage > 0 else 0
-            
-            # Completion rate (completed + extra + DNCO are successful, only missed counts as not completed)
-            completed_jobs = status_breakdown.get('completed', {}).get('count', 0) + status_breakdown.get('extra', {}).get('count', 0)
-            dnco_jobs = status_breakdown.get('DNCO', {}).get('count', 0) + status_breakdown.get('dnco', {}).get('count', 0)
-            missed_jobs = status_breakdown.get('missed', {}).get('count', 0)
-            
-            # Exclude pending from calculation (not yet processed)
-            pending_jobs = status_breakdown.get('pending', {}).get('count', 0)
-            processed_jobs = total_jobs - pending_jobs
-            
-            # Successful = completed + extra + DNCO (DNCO is not your fault - parts didn't arrive)
-            successful_jobs = completed_jobs + dnco_jobs
-            completion_rate = round((successful_jobs / processed_jobs * 100), 1) if processed_jobs > 0 else 0
-            
-            # Get discrepancies for this week (jobs in payslips but not in runsheets)
-            cursor.execute(f"""
-                SELECT COUNT(DISTINCT j.job_number) as discrepancy_count
-                FROM job_items j
-                LEFT JOIN run_sheet_jobs r ON j.job_number = r.job_number
-                WHERE j.date IN ({placeholders})
-                AND r.job_number IS NULL
-            """, dates_in_week)
-            
-            discrepancies = cursor.fetchone()['discrepancy_count'] or 0
-            
-            # Get week number and payslip net payment using period_end (Saturday of the week)
-            cursor.execute("""
-                SELECT week_number, tax_year, net_payment
-                FROM payslips
-                WHERE period_end = ?
+            latest_payslip = conn.execute("""
+                SELECT week_number, tax_year, period_end
+                FROM payslips 
+                WHERE period_end IS NOT NULL 
+                ORDER BY tax_year DESC, week_number DESC 
                 LIMIT 1
-            """, (week_end,))
-            
-            payslip_info = cursor.fetchone()
-            
-            # Always use payslip week numbers (not ISO weeks)
-            if payslip_info:
-                week_number = payslip_info['week_number']
-                tax_year = payslip_info['tax_year']
-            else:
-                # No payslip for this week - check if we have runsheet jobs
-                if total_jobs > 0:
-                    # We have runsheet data but no payslip - use company calendar to calculate week
-                    try:
-                        saturday_date = company_calendar.parse_date_string(week_end)
-                        week_number = company_calendar.get_week_number_from_date(saturday_date, 2025)
-                        tax_year = 2025
-                    except:
-                        week_number = None
-                        tax_year = None
-                else:
-                    # No runsheet jobs either - redirect to latest available week
-                    cursor.execute("""
-                        SELECT week_number, tax_year, period_end
-                        FROM payslips 
-                        WHERE period_end IS NOT NULL 
-                        ORDER BY tax_year DESC, week_number DESC 
-                        LIMIT 1
-                    """)
-                    latest_payslip = cursor.fetchone()
-                    
-                    if latest_payslip:
-                        # Redirect to the latest available week
-                        try:
-                            latest_saturday = datetime.strptime(latest_payslip['period_end'], '%d/%m/%Y')
-                            latest_sunday = latest_saturday - timedelta(days=6)
-                            latest_week_start = latest_sunday.strftime('%d/%m/%Y')
-                            
-                            # Return a redirect response with the latest week
-                            return jsonify({
-                                'redirect': True,
-                                'latest_week_start': latest_week_start,
-                                'message': f'Week ending {week_end} not available. Showing latest week: {latest_payslip["week_number"]}'
-                            })
-                        except:
-                            pass
-                    
-                    # Fallback error message
-                    return jsonify({
-                        'error': 'No data found for this week',
-                        'message': f'Week ending {week_end} has no runsheet or payslip data.',
-                        'week_start': week_start,
-                        'week_end': week_end,
-                        'week_label': f"{start_dt.strftime('%d %b')} - {end_dt.strftime('%d %b %Y')}"
-                    }), 404
-            
-            # Check if weekly earnings match payslip net payment
-            payslip_net_payment = payslip_info['net_payment'] if payslip_info else None
-            earnings_discrepancy = 0
-            if payslip_net_payment is not None:
-                earnings_discrepancy = round(total_earnings - payslip_net_payment, 2)
-            
-            # Generate proper week label using company calendar
-            if week_number:
-                week_label = company_calendar.get_week_label(week_number, tax_year or 2025)
-            else:
-                week_label = f"{start_dt.strftime('%d %b')} - {end_dt.strftime('%d %b %Y')}"
-            
-            return jsonify({
-                'week_start': week_start,
-                'week_end': week_end,
-                'week_label': week_label,
-                'week_number': week_number,
-                'tax_year': tax_year,
-                'summary': {
-                    'total_jobs': total_jobs,
-                    'total_earnings': round(total_earnings, 2),
-                    'total_mileage': total_mileage,
-                    'total_fuel_cost': round(total_fuel_cost, 2),
-                    'working_days': working_days,
-                    'completion_rate': completion_rate,
-                    'discrepancies': discrepancies,
-                    'payslip_net_payment': payslip_net_payment,
-                    'earnings_discrepancy': earnings_discrepancy,
-                    'missing_mileage_dates': missing_mileage_dates
-                },
-                'status_breakdown': status_breakdown,
-                'daily_breakdown': daily_breakdown,
-                'mileage_data': mileage_data,
-                'top_customers': top_customers,
-                'job_types': job_types,
-                'metrics': {
-                    'avg_jobs_per_day': avg_jobs_per_day,
-                    'avg_earnings_per_day': avg_earnings_per_day,
-                    'avg_earnings_per_job': avg_earnings_per_job,
-                    'avg_mileage_per_day': avg_mileage_per_day,
-                    'cost_per_mile': cost_per_mile,
-                    'earnings_per_mile': earnings_per_mile
-                }
-            })
+            """).fetchone()
+        
+        if latest_payslip:
+            try:
+                latest_saturday = datetime.strptime(latest_payslip['period_end'], '%d/%m/%Y')
+                latest_week_start = (latest_saturday - timedelta(days=6)).strftime('%d/%m/%Y')
+                return jsonify({
+                    'redirect': True,
+                    'latest_week_start': latest_week_start,
+                    'message': f'Week ending {week_end} not available. Showing latest week: {latest_payslip["week_number"]}'
+                })
+            except ValueError:
+                pass
+        
+        return jsonify({
+            'error': 'No data found for this week',
+            'message': f'Week ending {week_end} has no runsheet or payslip data.',
+            'week_start': week_start,
+            'week_end': week_end,
+            'week_label': f"{start_dt.strftime('%d %b')} - {end_dt.strftime('%d %b %Y')}"
+        }), 404
             
     except Exception as e:
-        logger.error(f'Error getting customer data: {e}')
+        logger.error(f'Error getting weekly summary: {e}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@reports_bp.route('/weekly-summary/year')
+def api_weekly_summary_year():
+    """Weekly summaries for every payslip week of a tax year (year-end export)."""
+    try:
+        tax_year = request.args.get('tax_year', type=int)
+        if not tax_year:
+            return jsonify({'success': False, 'error': 'tax_year is required'}), 400
+        
+        weeks = WeeklySummaryService.get_tax_year(tax_year)
+        return jsonify({
+            'success': True,
+            'tax_year': tax_year,
+            'weeks': [summary.to_dict() for summary in weeks],
+        })
+    except Exception as e:
+        logger.error(f'Error getting weekly summaries for {request.args.get("tax_year")}: {e}')
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -2113,11 +1642,11 @@ def api_customers():
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT customer, COUNT(*) as job_count
+                SELECT canonical_customer, COUNT(*) as job_count
                 FROM run_sheet_jobs 
-                WHERE customer IS NOT NULL AND customer != ''
-                GROUP BY customer
-                ORDER BY customer
+                WHERE canonical_customer IS NOT NULL AND canonical_customer != ''
+                GROUP BY canonical_customer
+                ORDER BY canonical_customer
             """)
             
             customers = []
@@ -2140,6 +1669,8 @@ def api_customer_parsing():
         customer = request.args.get('customer')
         if not customer:
             return jsonify({'error': 'Customer parameter required'}), 400
+        # Accept a raw name too: jobs are matched on the name it maps to.
+        customer = CustomerMappingModel().get_mapped_customer(customer)
         
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -2159,7 +1690,7 @@ def api_customer_parsing():
                         ELSE 'Complete'
                     END as parsing_status
                 FROM run_sheet_jobs 
-                WHERE customer = ?
+                WHERE canonical_customer = ?
                 ORDER BY date DESC, job_number DESC
             """, (customer,))
             
@@ -2419,3 +1950,41 @@ def api_earnings_analytics():
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ---------------------------------------------------------------------------
+# PDF report jobs: render in the background, download when ready
+# ---------------------------------------------------------------------------
+
+@reports_bp.route('/reports/jobs', methods=['POST'])
+def api_submit_report_job():
+    """Start a PDF report; answers 200 when it is already cached, else 202 to poll."""
+    data = request.get_json(silent=True) or {}
+    try:
+        job = report_jobs.submit(data.get('report_type', ''), data.get('params') or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f'Error starting report job: {e}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, **job}), 200 if job['status'] == 'completed' else 202
+
+
+@reports_bp.route('/reports/jobs/<job_id>', methods=['GET'])
+def api_report_job_status(job_id):
+    """Status of a PDF report job."""
+    job = report_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired report job'}), 404
+    return jsonify({'success': True, **job})
+
+
+@reports_bp.route('/reports/jobs/<job_id>/download', methods=['GET'])
+def api_report_job_download(job_id):
+    """Download a completed PDF report job."""
+    job = report_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired report job'}), 404
+    if job['status'] != 'completed':
+        return jsonify({'success': False, 'error': f"Report is {job['status']}", **job}), 409
+    return report_jobs.send_job_pdf(job)
@@ -3,8 +3,15 @@ API routes for runsheet extraction testing and comparison.
 Allows testing different extraction methods and comparing results.
 """
 
-import sqlite3
+import copy
+import logging
+import multiprocessing
 import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 from flask import Blueprint, request, jsonify
@@ -14,13 +21,32 @@ import os
 # Add testing directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scripts' / 'testing'))
 
-from camelot_runsheet_parser import CamelotRunsheetParser
 from app.config import Config
+from ..database import get_db_connection
+from ..services import job_store
 
-DB_PATH = "data/database/payslips.db"
+logger = logging.getLogger(__name__)
 
 runsheet_testing_bp = Blueprint('runsheet_testing', __name__, url_prefix='/api/runsheet-testing')
 
+DRIVER_NAME = 'Daniel Hanson'
+REIMPORT_DIR = Path('data/documents/runsheets')
+ABSENT_REASONS = ('Day Off', 'Holiday', 'Sick', 'Annual Leave')
+
+# A month of runsheets is parsed in this many worker processes
+REIMPORT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Parsed jobs by (path, mtime, size, driver), shared by the extract,
+# compare and reimport routes so a file is only parsed again once it changes
+MAX_PARSED_FILES = 200
+_parsed_files = OrderedDict()
+_parsed_files_lock = threading.Lock()
+
+# Reimport previews by token in the shared job store, with the parsed
+# month as payload until it is applied (oldest dropped first)
+REIMPORT_PREVIEW_KIND = 'reimport-preview'
+MAX_REIMPORT_PREVIEWS = 10
+
 
 @runsheet_testing_bp.route('/available-files', methods=['GET'])
 def get_available_files():
@@ -87,8 +113,8 @@ def extract_with_camelot():
             return jsonify({'error': 'pdf_path is required'}), 400
         
         # Parse with Camelot
-        parser = CamelotRunsheetParser()
-        jobs = parser.parse_pdf(pdf_path)
+        parser = camelot_parser_class()()
+        jobs = parse_runsheets([pdf_path])[pdf_path]
         
         # Calculate quality scores
         for job in jobs:
@@ -283,8 +309,8 @@ def compare_methods():
 
 def extract_with_camelot_internal(pdf_path):
     """Internal helper for Camelot extraction."""
-    parser = CamelotRunsheetParser()
-    jobs = parser.parse_pdf(pdf_path)
+    parser = camelot_parser_class()()
+    jobs = parse_runsheets([pdf_path])[pdf_path]
     
     for job in jobs:
         job['quality_score'] = parser.calculate_quality_score(job)
@@ -339,189 +365,277 @@ def extract_with_text_internal(pdf_path):
     }
 
 
-@runsheet_testing_bp.route('/reimport', methods=['POST'])
-def reimport_month():
-    """Re-import a month of runsheets using Camelot. Updates existing jobs and adds selected new jobs."""
+# ---------------------------------------------------------------------------
+# Shared parsing
+# ---------------------------------------------------------------------------
+
+def camelot_parser_class():
+    """CamelotRunsheetParser, imported on first use.
+
+    The parser pulls in camelot, pandas and OpenCV, about half a second
+    of imports that every process would otherwise pay at startup.
+    """
+    from camelot_runsheet_parser import CamelotRunsheetParser
+    return CamelotRunsheetParser
+
+
+def _parse_runsheet_file(pdf_path, driver_name):
+    """Parse one runsheet. Module-level so it can run in a worker process."""
+    return camelot_parser_class()(driver_name=driver_name).parse_pdf(pdf_path)
+
+
+def _parse_key(pdf_path, driver_name):
+    stat = os.stat(pdf_path)
+    return (str(Path(pdf_path).resolve()), stat.st_mtime_ns, stat.st_size, driver_name)
+
+
+def parse_runsheets(pdf_paths, driver_name=DRIVER_NAME, workers=1, progress=None):
+    """Camelot-parse runsheets, reusing results for files parsed before.
+
+    Returns ``{path: jobs}`` with a private copy of each job list. Files
+    not in the cache are parsed in up to ``workers`` processes.
+    ``progress(done)`` is called as files complete.
+    """
+    results = {}
+    missing = []
+    with _parsed_files_lock:
+        for path in pdf_paths:
+            key = _parse_key(path, driver_name)
+            if key in _parsed_files:
+                _parsed_files.move_to_end(key)
+                results[path] = copy.deepcopy(_parsed_files[key])
+            else:
+                missing.append((path, key))
+    if progress:
+        progress(len(results))
+
+    def store(path, key, jobs):
+        with _parsed_files_lock:
+            _parsed_files[key] = jobs
+            while len(_parsed_files) > MAX_PARSED_FILES:
+                _parsed_files.popitem(last=False)
+        results[path] = copy.deepcopy(jobs)
+        if progress:
+            progress(len(results))
+
+    if workers > 1 and len(missing) > 1:
+        # Spawned rather than forked: this runs beside the server's threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing)), mp_context=context) as pool:
+            futures = [(path, key, pool.submit(_parse_runsheet_file, str(path), driver_name))
+                       for path, key in missing]
+            for path, key, future in futures:
+                store(path, key, future.result())
+    else:
+        for path, key in missing:
+            store(path, key, _parse_runsheet_file(str(path), driver_name))
+    return results
+
+
+def _importable_jobs(parsed_files):
+    """Jobs a reimport may write from ``[(filename, jobs)]``, and the DNCO jobs skipped."""
+    importable = []
+    skipped_dnco = 0
+    for filename, jobs in parsed_files:
+        for job in jobs:
+            activity = (job.get('activity') or '').upper()
+            # Skip invalid jobs, PP Audit, and DNCO jobs
+            if not job.get('job_number') or not job.get('date') or 'PP Audit' in (job.get('customer') or ''):
+                continue
+            if 'DNCO' in activity or 'DID NOT CARRY OUT' in activity:
+                skipped_dnco += 1
+                continue
+            importable.append((filename, job))
+    return importable, skipped_dnco
+
+
+def _existing_job_ids(conn, jobs):
+    """``{(date, job_number): id}`` for the run sheet jobs on the jobs' dates."""
+    dates = sorted({job['date'] for _, job in jobs})
+    existing = {}
+    for i in range(0, len(dates), 500):
+        chunk = dates[i:i + 500]
+        for row in conn.execute(
+            f"SELECT id, date, job_number FROM run_sheet_jobs WHERE date IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ):
+            existing.setdefault((row['date'], row['job_number']), row['id'])
+    return existing
+
+
+# ---------------------------------------------------------------------------
+# Reimport: preview in the background, then apply the stored result
+# ---------------------------------------------------------------------------
+
+def create_reimport_preview(year, month, files):
+    """Register a background reimport preview and return its token."""
+    token = uuid.uuid4().hex
+    preview = {
+        'token': token,
+        'status': 'queued',
+        'year': year,
+        'month': month,
+        'total_files': len(files),
+        'parsed_files': 0,
+        'created_at': datetime.now().isoformat(),
+        'finished_at': None,
+        'error': None,
+        'new_jobs': [],
+        'existing_jobs_count': 0,
+        'skipped_dnco': 0,
+        'skipped_days': [],
+    }
+    job_store.create(REIMPORT_PREVIEW_KIND, token, preview, keep=MAX_REIMPORT_PREVIEWS)
+    return token
+
+
+def get_reimport_preview(token):
+    """A preview without its parsed jobs, or None if unknown (or expired)."""
+    return job_store.get(REIMPORT_PREVIEW_KIND, token)
+
+
+def _update_reimport_preview(token, payload=None, **changes):
+    job_store.update(REIMPORT_PREVIEW_KIND, token, payload=payload, **changes)
+
+
+def run_reimport_preview(token, files, workers=1):
+    """Parse a month of runsheets and record the jobs a reimport would add."""
     try:
-        data = request.json
-        year = data.get('year', '2025')
-        month = data.get('month', '12')
-        selected_jobs = data.get('selected_jobs', [])  # List of job_numbers to add
-        
-        runsheets_dir = Path('data/documents/runsheets')
-        pattern = f"DH_*-{month}-{year}.pdf"
-        files = list(runsheets_dir.rglob(pattern))
-        
-        if not files:
-            return jsonify({'error': f'No runsheets found for {month}/{year}'}), 404
-        
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        total_updated = 0
-        total_added = 0
-        total_skipped = 0
+        _update_reimport_preview(token, status='running')
+        with get_db_connection() as conn:
+            absent = dict(conn.execute(
+                f"SELECT date, reason FROM attendance WHERE reason IN ({', '.join('?' * len(ABSENT_REASONS))})",
+                ABSENT_REASONS,
+            ).fetchall())
+
+        to_parse = []
         skipped_days = []
-        files_processed = 0
-        
-        parser = CamelotRunsheetParser(driver_name="Daniel Hanson")
-        
         for pdf_file in sorted(files):
             date_match = re.search(r'(\d{2})-(\d{2})-(\d{4})', pdf_file.name)
             if not date_match:
                 continue
-            
             date_str = f"{date_match.group(1)}/{date_match.group(2)}/{date_match.group(3)}"
-            
-            cursor.execute("SELECT reason FROM attendance WHERE date = ?", (date_str,))
-            attendance = cursor.fetchone()
-            if attendance and attendance[0] in ['Day Off', 'Holiday', 'Sick', 'Annual Leave']:
-                skipped_days.append({'date': date_str, 'reason': attendance[0]})
-                continue
-            
-            jobs = parser.parse_pdf(str(pdf_file))
-            if not jobs:
-                continue
-            
-            files_processed += 1
-            current_filename = pdf_file.name
-            
-            for job in jobs:
-                job_number = job.get('job_number')
-                date = job.get('date')
-                customer = job.get('customer', '')
-                activity = job.get('activity', '')
-                
-                # Skip invalid jobs, PP Audit, and DNCO jobs
-                if not job_number or not date or 'PP Audit' in customer:
-                    continue
-                
-                if 'DNCO' in activity.upper() or 'DID NOT CARRY OUT' in activity.upper():
-                    total_skipped += 1
-                    continue
-                
-                cursor.execute("SELECT id FROM run_sheet_jobs WHERE date = ? AND job_number = ?", (date, job_number))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # Always update existing jobs
-                    cursor.execute("""
-                        UPDATE run_sheet_jobs SET customer = ?, activity = ?, job_address = ?, postcode = ?, source_file = ?
-                        WHERE id = ?
-                    """, (job.get('customer'), job.get('activity'), job.get('job_address'), job.get('postcode'), current_filename, existing[0]))
-                    total_updated += 1
-                else:
-                    # Only add new jobs if they're in the selected list (or if no selection provided, add all)
-                    if not selected_jobs or job_number in selected_jobs:
-                        cursor.execute("""
-                            INSERT INTO run_sheet_jobs (date, driver, job_number, customer, activity, job_address, postcode, source_file, status)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-                        """, (date, 'Daniel Hanson', job_number, job.get('customer'), job.get('activity'), job.get('job_address'), job.get('postcode'), current_filename))
-                        total_added += 1
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'files_processed': files_processed,
-            'jobs_updated': total_updated,
-            'jobs_added': total_added,
-            'jobs_skipped': total_skipped,
-            'skipped_days': skipped_days
-        })
-        
+            if date_str in absent:
+                skipped_days.append({'date': date_str, 'reason': absent[date_str]})
+            else:
+                to_parse.append(pdf_file)
+        _update_reimport_preview(token, total_files=len(to_parse), skipped_days=skipped_days)
+
+        parsed = parse_runsheets(
+            to_parse, workers=workers,
+            progress=lambda done: _update_reimport_preview(token, parsed_files=done))
+        parsed_files = [(pdf_file.name, parsed[pdf_file]) for pdf_file in to_parse if parsed[pdf_file]]
+
+        jobs, skipped_dnco = _importable_jobs(parsed_files)
+        with get_db_connection() as conn:
+            existing = _existing_job_ids(conn, jobs)
+        new_jobs = [{
+            'date': job['date'],
+            'job_number': job['job_number'],
+            'customer': job.get('customer', ''),
+            'activity': job.get('activity', ''),
+            'job_address': job.get('job_address', ''),
+            'postcode': job.get('postcode', ''),
+            'source_file': filename
+        } for filename, job in jobs if (job['date'], job['job_number']) not in existing]
+
+        _update_reimport_preview(
+            token, status='completed', new_jobs=new_jobs, existing_jobs_count=len(jobs) - len(new_jobs),
+            skipped_dnco=skipped_dnco, finished_at=datetime.now().isoformat(), payload=parsed_files)
     except Exception as e:
-        import traceback
-        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+        logger.error(f'Reimport preview failed: {e}', exc_info=True)
+        _update_reimport_preview(token, status='failed', error=str(e),
+                                 finished_at=datetime.now().isoformat())
+
+
+def apply_reimport(parsed_files, selected_jobs):
+    """Update existing jobs and add the selected new ones from a parsed month."""
+    jobs, skipped_dnco = _importable_jobs(parsed_files)
+    updated = 0
+    added = 0
+    with get_db_connection() as conn:
+        existing = _existing_job_ids(conn, jobs)
+        for filename, job in jobs:
+            key = (job['date'], job['job_number'])
+            if key in existing:
+                # Always update existing jobs
+                conn.execute("""
+                    UPDATE run_sheet_jobs SET customer = ?, activity = ?, job_address = ?, postcode = ?, source_file = ?
+                    WHERE id = ?
+                """, (job.get('customer'), job.get('activity'), job.get('job_address'), job.get('postcode'), filename, existing[key]))
+                updated += 1
+            elif not selected_jobs or job['job_number'] in selected_jobs:
+                # Only add new jobs if they're in the selected list (or if no selection provided, add all)
+                cursor = conn.execute("""
+                    INSERT INTO run_sheet_jobs (date, driver, job_number, customer, activity, job_address, postcode, source_file, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                """, (job['date'], DRIVER_NAME, job['job_number'], job.get('customer'), job.get('activity'), job.get('job_address'), job.get('postcode'), filename))
+                existing[key] = cursor.lastrowid
+                added += 1
+        conn.commit()
+    return {
+        'files_processed': len(parsed_files),
+        'jobs_updated': updated,
+        'jobs_added': added,
+        'jobs_skipped': skipped_dnco,
+    }
 
 
 @runsheet_testing_bp.route('/reimport-preview', methods=['POST'])
 def reimport_preview():
-    """Preview new jobs that would be added during re-import."""
+    """Start parsing a month of runsheets; poll /reimport-preview/<token> for the new jobs."""
     try:
         data = request.json
         year = data.get('year', '2025')
         month = data.get('month', '12')
-        
-        runsheets_dir = Path('data/documents/runsheets')
-        pattern = f"DH_*-{month}-{year}.pdf"
-        files = list(runsheets_dir.rglob(pattern))
-        
+
+        files = list(REIMPORT_DIR.rglob(f"DH_*-{month}-{year}.pdf"))
         if not files:
             return jsonify({'error': f'No runsheets found for {month}/{year}'}), 404
-        
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        new_jobs = []
-        existing_count = 0
-        skipped_dnco = 0
-        skipped_days = []
-        
-        parser = CamelotRunsheetParser(driver_name="Daniel Hanson")
-        
-        for pdf_file in sorted(files):
-            date_match = re.search(r'(\d{2})-(\d{2})-(\d{4})', pdf_file.name)
-            if not date_match:
-                continue
-            
-            date_str = f"{date_match.group(1)}/{date_match.group(2)}/{date_match.group(3)}"
-            
-            # Check attendance
-            cursor.execute("SELECT reason FROM attendance WHERE date = ?", (date_str,))
-            attendance = cursor.fetchone()
-            if attendance and attendance[0] in ['Day Off', 'Holiday', 'Sick', 'Annual Leave']:
-                skipped_days.append({'date': date_str, 'reason': attendance[0]})
-                continue
-            
-            jobs = parser.parse_pdf(str(pdf_file))
-            if not jobs:
-                continue
-            
-            for job in jobs:
-                job_number = job.get('job_number')
-                date = job.get('date')
-                customer = job.get('customer', '')
-                activity = job.get('activity', '')
-                
-                # Skip invalid jobs, PP Audit
-                if not job_number or not date or 'PP Audit' in customer:
-                    continue
-                
-                # Skip DNCO jobs
-                if 'DNCO' in activity.upper() or 'DID NOT CARRY OUT' in activity.upper():
-                    skipped_dnco += 1
-                    continue
-                
-                # Check if job exists
-                cursor.execute("SELECT id FROM run_sheet_jobs WHERE date = ? AND job_number = ?", (date, job_number))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    existing_count += 1
-                else:
-                    # This is a new job - add to preview list
-                    new_jobs.append({
-                        'date': date,
-                        'job_number': job_number,
-                        'customer': customer,
-                        'activity': activity,
-                        'job_address': job.get('job_address', ''),
-                        'postcode': job.get('postcode', ''),
-                        'source_file': pdf_file.name
-                    })
-        
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'new_jobs': new_jobs,
-            'existing_jobs_count': existing_count,
-            'skipped_dnco': skipped_dnco,
-            'skipped_days': skipped_days
-        })
-        
+
+        token = create_reimport_preview(year, month, files)
+        thread = threading.Thread(target=run_reimport_preview, args=(token, files, REIMPORT_WORKERS))
+        thread.daemon = True
+        thread.start()
+
+        return jsonify({'success': True, 'token': token, 'status': 'queued', 'total_files': len(files)}), 202
+
+    except Exception as e:
+        import traceback
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@runsheet_testing_bp.route('/reimport-preview/<token>', methods=['GET'])
+def reimport_preview_status(token):
+    """Progress of a reimport preview, with the new jobs once it has completed."""
+    preview = get_reimport_preview(token)
+    if preview is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired preview'}), 404
+    return jsonify({'success': True, **preview})
+
+
+@runsheet_testing_bp.route('/reimport', methods=['POST'])
+def reimport_month():
+    """Apply a completed preview: update existing jobs and add the selected new jobs."""
+    try:
+        data = request.json
+        token = data.get('token')
+        selected_jobs = data.get('selected_jobs', [])  # List of job_numbers to add
+
+        if not token:
+            return jsonify({'error': 'token is required - run the preview first'}), 400
+
+        # Claim the preview, so it is applied at most once
+        preview, parsed_files = job_store.claim(REIMPORT_PREVIEW_KIND, token)
+        if preview is None:
+            return jsonify({'error': 'Unknown or expired preview - run the preview again'}), 404
+        if preview['status'] != 'completed':
+            return jsonify({'error': f"Preview is {preview['status']}"}), 409
+
+        result = apply_reimport(parsed_files, set(selected_jobs))
+
+        return jsonify({'success': True, **result, 'skipped_days': preview['skipped_days']})
+
     except Exception as e:
         import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
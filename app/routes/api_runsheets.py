@@ -10,6 +10,7 @@ from pathlib import Path
 from flask import Blueprint, jsonify, request
 
 from ..models.runsheet import RunsheetModel
+from ..services import report_jobs
 from ..services.runsheet_service import RunsheetService
 
 logger = logging.getLogger(__name__)
@@ -486,52 +487,53 @@ def api_discrepancy_report():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _render_discrepancy(params):
+    from ..utils.pdf_generator import DiscrepancyPDFGenerator
+
+    year, month = params.get('year', ''), params.get('month', '')
+    
+    # Get the discrepancy data
+    report_data = RunsheetModel.get_discrepancy_report(
+        limit=1000,  # Get comprehensive data for PDF
+        year=year if year else None,
+        month=month if month else None
+    )
+    
+    # Prepare filters for PDF header
+    filters = {}
+    if year:
+        filters['year'] = year
+    if month:
+        filters['month'] = month
+    
+    return DiscrepancyPDFGenerator().generate_discrepancy_report(report_data, filters)
+
+
+def _discrepancy_filename(params):
+    from datetime import datetime
+
+    filename = 'discrepancy_report'
+    if params.get('year'):
+        filename += f"_{params['year']}"
+    if params.get('month'):
+        filename += f"_{params['month']}"
+    return filename + f'_{datetime.now().strftime("%Y%m%d")}.pdf'
+
+
+report_jobs.register(
+    'discrepancy', ('payslips', 'job_items', 'run_sheet_jobs'), _render_discrepancy, _discrepancy_filename,
+)
+
+
 @runsheets_bp.route('/discrepancy-pdf', methods=['POST'])
 def api_discrepancy_pdf():
     """Generate PDF discrepancy report."""
     try:
-        from flask import Response
-        from datetime import datetime
-        from ..models.runsheet import RunsheetModel
-        from ..utils.pdf_generator import DiscrepancyPDFGenerator
-        
         # Get filter parameters from request
         data = request.get_json() or {}
-        year = data.get('year', '')
-        month = data.get('month', '')
-        
-        # Get the discrepancy data
-        report_data = RunsheetModel.get_discrepancy_report(
-            limit=1000,  # Get comprehensive data for PDF
-            year=year if year else None,
-            month=month if month else None
-        )
+        params = {'year': data.get('year', ''), 'month': data.get('month', '')}
         
-        # Prepare filters for PDF header
-        filters = {}
-        if year:
-            filters['year'] = year
-        if month:
-            filters['month'] = month
-        
-        # Generate the PDF
-        pdf_generator = DiscrepancyPDFGenerator()
-        pdf_data = pdf_generator.generate_discrepancy_report(report_data, filters)
-        
-        # Generate filename with filters
-        filename = 'discrepancy_report'
-        if year:
-            filename += f'_{year}'
-        if month:
-            filename += f'_{month}'
-        filename += f'_{datetime.now().strftime("%Y%m%d")}.pdf'
-        
-        # Return PDF as download
-        return Response(
-            pdf_data,
-            mimetype='application/pdf',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return report_jobs.send_report('discrepancy', params)
             
     except Exception as e:
         import traceback
@@ -1,45 +1,56 @@
 """
 Search API routes blueprint.
 Extracted from web_app.py to improve code organization.
+
+Both endpoints query the ``job_search`` full-text index (see
+``app/services/job_search_index.py``) instead of scanning the job tables
+with ``LIKE '%q%'``.
 """
 
 from flask import Blueprint, jsonify, request
 from ..database import get_db_connection
+from ..services.job_search_index import (
+    SOURCE_PAYSLIP, SOURCE_RUNSHEET, search_jobs,
+)
 
 search_bp = Blueprint('search_api', __name__, url_prefix='/api')
 
 
 @search_bp.route('/search')
 def api_search():
-    """Search jobs."""
+    """Search jobs.
+
+    Query params:
+        q: Search text. Each word is matched as a prefix against job
+            number, customer, activity, address and postcode.
+        source: ``payslip`` (default), ``runsheet`` or ``all``.
+        page / per_page: Pagination (per_page defaults to 50).
+    """
     try:
         query = request.args.get('q', '')
-        
+
         if not query:
             return jsonify([])
-        
+
+        source = request.args.get('source', SOURCE_PAYSLIP)
+        if source == 'all':
+            source = None
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
+
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    p.tax_year,
-                    p.week_number,
-                    ji.job_number,
-                    ji.client,
-                    ji.location,
-                    ji.job_type,
-                    ji.amount,
-                    ji.date,
-                    ji.postcode
-                FROM job_items ji
-                JOIN payslips p ON ji.payslip_id = p.id
-                WHERE ji.client LIKE ? OR ji.location LIKE ? OR ji.job_type LIKE ? OR ji.job_number LIKE ?
-                ORDER BY p.tax_year DESC, p.week_number DESC
-                LIMIT 50
-            """, (f'%{query}%', f'%{query}%', f'%{query}%', f'%{query}%'))
-            
-            rows = [dict(row) for row in cursor.fetchall()]
-            return jsonify(rows)
+            result = search_jobs(conn, query, source=source, page=page, per_page=per_page)
+
+        return jsonify({
+            'success': True,
+            'data': result['results'],
+            'page': result['page'],
+            'per_page': result['per_page'],
+            'total': result['total'],
+            'has_more': result['has_more'],
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -54,61 +65,53 @@ def api_search_job(job_number):
             'runsheets': [],
             'payslips': []
         }
-        
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 100, type=int)
+
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
             # Search in run sheets
-            cursor.execute("""
-                SELECT date, customer, job_address, job_number, activity
-                FROM run_sheet_jobs
-                WHERE job_number = ? OR job_number LIKE ? OR CAST(job_number AS TEXT) = ?
-                ORDER BY date DESC
-            """, (job_number, f'%{job_number}%', job_number))
-            
-            runsheets = cursor.fetchall()
+            runsheets = search_jobs(
+                conn, job_number, source=SOURCE_RUNSHEET, field='job_number',
+                page=page, per_page=per_page,
+            )['results']
             if runsheets:
                 results['found'] = True
                 results['runsheets'] = [
                     {
-                        'date': row[0],
-                        'customer': row[1],
-                        'address': row[2],
-                        'job_number': row[3],
-                        'status': row[4]  # activity
+                        'date': row['date'],
+                        'customer': row['customer'],
+                        'address': row['address'],
+                        'job_number': row['job_number'],
+                        'status': row['activity'],  # activity
+                        'snippet': row['snippet'],
                     }
                     for row in runsheets
                 ]
-            
+
             # Search in payslip jobs
-            cursor.execute("""
-                SELECT ji.job_number, ji.client, ji.location, ji.job_type, ji.amount, 
-                       ji.date, ji.postcode, p.tax_year, p.week_number
-                FROM job_items ji
-                JOIN payslips p ON ji.payslip_id = p.id
-                WHERE ji.job_number = ? OR ji.job_number LIKE ? OR CAST(ji.job_number AS TEXT) = ?
-                ORDER BY p.tax_year DESC, p.week_number DESC
-            """, (job_number, f'%{job_number}%', job_number))
-            
-            payslips = cursor.fetchall()
+            payslips = search_jobs(
+                conn, job_number, source=SOURCE_PAYSLIP, field='job_number',
+                page=page, per_page=per_page,
+            )['results']
             if payslips:
                 results['found'] = True
                 results['payslips'] = [
                     {
-                        'job_number': row[0],
-                        'client': row[1],
-                        'location': row[2],
-                        'job_type': row[3],
-                        'amount': row[4],
-                        'date': row[5],
-                        'postcode': row[6],
-                        'tax_year': row[7],
-                        'week_number': row[8],
-                        'description': f"{row[1]} | {row[2]} | {row[3]} | £{row[4]} | {row[5]}"  # Clean description
+                        'job_number': row['job_number'],
+                        'client': row['client'],
+                        'location': row['location'],
+                        'job_type': row['job_type'],
+                        'amount': row['amount'],
+                        'date': row['date'],
+                        'postcode': row['postcode'],
+                        'tax_year': row['tax_year'],
+                        'week_number': row['week_number'],
+                        'description': f"{row['client']} | {row['location']} | {row['job_type']} | £{row['amount']} | {row['date']}",  # Clean description
+                        'snippet': row['snippet'],
                     }
                     for row in payslips
                 ]
-            
+
             return jsonify(results)
     except Exception as e:
         return jsonify({'error': str(e), 'found': False}), 500
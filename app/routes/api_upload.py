@@ -3,12 +3,16 @@ File upload and manual processing API routes.
 Handles drag-and-drop uploads, local file processing, and hybrid sync.
 """
 
+import json
 import logging
 import os
 import shutil
 import subprocess
 import sys
-from datetime import datetime
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import magic
@@ -17,6 +21,7 @@ from werkzeug.utils import secure_filename
 
 from ..utils.logging_utils import log_settings_action
 from ..database import get_db_connection
+from ..services import file_catalogue, job_store
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +30,16 @@ upload_bp = Blueprint('upload_api', __name__, url_prefix='/api/upload')
 ALLOWED_EXTENSIONS = {'.pdf'}
 ALLOWED_MIMES = {'application/pdf', 'application/octet-stream', 'text/csv', 'text/plain'}
 
+PAYSLIP_SCRIPT = 'scripts/production/extract_payslips.py'
+RUNSHEET_SCRIPT = 'scripts/production/import_run_sheets.py'
+
+# Runsheet PDFs are parsed in this many importer worker processes per batch
+BATCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Upload jobs kept for polling, in the shared job store (oldest dropped first)
+UPLOAD_JOB_KIND = 'upload'
+MAX_UPLOAD_JOBS = 50
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and \
@@ -140,13 +155,16 @@ def api_upload_files():
         
         # Auto-process if requested (run in background to avoid timeout)
         processing_results = []
+        job_id = None
         if auto_process and uploaded_files:
             try:
-                # Start processing in background thread to avoid gateway timeout
-                import threading
+                # Import the whole upload as one batch; the client polls
+                # /api/upload/jobs/<job_id> for per-file results.
+                job_id = create_upload_job(uploaded_files, file_type)
+                app = current_app._get_current_object()
                 thread = threading.Thread(
                     target=process_uploaded_files_background,
-                    args=(uploaded_files, file_type, overwrite)
+                    args=(uploaded_files, file_type, overwrite, job_id, app)
                 )
                 thread.daemon = True
                 thread.start()
@@ -162,6 +180,7 @@ def api_upload_files():
             'success': True,
             'uploaded_files': uploaded_files,
             'processing_results': processing_results,
+            'job_id': job_id,
             'errors': errors,
             'message': f'Uploaded {len(uploaded_files)} files successfully'
         })
@@ -171,6 +190,14 @@ def api_upload_files():
         log_settings_action('FILE_UPLOAD', f'Upload failed: {str(e)}', 'ERROR')
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+def api_upload_job(job_id):
+    """Progress and per-file results of a background upload batch."""
+    job = get_upload_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown upload job'}), 404
+    return jsonify({'success': True, 'job': job})
+
 @upload_bp.route('/process-local', methods=['POST'])
 def process_local_files():
     """Process files already in local directories."""
@@ -266,32 +293,33 @@ def hybrid_sync():
 
 @upload_bp.route('/scan-directories', methods=['GET'])
 def scan_directories():
-    """Scan for unprocessed files in various directories."""
+    """List PDFs in the document folders from the file catalogue.
+
+    Each folder gets a cheap rescan first (only directories whose mtime
+    changed are listed); ``?full=true`` re-stats every file.
+    """
     try:
-        from app.config import Config
-        directories_to_scan = [
-            Path(Config.PAYSLIPS_DIR),
-            Path(Config.RUNSHEETS_DIR), 
-            Path('data/uploads'),
-            Path('data/processing/manual')
-        ]
-        
+        full = request.args.get('full', 'false').lower() == 'true'
         found_files = {}
         
-        for directory in directories_to_scan:
-            if directory.exists():
-                pdf_files = list(directory.glob('**/*.pdf'))
-                if pdf_files:
-                    found_files[str(directory)] = [
-                        {
-                            'name': f.name,
-                            'path': str(f),
-                            'size': f.stat().st_size,
-                            'modified': f.stat().st_mtime,
-                            'relative_path': str(f.relative_to(directory))
-                        }
-                        for f in pdf_files
-                    ]
+        for directory, root_type in file_catalogue.default_roots():
+            file_catalogue.refresh(directory, root_type, full=full)
+            rows = file_catalogue.list_files(root=directory, extensions=['.pdf'])
+            if rows:
+                root = os.path.abspath(directory)
+                found_files[str(Path(directory))] = [
+                    {
+                        'name': row['name'],
+                        'path': row['path'],
+                        'size': row['size'],
+                        'modified': row['mtime'],
+                        'relative_path': os.path.relpath(row['path'], root),
+                        'type': row['file_type'],
+                        'date': row['file_date'],
+                        'import_status': row['import_status'],
+                    }
+                    for row in rows
+                ]
         
         return jsonify({
             'success': True,
@@ -304,39 +332,239 @@ def scan_directories():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Helper functions
-def process_uploaded_files(uploaded_files, file_type, overwrite=False):
-    """Process uploaded files based on type."""
-    results = []
-    
-    for file_info in uploaded_files:
-        file_path = file_info['path']
-        
-        if file_type == 'runsheets':
-            result = process_single_runsheet(file_path, overwrite)
-        elif file_type == 'payslips':
-            result = process_single_payslip(file_path)
-        else:
-            # Auto-detect and process
-            result = auto_detect_and_process(file_path, overwrite)
-        
-        results.append({
-            'file': file_info['original_name'],
-            'result': result
-        })
-    
-    return results
-
-
-def process_uploaded_files_background(uploaded_files, file_type, overwrite=False):
+def process_uploaded_files_background(uploaded_files, file_type, overwrite=False, job_id=None, app=None):
     """Process uploaded files in background to avoid timeout."""
+    if app is not None:
+        with app.app_context():
+            return process_uploaded_files_background(uploaded_files, file_type, overwrite, job_id)
     try:
         log_settings_action('FILE_UPLOAD', f'Background processing started for {len(uploaded_files)} files (overwrite={overwrite})')
-        results = process_uploaded_files(uploaded_files, file_type, overwrite)
+        _update_upload_job(job_id, status='running', started_at=datetime.now().isoformat())
+        results = process_uploaded_files_batch(uploaded_files, file_type, overwrite, job_id)
         
         success_count = sum(1 for r in results if r['result'].get('success'))
         log_settings_action('FILE_UPLOAD', f'Background processing complete: {success_count}/{len(results)} successful')
+        _update_upload_job(job_id, status='completed', results=results,
+                           succeeded=success_count, failed=len(results) - success_count,
+                           finished_at=datetime.now().isoformat())
+
+        if success_count:
+            # Let the sync scheduler re-check now (e.g. tomorrow's runsheet
+            # uploaded by hand ends the evening's Gmail polling).
+            from ..services.periodic_sync import periodic_sync_service
+            periodic_sync_service.notify_new_data('upload')
     except Exception as e:
         log_settings_action('FILE_UPLOAD', f'Background processing failed: {str(e)}', 'ERROR')
+        _update_upload_job(job_id, status='failed', error=str(e),
+                           finished_at=datetime.now().isoformat())
+
+
+# ---------------------------------------------------------------------------
+# Batch processing
+# ---------------------------------------------------------------------------
+
+def create_upload_job(uploaded_files, file_type):
+    """Register a background upload batch and return its job ID."""
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        'job_id': job_id,
+        'status': 'queued',
+        'file_type': file_type,
+        'total': len(uploaded_files),
+        'processed': 0,
+        'succeeded': 0,
+        'failed': 0,
+        'created_at': datetime.now().isoformat(),
+        'started_at': None,
+        'finished_at': None,
+        'error': None,
+        'results': [],
+    }
+    job_store.create(UPLOAD_JOB_KIND, job_id, job, keep=MAX_UPLOAD_JOBS)
+    return job_id
+
+
+def get_upload_job(job_id):
+    """Snapshot of an upload job, or None if unknown (or long finished)."""
+    return job_store.get(UPLOAD_JOB_KIND, job_id)
+
+
+def _update_upload_job(job_id, **changes):
+    job_store.update(UPLOAD_JOB_KIND, job_id, **changes)
+
+
+def _detect_upload_type(file_path):
+    """'payslip', 'runsheet' or None, by the same filename rules as auto-detect."""
+    filename = Path(file_path).name.lower()
+    if 'payslip' in filename or 'saser' in filename:
+        return 'payslip'
+    if 'runsheet' in filename or 'run' in filename:
+        return 'runsheet'
+    return None
+
+
+def process_uploaded_files_batch(uploaded_files, file_type, overwrite=False, job_id=None):
+    """Import uploaded files with one importer run per file type.
+
+    Runsheets go through a single ``import_run_sheets.py --files`` run
+    and payslips through a single ``extract_payslips.py --files`` run
+    (both parsing in ``BATCH_WORKERS`` processes), instead of one
+    interpreter per file. Imported runsheet jobs are marked as manually uploaded in one
+    transaction. Files of unknown type are tried as payslips first, then
+    as runsheets. Returns ``[{'file': original_name, 'result': {...}}]``
+    in upload order.
+    """
+    if file_type == 'runsheets':
+        kinds = {f['path']: 'runsheet' for f in uploaded_files}
+    elif file_type == 'payslips':
+        kinds = {f['path']: 'payslip' for f in uploaded_files}
+    else:
+        kinds = {f['path']: _detect_upload_type(f['path']) for f in uploaded_files}
+
+    results = {}
+    payslips = [p for p, kind in kinds.items() if kind in ('payslip', None)]
+    if payslips:
+        results.update(_import_payslip_batch(payslips))
+        _update_upload_job(job_id, processed=sum(1 for p in payslips if kinds[p] == 'payslip'))
+
+    runsheets = [p for p, kind in kinds.items()
+                 if kind == 'runsheet' or (kind is None and not results[p]['success'])]
+    if runsheets:
+        results.update(_import_runsheet_batch(runsheets, overwrite))
+    _update_upload_job(job_id, processed=len(uploaded_files))
+
+    for path, kind in kinds.items():
+        if kind is None and not results[path]['success']:
+            results[path] = {'success': False, 'error': 'Could not determine file type'}
+    _catalogue_results(results)
+
+    return [{'file': f['original_name'], 'result': results[f['path']]} for f in uploaded_files]
+
+
+def _catalogue_results(results):
+    """Record the uploaded files and their import outcome in the file catalogue."""
+    try:
+        with get_db_connection() as conn:
+            for path, result in results.items():
+                file_catalogue.record_file(path, conn=conn)
+                status = file_catalogue.STATUS_IMPORTED if result['success'] else file_catalogue.STATUS_FAILED
+                file_catalogue.mark_status([path], status, result.get('error'), conn=conn)
+    except Exception as e:
+        logger.warning(f'Could not update file catalogue: {e}')
+
+
+def _run_batch_import(script, file_paths, extra_args=()):
+    """Run ``script --files ...`` once and return its per-file results by path.
+
+    The importer writes its results to a temp JSON file (stdout is full of
+    progress output). Files missing from the results are reported with the
+    importer's stderr.
+    """
+    fd, results_path = tempfile.mkstemp(prefix='upload_batch_', suffix='.json')
+    os.close(fd)
+    error = None
+    file_results = []
+    try:
+        process = subprocess.run(
+            [sys.executable, script, '--files', *file_paths, '--results', results_path, *extra_args],
+            capture_output=True,
+            text=True,
+            timeout=60 + 30 * len(file_paths)
+        )
+        try:
+            with open(results_path) as f:
+                file_results = json.load(f)
+        except (OSError, ValueError):
+            file_results = []
+        error = (process.stderr or '').strip() or f'{Path(script).name} exited with code {process.returncode}'
+    except subprocess.TimeoutExpired:
+        error = f'{Path(script).name} timed out'
+    finally:
+        try:
+            os.unlink(results_path)
+        except OSError:
+            pass
+
+    by_path = {r.get('file'): r for r in file_results}
+    return {
+        path: by_path.get(path) or {'file': path, 'status': 'error', 'error': error}
+        for path in file_paths
+    }
+
+
+def _import_payslip_batch(file_paths):
+    results = {}
+    for path, r in _run_batch_import(PAYSLIP_SCRIPT, file_paths, ('--workers', str(BATCH_WORKERS))).items():
+        results[path] = {
+            'success': r.get('status') == 'imported',
+            'status': r.get('status'),
+            'payslip_id': r.get('payslip_id'),
+            'error': r.get('error'),
+        }
+    return results
+
+
+def _import_runsheet_batch(file_paths, overwrite=False):
+    # CURRENT_TIMESTAMP (imported_at) is UTC; allow for clock granularity.
+    started = (datetime.now(timezone.utc) - timedelta(seconds=5)).strftime('%Y-%m-%d %H:%M:%S')
+    extra_args = ['--workers', str(BATCH_WORKERS)]
+    if overwrite:
+        extra_args.append('--overwrite')
+
+    results = {}
+    imported = []
+    for path, r in _run_batch_import(RUNSHEET_SCRIPT, file_paths, extra_args).items():
+        status = r.get('status')
+        error = r.get('error')
+        if status == 'already_imported':
+            error = 'Already imported (upload with overwrite to replace)'
+        elif status == 'no_jobs':
+            error = 'No jobs imported from this file'
+        results[path] = {
+            'success': status == 'imported',
+            'status': status,
+            'jobs': r.get('jobs', 0),
+            'dates': r.get('dates', []),
+            'error': error,
+        }
+        if status == 'imported':
+            imported.append(path)
+
+    if imported:
+        try:
+            marked = mark_manual_uploads([Path(p).name for p in imported], started)
+            log_settings_action(
+                'MANUAL_UPLOAD',
+                f'Marked {marked} jobs as manually uploaded from {len(imported)} files'
+            )
+        except Exception as e:
+            log_settings_action(
+                'MANUAL_UPLOAD',
+                f'Failed to mark jobs as manually uploaded: {str(e)}',
+                'ERROR'
+            )
+
+    for path in imported:
+        dates = results[path]['dates']
+        output_lines = []
+        results[path]['nas_path'] = copy_runsheet_to_nas(path, dates[0] if dates else None, output_lines)
+        results[path]['output'] = '\n'.join(output_lines)
+    return results
+
+
+def mark_manual_uploads(source_files, since):
+    """Flag jobs imported from ``source_files`` since ``since`` (UTC) as
+    manually uploaded, in one transaction. Returns the rows updated."""
+    placeholders = ', '.join('?' * len(source_files))
+    with get_db_connection() as conn:
+        cursor = conn.execute(f"""
+            UPDATE run_sheet_jobs
+            SET manually_uploaded = 1
+            WHERE source_file IN ({placeholders})
+            AND imported_at >= ?
+        """, (*source_files, since))
+        conn.commit()
+        return cursor.rowcount
 
 
 def process_single_payslip(file_path):
@@ -363,8 +591,6 @@ def process_single_runsheet(file_path, overwrite=False):
     `<Config.RUNSHEETS_DIR>/<YYYY>/<MM-Month>/DH_DD-MM-YYYY.pdf`
     using the runsheet date already extracted by the importer.
     """
-    from app.config import Config
-
     cmd = [sys.executable, 'scripts/production/import_run_sheets.py', '--file', file_path]
     if overwrite:
         cmd.append('--overwrite')
@@ -420,7 +646,25 @@ def process_single_runsheet(file_path, overwrite=False):
             'ERROR'
         )
 
-    # Copy file to NAS canonical path: <RUNSHEETS_DIR>/<YYYY>/<MM-Month>/DH_DD-MM-YYYY.pdf
+    copy_runsheet_to_nas(file_path, runsheet_date, output_lines)
+
+    return {
+        'success': True,
+        'output': '\n'.join(output_lines),
+        'error': None
+    }
+
+def copy_runsheet_to_nas(file_path, runsheet_date, output_lines):
+    """Copy an uploaded runsheet to <RUNSHEETS_DIR>/<YYYY>/<MM-Month>/DH_DD-MM-YYYY.pdf.
+
+    ``runsheet_date`` is DD/MM/YYYY. An existing canonical file is left
+    alone. Progress lines are appended to ``output_lines``; returns the
+    canonical path, or None if nothing was copied.
+    """
+    from app.config import Config
+
+    source_filename = Path(file_path).name
+    target_path = None
     if runsheet_date:
         try:
             dt = datetime.strptime(runsheet_date, '%d/%m/%Y')
@@ -455,12 +699,7 @@ def process_single_runsheet(file_path, overwrite=False):
             'WARNING'
         )
         output_lines.append('WARNING: No runsheet date found in DB; file not copied to NAS')
-
-    return {
-        'success': True,
-        'output': '\n'.join(output_lines),
-        'error': None
-    }
+    return str(target_path) if target_path and target_path.exists() else None
 
 def auto_detect_and_process(file_path, overwrite=False):
     """Auto-detect file type and process accordingly."""
@@ -0,0 +1,195 @@
+"""
+Canonical customer names on run sheet jobs and payslip job items.
+
+``run_sheet_jobs`` and ``job_items`` carry a ``canonical_customer``
+column: the customer's mapped name from ``customer_mappings`` (migration
+018), or the raw name when it has no mapping. Reports group and filter
+on it, so mapped customers merge in SQL and the GROUP BY can use an
+index instead of the browser re-keying raw names.
+
+The column is kept current by SQLite triggers on both sides:
+
+- inserting a job, or changing its customer, resolves that row;
+- adding, changing or deleting a mapping rewrites the rows carrying the
+  original name, which the index on the customer column keeps cheap.
+
+Triggers rather than Python hooks cover every writer, including the
+importer scripts running in their own process. ``job_items`` calls its
+customer column ``client`` on importer-created databases and ``customer``
+on the migration-001 layout, so the column, indexes and trigger bodies
+are generated from the live schema by ``ensure_canonical_customers``.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+# Table -> candidate customer columns, in order of preference.
+_SOURCES = {
+    'run_sheet_jobs': ('customer',),
+    'job_items': ('client', 'customer'),
+}
+
+
+def _table_columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def source_columns(conn) -> dict:
+    """Return ``{table: customer column}`` for the job tables that exist."""
+    sources = {}
+    for table, candidates in _SOURCES.items():
+        columns = _table_columns(conn, table)
+        for column in candidates:
+            if column in columns:
+                sources[table] = column
+                break
+    return sources
+
+
+def _resolved(value: str) -> str:
+    """SQL for the canonical name of the customer name ``value``."""
+    return (
+        f'COALESCE((SELECT mapped_customer FROM customer_mappings '
+        f'WHERE original_customer = {value}), {value})'
+    )
+
+
+def _prepare_columns(conn, sources: dict) -> bool:
+    """Add the column and indexes where missing. Returns True if a column was added."""
+    added = False
+    for table, source in sources.items():
+        if 'canonical_customer' not in _table_columns(conn, table):
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN canonical_customer TEXT')
+            added = True
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{table}_canonical_customer '
+            f'ON {table}(canonical_customer)'
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{source} ON {table}({source})')
+    conn.commit()
+    return added
+
+
+def _trigger_definitions(sources: dict) -> dict:
+    """Return ``{trigger_name: CREATE TRIGGER sql}`` for ``sources``."""
+    triggers = {}
+    for table, source in sources.items():
+        resolve_row = (
+            f'UPDATE {table} SET canonical_customer = {_resolved(f"NEW.{source}")} '
+            f'WHERE rowid = NEW.rowid;'
+        )
+        triggers[f'canonical_customer_{table}_ai'] = (
+            f'CREATE TRIGGER canonical_customer_{table}_ai AFTER INSERT ON {table} '
+            f'WHEN NEW.{source} IS NOT NULL BEGIN {resolve_row} END'
+        )
+        triggers[f'canonical_customer_{table}_au'] = (
+            f'CREATE TRIGGER canonical_customer_{table}_au AFTER UPDATE OF {source} ON {table} '
+            f'WHEN OLD.{source} IS NOT NEW.{source} BEGIN {resolve_row} END'
+        )
+
+    def mapped(row):
+        return ' '.join(
+            f'UPDATE {table} SET canonical_customer = {row}.mapped_customer '
+            f'WHERE {source} = {row}.original_customer;'
+            for table, source in sources.items()
+        )
+
+    def unmapped(row):
+        return ' '.join(
+            f'UPDATE {table} SET canonical_customer = {source} '
+            f'WHERE {source} = {row}.original_customer;'
+            for table, source in sources.items()
+        )
+
+    if sources:
+        triggers['canonical_customer_mappings_ai'] = (
+            f'CREATE TRIGGER canonical_customer_mappings_ai AFTER INSERT ON customer_mappings '
+            f'BEGIN {mapped("NEW")} END'
+        )
+        triggers['canonical_customer_mappings_ad'] = (
+            f'CREATE TRIGGER canonical_customer_mappings_ad AFTER DELETE ON customer_mappings '
+            f'BEGIN {unmapped("OLD")} END'
+        )
+        triggers['canonical_customer_mappings_au'] = (
+            f'CREATE TRIGGER canonical_customer_mappings_au '
+            f'AFTER UPDATE OF original_customer, mapped_customer ON customer_mappings '
+            f'BEGIN {unmapped("OLD")} {mapped("NEW")} END'
+        )
+    return triggers
+
+
+def install_triggers(conn, sources: dict) -> bool:
+    """Create or replace the triggers. Returns True if any changed."""
+    existing = {
+        row[0]: row[1] for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE 'canonical_customer_%'"
+        )
+    }
+    wanted = _trigger_definitions(sources)
+    changed = False
+    for name in existing.keys() - wanted.keys():
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        changed = True
+    for name, sql in wanted.items():
+        if existing.get(name) == sql:
+            continue
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(sql)
+        changed = True
+    conn.commit()
+    return changed
+
+
+def rebuild(conn, sources: dict) -> int:
+    """Re-resolve every row whose canonical name is stale. Returns the rows changed."""
+    changed = 0
+    for table, source in sources.items():
+        resolved = _resolved(f'{table}.{source}')
+        cursor = conn.execute(
+            f'UPDATE {table} SET canonical_customer = {resolved} '
+            f'WHERE canonical_customer IS NOT {resolved}'
+        )
+        changed += cursor.rowcount
+    conn.commit()
+    logger.info(f'Canonical customer names rebuilt: {changed} rows updated')
+    return changed
+
+
+def _has_unresolved(conn, sources: dict) -> bool:
+    """True if some row with a customer has no canonical name yet."""
+    return any(
+        conn.execute(
+            f'SELECT 1 FROM {table} WHERE canonical_customer IS NULL '
+            f'AND {source} IS NOT NULL LIMIT 1'
+        ).fetchone()
+        for table, source in sources.items()
+    )
+
+
+def ensure_canonical_customers() -> bool:
+    """Add the columns, install the triggers and back-fill if needed.
+
+    Called once from ``create_app`` after migrations.
+    """
+    try:
+        with get_db_connection() as conn:
+            if not _table_columns(conn, 'customer_mappings'):
+                logger.warning('customer_mappings table missing - run migrations')
+                return False
+            sources = source_columns(conn)
+            added = _prepare_columns(conn, sources)
+            changed = install_triggers(conn, sources)
+            if added or changed or _has_unresolved(conn, sources):
+                rebuild(conn, sources)
+        return True
+    except sqlite3.Error as e:
+        logger.error(f'Failed to prepare canonical customer names: {e}', exc_info=True)
+        return False
@@ -0,0 +1,186 @@
+"""
+PDF layout for the custom reports (/api/data/reports/custom/pdf).
+
+The route gathers the report data; :func:`build_custom_report_pdf` lays
+it out with the shared engine (services/pdf_engine.py) and returns the
+rendered PDF as a spooled file.
+"""
+
+from datetime import datetime
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import inch
+from reportlab.platypus import Table, Paragraph, Spacer
+
+from . import pdf_engine
+
+REPORT_TITLES = {
+    'dnco': 'DNCO Report',
+    'paypoint': 'Paypoint Stock Report',
+}
+
+MONTH_NAMES = ['', 'January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+DNCO_TABLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), '#343a40'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), '#f5f5f5'),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('TOPPADDING', (0, 0), (-1, 0), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
+    ('TOPPADDING', (0, 1), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
+    ('BACKGROUND', (0, 1), (-1, -1), '#ffffff'),
+    ('GRID', (0, 0), (-1, -1), 0.5, '#808080'),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+)
+
+PAYPOINT_TABLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), '#343a40'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), '#f5f5f5'),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('BACKGROUND', (0, 1), (-1, -1), '#ffffff'),
+    ('GRID', (0, 0), (-1, -1), 0.5, '#808080'),
+)
+
+
+def _summary_commands(left, right, right_text='#000000'):
+    return (
+        ('BACKGROUND', (0, 0), (0, 0), left),
+        ('BACKGROUND', (1, 0), (1, 0), right),
+        ('TEXTCOLOR', (0, 0), (0, 0), '#000000'),
+        ('TEXTCOLOR', (1, 0), (1, 0), right_text),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    )
+
+
+DNCO_SUMMARY = _summary_commands('#d1ecf1', '#fff3cd', right_text='#856404')
+PAYPOINT_SUMMARY = _summary_commands('#d1ecf1', '#d4edda')
+
+
+def period_text(year='', week='', month=''):
+    """The report period as shown in the header."""
+    if year and week:
+        return f"Week {week}, {year}"
+    if year and month:
+        return f"{MONTH_NAMES[int(month)]} {year}"
+    if year:
+        return f"Year {year}"
+    return "All Time"
+
+
+def _summary_row(left, right, commands):
+    normal = pdf_engine.sample_styles()['Normal']
+    table = Table([[Paragraph(left, normal), Paragraph(right, normal)]], colWidths=[4*inch, 4*inch])
+    table.setStyle(pdf_engine.table_style(commands))
+    return table
+
+
+def _display_date(value):
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%d/%m/%Y')
+        except (ValueError, AttributeError):
+            pass
+    return value or ''
+
+
+def _dnco_story(report_data):
+    summary = report_data['summary']
+    story = [
+        _summary_row(
+            f'<b>Summary:</b> Estimated Loss: £{summary["estimated_loss"]:,.2f} | Total DNCO: {summary["total_dnco"]}',
+            '<b>⚠ Jobs Not Completed</b> - These jobs represent potential lost earnings',
+            DNCO_SUMMARY,
+        ),
+        Spacer(1, 8),
+    ]
+
+    rows = []
+    for job in report_data['dnco_jobs']:
+        customer = job.get('customer') or ''
+        address = job.get('address') or ''
+        rows.append([
+            job.get('date', ''),
+            job.get('job', ''),
+            customer[:30],
+            address[:40],
+            f"£{job.get('amount', 0):.2f}",
+        ])
+    story.extend(pdf_engine.data_tables(
+        ['Date', 'Job Number', 'Customer', 'Address', 'Est. Loss'], rows,
+        [0.9*inch, 1.1*inch, 2*inch, 3*inch, 0.9*inch], DNCO_TABLE,
+    ))
+    return story
+
+
+def _paypoint_story(report_data):
+    summary = report_data['summary']
+    heading = pdf_engine.sample_styles()['Heading2']
+    story = [
+        _summary_row(
+            f'<b>Stock Summary:</b> Total: {summary["total_stock"]} | Available: {summary["available_stock"]}',
+            f'<b>Activity:</b> Deployments: {summary["deployments_count"]} | Returns: {summary["returns_count"]}',
+            PAYPOINT_SUMMARY,
+        ),
+        Spacer(1, 8),
+    ]
+
+    if report_data.get('deployments'):
+        rows = [[
+            _display_date(deployment.get('deployment_date', '')),
+            deployment.get('job_number', ''),
+            (deployment.get('customer') or '')[:20],
+            deployment.get('paypoint_type', ''),
+            deployment.get('serial_ptid', ''),
+            deployment.get('trace_stock', ''),
+            deployment.get('status', ''),
+        ] for deployment in report_data['deployments']]
+        story.append(Paragraph('<b>Recent Deployments</b>', heading))
+        story.append(Spacer(1, 4))
+        story.extend(pdf_engine.data_tables(
+            ['Date', 'Job Number', 'Customer', 'Device Type', 'Serial/TID', 'Trace/Stock', 'Status'], rows,
+            [0.7*inch, 0.9*inch, 1.5*inch, 0.9*inch, 1*inch, 1*inch, 0.7*inch], PAYPOINT_TABLE,
+        ))
+        story.append(Spacer(1, 8))
+
+    if report_data.get('returns'):
+        rows = [[
+            _display_date(item.get('return_date', '')),
+            item.get('job_number', ''),
+            item.get('paypoint_type', ''),
+            item.get('return_serial_ptid', ''),
+            item.get('return_trace', ''),
+            (item.get('return_reason') or '')[:25],
+        ] for item in report_data['returns']]
+        story.append(Paragraph('<b>Recent Returns</b>', heading))
+        story.append(Spacer(1, 4))
+        story.extend(pdf_engine.data_tables(
+            ['Return Date', 'Job Number', 'Device Type', 'Return Serial/TID', 'Return Trace', 'Reason'], rows,
+            [0.9*inch, 0.9*inch, 0.9*inch, 1.2*inch, 1.2*inch, 1.7*inch], PAYPOINT_TABLE,
+        ))
+    return story
+
+
+def build_custom_report_pdf(report_type, report_data, period):
+    """Render a custom report. Returns a rewound spooled file."""
+    story = pdf_engine.report_header(REPORT_TITLES[report_type], period, space_after=5)
+    if report_type == 'dnco':
+        story.extend(_dnco_story(report_data))
+    else:
+        story.extend(_paypoint_story(report_data))
+    return pdf_engine.render(
+        story, pagesize=landscape(A4),
+        rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18,
+    )
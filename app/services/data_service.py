@@ -18,6 +18,7 @@ from ..models.attendance import AttendanceModel
 from ..models.settings import SettingsModel
 from ..database import get_db_connection, DB_PATH
 from ..utils.logging_utils import log_settings_action
+from . import table_stats
 
 
 class DataService:
@@ -560,18 +561,10 @@ class DataService:
                 
                 stats = {}
                 
-                # Table counts - whitelist of allowed tables to prevent SQL injection
-                ALLOWED_TABLES = {'payslips', 'job_items', 'run_sheet_jobs', 'attendance', 'settings'}
-                tables = ['payslips', 'job_items', 'run_sheet_jobs', 'attendance', 'settings']
-                for table in tables:
-                    # Validate table name against whitelist
-                    if table not in ALLOWED_TABLES:
-                        continue
-                    try:
-                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                        stats[f'{table}_count'] = cursor.fetchone()[0]
-                    except:
-                        stats[f'{table}_count'] = 0
+                # Table counts, maintained by triggers (see table_stats.py)
+                maintained = table_stats.get_stats(conn)
+                for table in ['payslips', 'job_items', 'run_sheet_jobs', 'attendance', 'settings']:
+                    stats[f'{table}_count'] = maintained.get(f'{table}.rows', 0)
                 
                 # Date ranges
                 cursor.execute("SELECT MIN(pay_date), MAX(pay_date) FROM payslips WHERE pay_date IS NOT NULL")
@@ -0,0 +1,126 @@
+"""
+Per-table change counters for cache invalidation.
+
+``data_versions`` (migration 013) holds a counter per tracked table that
+SQLite triggers bump on every insert, update and delete, whichever
+process or code path made the change (routes, importer scripts, bank
+imports). Code that caches derived results keys them on
+``get_versions(...)``: a cached value is still valid while the versions
+it was computed from are unchanged, and checking that costs one
+primary-key lookup per table.
+
+Changes that happen outside the database (e.g. submissions to HMRC) can
+have a counter too: ``bump_version`` moves a named row by hand.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+TRACKED_TABLES = (
+    'payslips',
+    'job_items',
+    'expenses',
+    'expense_categories',
+    'run_sheet_jobs',
+    'runsheet_daily_data',
+    'customer_mappings',
+    'attendance',
+    'paypoint_stock',
+    'paypoint_deployments',
+    'paypoint_returns',
+)
+
+
+def _trigger_definitions(conn) -> dict:
+    """Return ``{trigger_name: CREATE TRIGGER sql}`` for tables that exist."""
+    existing = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    triggers = {}
+    for table in TRACKED_TABLES:
+        if table not in existing:
+            continue
+        bump = (
+            f"INSERT INTO data_versions (name, version) VALUES ('{table}', 1) "
+            f"ON CONFLICT(name) DO UPDATE SET version = version + 1, "
+            f"updated_at = CURRENT_TIMESTAMP;"
+        )
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            name = f'data_versions_{table}_{suffix}'
+            triggers[name] = (
+                f'CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN {bump} END'
+            )
+    return triggers
+
+
+def install_triggers(conn) -> bool:
+    """Create or replace the version triggers. Returns True if any changed."""
+    existing = {
+        row[0]: row[1] for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE 'data_versions_%'"
+        )
+    }
+    changed = False
+    for name, sql in _trigger_definitions(conn).items():
+        if existing.get(name) == sql:
+            continue
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(sql)
+        changed = True
+    conn.commit()
+    return changed
+
+
+def ensure_data_versions() -> bool:
+    """Install the triggers. Called once from ``create_app`` after migrations."""
+    try:
+        with get_db_connection() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_versions'"
+            ).fetchone():
+                logger.warning('data_versions table missing - run migrations')
+                return False
+            install_triggers(conn)
+        return True
+    except sqlite3.Error as e:
+        logger.error(f'Failed to install data version triggers: {e}', exc_info=True)
+        return False
+
+
+def get_versions(conn, *tables) -> tuple | None:
+    """Return the current version of each table, in order.
+
+    Tables that have never changed report 0. Returns None when the
+    ``data_versions`` table is missing, so callers can skip caching.
+    """
+    try:
+        rows = dict(conn.execute(
+            f"SELECT name, version FROM data_versions "
+            f"WHERE name IN ({', '.join('?' * len(tables))})",
+            tables,
+        ).fetchall())
+    except sqlite3.OperationalError:
+        return None
+    return tuple(rows.get(table, 0) for table in tables)
+
+
+def bump_version(conn, name) -> None:
+    """Increment the counter ``name`` for a change no trigger can see.
+
+    The caller commits. Raises sqlite3.OperationalError when the
+    ``data_versions`` table is missing.
+    """
+    conn.execute(
+        "INSERT INTO data_versions (name, version) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET version = version + 1, "
+        "updated_at = CURRENT_TIMESTAMP",
+        (name,),
+    )
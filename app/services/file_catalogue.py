@@ -0,0 +1,479 @@
+"""
+Catalogue of the runsheet, payslip and upload directories.
+
+``file_catalogue`` (migration 016) has one row per file with its size,
+mtime, content hash (when known), detected type, the date parsed from its
+name and its import status. The directory scan endpoint and the importer
+scripts query it instead of walking the NAS-mounted archive.
+
+The table is kept current in two ways:
+
+- :func:`refresh` is a cheap rescan. ``file_catalogue_dirs`` stores each
+  directory's mtime, which changes when entries are added, removed or
+  renamed. A rescan stats the known directories and only lists those
+  whose mtime has moved (``full=True`` lists and stats everything, for
+  files rewritten in place).
+- :class:`CatalogueWatcher` applies watchdog events for single files as
+  they happen. It also runs a rescan at start-up and on a timer, for
+  changes the events miss (network mounts do not always deliver them).
+
+Paths are stored absolute. All functions take an optional ``conn`` so the
+importer scripts can use their own connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from ..config import Config
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+PAYSLIP = 'payslip'
+RUNSHEET = 'runsheet'
+
+EXTENSIONS = {'.pdf', '.csv', '.txt'}
+
+STATUS_NEW = 'new'
+STATUS_IMPORTED = 'imported'
+STATUS_NO_JOBS = 'no_jobs'
+STATUS_FAILED = 'failed'
+
+_DMY = re.compile(r'(?<!\d)(\d{2})[-_.](\d{2})[-_.](\d{4})(?!\d)')
+_YMD = re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)')
+
+_COLUMNS = ('path', 'root', 'directory', 'name', 'size', 'mtime', 'content_hash',
+            'file_type', 'file_date', 'import_status', 'import_error', 'imported_at')
+
+
+def default_roots() -> list[tuple[str, str | None]]:
+    """Catalogued directories and the type of the files in them.
+
+    ``None`` means the type is detected from each file name.
+    """
+    return [
+        (Config.RUNSHEETS_DIR, RUNSHEET),
+        (Config.PAYSLIPS_DIR, PAYSLIP),
+        ('data/uploads', None),
+        ('data/processing/manual', None),
+    ]
+
+
+def _key(path) -> str:
+    return os.path.abspath(str(path))
+
+
+def _is_catalogued(name: str) -> bool:
+    # Skips hidden files, including macOS resource forks (._name.pdf)
+    return not name.startswith('.') and os.path.splitext(name)[1].lower() in EXTENSIONS
+
+
+def parse_file_date(name: str) -> str | None:
+    """Date in a file name (DD-MM-YYYY or YYYY-MM-DD) as YYYY-MM-DD."""
+    for pattern, order in ((_DMY, (3, 2, 1)), (_YMD, (1, 2, 3))):
+        for match in pattern.finditer(name):
+            year, month, day = (int(match.group(i)) for i in order)
+            try:
+                return datetime(year, month, day).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+    return None
+
+
+def detect_type(path, root_type: str | None = None) -> str | None:
+    """'payslip', 'runsheet' or None, from the root directory or the file name."""
+    if root_type:
+        return root_type
+    name = Path(path).name.lower()
+    if 'payslip' in name or 'saser' in name or re.search(r'week\s*_?\d', name):
+        return PAYSLIP
+    if 'runsheet' in name or 'run' in name or name.startswith('dh_'):
+        return RUNSHEET
+    return None
+
+
+def _root_for(path: str) -> tuple[str, str | None]:
+    """The catalogued root containing ``path`` (the innermost one), and its type."""
+    best = None
+    for root, root_type in default_roots():
+        root = _key(root)
+        if path.startswith(root + os.sep) and (best is None or len(root) > len(best[0])):
+            best = (root, root_type)
+    return best or (os.path.dirname(path), None)
+
+
+@contextmanager
+def _connection(conn=None):
+    if conn is not None:
+        yield conn
+    else:
+        with get_db_connection() as own:
+            yield own
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+# A row counts as changed when its hash differs (if both are known) or,
+# without hashes, when size or mtime differ. Changed files go back to 'new'.
+_CHANGED = (
+    '(CASE WHEN excluded.content_hash IS NOT NULL AND file_catalogue.content_hash IS NOT NULL '
+    'THEN excluded.content_hash != file_catalogue.content_hash '
+    'ELSE (file_catalogue.size IS NOT excluded.size OR file_catalogue.mtime IS NOT excluded.mtime) END)'
+)
+
+_UPSERT = f'''
+    INSERT INTO file_catalogue (path, root, directory, name, size, mtime, content_hash,
+                                file_type, file_date, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(path) DO UPDATE SET
+        root = excluded.root,
+        directory = excluded.directory,
+        name = excluded.name,
+        file_type = excluded.file_type,
+        file_date = excluded.file_date,
+        import_status = CASE WHEN {_CHANGED} THEN 'new' ELSE file_catalogue.import_status END,
+        import_error = CASE WHEN {_CHANGED} THEN NULL ELSE file_catalogue.import_error END,
+        content_hash = CASE
+            WHEN excluded.content_hash IS NOT NULL THEN excluded.content_hash
+            WHEN {_CHANGED} THEN NULL
+            ELSE file_catalogue.content_hash END,
+        size = excluded.size,
+        mtime = excluded.mtime,
+        updated_at = excluded.updated_at
+'''
+
+
+def _upsert(conn, path: str, root: str, root_type, stat, content_hash=None):
+    name = os.path.basename(path)
+    conn.execute(_UPSERT, (
+        path, root, os.path.dirname(path), name, stat.st_size, stat.st_mtime,
+        content_hash, detect_type(path, root_type), parse_file_date(name),
+    ))
+
+
+def _remove_tree(conn, path: str) -> int:
+    """Delete the rows for ``path`` and everything below it."""
+    prefix = path + os.sep
+    removed = conn.execute(
+        'DELETE FROM file_catalogue WHERE path = ? OR substr(path, 1, ?) = ?',
+        (path, len(prefix), prefix),
+    ).rowcount
+    conn.execute(
+        'DELETE FROM file_catalogue_dirs WHERE path = ? OR substr(path, 1, ?) = ?',
+        (path, len(prefix), prefix),
+    )
+    return removed
+
+
+def record_file(path, content_hash: str | None = None, conn=None) -> bool:
+    """Add or update one file's row. Returns False if it is not catalogued."""
+    path = _key(path)
+    if not _is_catalogued(os.path.basename(path)):
+        return False
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        remove_path(path, conn=conn)
+        return False
+    root, root_type = _root_for(path)
+    with _connection(conn) as c:
+        _upsert(c, path, root, root_type, stat, content_hash)
+        c.commit()
+    return True
+
+
+def remove_path(path, conn=None) -> int:
+    """Forget a deleted file or directory. Returns the files removed."""
+    with _connection(conn) as c:
+        removed = _remove_tree(c, _key(path))
+        c.commit()
+    return removed
+
+
+def mark_status(paths, status: str, error: str | None = None, conn=None):
+    """Record the import outcome for ``paths`` (unknown paths are ignored)."""
+    with _connection(conn) as c:
+        c.executemany(
+            'UPDATE file_catalogue SET import_status = ?, import_error = ?, '
+            "imported_at = CASE WHEN ? = 'imported' THEN CURRENT_TIMESTAMP ELSE imported_at END "
+            'WHERE path = ?',
+            [(status, error, status, _key(p)) for p in paths],
+        )
+        c.commit()
+
+
+# ---------------------------------------------------------------------------
+# Rescan
+# ---------------------------------------------------------------------------
+
+def refresh(root, root_type: str | None = None, full: bool = False, conn=None) -> dict:
+    """Bring the rows under ``root`` up to date with the filesystem.
+
+    Only directories whose mtime changed since the last scan are listed,
+    unless ``full`` is set. If ``root`` itself is missing (an unmounted
+    share), its rows are left alone.
+    """
+    root = _key(root)
+    stats = {'root': root, 'dirs_checked': 0, 'dirs_listed': 0,
+             'added': 0, 'updated': 0, 'removed': 0, 'missing': False}
+    if not os.path.isdir(root):
+        stats['missing'] = True
+        return stats
+
+    with _connection(conn) as c:
+        known_dirs = {}
+        children = defaultdict(list)
+        for path, parent, mtime in c.execute(
+            'SELECT path, parent, mtime FROM file_catalogue_dirs WHERE root = ?', (root,)
+        ):
+            known_dirs[path] = mtime
+            children[parent].append(path)
+
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except OSError:
+                stats['removed'] += _remove_tree(c, directory)
+                continue
+            stats['dirs_checked'] += 1
+            if not full and known_dirs.get(directory) == dir_mtime:
+                stack.extend(children[directory])
+                continue
+
+            stats['dirs_listed'] += 1
+            files = {}
+            subdirs = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append(entry.path)
+                    elif _is_catalogued(entry.name):
+                        files[entry.path] = entry.stat()
+
+            existing = {
+                path: (size, mtime) for path, size, mtime in c.execute(
+                    'SELECT path, size, mtime FROM file_catalogue WHERE directory = ?',
+                    (directory,),
+                )
+            }
+            for path, stat in files.items():
+                old = existing.pop(path, None)
+                if old == (stat.st_size, stat.st_mtime):
+                    continue
+                _upsert(c, path, root, root_type, stat)
+                stats['added' if old is None else 'updated'] += 1
+            for path in existing:
+                stats['removed'] += _remove_tree(c, path)
+            for child in children[directory]:
+                if child not in subdirs:
+                    stats['removed'] += _remove_tree(c, child)
+
+            c.execute(
+                'INSERT INTO file_catalogue_dirs (path, root, parent, mtime, scanned_at) '
+                'VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP) '
+                'ON CONFLICT(path) DO UPDATE SET root = excluded.root, parent = excluded.parent, '
+                'mtime = excluded.mtime, scanned_at = excluded.scanned_at',
+                (directory, root, os.path.dirname(directory) if directory != root else None, dir_mtime),
+            )
+            stack.extend(subdirs)
+        c.commit()
+
+    if stats['added'] or stats['updated'] or stats['removed']:
+        logger.info(
+            f"File catalogue {root}: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed ({stats['dirs_listed']}/{stats['dirs_checked']} dirs listed)"
+        )
+    return stats
+
+
+def refresh_all(full: bool = False) -> list[dict]:
+    """Rescan every directory in :func:`default_roots`."""
+    return [refresh(root, root_type, full=full) for root, root_type in default_roots()]
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def list_files(root=None, file_type: str | None = None, modified_since=None,
+               date_from: str | None = None, date_to: str | None = None,
+               statuses=None, extensions=None, conn=None) -> list[dict]:
+    """Catalogued files matching every given filter, ordered by path.
+
+    ``root`` may be a catalogued root or any directory below one.
+    ``modified_since`` is a datetime or a Unix timestamp. ``date_from`` and
+    ``date_to`` (YYYY-MM-DD, inclusive) filter on the date in the file name.
+    """
+    clauses = []
+    params = []
+    if root is not None:
+        root = _key(root)
+        prefix = root + os.sep
+        clauses.append('(root = ? OR substr(path, 1, ?) = ?)')
+        params += [root, len(prefix), prefix]
+    if file_type is not None:
+        clauses.append('file_type = ?')
+        params.append(file_type)
+    if modified_since is not None:
+        if isinstance(modified_since, datetime):
+            modified_since = modified_since.timestamp()
+        clauses.append('mtime > ?')
+        params.append(modified_since)
+    if date_from is not None:
+        clauses.append('file_date >= ?')
+        params.append(date_from)
+    if date_to is not None:
+        clauses.append('file_date <= ?')
+        params.append(date_to)
+    if statuses:
+        clauses.append(f"import_status IN ({', '.join('?' * len(statuses))})")
+        params += list(statuses)
+    if extensions:
+        clauses.append(f"lower(substr(name, -4)) IN ({', '.join('?' * len(extensions))})")
+        params += [e.lower() for e in extensions]
+
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM file_catalogue"
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY path'
+    with _connection(conn) as c:
+        rows = c.execute(sql, params).fetchall()
+    return [dict(zip(_COLUMNS, row)) for row in rows]
+
+
+def find_by_hash(content_hash: str, conn=None) -> list[dict]:
+    """Catalogued files with this content hash."""
+    with _connection(conn) as c:
+        rows = c.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM file_catalogue WHERE content_hash = ?",
+            (content_hash,),
+        ).fetchall()
+    return [dict(zip(_COLUMNS, row)) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Watching
+# ---------------------------------------------------------------------------
+
+class CatalogueEventHandler(FileSystemEventHandler):
+    """Collects changed and deleted paths for :class:`CatalogueWatcher`."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.changed(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.changed(event.src_path)
+
+    def on_deleted(self, event):
+        self.watcher.deleted(event.src_path)
+
+    def on_moved(self, event):
+        self.watcher.deleted(event.src_path)
+        if not event.is_directory:
+            self.watcher.changed(event.dest_path)
+
+
+class CatalogueWatcher:
+    """Keep the catalogue current from watchdog events and periodic rescans.
+
+    Events are collected and applied every ``flush_seconds``, so the burst
+    of modify events from one copy becomes a single row update.
+    """
+
+    def __init__(self, flush_seconds: float = 2.0, rescan_seconds: float = 900):
+        self.flush_seconds = flush_seconds
+        self.rescan_seconds = rescan_seconds
+        self._lock = threading.Lock()
+        self._changed = set()
+        self._deleted = set()
+        self._observers = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def changed(self, path):
+        if _is_catalogued(os.path.basename(path)):
+            with self._lock:
+                self._changed.add(_key(path))
+                self._deleted.discard(_key(path))
+
+    def deleted(self, path):
+        with self._lock:
+            self._deleted.add(_key(path))
+            self._changed.discard(_key(path))
+
+    def flush(self) -> int:
+        """Apply the collected events. Returns the number of paths handled."""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            deleted, self._deleted = self._deleted, set()
+        with get_db_connection() as conn:
+            for path in deleted:
+                _remove_tree(conn, path)
+            for path in changed:
+                record_file(path, conn=conn)
+            conn.commit()
+        return len(changed) + len(deleted)
+
+    def _loop(self):
+        next_rescan = 0.0
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+                if self.rescan_seconds and next_rescan <= 0:
+                    refresh_all()
+                    next_rescan = self.rescan_seconds
+                next_rescan -= self.flush_seconds
+            except sqlite3.Error as e:
+                logger.error(f'File catalogue update failed: {e}')
+            except OSError as e:
+                logger.warning(f'File catalogue scan error: {e}')
+
+    def start(self) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        handler = CatalogueEventHandler(self)
+        for root, _root_type in default_roots():
+            if os.path.isdir(root):
+                observer = Observer()
+                observer.schedule(handler, root, recursive=True)
+                observer.start()
+                self._observers.append(observer)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='file-catalogue', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        for observer in self._observers:
+            observer.stop()
+            observer.join(timeout=5)
+        self._observers.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+catalogue_watcher = CatalogueWatcher()
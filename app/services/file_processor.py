@@ -1,41 +1,98 @@
 """
 Real-time File Processor
 Processes payslips and runsheets immediately as they're downloaded.
+
+New PDFs go through three stages instead of a timer and a subprocess each:
+
+1. Debounce: a detected path waits in ``pending`` until its size and mtime
+   have stopped changing for ``settle_seconds``. A slow NAS copy is not
+   picked up half-written, and repeated events for one path collapse
+   into a single entry.
+2. De-duplicate: a settled file is hashed. Content already queued or
+   imported (the same PDF downloaded twice, or copied to two watched
+   folders) is skipped. Hashes and import outcomes are also written to
+   the file catalogue, so this holds across restarts.
+3. Queue: settled files go on a bounded queue. A fixed pool of workers
+   drains it in batches, so a backfill of hundreds of files runs one
+   importer process per batch rather than one per file. When the queue
+   is full, files stay pending until there is room.
 """
 
+import hashlib
+import json
 import logging
 import os
+import queue
 import subprocess
 import sys
+import tempfile
 import threading
 import time
+from collections import OrderedDict, deque
 from datetime import datetime
 from pathlib import Path
 
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from . import file_catalogue
+
+PAYSLIP = 'payslip'
+RUNSHEET = 'runsheet'
+
 class FileProcessorHandler(FileSystemEventHandler):
     """Handles file system events for immediate processing."""
-    
+
     def __init__(self, processor):
         self.processor = processor
         self.logger = processor.logger
-        
+
     def on_created(self, event):
         """Handle new file creation."""
         if not event.is_directory and event.src_path.endswith('.pdf'):
             self.logger.info(f"New PDF detected: {event.src_path}")
-            # Add small delay to ensure file is fully written
-            threading.Timer(2.0, self.processor.process_new_file, args=[event.src_path]).start()
+            self.processor.enqueue(event.src_path)
+
+    def on_moved(self, event):
+        """Handle files renamed into place (copy to temp name, then rename)."""
+        if not event.is_directory and event.dest_path.endswith('.pdf'):
+            self.logger.info(f"PDF moved into place: {event.dest_path}")
+            self.processor.enqueue(event.dest_path)
 
 class RealTimeFileProcessor:
     """Processes files immediately as they're downloaded."""
-    
-    def __init__(self):
+
+    def __init__(self, workers=2, queue_size=500, batch_size=25, settle_seconds=2.0,
+                 poll_seconds=0.5, batch_wait_seconds=1.0):
         self.is_monitoring = False
         self.observers = []
-        
+
+        # Queue and worker pool settings
+        self.workers = workers
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.batch_wait_seconds = batch_wait_seconds
+
+        self._lock = threading.Lock()
+        self._pending = {}  # path -> {'size', 'mtime', 'stable_since'}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._queued_paths = set()
+        self._seen_hashes = OrderedDict()  # content hash -> path, bounded
+        self._max_seen_hashes = 10000
+        self._threads = []
+        self._stop = threading.Event()
+
+        # Counters for get_status
+        self.in_flight = 0
+        self.processed_count = 0
+        self.failed_count = 0
+        self.duplicates_skipped = 0
+        self.batches_run = 0
+        self._batch_seconds = 0.0
+        self._completed_at = deque()  # completion times for the throughput window
+        self.last_batch_at = None
+
         # Setup logging
         self.logger = logging.getLogger('file_processor')
         handler = logging.FileHandler('logs/file_processor.log')
@@ -43,7 +100,7 @@ class RealTimeFileProcessor:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
         self.logger.setLevel(logging.INFO)
-        
+
         # Directories to monitor using the new organized structure
         self.watch_dirs = [
             Path('data/processing/manual'),      # User manual uploads
@@ -52,15 +109,16 @@ class RealTimeFileProcessor:
             Path('data/processing/queue'),       # Files being processed
             Path('data/processing/failed')       # Failed processing files
         ]
-    
+
     def start_monitoring(self):
         """Start monitoring directories for new files."""
         if self.is_monitoring:
             return
-        
+
         self.is_monitoring = True
         self.logger.info("Starting real-time file monitoring")
-        
+        self._start_threads()
+
         # Create observers for each directory
         for watch_dir in self.watch_dirs:
             if watch_dir.exists():
@@ -70,107 +128,383 @@ class RealTimeFileProcessor:
                 observer.start()
                 self.observers.append(observer)
                 self.logger.info(f"Monitoring directory: {watch_dir}")
-    
+
     def stop_monitoring(self):
         """Stop monitoring directories."""
         self.is_monitoring = False
-        
+
         for observer in self.observers:
             observer.stop()
             observer.join()
-        
+
         self.observers.clear()
+        self._stop_threads()
         self.logger.info("Stopped real-time file monitoring")
-    
+
+    def _start_threads(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._debounce_loop, name='file-debounce', daemon=True)
+        ] + [
+            threading.Thread(target=self._worker_loop, name=f'file-worker-{n}', daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _stop_threads(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Debounce and de-duplication
+    # ------------------------------------------------------------------
+
+    def enqueue(self, file_path):
+        """Register a new or changed file. Returns False if it is ignored."""
+        path = str(file_path)
+        if not path.endswith('.pdf') or Path(path).name.startswith('._'):
+            return False
+        with self._lock:
+            if path in self._queued_paths:
+                return False
+            # Already pending: the stability check sees any new writes.
+            self._pending.setdefault(path, {'size': None, 'mtime': None, 'stable_since': None})
+        return True
+
+    def _debounce_loop(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check_pending()
+            except Exception as e:
+                self.logger.error(f"Error checking pending files: {e}")
+
+    def check_pending(self, now=None):
+        """Move files whose size and mtime have settled onto the queue.
+
+        Returns the number of files queued.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            paths = list(self._pending)
+
+        ready = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            with self._lock:
+                entry = self._pending.get(path)
+                if entry is None:
+                    continue
+                if (stat.st_size, stat.st_mtime) != (entry['size'], entry['mtime']):
+                    entry.update(size=stat.st_size, mtime=stat.st_mtime, stable_since=now)
+                elif stat.st_size > 0 and now - entry['stable_since'] >= self.settle_seconds:
+                    ready.append(path)
+
+        queued = 0
+        for path in ready:
+            try:
+                digest = self._file_hash(path)
+            except OSError as e:
+                self.logger.warning(f"Could not read {path}: {e}")
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            imported_as = self._catalogue_record(path, digest)
+            with self._lock:
+                duplicate_of = self._seen_hashes.get(digest) or imported_as
+                if duplicate_of:
+                    self._pending.pop(path, None)
+                    self.duplicates_skipped += 1
+                    self.logger.info(f"Skipping duplicate of {duplicate_of}: {path}")
+                    continue
+                try:
+                    self._queue.put_nowait((path, digest))
+                except queue.Full:
+                    # Back-pressure: stays pending and is retried next poll.
+                    break
+                self._pending.pop(path, None)
+                self._queued_paths.add(path)
+                self._remember_hash(digest, path)
+            queued += 1
+        return queued
+
+    @staticmethod
+    def _file_hash(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _catalogue_record(self, path, digest):
+        """Record a settled file in the file catalogue.
+
+        Returns the path of an already imported file with the same content
+        (the in-memory hash set does not survive a restart), else None.
+        """
+        try:
+            imported = [
+                row['path'] for row in file_catalogue.find_by_hash(digest)
+                if row['import_status'] == file_catalogue.STATUS_IMPORTED
+                and row['path'] != os.path.abspath(path)
+            ]
+            file_catalogue.record_file(path, content_hash=digest)
+            return imported[0] if imported else None
+        except Exception as e:
+            self.logger.warning(f"Could not update file catalogue for {path}: {e}")
+            return None
+
+    def _catalogue_mark(self, results):
+        """Record import outcomes (path -> success) in the file catalogue."""
+        try:
+            for ok in (True, False):
+                paths = [p for p, success in results.items() if bool(success) == ok]
+                if paths:
+                    file_catalogue.mark_status(
+                        paths, file_catalogue.STATUS_IMPORTED if ok else file_catalogue.STATUS_FAILED)
+        except Exception as e:
+            self.logger.warning(f"Could not update file catalogue: {e}")
+
+    def _remember_hash(self, digest, path):
+        self._seen_hashes[digest] = path
+        self._seen_hashes.move_to_end(digest)
+        while len(self._seen_hashes) > self._max_seen_hashes:
+            self._seen_hashes.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _next_batch(self, timeout):
+        """Block for one item, then take whatever else arrives within the batch window."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait_seconds
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            batch = self._next_batch(timeout=self.poll_seconds)
+            if batch:
+                self.process_batch(batch)
+
+    def process_batch(self, batch):
+        """Import a batch of ``(path, hash)`` items. Returns the number imported."""
+        with self._lock:
+            self.in_flight += len(batch)
+        started = time.monotonic()
+
+        by_type = {PAYSLIP: [], RUNSHEET: [], None: []}
+        for path, _digest in batch:
+            by_type[self._detect_type(Path(path))].append(path)
+
+        results = {}
+        try:
+            for file_type, process in ((PAYSLIP, self._process_payslips),
+                                       (RUNSHEET, self._process_runsheets)):
+                if by_type[file_type]:
+                    outcome = process([Path(p) for p in by_type[file_type]])
+                    results.update((p, outcome.get(str(Path(p)), False)) for p in by_type[file_type])
+            for path in by_type[None]:
+                results[path] = self._auto_process_file(Path(path))
+        finally:
+            elapsed = time.monotonic() - started
+            succeeded = 0
+            with self._lock:
+                for path, digest in batch:
+                    self._queued_paths.discard(path)
+                    if results.get(path):
+                        succeeded += 1
+                    else:
+                        # Let a fixed or re-sent copy through next time.
+                        self._seen_hashes.pop(digest, None)
+                self.in_flight -= len(batch)
+                self.processed_count += succeeded
+                self.failed_count += len(batch) - succeeded
+                self.batches_run += 1
+                self._batch_seconds += elapsed
+                self.last_batch_at = datetime.now()
+                completed = time.monotonic()
+                self._completed_at.extend([completed] * len(batch))
+            for _ in batch:
+                self._queue.task_done()
+        self._catalogue_mark({path: results.get(path) for path, _digest in batch})
+
+        self.logger.info(
+            f"Batch of {len(batch)} files: {succeeded} imported, "
+            f"{len(batch) - succeeded} failed in {elapsed:.1f}s"
+        )
+        if succeeded:
+            self._notify_sync()
+        return succeeded
+
+    def _notify_sync(self):
+        """Tell the sync scheduler new data has been imported."""
+        try:
+            from .periodic_sync import periodic_sync_service
+            periodic_sync_service.notify_new_data('file watcher')
+        except Exception as e:
+            self.logger.warning(f"Could not notify sync scheduler: {e}")
+
+    def wait_idle(self, timeout=None):
+        """Block until the pending set and the queue are empty. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                idle = not self._pending and not self._queued_paths and self.in_flight == 0
+            if idle:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    # ------------------------------------------------------------------
+    # Importing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _detect_type(file_path):
+        if 'PaySlips' in str(file_path) or 'payslip' in file_path.name.lower():
+            return PAYSLIP
+        if 'RunSheets' in str(file_path) or 'runsheet' in file_path.name.lower():
+            return RUNSHEET
+        return None
+
     def process_new_file(self, file_path):
         """Process a newly detected file immediately."""
         try:
             file_path = Path(file_path)
             self.logger.info(f"Processing new file: {file_path}")
-            
+
             # Determine file type based on path
-            if 'PaySlips' in str(file_path) or 'payslip' in file_path.name.lower():
+            file_type = self._detect_type(file_path)
+            if file_type == PAYSLIP:
                 success = self._process_payslip(file_path)
-            elif 'RunSheets' in str(file_path) or 'runsheet' in file_path.name.lower():
+            elif file_type == RUNSHEET:
                 success = self._process_runsheet(file_path)
             else:
                 # Try to auto-detect based on content
                 success = self._auto_process_file(file_path)
-            
+
             if success:
                 self.logger.info(f"Successfully processed: {file_path}")
             else:
                 self.logger.warning(f"Failed to process: {file_path}")
-                
+            return success
+
         except Exception as e:
             self.logger.error(f"Error processing file {file_path}: {str(e)}")
-    
-    def _process_payslip(self, file_path):
-        """Process a single payslip file."""
+            return False
+
+    def _run_import(self, script, file_paths, timeout):
+        """Run an importer script over ``file_paths`` in one process.
+
+        Returns the importer's per-file results (its ``--results`` JSON)
+        by path. Files missing from them are reported as errors.
+        """
+        fd, results_path = tempfile.mkstemp(prefix='watcher_batch_', suffix='.json')
+        os.close(fd)
+        file_results = []
         try:
-            self.logger.info(f"Processing payslip: {file_path}")
-            
-            process = subprocess.run([
-                sys.executable, 
-                'scripts/production/extract_payslips.py', 
-                '--file', str(file_path),
-                '--quiet'
-            ], capture_output=True, text=True, timeout=60)
-            
-            if process.returncode == 0:
-                self.logger.info(f"Payslip processed successfully: {file_path}")
-                return True
-            else:
-                self.logger.warning(f"Payslip processing failed: {process.stderr}")
-                return False
-                
+            process = subprocess.run(
+                [sys.executable, script, '--files', *(str(p) for p in file_paths), '--results', results_path],
+                capture_output=True, text=True, timeout=timeout,
+            )
+            error = (process.stderr or process.stdout[-500:]).strip() or f'exit code {process.returncode}'
+            try:
+                with open(results_path) as f:
+                    file_results = json.load(f)
+            except (OSError, ValueError):
+                pass
+        except subprocess.TimeoutExpired:
+            error = f'{Path(script).name} timed out'
+        finally:
+            try:
+                os.unlink(results_path)
+            except OSError:
+                pass
+
+        by_path = {r.get('file'): r for r in file_results}
+        return {
+            str(p): by_path.get(str(p)) or {'file': str(p), 'status': 'error', 'error': error}
+            for p in file_paths
+        }
+
+    def _import_files(self, kind, script, file_paths, timeout, ok_statuses):
+        """Run one importer over ``file_paths``. Returns ``{str(path): success}``."""
+        try:
+            self.logger.info(f"Processing {len(file_paths)} {kind}(s)")
+            results = self._run_import(script, file_paths, timeout=timeout)
         except Exception as e:
-            self.logger.error(f"Error processing payslip {file_path}: {str(e)}")
-            return False
-    
+            self.logger.error(f"Error processing {kind}s {[p.name for p in file_paths]}: {str(e)}")
+            return {str(p): False for p in file_paths}
+
+        outcome = {}
+        for path, result in results.items():
+            outcome[path] = result.get('status') in ok_statuses
+            if not outcome[path]:
+                self.logger.warning(f"{kind.capitalize()} processing failed for {Path(path).name}: "
+                                    f"{result.get('error') or result.get('status')}")
+        self.logger.info(f"{kind.capitalize()}s processed: {sum(outcome.values())}/{len(file_paths)} file(s)")
+        return outcome
+
+    def _process_payslips(self, file_paths):
+        """Process payslip files in one extractor run. Returns ``{str(path): success}``."""
+        return self._import_files(
+            'payslip', 'scripts/production/extract_payslips.py', file_paths,
+            timeout=60 + 15 * len(file_paths), ok_statuses=('imported',),
+        )
+
+    def _process_runsheets(self, file_paths):
+        """Process runsheet files in one importer run. Returns ``{str(path): success}``."""
+        # Already imported, or no new jobs: ran cleanly, nothing to retry
+        return self._import_files(
+            'runsheet', 'scripts/production/import_run_sheets.py', file_paths,
+            timeout=120 + 30 * len(file_paths), ok_statuses=('imported', 'already_imported', 'no_jobs'),
+        )
+
+    def _process_payslip(self, file_path):
+        """Process a single payslip file."""
+        return all(self._process_payslips([Path(file_path)]).values())
+
     def _process_runsheet(self, file_path):
         """Process a single runsheet file."""
-        try:
-            self.logger.info(f"Processing runsheet: {file_path}")
-            
-            process = subprocess.run([
-                sys.executable, 
-                'scripts/production/import_run_sheets.py', 
-                '--file', str(file_path),
-                '--quiet'
-            ], capture_output=True, text=True, timeout=120)
-            
-            if process.returncode == 0:
-                self.logger.info(f"Runsheet processed successfully: {file_path}")
-                return True
-            else:
-                self.logger.warning(f"Runsheet processing failed: {process.stderr}")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"Error processing runsheet {file_path}: {str(e)}")
-            return False
-    
+        return all(self._process_runsheets([Path(file_path)]).values())
+
     def _auto_process_file(self, file_path):
         """Auto-detect file type and process accordingly."""
         try:
             self.logger.info(f"Auto-detecting file type: {file_path}")
-            
+
             # Try payslip first
             if self._process_payslip(file_path):
                 return True
-            
+
             # If payslip processing failed, try runsheet
             if self._process_runsheet(file_path):
                 return True
-            
+
             self.logger.warning(f"Could not process file as payslip or runsheet: {file_path}")
             return False
-            
+
         except Exception as e:
             self.logger.error(f"Error auto-processing file {file_path}: {str(e)}")
             return False
-    
+
     def process_directory(self, directory_path, file_type=None):
         """Process all PDF files in a directory immediately."""
         try:
@@ -178,37 +512,54 @@ class RealTimeFileProcessor:
             if not directory.exists():
                 self.logger.warning(f"Directory does not exist: {directory}")
                 return 0
-            
+
             pdf_files = list(directory.glob('**/*.pdf'))
             processed_count = 0
-            
+
             self.logger.info(f"Processing {len(pdf_files)} files in {directory}")
-            
-            for pdf_file in pdf_files:
-                if file_type == 'payslips':
-                    success = self._process_payslip(pdf_file)
-                elif file_type == 'runsheets':
-                    success = self._process_runsheet(pdf_file)
-                else:
-                    success = self._auto_process_file(pdf_file)
-                
-                if success:
-                    processed_count += 1
-            
+
+            # Known types go through the importers in batches
+            if file_type in ('payslips', 'runsheets'):
+                process = self._process_payslips if file_type == 'payslips' else self._process_runsheets
+                for start in range(0, len(pdf_files), self.batch_size):
+                    chunk = pdf_files[start:start + self.batch_size]
+                    processed_count += sum(process(chunk).values())
+            else:
+                for pdf_file in pdf_files:
+                    if self._auto_process_file(pdf_file):
+                        processed_count += 1
+
             self.logger.info(f"Processed {processed_count}/{len(pdf_files)} files in {directory}")
             return processed_count
-            
+
         except Exception as e:
             self.logger.error(f"Error processing directory {directory_path}: {str(e)}")
             return 0
-    
-    def get_status(self):
-        """Get current processor status."""
-        return {
-            'is_monitoring': self.is_monitoring,
-            'watched_directories': [str(d) for d in self.watch_dirs if d.exists()],
-            'active_observers': len(self.observers)
-        }
+
+    def get_status(self, window_seconds=300):
+        """Get current processor status, queue depth and throughput."""
+        now = time.monotonic()
+        with self._lock:
+            while self._completed_at and now - self._completed_at[0] > window_seconds:
+                self._completed_at.popleft()
+            recent = len(self._completed_at)
+            return {
+                'is_monitoring': self.is_monitoring,
+                'watched_directories': [str(d) for d in self.watch_dirs if d.exists()],
+                'active_observers': len(self.observers),
+                'workers': sum(1 for t in self._threads if t.is_alive() and t.name.startswith('file-worker')),
+                'pending': len(self._pending),
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'in_flight': self.in_flight,
+                'processed': self.processed_count,
+                'failed': self.failed_count,
+                'duplicates_skipped': self.duplicates_skipped,
+                'batches': self.batches_run,
+                'avg_batch_seconds': round(self._batch_seconds / self.batches_run, 2) if self.batches_run else None,
+                'files_per_minute': round(recent * 60 / window_seconds, 2),
+                'last_batch_at': self.last_batch_at.isoformat() if self.last_batch_at else None,
+            }
 
 # Global instance
 file_processor = RealTimeFileProcessor()
@@ -1,18 +1,40 @@
 """
 HMRC OAuth 2.0 Authentication Service for Making Tax Digital (MTD).
 Handles authorization flow, token management, and refresh logic.
+
+The decrypted access token is cached in memory until shortly before it
+expires, so API calls do not re-read and decrypt ``hmrc_credentials`` every
+time. The cache is keyed by database path and environment and is replaced
+whenever tokens are stored or revoked through this service.
 """
 
 import secrets
+import threading
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
 import requests
 
+from .. import database as _db_module
 from ..database import get_db_connection, execute_query
 from ..config import Config
 from ..utils.encryption import get_encryption
 
+# Refresh (and stop serving the cached token) this long before expiry.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# {(db_path, environment): (access_token, expires_at)}
+_token_cache = {}
+# Serialises the slow path so concurrent callers don't all refresh with
+# the same (single-use) refresh token.
+_token_lock = threading.RLock()
+
+
+def clear_token_cache():
+    """Forget every cached access token."""
+    with _token_lock:
+        _token_cache.clear()
+
 
 class HMRCAuthService:
     """Handle HMRC OAuth 2.0 authentication and token management."""
@@ -149,6 +171,7 @@ class HMRCAuthService:
         """
         expires_in = token_data.get('expires_in', 14400)  # Default 4 hours
         expires_at = datetime.now() + timedelta(seconds=expires_in)
+        self._cache_token(token_data.get('access_token'), expires_at)
 
         # Encrypt tokens before storage
         encryption = get_encryption()
@@ -223,6 +246,22 @@ class HMRCAuthService:
             return credentials
         return None
     
+    def _cache_key(self):
+        return (_db_module.DB_PATH, self.environment)
+
+    def _cache_token(self, access_token, expires_at):
+        with _token_lock:
+            if access_token:
+                _token_cache[self._cache_key()] = (access_token, expires_at)
+            else:
+                _token_cache.pop(self._cache_key(), None)
+
+    def _cached_token(self):
+        entry = _token_cache.get(self._cache_key())
+        if entry and datetime.now() < entry[1] - TOKEN_REFRESH_MARGIN:
+            return entry[0]
+        return None
+
     def get_valid_access_token(self):
         """
         Get a valid access token, refreshing if necessary.
@@ -230,21 +269,32 @@ class HMRCAuthService:
         Returns:
             str: Valid access token or None
         """
-        credentials = self.get_stored_credentials()
-        
-        if not credentials:
-            return None
-        
-        # Check if token is expired or about to expire (within 5 minutes)
-        expires_at = datetime.fromisoformat(credentials['expires_at'])
-        if datetime.now() >= expires_at - timedelta(minutes=5):
-            # Token expired or about to expire, refresh it
-            refresh_result = self.refresh_access_token(credentials['refresh_token'])
-            if refresh_result['success']:
-                return refresh_result['data']['access_token']
-            return None
-        
-        return credentials['access_token']
+        token = self._cached_token()
+        if token:
+            return token
+
+        with _token_lock:
+            # Another thread may have refreshed while we waited.
+            token = self._cached_token()
+            if token:
+                return token
+
+            credentials = self.get_stored_credentials()
+            
+            if not credentials:
+                return None
+            
+            # Check if token is expired or about to expire (within 5 minutes)
+            expires_at = datetime.fromisoformat(credentials['expires_at'])
+            if datetime.now() >= expires_at - TOKEN_REFRESH_MARGIN:
+                # Token expired or about to expire, refresh it
+                refresh_result = self.refresh_access_token(credentials['refresh_token'])
+                if refresh_result['success']:
+                    return refresh_result['data']['access_token']
+                return None
+            
+            self._cache_token(credentials['access_token'], expires_at)
+            return credentials['access_token']
     
     def is_authenticated(self):
         """
@@ -276,6 +326,7 @@ class HMRCAuthService:
                     (self.environment,)
                 )
                 conn.commit()
+            self._cache_token(None, None)
             return True
         except Exception:
             return False
@@ -5,15 +5,31 @@ Handles all API calls with fraud prevention headers and error handling.
 
 import json
 import logging
+import re
 from datetime import datetime
 
 import requests
 
 from .hmrc_auth import HMRCAuthService
+from .hmrc_http import fan_out, get_session, rate_limiter, record_write, response_cache, write_generation
 from ..config import Config
 
 logger = logging.getLogger('hmrc')
 
+NINO_PATTERN = re.compile(r'/[A-Z]{2}\d{6}[A-D]')
+
+# GET endpoints served from the short-TTL response cache. They are read
+# several times while rendering one page and only change when we write.
+CACHEABLE_ENDPOINT_PATTERNS = (
+    # Business list/detail and periods of account
+    re.compile(r'^/individuals/business/details/'),
+    # Quarterly and final declaration obligations
+    re.compile(r'^/individuals/business/self-employment/[^/]+/obligations$'),
+    re.compile(r'^/obligations/'),
+    # Calculations list
+    re.compile(r'^/individuals/calculations/[^/]+/self-assessment$'),
+)
+
 
 class HMRCClient:
     """Client for HMRC MTD Self-Employment API."""
@@ -23,6 +39,8 @@ class HMRCClient:
         self.auth_service = HMRCAuthService()
         self.base_url = self.config.HMRC_API_BASE_URL
         self.environment = self.config.HMRC_ENVIRONMENT
+        self.timeout = self.config.HMRC_HTTP_TIMEOUT
+        self.session = get_session()
     
     def _get_fraud_prevention_headers(self):
         """
@@ -38,6 +56,11 @@ class HMRCClient:
     def _make_request(self, method, endpoint, data=None, params=None, test_scenario=None):
         """
         Make authenticated request to HMRC API with fraud prevention headers.
+
+        Requests go through the shared pooled session (see ``hmrc_http``),
+        which retries throttled and transient failures. Successful GETs of
+        the endpoints in ``CACHEABLE_ENDPOINT_PATTERNS`` are cached briefly;
+        any write retires that cache in every worker.
         
         Args:
             method: HTTP method (GET, POST, PUT)
@@ -49,6 +72,18 @@ class HMRCClient:
         Returns:
             dict: Response data or error
         """
+        cache_key = None
+        if (method == 'GET' and response_cache.ttl > 0
+                and any(p.match(endpoint) for p in CACHEABLE_ENDPOINT_PATTERNS)):
+            generation = write_generation()
+            if generation is not None:
+                cache_key = response_cache.make_key(self.environment, endpoint, params,
+                                                    test_scenario, generation)
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"HMRC API cache hit: GET {NINO_PATTERN.sub('/[NINO]', endpoint)}")
+                    return cached
+
         access_token = self.auth_service.get_valid_access_token()
         
         if not access_token:
@@ -95,30 +130,30 @@ class HMRCClient:
         url = f"{self.base_url}{endpoint}"
         
         # Log API call (never log sensitive data like tokens or NINOs)
-        safe_endpoint = endpoint.replace(r'/[A-Z]{2}\d{6}[A-D]', '/[NINO]')  # Mask NINOs
+        safe_endpoint = NINO_PATTERN.sub('/[NINO]', endpoint)
         logger.info(f"HMRC API call: {method} {safe_endpoint} (environment: {self.environment})")
         
-        # Log request headers (mask Authorization token for security)
-        safe_headers = dict(headers)
-        if 'Authorization' in safe_headers:
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log request headers (mask Authorization token for security)
+            safe_headers = dict(headers)
             safe_headers['Authorization'] = 'Bearer [REDACTED]'
-        logger.info(f'Request headers: {safe_headers}')
+            logger.debug(f'Request headers: {safe_headers}')
+            if data:
+                logger.debug(f'Request payload: {json.dumps(data)}')
+        
+        waited = rate_limiter.acquire(self._rate_limit_key(endpoint))
+        if waited:
+            logger.debug(f"HMRC API rate limit: waited {waited:.2f}s for {method} {safe_endpoint}")
         
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
             elif method == 'POST':
-                # Log the request payload for debugging
-                if data:
-                    logger.info(f'Period submission payload: {json.dumps(data, indent=2)}')
-                response = requests.post(url, headers=headers, json=data, timeout=30)
+                response = self.session.post(url, headers=headers, json=data, timeout=self.timeout)
             elif method == 'PUT':
-                # Log the request payload for debugging
-                if data:
-                    logger.info(f'Annual submission payload: {json.dumps(data, indent=2)}')
-                response = requests.put(url, headers=headers, json=data, timeout=30)
+                response = self.session.put(url, headers=headers, json=data, timeout=self.timeout)
             elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, params=params, timeout=30)
+                response = self.session.delete(url, headers=headers, params=params, timeout=self.timeout)
             else:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return {'success': False, 'error': f'Unsupported method: {method}'}
@@ -129,11 +164,14 @@ class HMRCClient:
             # Handle different response codes
             if response.status_code == 200 or response.status_code == 201:
                 logger.debug(f"HMRC API success: {method} {safe_endpoint}")
-                return {
+                result = {
                     'success': True,
                     'data': response.json() if response.content else {},
                     'status_code': response.status_code
                 }
+                if cache_key is not None:
+                    response_cache.set(cache_key, result)
+                return result
             elif response.status_code == 204:
                 logger.debug(f"HMRC API success (no content): {method} {safe_endpoint}")
                 return {
@@ -181,6 +219,39 @@ class HMRCClient:
                 'success': False,
                 'error': str(e)
             }
+        finally:
+            # Any write may change what the cached reads return (obligations
+            # are fulfilled, periods and calculations appear), so retire them
+            # in every worker whether or not HMRC accepted it.
+            if method != 'GET':
+                record_write()
+
+    def invalidate_cache(self):
+        """Drop every worker's cached GET responses (e.g. after an out-of-band change)."""
+        record_write()
+
+    @staticmethod
+    def _rate_limit_key(endpoint):
+        """Rate-limit bucket for an endpoint: its API path up to the NINO."""
+        return NINO_PATTERN.split(endpoint, maxsplit=1)[0]
+
+    def fetch_concurrently(self, calls, max_workers=None):
+        """
+        Issue independent read calls in parallel.
+
+        Each call still goes through ``_make_request``, so it gets its own
+        fraud prevention headers, the per-API rate limit and the GET cache.
+        Only use this for calls that do not depend on each other's results.
+
+        Args:
+            calls: ``{name: zero-argument callable}``, e.g.
+                ``{'losses': lambda: client.list_losses(nino)}``
+            max_workers: Concurrency cap (default ``HMRC_FANOUT_WORKERS``)
+
+        Returns:
+            dict: ``{name: result envelope}``
+        """
+        return fan_out(calls, max_workers or self.config.HMRC_FANOUT_WORKERS)
     
     def test_connection(self):
         """
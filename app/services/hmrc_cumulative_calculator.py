@@ -12,13 +12,24 @@ This service is the single source of truth for those running totals.
 It deliberately does not call HMRC - it only assembles the dict that
 the API client will POST. Keeping it pure makes it cheap to unit-test
 without mocking the HMRC sandbox.
+
+All figures come from one aggregation per tax year
+(:func:`tax_year_aggregate`): payslip income summed per day and expenses
+summed per day and HMRC box, both in SQL. The cumulative totals, the
+per-quarter breakdown and the HMRC expense mapping are all derived from
+that result. It is memoised against the ``data_versions`` counters of the
+source tables, so a preview followed by a submit aggregates once.
 """
 
 import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
 
-from ..database import execute_query
-from ..models.expense import ExpenseModel
+from .. import database as _db_module
+from ..database import get_db_connection
+from .data_versions import get_versions
 from .hmrc_mapper import HMRCMapper
 
 logger = logging.getLogger('hmrc')
@@ -94,35 +105,104 @@ def quarter_end_date(tax_year, period_id):
     raise ValueError(f'Unknown period_id: {period_id!r}')
 
 
-def _income_between(start_date, end_date):
-    """Sum payslip income between two ISO dates (inclusive).
+# ---------------------------------------------------------------------------
+# Tax-year aggregation
+# ---------------------------------------------------------------------------
 
-    Payslips store ``period_end`` as DD/MM/YYYY text, so the query has
-    to reconstruct an ISO date for the comparison.
-    """
-    query = """
-        SELECT COALESCE(SUM(gross_subcontractor_payment), 0) AS total
+# Must match idx_payslips_period_end_iso (migration 013) character for
+# character, or SQLite will not use the index.
+_PERIOD_END_ISO = (
+    "(substr(period_end, 7, 4) || '-' || substr(period_end, 4, 2) || '-' || substr(period_end, 1, 2))"
+)
+
+# Tables whose changes invalidate a memoised aggregate.
+_SOURCE_TABLES = ('payslips', 'expenses', 'expense_categories')
+
+_AGGREGATE_CACHE_SIZE = 8
+_aggregate_cache = OrderedDict()
+_aggregate_lock = threading.Lock()
+
+
+def _aggregate(conn, start_iso, end_iso):
+    """Run the two grouped queries for one tax year."""
+    income = conn.execute(f"""
+        SELECT {_PERIOD_END_ISO} AS day,
+               SUM(gross_subcontractor_payment) AS total
         FROM payslips
-        WHERE date(substr(period_end, 7, 4) || '-' ||
-                   substr(period_end, 4, 2) || '-' ||
-                   substr(period_end, 1, 2))
-              BETWEEN ? AND ?
-    """
-    row = execute_query(query, (start_date, end_date), fetch_one=True)
-    if not row:
-        return 0.0
-    total = row['total'] if 'total' in row.keys() else row[0]
-    return round(float(total or 0), 2)
+        WHERE {_PERIOD_END_ISO} BETWEEN ? AND ?
+        GROUP BY day
+        ORDER BY day
+    """, (start_iso, end_iso)).fetchall()
+
+    expenses = conn.execute("""
+        SELECT e.date AS day, c.hmrc_box, SUM(e.amount) AS total
+        FROM expenses e
+        JOIN expense_categories c ON e.category_id = c.id
+        WHERE e.date BETWEEN ? AND ?
+        GROUP BY e.date, c.hmrc_box
+        ORDER BY e.date
+    """, (start_iso, end_iso)).fetchall()
+
+    return {
+        'income_days': tuple(row['day'] for row in income),
+        'income': tuple(float(row['total'] or 0) for row in income),
+        'expense_days': tuple(row['day'] for row in expenses),
+        'expenses': tuple((row['hmrc_box'], float(row['total'] or 0)) for row in expenses),
+    }
 
 
-def _expenses_between(start_date, end_date):
-    """Return the list of expense rows between two ISO dates (inclusive).
+def tax_year_aggregate(tax_year):
+    """Return the day-level income and expense totals for a whole tax year.
 
-    `ExpenseModel.get_expenses` already does a direct string comparison
-    on the YYYY-MM-DD `expenses.date` column, so we feed it the ISO
-    dates straight through.
+    Returns:
+        dict with parallel, day-sorted tuples ``income_days`` / ``income``
+        and ``expense_days`` / ``expenses`` (``(hmrc_box, amount)`` pairs).
+        Treat it as read-only: it is shared between callers.
     """
-    return ExpenseModel.get_expenses(start_date=start_date, end_date=end_date)
+    start = tax_year_start(tax_year)
+    start_iso = start.isoformat()
+    end_iso = date(start.year + 1, 4, 5).isoformat()
+
+    with get_db_connection() as conn:
+        # Read the versions before the data: if a write lands in between,
+        # the result is cached under the older versions and simply never
+        # matched again.
+        versions = get_versions(conn, *_SOURCE_TABLES)
+        key = (_db_module.DB_PATH, start.year, versions)
+        if versions is not None:
+            with _aggregate_lock:
+                cached = _aggregate_cache.get(key)
+                if cached is not None:
+                    _aggregate_cache.move_to_end(key)
+                    return cached
+
+        aggregate = _aggregate(conn, start_iso, end_iso)
+
+    if versions is not None:
+        with _aggregate_lock:
+            _aggregate_cache[key] = aggregate
+            while len(_aggregate_cache) > _AGGREGATE_CACHE_SIZE:
+                _aggregate_cache.popitem(last=False)
+    return aggregate
+
+
+def clear_aggregate_cache():
+    """Forget every memoised tax-year aggregate."""
+    with _aggregate_lock:
+        _aggregate_cache.clear()
+
+
+def _slice(days, start_iso, end_iso):
+    """Index range of ``days`` (sorted ISO strings) within start..end inclusive."""
+    return bisect_left(days, start_iso), bisect_right(days, end_iso)
+
+
+def _window_totals(aggregate, start_iso, end_iso):
+    """Return ``(turnover, [(hmrc_box, amount), ...])`` for a date window."""
+    lo, hi = _slice(aggregate['income_days'], start_iso, end_iso)
+    turnover = round(sum(aggregate['income'][lo:hi]), 2)
+    lo, hi = _slice(aggregate['expense_days'], start_iso, end_iso)
+    return turnover, aggregate['expenses'][lo:hi]
 
 
 def calculate_cumulative_totals(tax_year, period_end_date=None, period_id=None):
@@ -174,11 +254,11 @@ def calculate_cumulative_totals(tax_year, period_end_date=None, period_id=None):
     start_iso = start_date.isoformat()
     end_iso = end_date.isoformat()
 
-    turnover = _income_between(start_iso, end_iso)
-    expenses = _expenses_between(start_iso, end_iso)
-    expense_data = HMRCMapper.map_expenses_to_hmrc_format(expenses)
+    aggregate = tax_year_aggregate(tax_year)
+    turnover, box_totals = _window_totals(aggregate, start_iso, end_iso)
+    expense_data = HMRCMapper.map_box_totals_to_hmrc_format(box_totals)
 
-    breakdown = _per_quarter_breakdown(tax_year, end_date)
+    breakdown = _per_quarter_breakdown(tax_year, end_date, aggregate)
 
     submission = {
         'periodDates': {
@@ -213,7 +293,7 @@ def strip_meta(payload):
     return {k: v for k, v in payload.items() if k != 'meta'}
 
 
-def _per_quarter_breakdown(tax_year, end_date):
+def _per_quarter_breakdown(tax_year, end_date, aggregate):
     """Compute the per-quarter contribution up to ``end_date``.
 
     Used by the UI to show "previous quarters' contributions vs this
@@ -235,9 +315,8 @@ def _per_quarter_breakdown(tax_year, end_date):
 
         start_iso = window_start.isoformat()
         end_iso = window_end.isoformat()
-        income = _income_between(start_iso, end_iso)
-        expenses = _expenses_between(start_iso, end_iso)
-        expense_total = round(sum(float(e['amount']) for e in expenses), 2)
+        income, box_totals = _window_totals(aggregate, start_iso, end_iso)
+        expense_total = round(sum(amount for _, amount in box_totals), 2)
 
         breakdown.append({
             'period_id': qid,
@@ -0,0 +1,312 @@
+"""
+Shared HTTP plumbing for the HMRC MTD API client.
+
+``get_session()`` returns one pooled ``requests.Session`` per process, so
+consecutive HMRC calls reuse TLS connections instead of handshaking every
+time. The session retries connection failures and throttled responses
+with exponential backoff:
+
+- ``429 Too Many Requests`` is retried for every method, honouring HMRC's
+  ``Retry-After`` header. A throttled request was never processed, so
+  replaying a POST is safe.
+- ``502/503/504`` are only retried for idempotent methods (GET, PUT,
+  DELETE). A submission that timed out at the gateway may still have
+  landed, and the caller has to decide what to do about that.
+
+``ResponseCache`` is a short-TTL cache for idempotent GETs (business
+details, obligations, periods of account, calculation lists) that are
+read several times while rendering one page. The cache lives in each
+worker process, so writes are tracked in a shared counter: every
+POST/PUT/DELETE bumps the ``hmrc_writes`` row in ``data_versions`` and
+cache keys include its value, so a write made by one worker retires the
+cached reads of all of them. A read never returns data older than the
+last submission.
+
+``RateLimiter`` spaces calls per HMRC API so that concurrent reads issued
+by ``fan_out`` stay inside HMRC's per-API request rate instead of
+bouncing off 429s.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlite3
+
+import requests
+from flask import copy_current_request_context, current_app, has_app_context, has_request_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import Config
+from ..database import get_db_connection
+from .data_versions import bump_version, get_versions
+
+logger = logging.getLogger('hmrc')
+
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class HMRCRetry(Retry):
+    """urllib3 retry policy: throttling retried for any method, 5xx for idempotent ones."""
+
+    def __init__(self, *args, max_retry_after=30, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Upper bound on a single Retry-After wait so one page never stalls
+        # behind a long throttle window.
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+def build_retry(config: Config | None = None) -> HMRCRetry:
+    """Build the retry policy from ``HMRC_HTTP_*`` configuration."""
+    config = config or Config()
+    return HMRCRetry(
+        total=config.HMRC_HTTP_RETRIES,
+        connect=config.HMRC_HTTP_RETRIES,
+        read=0,
+        status=config.HMRC_HTTP_RETRIES,
+        backoff_factor=config.HMRC_HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        max_retry_after=config.HMRC_HTTP_MAX_RETRY_AFTER,
+    )
+
+
+def build_session(config: Config | None = None) -> requests.Session:
+    """Create a pooled session with the HMRC retry policy mounted."""
+    config = config or Config()
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=config.HMRC_HTTP_POOL_SIZE,
+        pool_maxsize=config.HMRC_HTTP_POOL_SIZE,
+        max_retries=build_retry(config),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide HMRC session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def reset_session():
+    """Close and drop the shared session (configuration changes, tests)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+# ---------------------------------------------------------------------------
+# GET response cache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """Thread-safe TTL cache of successful ``_make_request`` results."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(environment, endpoint, params=None, test_scenario=None, generation=None) -> tuple:
+        items = tuple(sorted((params or {}).items()))
+        return (environment, endpoint, items, test_scenario, generation)
+
+    def get(self, key):
+        """Return a copy of the cached result, or None if absent/expired."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            result = entry[1]
+        # Callers are free to mutate what they get back.
+        return copy.deepcopy(result)
+
+    def set(self, key, result):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+
+    def clear(self):
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+        if dropped:
+            logger.debug(f'HMRC GET cache cleared ({dropped} entries)')
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'ttl_seconds': self.ttl,
+            }
+
+
+response_cache = ResponseCache(ttl=Config.HMRC_GET_CACHE_TTL)
+
+WRITE_VERSION = 'hmrc_writes'
+
+
+def write_generation() -> int | None:
+    """Return the shared count of HMRC writes, for ``make_key``.
+
+    Returns None when it cannot be read; callers should not cache then,
+    since another worker's write would go unnoticed.
+    """
+    try:
+        with get_db_connection() as conn:
+            versions = get_versions(conn, WRITE_VERSION)
+    except sqlite3.Error as e:
+        logger.warning(f'Could not read the HMRC write counter: {e}')
+        return None
+    return versions[0] if versions else None
+
+
+def record_write():
+    """Retire cached reads in every worker after a POST/PUT/DELETE."""
+    response_cache.clear()
+    try:
+        with get_db_connection() as conn:
+            bump_version(conn, WRITE_VERSION)
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f'Could not bump the HMRC write counter: {e}')
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting and concurrent reads
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Per-key token bucket shared by every thread in the process.
+
+    ``acquire`` reserves a slot and sleeps until it is due, so callers are
+    released in order at no more than ``rate`` per second per key, after an
+    initial burst of ``burst``.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key) -> float:
+        """Wait for a slot on ``key``. Returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[key] = (tokens, now)
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+rate_limiter = RateLimiter(rate=Config.HMRC_RATE_LIMIT_PER_SECOND)
+
+
+def _with_flask_context(fn):
+    """Wrap ``fn`` to run inside a copy of the caller's Flask context.
+
+    Fraud prevention headers are built per request from the current request
+    and session, so worker threads need the originating request context.
+    """
+    if has_request_context():
+        return copy_current_request_context(fn)
+    if has_app_context():
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                return fn()
+        return run
+    return fn
+
+
+def fan_out(calls: dict, max_workers: int) -> dict:
+    """Run independent HMRC calls concurrently.
+
+    Args:
+        calls: ``{name: zero-argument callable}`` returning a
+            ``_make_request``-style result envelope.
+        max_workers: Upper bound on concurrent calls.
+
+    Returns:
+        ``{name: result}`` in the order of ``calls``. A call that raises is
+        reported as ``{'success': False, 'error': ...}`` rather than failing
+        the others.
+    """
+    if not calls:
+        return {}
+    workers = max(1, min(max_workers, len(calls)))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hmrc-fanout') as pool:
+        futures = {name: pool.submit(_with_flask_context(fn)) for name, fn in calls.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logger.error(f'HMRC fan-out call {name} failed: {e}', exc_info=True)
+            results[name] = {'success': False, 'error': str(e)}
+    logger.info(
+        f'HMRC fan-out: {len(calls)} calls on {workers} workers '
+        f'in {(time.perf_counter() - started) * 1000:.0f}ms'
+    )
+    return results
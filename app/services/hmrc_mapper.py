@@ -81,86 +81,117 @@ class HMRCMapper:
         
         return None
     
+    # HMRC API pre-TY 2023-24 expense fields (flat decimal values), in the
+    # order they are reported.
+    EXPENSE_FIELDS = (
+        'costOfGoodsBought',
+        'cisPaymentsToSubcontractors',
+        'staffCosts',
+        'travelCosts',
+        'premisesRunningCosts',
+        'maintenanceCosts',
+        'adminCosts',
+        'advertisingCosts',
+        'interest',
+        'financialCharges',
+        'badDebt',
+        'professionalFees',
+        'depreciation',
+        'other',
+    )
+
     @staticmethod
-    def map_expenses_to_hmrc_format(expenses):
+    def hmrc_field_for_box(hmrc_box):
         """
-        Map expenses to HMRC API format.
+        Map an expense category's HMRC box label to the API field name.
         
         Args:
-            expenses: List of expense records
+            hmrc_box: ``expense_categories.hmrc_box`` text (None means other)
             
         Returns:
-            dict: HMRC-formatted expense data
+            str: One of ``EXPENSE_FIELDS``
         """
-        # Initialize expense categories - Pre-TY 2023-24 format (flat decimal values)
-        # HMRC Self Employment Business API v5.0 for TY 2024-25 uses this format
-        expense_data = {
-            'costOfGoodsBought': 0,
-            'cisPaymentsToSubcontractors': 0,
-            'staffCosts': 0,
-            'travelCosts': 0,
-            'premisesRunningCosts': 0,
-            'maintenanceCosts': 0,
-            'adminCosts': 0,
-            'advertisingCosts': 0,
-            'interest': 0,
-            'financialCharges': 0,
-            'badDebt': 0,
-            'professionalFees': 0,
-            'depreciation': 0,
-            'other': 0
-        }
+        hmrc_box_lower = (hmrc_box or 'Other expenses').lower()  # Case-insensitive matching
         
-        # Map each expense to HMRC category
-        for expense in expenses:
-            amount = float(expense['amount'])
-            hmrc_box = expense.get('hmrc_box', 'Other expenses')
-            hmrc_box_lower = hmrc_box.lower()  # Case-insensitive matching
-            
-            # Debug logging to see actual category values
-            logger.debug(f'Mapping expense: amount={amount}, hmrc_box="{hmrc_box}", category="{expense.get("category_name", "Unknown")}"')
+        # IMPORTANT: Check 'admin' BEFORE 'advertis' to prevent mismatches
+        if 'cost of goods' in hmrc_box_lower or 'materials' in hmrc_box_lower:
+            return 'costOfGoodsBought'
+        elif 'cis' in hmrc_box_lower and 'payment' in hmrc_box_lower:
+            return 'cisPaymentsToSubcontractors'
+        elif 'staff' in hmrc_box_lower or 'wages' in hmrc_box_lower:
+            return 'staffCosts'
+        elif 'motor' in hmrc_box_lower or 'vehicle' in hmrc_box_lower or 'fuel' in hmrc_box_lower or 'travel' in hmrc_box_lower:
+            # Motor/vehicle/travel expenses → travelCosts
+            return 'travelCosts'
+        elif 'premises' in hmrc_box_lower:
+            return 'premisesRunningCosts'
+        elif 'maintenance' in hmrc_box_lower:
+            return 'maintenanceCosts'
+        elif 'admin' in hmrc_box_lower:
+            # Check admin BEFORE advertising to prevent "Admin" matching "Advertising"
+            return 'adminCosts'
+        elif 'advertis' in hmrc_box_lower:
+            return 'advertisingCosts'
+        elif 'interest' in hmrc_box_lower:
+            return 'interest'
+        elif 'financial' in hmrc_box_lower:
+            return 'financialCharges'
+        elif 'bad debt' in hmrc_box_lower or 'irrecoverable' in hmrc_box_lower:
+            return 'badDebt'
+        elif 'professional' in hmrc_box_lower or 'fees' in hmrc_box_lower:
+            return 'professionalFees'
+        elif 'depreciation' in hmrc_box_lower:
+            return 'depreciation'
+        return 'other'
+
+    @staticmethod
+    def map_box_totals_to_hmrc_format(box_totals):
+        """
+        Map pre-aggregated ``{hmrc_box: amount}`` totals to HMRC API format.
+        
+        Produces exactly what ``map_expenses_to_hmrc_format`` would for the
+        underlying expense rows, without needing the rows themselves.
+        
+        Args:
+            box_totals: Iterable of ``(hmrc_box, amount)`` pairs or a dict
             
-            # Map to HMRC API pre-TY 2023-24 field names (flat decimal values)
-            # IMPORTANT: Check 'admin' BEFORE 'advertis' to prevent mismatches
-            if 'cost of goods' in hmrc_box_lower or 'materials' in hmrc_box_lower:
-                expense_data['costOfGoodsBought'] += amount
-            elif 'cis' in hmrc_box_lower and 'payment' in hmrc_box_lower:
-                expense_data['cisPaymentsToSubcontractors'] += amount
-            elif 'staff' in hmrc_box_lower or 'wages' in hmrc_box_lower:
-                expense_data['staffCosts'] += amount
-            elif 'motor' in hmrc_box_lower or 'vehicle' in hmrc_box_lower or 'fuel' in hmrc_box_lower or 'travel' in hmrc_box_lower:
-                # Motor/vehicle/travel expenses → travelCosts
-                expense_data['travelCosts'] += amount
-            elif 'premises' in hmrc_box_lower:
-                expense_data['premisesRunningCosts'] += amount
-            elif 'maintenance' in hmrc_box_lower:
-                expense_data['maintenanceCosts'] += amount
-            elif 'admin' in hmrc_box_lower:
-                # Check admin BEFORE advertising to prevent "Admin" matching "Advertising"
-                expense_data['adminCosts'] += amount
-            elif 'advertis' in hmrc_box_lower:
-                expense_data['advertisingCosts'] += amount
-            elif 'interest' in hmrc_box_lower:
-                expense_data['interest'] += amount
-            elif 'financial' in hmrc_box_lower:
-                expense_data['financialCharges'] += amount
-            elif 'bad debt' in hmrc_box_lower or 'irrecoverable' in hmrc_box_lower:
-                expense_data['badDebt'] += amount
-            elif 'professional' in hmrc_box_lower or 'fees' in hmrc_box_lower:
-                expense_data['professionalFees'] += amount
-            elif 'depreciation' in hmrc_box_lower:
-                expense_data['depreciation'] += amount
-            else:
-                expense_data['other'] += amount
+        Returns:
+            dict: HMRC-formatted expense data (non-zero fields only)
+        """
+        if isinstance(box_totals, dict):
+            box_totals = box_totals.items()
+        
+        expense_data = dict.fromkeys(HMRCMapper.EXPENSE_FIELDS, 0)
+        for hmrc_box, amount in box_totals:
+            expense_data[HMRCMapper.hmrc_field_for_box(hmrc_box)] += float(amount)
         
         # Round all amounts to 2 decimal places
         for category in expense_data:
             expense_data[category] = round(expense_data[category], 2)
         
         # Only include expense fields with non-zero amounts
-        expense_data = {k: v for k, v in expense_data.items() if v > 0}
+        return {k: v for k, v in expense_data.items() if v > 0}
+    
+    @staticmethod
+    def map_expenses_to_hmrc_format(expenses):
+        """
+        Map expenses to HMRC API format.
+        
+        Args:
+            expenses: List of expense records
+            
+        Returns:
+            dict: HMRC-formatted expense data
+        """
+        # HMRC Self Employment Business API v5.0 for TY 2024-25 uses the
+        # pre-TY 2023-24 format (flat decimal values)
+        if logger.isEnabledFor(logging.DEBUG):
+            for expense in expenses:
+                logger.debug(f'Mapping expense: amount={expense["amount"]}, hmrc_box="{expense.get("hmrc_box")}", category="{expense.get("category_name", "Unknown")}"')
         
-        return expense_data
+        return HMRCMapper.map_box_totals_to_hmrc_format(
+            (expense.get('hmrc_box'), expense['amount']) for expense in expenses
+        )
     
     @staticmethod
     def get_income_for_period(start_date, end_date):
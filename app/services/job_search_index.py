@@ -0,0 +1,398 @@
+"""
+Full-text search index for jobs across run sheets and payslips.
+
+``job_search`` (migration 011) is an FTS5 table with one row per
+``run_sheet_jobs`` row and one row per ``job_items`` row. The rowid
+encodes where the entry came from (``id * 2`` for run sheets,
+``id * 2 + 1`` for payslips) so the sync triggers can maintain the index
+with rowid lookups only.
+
+The triggers are generated here rather than in the migration because
+the two source tables have different column names depending on whether
+they were created by the importers (``job_address``, ``client``,
+``job_type``) or by migration 001 (``location``, ``customer``). Each
+logical search field is resolved to whichever column actually exists.
+
+Routes call ``search_jobs`` and get back fully hydrated rows with a
+rank and an HTML-safe highlight snippet.
+"""
+
+from __future__ import annotations
+
+import html
+import logging
+import re
+import sqlite3
+from typing import Optional
+
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE_RUNSHEET = 'runsheet'
+SOURCE_PAYSLIP = 'payslip'
+
+INDEXED_FIELDS = ('job_number', 'customer', 'activity', 'address', 'postcode')
+
+# bm25 column weights, in INDEXED_FIELDS order. A hit on the job number
+# matters far more than a hit somewhere in the address.
+_BM25_WEIGHTS = '10.0, 4.0, 2.0, 1.0, 3.0'
+
+# Logical field -> candidate columns, most specific first.
+_FIELD_COLUMNS = {
+    SOURCE_RUNSHEET: {
+        'job_number': ('job_number',),
+        'customer': ('customer',),
+        'activity': ('activity',),
+        'address': ('job_address', 'location'),
+        'postcode': ('postcode',),
+    },
+    SOURCE_PAYSLIP: {
+        'job_number': ('job_number',),
+        'customer': ('client', 'customer'),
+        'activity': ('job_type', 'activity'),
+        'address': ('location',),
+        'postcode': ('postcode',),
+    },
+}
+
+# source -> (table, rowid offset)
+_SOURCE_TABLES = {
+    SOURCE_RUNSHEET: ('run_sheet_jobs', 0),
+    SOURCE_PAYSLIP: ('job_items', 1),
+}
+
+# Control characters never appear in job data, so they are safe
+# placeholders for the highlight markers until the text is escaped.
+_MARK_OPEN = '\x02'
+_MARK_CLOSE = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+MAX_PER_PAGE = 200
+
+# Above this many matches results are listed newest first instead of by
+# bm25 score (see search_jobs).
+RANKED_MATCH_LIMIT = 2000
+
+
+# ---------------------------------------------------------------------------
+# schema helpers
+# ---------------------------------------------------------------------------
+
+def _table_columns(conn, table: str) -> set:
+    """Return the column names of ``table`` (empty set if it is missing)."""
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _resolve(columns: set, candidates: tuple) -> Optional[str]:
+    """Return the first candidate column present in ``columns``."""
+    for name in candidates:
+        if name in columns:
+            return name
+    return None
+
+
+def _field_exprs(conn, source: str, alias: str) -> dict:
+    """Map each indexed field to ``alias.column`` or ``NULL`` for ``source``."""
+    table, _ = _SOURCE_TABLES[source]
+    columns = _table_columns(conn, table)
+    exprs = {}
+    for field, candidates in _FIELD_COLUMNS[source].items():
+        column = _resolve(columns, candidates)
+        exprs[field] = f'{alias}.{column}' if column else 'NULL'
+    return exprs
+
+
+def is_available(conn) -> bool:
+    """True when the ``job_search`` table exists (migration 011 applied)."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_search'"
+    ).fetchone()
+    return row is not None
+
+
+# ---------------------------------------------------------------------------
+# index maintenance
+# ---------------------------------------------------------------------------
+
+def install_triggers(conn) -> None:
+    """(Re)create the insert/update/delete sync triggers on both tables.
+
+    Update triggers only fire when an indexed column changes, so the
+    frequent status and pay updates on ``run_sheet_jobs`` cost nothing.
+    """
+    for source, (table, offset) in _SOURCE_TABLES.items():
+        columns = _table_columns(conn, table)
+        if not columns:
+            continue
+
+        new = _field_exprs(conn, source, 'new')
+        watched = [
+            column for column in (
+                _resolve(columns, candidates)
+                for candidates in _FIELD_COLUMNS[source].values()
+            ) if column
+        ]
+        values = ', '.join(new[field] for field in INDEXED_FIELDS)
+        insert_sql = (
+            f"INSERT INTO job_search (rowid, {', '.join(INDEXED_FIELDS)}, source) "
+            f"VALUES (new.id * 2 + {offset}, {values}, '{source}');"
+        )
+        delete_sql = f'DELETE FROM job_search WHERE rowid = old.id * 2 + {offset};'
+
+        for suffix in ('ai', 'ad', 'au'):
+            conn.execute(f'DROP TRIGGER IF EXISTS job_search_{table}_{suffix}')
+
+        conn.execute(
+            f'CREATE TRIGGER job_search_{table}_ai AFTER INSERT ON {table} '
+            f'BEGIN {insert_sql} END'
+        )
+        conn.execute(
+            f'CREATE TRIGGER job_search_{table}_ad AFTER DELETE ON {table} '
+            f'BEGIN {delete_sql} END'
+        )
+        conn.execute(
+            f"CREATE TRIGGER job_search_{table}_au AFTER UPDATE OF {', '.join(watched)} "
+            f'ON {table} BEGIN {delete_sql} {insert_sql} END'
+        )
+    conn.commit()
+
+
+def rebuild(conn) -> int:
+    """Repopulate ``job_search`` from both source tables. Returns row count."""
+    conn.execute('DELETE FROM job_search')
+    total = 0
+    for source, (table, offset) in _SOURCE_TABLES.items():
+        if not _table_columns(conn, table):
+            continue
+        exprs = _field_exprs(conn, source, 't')
+        values = ', '.join(exprs[field] for field in INDEXED_FIELDS)
+        cursor = conn.execute(
+            f"INSERT INTO job_search (rowid, {', '.join(INDEXED_FIELDS)}, source) "
+            f"SELECT t.id * 2 + {offset}, {values}, '{source}' FROM {table} t"
+        )
+        total += cursor.rowcount
+    conn.commit()
+    logger.info(f'Job search index rebuilt: {total} entries')
+    return total
+
+
+def _source_row_count(conn) -> int:
+    total = 0
+    for table, _ in _SOURCE_TABLES.values():
+        if _table_columns(conn, table):
+            total += conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    return total
+
+
+def ensure_search_index() -> bool:
+    """Install the sync triggers and back-fill the index if it has drifted.
+
+    Called once from ``create_app`` after migrations. Returns False when
+    the FTS table is not available (migration 011 not applied).
+    """
+    try:
+        with get_db_connection() as conn:
+            if not is_available(conn):
+                logger.warning('job_search table missing - full-text search disabled')
+                return False
+            install_triggers(conn)
+            indexed = conn.execute('SELECT COUNT(*) FROM job_search').fetchone()[0]
+            if indexed != _source_row_count(conn):
+                rebuild(conn)
+        return True
+    except sqlite3.Error as e:
+        logger.error(f'Failed to prepare job search index: {e}', exc_info=True)
+        return False
+
+
+# ---------------------------------------------------------------------------
+# querying
+# ---------------------------------------------------------------------------
+
+def build_match_query(text: str, field: Optional[str] = None) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query, or None if it has no terms.
+
+    Every word becomes a quoted prefix term (``"word"*``) and terms are
+    ANDed together, so ``"m1 1a"`` matches ``M1 1AA``. Quoting means FTS5
+    operators typed by the user are treated as plain text.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    if field:
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f'Unknown search field: {field}')
+        return f'{field} : ({terms})'
+    return terms
+
+
+def _safe_snippet(raw: Optional[str]) -> str:
+    """HTML-escape a snippet and turn the placeholder markers into <mark>."""
+    if not raw:
+        return ''
+    return (
+        html.escape(raw)
+        .replace(_MARK_OPEN, '<mark>')
+        .replace(_MARK_CLOSE, '</mark>')
+    )
+
+
+def _hydrate_runsheets(conn, ids: list) -> dict:
+    if not ids:
+        return {}
+    exprs = _field_exprs(conn, SOURCE_RUNSHEET, 'r')
+    placeholders = ','.join('?' * len(ids))
+    rows = conn.execute(f"""
+        SELECT r.id, r.date, {exprs['customer']} AS customer,
+               {exprs['address']} AS address, r.job_number,
+               {exprs['activity']} AS activity, {exprs['postcode']} AS postcode
+        FROM run_sheet_jobs r
+        WHERE r.id IN ({placeholders})
+    """, ids).fetchall()
+    return {row['id']: dict(row) for row in rows}
+
+
+def _hydrate_payslips(conn, ids: list) -> dict:
+    if not ids:
+        return {}
+    exprs = _field_exprs(conn, SOURCE_PAYSLIP, 'ji')
+    item_columns = _table_columns(conn, 'job_items')
+    payslip_columns = _table_columns(conn, 'payslips')
+    amount = _resolve(item_columns, ('amount', 'pay'))
+    extra = {
+        'amount': f'ji.{amount}' if amount else 'NULL',
+        'date': 'ji.date' if 'date' in item_columns else 'NULL',
+        'time': 'ji.time' if 'time' in item_columns else 'NULL',
+        'tax_year': 'p.tax_year' if 'tax_year' in payslip_columns else 'NULL',
+        'week_number': 'p.week_number' if 'week_number' in payslip_columns else 'NULL',
+    }
+    placeholders = ','.join('?' * len(ids))
+    rows = conn.execute(f"""
+        SELECT ji.id, {extra['tax_year']} AS tax_year,
+               {extra['week_number']} AS week_number, ji.job_number,
+               {exprs['customer']} AS client, {exprs['address']} AS location,
+               {exprs['activity']} AS job_type, {extra['amount']} AS amount,
+               {extra['date']} AS date, {extra['time']} AS time,
+               {exprs['postcode']} AS postcode
+        FROM job_items ji
+        LEFT JOIN payslips p ON ji.payslip_id = p.id
+        WHERE ji.id IN ({placeholders})
+    """, ids).fetchall()
+    return {row['id']: dict(row) for row in rows}
+
+
+def search_jobs(conn, text: str, source: Optional[str] = None,
+                field: Optional[str] = None, page: int = 1,
+                per_page: int = 50) -> dict:
+    """Ranked, paginated job search.
+
+    Args:
+        conn: Open database connection (row_factory = sqlite3.Row).
+        text: Free-text query; each word is matched as a prefix.
+        source: ``'runsheet'``, ``'payslip'`` or None for both.
+        field: Restrict matching to one of ``INDEXED_FIELDS``.
+        page: 1-based page number.
+        per_page: Page size, capped at ``MAX_PER_PAGE``.
+
+    Returns:
+        dict: ``{'results', 'page', 'per_page', 'total', 'has_more'}``.
+        Each result is the hydrated source row plus ``source``, ``rank``
+        and an HTML-safe ``snippet`` with matches wrapped in ``<mark>``.
+        Exact job number matches sort first, then bm25 rank, then the most
+        recently added rows. Very broad queries (more than
+        ``RANKED_MATCH_LIMIT`` matches) are unranked and newest first.
+    """
+    if source not in (None, SOURCE_RUNSHEET, SOURCE_PAYSLIP):
+        raise ValueError(f'Unknown search source: {source}')
+    page = max(1, int(page))
+    per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+
+    match = build_match_query(text, field)
+    if match is None:
+        return {'results': [], 'page': page, 'per_page': per_page,
+                'total': 0, 'has_more': False}
+
+    where = 'job_search MATCH ?'
+    params = [match]
+    if source:
+        # Filter on the rowid parity rather than the stored source column
+        # so FTS5 never has to read row content to apply it.
+        where += ' AND rowid % 2 = ?'
+        params.append(_SOURCE_TABLES[source][1])
+
+    # Counting matches is cheap (no row content or scoring involved) and
+    # gives the caller a total for the pager.
+    total = conn.execute(
+        f'SELECT COUNT(*) FROM job_search WHERE {where}', params,
+    ).fetchone()[0]
+    if total == 0 or (page - 1) * per_page >= total:
+        return {'results': [], 'page': page, 'per_page': per_page,
+                'total': total, 'has_more': False}
+
+    if total > RANKED_MATCH_LIMIT:
+        # The first keystrokes match thousands of rows that all score about
+        # the same. Scoring and sorting every one of them costs more than
+        # the LIKE scan this index replaced, so list newest first instead -
+        # FTS5 walks its rowids backwards without a sort.
+        score = 'NULL'
+        order = 'rowid DESC'
+    else:
+        score = f'bm25(job_search, {_BM25_WEIGHTS})'
+        order = 'score, rowid DESC'
+        if field == 'job_number':
+            order = '(job_number = ?) DESC, ' + order
+            params = params + [(text or '').strip()]
+
+    hits = conn.execute(f"""
+        SELECT rowid, {score} AS score
+        FROM job_search
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT ? OFFSET ?
+    """, params + [per_page, (page - 1) * per_page]).fetchall()
+
+    # Snippets are only built for the rows on this page, not for every
+    # match going into the sort. The unary + keeps SQLite from pushing the
+    # IN list into FTS5, which would re-read the full doclist of every
+    # prefix term once per rowid.
+    rowids = [hit['rowid'] for hit in hits]
+    snippets = dict(conn.execute(f"""
+        SELECT rowid, snippet(job_search, -1, ?, ?, '…', 10)
+        FROM job_search
+        WHERE job_search MATCH ? AND +rowid IN ({','.join('?' * len(rowids))})
+    """, [_MARK_OPEN, _MARK_CLOSE, match] + rowids).fetchall())
+
+    runsheets = _hydrate_runsheets(
+        conn, [rowid // 2 for rowid in rowids if rowid % 2 == 0]
+    )
+    payslips = _hydrate_payslips(
+        conn, [rowid // 2 for rowid in rowids if rowid % 2 == 1]
+    )
+
+    results = []
+    for hit in hits:
+        hit_source = SOURCE_PAYSLIP if hit['rowid'] % 2 else SOURCE_RUNSHEET
+        rows = payslips if hit_source == SOURCE_PAYSLIP else runsheets
+        row = rows.get(hit['rowid'] // 2)
+        if row is None:
+            # Index entry without a source row - only possible if the
+            # triggers were bypassed. Skip it rather than fail the search.
+            continue
+        row.update({
+            'source': hit_source,
+            'rank': hit['score'],
+            'snippet': _safe_snippet(snippets.get(hit['rowid'])),
+        })
+        results.append(row)
+
+    return {
+        'results': results,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_more': page * per_page < total,
+    }
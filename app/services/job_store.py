@@ -0,0 +1,91 @@
+"""
+Background job state shared by every process serving the database.
+
+Routes that start work in a background thread and let the browser poll
+for it (upload batches, runsheet reimport previews) keep their jobs in
+``background_jobs`` (migration 021) rather than in a module-level dict,
+which only the worker running the job could see. A job is a JSON
+``state`` document under ``(kind, job_id)`` plus an optional ``payload``
+that polls do not return. Only the newest ``keep`` jobs of each kind are
+kept.
+
+Only the thread running a job updates it, so :func:`update` reads and
+rewrites the document without further locking. :func:`claim` is the
+exception: it deletes the job, and only one caller can do that.
+"""
+
+from __future__ import annotations
+
+import json
+
+from ..database import get_db_connection
+
+
+def create(kind: str, job_id: str, state: dict, keep: int = 50):
+    """Store a new job and drop the oldest of its kind beyond ``keep``."""
+    with get_db_connection() as conn:
+        conn.execute(
+            'INSERT INTO background_jobs (kind, job_id, state) VALUES (?, ?, ?)',
+            (kind, job_id, json.dumps(state, default=str)),
+        )
+        conn.execute(
+            'DELETE FROM background_jobs WHERE kind = ? AND id NOT IN '
+            '(SELECT id FROM background_jobs WHERE kind = ? ORDER BY id DESC LIMIT ?)',
+            (kind, kind, keep),
+        )
+        conn.commit()
+
+
+def get(kind: str, job_id: str) -> dict | None:
+    """The job's state, or None if unknown (or dropped)."""
+    with get_db_connection() as conn:
+        row = conn.execute(
+            'SELECT state FROM background_jobs WHERE kind = ? AND job_id = ?', (kind, job_id)
+        ).fetchone()
+    return json.loads(row['state']) if row else None
+
+
+def update(kind: str, job_id: str, payload=None, **changes):
+    """Merge ``changes`` into the job's state, and store ``payload`` if given."""
+    if job_id is None:
+        return
+    with get_db_connection() as conn:
+        row = conn.execute(
+            'SELECT state FROM background_jobs WHERE kind = ? AND job_id = ?', (kind, job_id)
+        ).fetchone()
+        if row is None:
+            return
+        state = json.loads(row['state'])
+        state.update(changes)
+        conn.execute(
+            'UPDATE background_jobs SET state = ?, payload = COALESCE(?, payload), '
+            'updated_at = CURRENT_TIMESTAMP WHERE kind = ? AND job_id = ?',
+            (json.dumps(state, default=str),
+             None if payload is None else json.dumps(payload, default=str), kind, job_id),
+        )
+        conn.commit()
+
+
+def claim(kind: str, job_id: str, status: str = 'completed'):
+    """Take a job in ``status`` for use, deleting it so nobody else can.
+
+    Returns ``(state, payload)``: ``(None, None)`` for an unknown job (or
+    one another caller has just claimed), the state alone for a job in
+    some other status (left in place), else the claimed job's state and
+    payload.
+    """
+    with get_db_connection() as conn:
+        row = conn.execute(
+            'SELECT id, state, payload FROM background_jobs WHERE kind = ? AND job_id = ?',
+            (kind, job_id),
+        ).fetchone()
+        if row is None:
+            return None, None
+        state = json.loads(row['state'])
+        if state.get('status') != status:
+            return state, None
+        deleted = conn.execute('DELETE FROM background_jobs WHERE id = ?', (row['id'],)).rowcount
+        conn.commit()
+    if not deleted:
+        return None, None
+    return state, json.loads(row['payload']) if row['payload'] else None
@@ -0,0 +1,78 @@
+"""
+One-time copy of mileage entries from the legacy wages.db.
+
+MileageModel used to keep mileage_entries in its own
+data/database/wages.db. The table now lives in the app database
+(migration 019). :func:`import_legacy_mileage` copies the old entries
+across and records the copy in ``legacy_imports`` (migration 020);
+``prepare_database`` calls it on every start, and once the copy is
+recorded it does nothing but check for the row.
+
+Entries already in the app database for a date are kept.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from ..database import get_db_connection
+
+logger = logging.getLogger('app')
+
+LEGACY_DB = Path(__file__).resolve().parent.parent.parent / 'data' / 'database' / 'wages.db'
+IMPORT_NAME = 'wages_db_mileage'
+
+COLUMNS = ('date', 'start_mileage', 'end_mileage', 'total_miles', 'fuel_cost',
+           'notes', 'created_at', 'updated_at')
+
+
+def _legacy_rows(legacy_db) -> list[tuple]:
+    with sqlite3.connect(legacy_db) as legacy:
+        has_table = legacy.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mileage_entries'"
+        ).fetchone()
+        if not has_table:
+            return []
+        return legacy.execute(f"SELECT {', '.join(COLUMNS)} FROM mileage_entries").fetchall()
+
+
+def import_legacy_mileage(legacy_db=None, force: bool = False, dry_run: bool = False) -> int | None:
+    """Copy legacy mileage entries into the app database.
+
+    Returns the number of entries copied (or that would be, with
+    ``dry_run``), or None if there is no legacy database or it has
+    already been imported. ``force`` copies again regardless.
+    """
+    legacy_db = Path(legacy_db or LEGACY_DB)
+    if not legacy_db.exists():
+        return None
+
+    with get_db_connection() as conn:
+        if not force and conn.execute(
+            "SELECT 1 FROM legacy_imports WHERE name = ?", (IMPORT_NAME,)
+        ).fetchone():
+            return None
+
+        rows = _legacy_rows(legacy_db)
+        existing = {row[0] for row in conn.execute('SELECT date FROM mileage_entries')}
+        new_rows = [row for row in rows if row[0] not in existing]
+        if dry_run:
+            return len(new_rows)
+
+        conn.executemany(
+            f"INSERT INTO mileage_entries ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(COLUMNS))})",
+            new_rows,
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO legacy_imports (name, source, rows_imported, imported_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            (IMPORT_NAME, os.fspath(legacy_db), len(new_rows)),
+        )
+        conn.commit()
+
+    logger.info(f"Imported {len(new_rows)} of {len(rows)} mileage entries from {legacy_db}")
+    return len(new_rows)
@@ -1,15 +1,23 @@
 """
 Database migration runner for TVS Wages.
 Automatically applies SQL migrations on app startup.
+
+Once every migration has been applied, the number of migration files is
+stored as the database's ``PRAGMA user_version``. Startup compares that
+to the files on disk, so an up-to-date database costs one pragma read
+and no DDL.
 """
 
 import os
 import logging
+import re
 from pathlib import Path
 from ..database import get_db_connection
 
 logger = logging.getLogger('migration')
 
+_ADD_COLUMN_RE = re.compile(r'^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?:COLUMN\s+)?(\w+)', re.IGNORECASE)
+
 
 class MigrationRunner:
     """Handles database schema migrations."""
@@ -27,7 +35,6 @@ class MigrationRunner:
             migrations_dir = project_root / 'migrations'
         
         self.migrations_dir = Path(migrations_dir)
-        self._ensure_migrations_table()
     
     def _ensure_migrations_table(self):
         """Create migrations tracking table if it doesn't exist."""
@@ -61,14 +68,7 @@ class MigrationRunner:
         Returns:
             list: Sorted list of migration filenames to apply
         """
-        if not self.migrations_dir.exists():
-            logger.warning(f"Migrations directory not found: {self.migrations_dir}")
-            return []
-        
-        # Get all .sql files in migrations directory
-        all_migrations = sorted([
-            f.name for f in self.migrations_dir.glob('*.sql')
-        ])
+        all_migrations = self._get_migration_files()
         
         # Get already applied migrations
         applied = self._get_applied_migrations()
@@ -78,6 +78,42 @@ class MigrationRunner:
         
         return pending
     
+    def _get_migration_files(self):
+        """Sorted migration filenames on disk."""
+        if not self.migrations_dir.exists():
+            logger.warning(f"Migrations directory not found: {self.migrations_dir}")
+            return []
+        return sorted(f.name for f in self.migrations_dir.glob('*.sql'))
+    
+    def schema_is_current(self):
+        """True if the database's schema version matches the migration files."""
+        with get_db_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        return version > 0 and version == len(self._get_migration_files())
+    
+    def _set_schema_version(self):
+        """Record that every migration on disk has been applied."""
+        with get_db_connection() as conn:
+            conn.execute(f"PRAGMA user_version = {len(self._get_migration_files())}")
+    
+    @staticmethod
+    def _existing_column(cursor, statement):
+        """True if ``statement`` adds a column that is already there.
+        
+        Several columns were first added at runtime (by the importers or
+        by older app code), so a migration adding them must not fail on
+        databases that already have them.
+        """
+        sql = '\n'.join(
+            line for line in statement.splitlines() if not line.strip().startswith('--')
+        )
+        match = _ADD_COLUMN_RE.match(sql)
+        if not match:
+            return False
+        table, column = match.groups()
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        return column in columns
+    
     def _apply_migration(self, filename):
         """
         Apply a single migration file.
@@ -106,6 +142,9 @@ class MigrationRunner:
                 statements = [s.strip() for s in migration_sql.split(';') if s.strip()]
                 
                 for statement in statements:
+                    if self._existing_column(cursor, statement):
+                        logger.info(f"Column already exists, skipping: {statement.splitlines()[-1].strip()}")
+                        continue
                     cursor.execute(statement)
                 
                 # Record migration as applied
@@ -131,10 +170,16 @@ class MigrationRunner:
         Returns:
             tuple: (success: bool, applied_count: int)
         """
+        if self.schema_is_current():
+            logger.info("No pending migrations (schema version is current)")
+            return True, 0
+        
+        self._ensure_migrations_table()
         pending = self._get_pending_migrations()
         
         if not pending:
             logger.info("No pending migrations")
+            self._set_schema_version()
             return True, 0
         
         logger.info(f"Found {len(pending)} pending migration(s)")
@@ -149,6 +194,7 @@ class MigrationRunner:
             
             applied_count += 1
         
+        self._set_schema_version()
         logger.info(f"Successfully applied {applied_count} migration(s)")
         return True, applied_count
 
@@ -0,0 +1,180 @@
+"""
+Shared ReportLab rendering for the PDF reports.
+
+Everything a report needs that does not depend on the data is built
+once per process and reused:
+
+- :func:`sample_styles` - the ReportLab sample stylesheet.
+- :func:`paragraph_style` - named ``ParagraphStyle`` variants (footers,
+  metric cards, headings), cached by their attributes.
+- :func:`logo` - the TVS logo, read from disk once. A fresh ``Image``
+  flowable is returned per call because flowables hold layout state.
+- :func:`table_style` - ``TableStyle`` objects cached by their commands.
+
+:func:`data_tables` lays out long tables as a run of smaller tables of
+``CHUNK_ROWS`` rows, each repeating the header. ReportLab sizes and
+splits a table as one unit, so a year of jobs in a single ``Table``
+costs far more than the same rows in chunks.
+
+:func:`render` builds a story into a ``SpooledTemporaryFile`` (in memory
+up to ``SPOOL_MAX_BYTES``, then on disk) and :func:`send_pdf` streams it
+to the client, so a large report is never held as one bytes object.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+LOGO_PATH = Path(__file__).parent.parent.parent / 'static' / 'images' / 'logo.png'
+
+# Body rows per table in data_tables()
+CHUNK_ROWS = 200
+
+# Rendered PDFs stay in memory up to this size, then spill to a temp file
+SPOOL_MAX_BYTES = 2 * 1024 * 1024
+
+BRAND_TITLE = 'TVS - Technical Courier Management System'
+
+
+def require_reportlab():
+    if not REPORTLAB_AVAILABLE:
+        raise ImportError("ReportLab is required for PDF generation. Install with: pip install reportlab")
+
+
+@lru_cache(maxsize=None)
+def sample_styles():
+    """The ReportLab sample stylesheet. Shared - do not modify it."""
+    return getSampleStyleSheet()
+
+
+def _color(value):
+    if isinstance(value, tuple):
+        return [_color(part) for part in value] if any(isinstance(p, str) for p in value) else value
+    if isinstance(value, str) and value.startswith('#'):
+        return colors.HexColor(value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _paragraph_style(name, parent, attrs):
+    values = {key: _color(value) for key, value in attrs}
+    return ParagraphStyle(name, parent=sample_styles()[parent] if parent else None, **values)
+
+
+def paragraph_style(name, parent='Normal', **attrs):
+    """A ``ParagraphStyle`` based on a sample style, built once per set of attributes.
+
+    ``parent`` names a sample style (None for ReportLab's defaults).
+    Colours may be given as '#rrggbb' strings.
+    """
+    return _paragraph_style(name, parent, tuple(sorted(attrs.items())))
+
+
+@lru_cache(maxsize=None)
+def _logo_bytes():
+    try:
+        return LOGO_PATH.read_bytes()
+    except OSError:
+        return None
+
+
+def logo(width=40, height=40):
+    """A logo ``Image`` flowable, or None when there is no logo file."""
+    data = _logo_bytes()
+    if data is None:
+        return None
+    try:
+        return Image(BytesIO(data), width=width, height=height)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def table_style(commands):
+    """A ``TableStyle`` for a tuple of commands, built once per tuple.
+
+    Colours may be given as '#rrggbb' strings; ROWBACKGROUNDS takes a
+    tuple of them.
+    """
+    return TableStyle([tuple(_color(part) for part in command) for command in commands])
+
+
+def data_tables(header, rows, col_widths, commands, chunk_rows=CHUNK_ROWS):
+    """Lay out ``rows`` under ``header`` as tables of at most ``chunk_rows`` rows.
+
+    ``commands`` style each chunk as if it were the whole table (row 0 is
+    the header). Each chunk also repeats its header if it breaks across a
+    page. Returns a list of flowables, empty when there are no rows.
+    """
+    style = table_style(commands)
+    tables = []
+    for start in range(0, len(rows), chunk_rows):
+        table = Table([header] + rows[start:start + chunk_rows], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        tables.append(table)
+    return tables
+
+
+HEADER_COMMANDS = (
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('ALIGN', (-1, 0), (-1, 0), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+)
+
+
+def report_header(report_title, period_text, space_after=10):
+    """The standard TVS TCMS header: logo, branding and report period."""
+    normal = sample_styles()['Normal']
+    title = Paragraph(
+        f'<b><font size=14 color="#1a73e8">{BRAND_TITLE}</font></b><br/><font size=12>{report_title}</font>',
+        normal,
+    )
+    period = Paragraph(
+        f'<b>Period:</b> {period_text}<br/><b>Generated:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}',
+        normal,
+    )
+    logo_element = logo()
+    if logo_element:
+        header_table = Table([[logo_element, title, period]], colWidths=[0.6*inch, 4.4*inch, 3*inch])
+    else:
+        header_table = Table([[title, period]], colWidths=[5*inch, 3*inch])
+    header_table.setStyle(table_style(HEADER_COMMANDS))
+    return [header_table, Spacer(1, space_after)]
+
+
+def render(story, target=None, pagesize=None, **margins):
+    """Build ``story`` into a PDF.
+
+    ``target`` is a path to write to; without one the PDF goes to a
+    spooled temporary file, returned rewound and ready for
+    :func:`send_pdf`. ``margins`` are SimpleDocTemplate keyword arguments.
+    """
+    require_reportlab()
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) if target is None else str(target)
+    doc = SimpleDocTemplate(output, pagesize=pagesize or landscape(A4), **margins)
+    doc.build(story)
+    if target is None:
+        output.seek(0)
+    return output
+
+
+def send_pdf(spool, filename):
+    """Stream a rendered PDF as a download. The response closes the file."""
+    from flask import send_file
+
+    return send_file(spool, mimetype='application/pdf', as_attachment=True, download_name=filename)
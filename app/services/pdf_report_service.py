@@ -8,11 +8,12 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from . import pdf_engine
+
 try:
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
     from reportlab.lib.units import inch
     from reportlab.graphics.shapes import Drawing
     from reportlab.graphics.charts.linecharts import HorizontalLineChart
@@ -22,59 +23,77 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+HIGH_MILEAGE_TABLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), '#e74c3c'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), '#f5f5f5'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), '#f5f5dc'),
+    ('GRID', (0, 0), (-1, -1), 1, '#000000'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), ('#ffffff', '#f8f9fa')),
+)
+
+
 class MileagePDFReportService:
     """Service for generating professional mileage PDF reports."""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet() if REPORTLAB_AVAILABLE else None
+        self.styles = pdf_engine.sample_styles() if REPORTLAB_AVAILABLE else None
         self.setup_custom_styles()
     
     def setup_custom_styles(self):
-        """Setup custom paragraph styles for the reports."""
+        """Look up the report's paragraph styles (built once per process)."""
         if not REPORTLAB_AVAILABLE:
             return
             
         # Title style
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
+        self.title_style = pdf_engine.paragraph_style(
+            'CustomTitle', 'Heading1',
             fontSize=24,
             spaceAfter=30,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor='#2c3e50',
             alignment=1  # Center alignment
         )
         
         # Subtitle style
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=self.styles['Heading2'],
+        self.subtitle_style = pdf_engine.paragraph_style(
+            'CustomSubtitle', 'Heading2',
             fontSize=16,
             spaceAfter=20,
-            textColor=colors.HexColor('#34495e'),
+            textColor='#34495e',
             alignment=1
         )
         
         # Section header style
-        self.section_style = ParagraphStyle(
-            'SectionHeader',
-            parent=self.styles['Heading3'],
+        self.section_style = pdf_engine.paragraph_style(
+            'SectionHeader', 'Heading3',
             fontSize=14,
             spaceBefore=20,
             spaceAfter=10,
-            textColor=colors.HexColor('#2980b9'),
+            textColor='#2980b9',
             borderWidth=1,
-            borderColor=colors.HexColor('#3498db'),
+            borderColor='#3498db',
             borderPadding=5,
-            backColor=colors.HexColor('#ecf0f1')
+            backColor='#ecf0f1'
         )
         
         # Body text style
-        self.body_style = ParagraphStyle(
+        self.body_style = pdf_engine.paragraph_style(
             'CustomBody',
-            parent=self.styles['Normal'],
             fontSize=10,
             spaceAfter=6,
-            textColor=colors.HexColor('#2c3e50')
+            textColor='#2c3e50'
+        )
+        
+        # Footer and date lines
+        self.footer_style = pdf_engine.paragraph_style(
+            'Footer', fontSize=8, textColor=colors.grey, alignment=1
+        )
+        self.date_style = pdf_engine.paragraph_style(
+            'Date', fontSize=12, alignment=1, textColor=colors.grey
         )
     
     def create_monthly_mileage_pdf(self, data, filename=None):
@@ -97,10 +116,6 @@ class MileagePDFReportService:
             reports_dir.mkdir(exist_ok=True)
             filepath = reports_dir / filename
         
-        # Create PDF document
-        doc = SimpleDocTemplate(str(filepath), pagesize=A4, 
-                              rightMargin=72, leftMargin=72, 
-                              topMargin=72, bottomMargin=18)
         
         # Build content
         story = []
@@ -184,13 +199,11 @@ class MileagePDFReportService:
         
         # Footer
         story.append(Spacer(1, 30))
-        story.append(Paragraph("Report generated by TVS Mileage Tracking System", 
-                              ParagraphStyle('Footer', parent=self.styles['Normal'], 
-                                           fontSize=8, textColor=colors.grey, alignment=1)))
-        
-        # Build PDF
-        doc.build(story)
+        story.append(Paragraph("Report generated by TVS Mileage Tracking System", self.footer_style))
         
+        pdf_engine.render(story, filepath, pagesize=A4,
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=18)
         return str(filepath)
     
     def create_high_mileage_pdf(self, data, filename=None):
@@ -213,9 +226,6 @@ class MileagePDFReportService:
             reports_dir.mkdir(exist_ok=True)
             filepath = reports_dir / filename
         
-        doc = SimpleDocTemplate(str(filepath), pagesize=A4,
-                              rightMargin=72, leftMargin=72,
-                              topMargin=72, bottomMargin=18)
         
         story = []
         
@@ -223,8 +233,7 @@ class MileagePDFReportService:
         story.append(Paragraph("High Mileage Days Report", self.title_style))
         story.append(Paragraph("Days with 200+ Miles", self.subtitle_style))
         story.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y')}", 
-                              ParagraphStyle('Date', parent=self.styles['Normal'], 
-                                           fontSize=12, alignment=1, textColor=colors.grey)))
+                              self.date_style))
         story.append(Spacer(1, 20))
         
         if data:
@@ -270,30 +279,20 @@ class MileagePDFReportService:
                     f"£{row['cost_per_mile']:,.3f}"
                 ])
             
-            table = Table(table_data, colWidths=[1.5*inch, 1.2*inch, 1.3*inch, 1.3*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
-            ]))
-            story.append(table)
+            # One row per day: chunked, so a long history lays out quickly
+            story.extend(pdf_engine.data_tables(
+                table_data[0], table_data[1:], [1.5*inch, 1.2*inch, 1.3*inch, 1.3*inch], HIGH_MILEAGE_TABLE,
+            ))
         else:
             story.append(Paragraph("No high mileage days (200+ miles) found in the data.", self.body_style))
         
         # Footer
         story.append(Spacer(1, 30))
-        story.append(Paragraph("Report generated by TVS Mileage Tracking System", 
-                              ParagraphStyle('Footer', parent=self.styles['Normal'], 
-                                           fontSize=8, textColor=colors.grey, alignment=1)))
+        story.append(Paragraph("Report generated by TVS Mileage Tracking System", self.footer_style))
         
-        doc.build(story)
+        pdf_engine.render(story, filepath, pagesize=A4,
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=18)
         return str(filepath)
     
     def create_missing_data_pdf(self, missing_mileage, missing_fuel_cost, summary_stats, filename=None):
@@ -316,9 +315,6 @@ class MileagePDFReportService:
             reports_dir.mkdir(exist_ok=True)
             filepath = reports_dir / filename
         
-        doc = SimpleDocTemplate(str(filepath), pagesize=A4,
-                              rightMargin=72, leftMargin=72,
-                              topMargin=72, bottomMargin=18)
         
         story = []
         
@@ -326,8 +322,7 @@ class MileagePDFReportService:
         story.append(Paragraph("Missing Mileage Data Analysis", self.title_style))
         story.append(Paragraph("Data Quality Assessment Report", self.subtitle_style))
         story.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y')}", 
-                              ParagraphStyle('Date', parent=self.styles['Normal'], 
-                                           fontSize=12, alignment=1, textColor=colors.grey)))
+                              self.date_style))
         story.append(Spacer(1, 20))
         
         # Summary
@@ -429,9 +424,9 @@ class MileagePDFReportService:
         
         # Footer
         story.append(Spacer(1, 30))
-        story.append(Paragraph("Report generated by TVS Mileage Tracking System", 
-                              ParagraphStyle('Footer', parent=self.styles['Normal'], 
-                                           fontSize=8, textColor=colors.grey, alignment=1)))
+        story.append(Paragraph("Report generated by TVS Mileage Tracking System", self.footer_style))
         
-        doc.build(story)
+        pdf_engine.render(story, filepath, pagesize=A4,
+                          rightMargin=72, leftMargin=72,
+                          topMargin=72, bottomMargin=18)
         return str(filepath)
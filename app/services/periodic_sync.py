@@ -13,8 +13,6 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import schedule
-
 from .sync_helpers import (
     get_latest_runsheet_date,
     get_latest_payslip_week,
@@ -23,13 +21,33 @@ from .sync_helpers import (
     should_send_notification,
     format_sync_email
 )
+from .sync_scheduler import Scheduler, load_state, save_state
 from ..database import DB_PATH
+from ..utils.log_reader import RunTagFilter
 import os
 
+# Scheduler job names (rows in scheduler_jobs).
+JOB_DAILY = 'daily-sync'
+JOB_INTERVAL = 'interval-sync'
+JOB_RETRY = 'retry-sync'
+JOB_RESUME = 'auto-resume'
+JOB_NEW_DATA = 'new-data'
+
+# Key in scheduler_state for the progress flags below.
+STATE_KEY = 'periodic_sync'
+
+# Progress that survives restarts and is shared between workers.
+_PERSISTED_FIELDS = (
+    'last_check_date', 'last_runsheet_date_processed', 'last_payslip_week_processed',
+    'runsheet_completed_today', 'payslip_completed_this_week', 'sync_started_today',
+    'retry_count', 'last_error', 'is_paused', 'pause_until', 'last_sync_time',
+    'sync_history',
+)
+_DATETIME_FIELDS = ('pause_until', 'last_sync_time')
+
 class PeriodicSyncService:
     def __init__(self):
         self.is_running = False
-        self.sync_thread = None
         self.last_sync_time = None
         self.sync_interval_minutes = 15  # Sync every 15 minutes
         self.real_time_processing = False  # Disable file monitoring, use simple sync
@@ -80,7 +98,20 @@ class PeriodicSyncService:
         # Logger is configured centrally by app.logging_config._setup_periodic_sync_logger
         # which attaches a RotatingFileHandler. Just grab the named logger here.
         self.logger = logging.getLogger('periodic_sync')
-        
+        # Prefixes lines logged during a sync with "[run <id>]".
+        self.run_tags = RunTagFilter()
+        self.logger.addFilter(self.run_tags)
+        self.current_run_id = None
+
+        # Jobs run from the DB-backed scheduler; only the process holding
+        # its lease runs them (see app/services/sync_scheduler.py).
+        self.scheduler = Scheduler(STATE_KEY)
+        self.scheduler.register(JOB_DAILY, self._start_daily_sync)
+        self.scheduler.register(JOB_INTERVAL, self._interval_sync)
+        self.scheduler.register(JOB_RETRY, self.sync_latest)
+        self.scheduler.register(JOB_RESUME, self.resume_sync)
+        self.scheduler.register(JOB_NEW_DATA, self.sync_latest)
+
         # Load configuration from settings
         self._load_config()
     
@@ -112,6 +143,10 @@ class PeriodicSyncService:
             self.auto_sync_payslips_enabled = SettingsModel.get_setting('auto_sync_payslips_enabled') != 'false'
             
             self.logger.info(f"Config loaded: start={self.sync_start_time}, interval={self.sync_interval_minutes}min")
+
+            if self.is_running:
+                # The start time may have changed
+                self.scheduler.schedule_at(JOB_DAILY, self._next_daily_start(datetime.now()))
         except Exception as e:
             self.logger.warning(f"Could not load config, using defaults: {e}")
     
@@ -136,7 +171,14 @@ class PeriodicSyncService:
         self.is_running = True
         self.current_state = 'idle'
         self.logger.info(f"Starting periodic sync service ({self.sync_start_time} daily, then every {self.sync_interval_minutes} minutes until complete)")
-        
+
+        self.scheduler.open()
+        self._restore_state()
+        now = datetime.now()
+        if self.last_check_date != now.strftime('%Y-%m-%d'):
+            # Yesterday's flags; sync_latest resets the rest on its first run.
+            self.runsheet_completed_today = False
+
         # Check if tomorrow's runsheet already exists in database.
         # Runsheets are for the NEXT day, so if we have tomorrow's date or later, we're done.
         latest_runsheet = get_latest_runsheet_date()
@@ -144,60 +186,133 @@ class PeriodicSyncService:
             self.runsheet_completed_today = True
             self.logger.info(f"Latest runsheet ({latest_runsheet}) is tomorrow or later - marking as completed")
         elif latest_runsheet:
-            tomorrow_date = (datetime.now() + timedelta(days=1)).strftime('%d/%m/%Y')
+            tomorrow_date = (now + timedelta(days=1)).strftime('%d/%m/%Y')
             self.logger.info(f"Latest runsheet ({latest_runsheet}) is before tomorrow ({tomorrow_date}) - sync needed")
         else:
             self.logger.info("No runsheets in DB yet - sync needed")
-        
-        # Schedule daily sync at configured time
-        schedule.every().day.at(self.sync_start_time).do(self._start_daily_sync)
-        
-        # Schedule fixed 15-minute intervals from start time
-        start_hour = int(self.sync_start_time.split(':')[0])
-        start_minute = int(self.sync_start_time.split(':')[1])
-        
-        # Schedule every 15 minutes: 19:00, 19:15, 19:30, 19:45, 20:00, etc.
-        for minutes_offset in range(0, 24*60, self.sync_interval_minutes):  # Every 15 mins for 24 hours
-            sync_hour = (start_hour + (start_minute + minutes_offset) // 60) % 24
-            sync_minute = (start_minute + minutes_offset) % 60
-            sync_time = f"{sync_hour:02d}:{sync_minute:02d}"
-            schedule.every().day.at(sync_time).do(self.sync_latest).tag('interval-sync')
-        
+
+        # Daily cycle at the configured time.
+        self.scheduler.schedule_at(JOB_DAILY, self._next_daily_start(now))
+
+        # Started mid-cycle (after the start time, runsheet not in yet): keep
+        # polling on the interval grid. A pending time from before a restart
+        # is kept as it is.
+        start_today = self._start_time_on(now)
+        if (not self.runsheet_completed_today and now >= start_today
+                and self.scheduler.next_run(JOB_INTERVAL) is None):
+            self.scheduler.schedule_at(JOB_INTERVAL, self._next_interval_time(now))
+
+        self._save_state()
+        self.scheduler.start()
         self.logger.info(f"Scheduled sync every {self.sync_interval_minutes} minutes starting from {self.sync_start_time}")
-        
-        # Start the scheduler in a separate thread
-        self.sync_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self.sync_thread.start()
-    
+
+    def _start_time_on(self, day):
+        hour, minute = (int(part) for part in self.sync_start_time.split(':')[:2])
+        return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    def _next_daily_start(self, now):
+        """Next occurrence of the configured start time after ``now``."""
+        start = self._start_time_on(now)
+        return start if start > now else start + timedelta(days=1)
+
+    def _next_interval_time(self, now):
+        """Next point on the start-time + N-minute grid after ``now``."""
+        start = self._start_time_on(now)
+        if now < start:
+            return start
+        minutes_since_start = int((now - start).total_seconds() // 60)
+        intervals_passed = minutes_since_start // self.sync_interval_minutes
+        return start + timedelta(minutes=(intervals_passed + 1) * self.sync_interval_minutes)
+
     def _start_daily_sync(self):
         """Start daily sync at configured time - runs every N mins until runsheet processed."""
-        # Clear any existing interval jobs
-        schedule.clear('interval-sync')
-        
+        # Clear any existing interval job
+        self.scheduler.cancel(JOB_INTERVAL)
+        # Same time tomorrow
+        self.scheduler.schedule_at(JOB_DAILY, self._next_daily_start(datetime.now()))
+
         self.logger.info(f"{self.sync_start_time} - Starting daily sync cycle")
-        
+
         # Reset retry counter for new day
         self.retry_count = 0
         self.last_error = None
-        
+
         # Run the sync immediately
         self.sync_latest()
-        
-        # Schedule interval syncing every N minutes (will auto-stop when completed)
-        schedule.every(self.sync_interval_minutes).minutes.do(self.sync_latest).tag('interval-sync')
-    
+
+        # Interval syncing every N minutes (stops once the cycle completes)
+        self.scheduler.schedule_in(JOB_INTERVAL, minutes=self.sync_interval_minutes)
+
+    def _interval_sync(self):
+        """Interval job: sync, and come back in N minutes.
+
+        The next run is booked before syncing so that the completion and
+        new-day checks inside sync_latest() can cancel it.
+        """
+        self.scheduler.schedule_in(JOB_INTERVAL, minutes=self.sync_interval_minutes)
+        self.sync_latest()
+
+    def notify_new_data(self, source='upload'):
+        """Wake the scheduler because new files have arrived.
+
+        Runs a sync check straight away instead of at the next interval, so
+        an uploaded runsheet for tomorrow ends the evening's polling at once
+        and unprocessed files on disk are imported.
+        """
+        if not self.is_running:
+            return False
+        self.logger.info(f"New data signalled by {source} - running sync check now")
+        self.scheduler.schedule_at(JOB_NEW_DATA, datetime.now())
+        return True
+
     def stop_periodic_sync(self):
-        """Stop the periodic sync service."""
+        """Stop the periodic sync service.
+
+        Scheduled job times are kept in the database, so the schedule resumes
+        on the next start.
+        """
         self.is_running = False
-        schedule.clear()
+        self.scheduler.stop()
         self.logger.info("Periodic sync service stopped")
-    
-    def _run_scheduler(self):
-        """Run the scheduler loop."""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-    
+
+    # ------------------------------------------------------------------
+    # Persisted state
+    # ------------------------------------------------------------------
+
+    def _save_state(self):
+        """Write the progress flags to scheduler_state (once the scheduler is open)."""
+        if not self.scheduler.active:
+            return
+        state = {}
+        for field in _PERSISTED_FIELDS:
+            value = getattr(self, field)
+            if field in _DATETIME_FIELDS and value is not None:
+                value = value.isoformat()
+            state[field] = value
+        try:
+            save_state(STATE_KEY, state)
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not save sync state: {e}")
+
+    def _restore_state(self):
+        """Load the progress flags saved by this or another process."""
+        if not self.scheduler.active:
+            return
+        try:
+            state = load_state(STATE_KEY)
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not load sync state: {e}")
+            return
+        if not state:
+            return
+        for field in _PERSISTED_FIELDS:
+            if field not in state:
+                continue
+            value = state[field]
+            if field in _DATETIME_FIELDS and value is not None:
+                value = datetime.fromisoformat(value)
+            setattr(self, field, value)
+
     def pause_sync(self, duration_minutes=None):
         """Pause auto-sync temporarily."""
         self.is_paused = True
@@ -206,19 +321,20 @@ class PeriodicSyncService:
         if duration_minutes:
             self.pause_until = datetime.now() + timedelta(minutes=duration_minutes)
             self.logger.info(f"Sync paused for {duration_minutes} minutes until {self.pause_until.strftime('%H:%M')}")
-            # Note: auto-resume is handled inside sync_latest() which checks
-            # `datetime.now() >= self.pause_until` on every scheduler tick (~1 min).
-            # The `schedule` library has no `once()` API, so do not try to schedule one here.
+            self.scheduler.schedule_at(JOB_RESUME, self.pause_until)
         else:
             self.pause_until = None
+            self.scheduler.cancel(JOB_RESUME)
             self.logger.info("Sync paused indefinitely")
+        self._save_state()
     
     def resume_sync(self):
         """Resume auto-sync."""
         self.is_paused = False
         self.pause_until = None
         self.current_state = 'idle'
-        schedule.clear('auto-resume')
+        self.scheduler.cancel(JOB_RESUME)
+        self._save_state()
         self.logger.info("Sync resumed")
         return True
     
@@ -261,7 +377,9 @@ class PeriodicSyncService:
     
     def sync_latest(self, dry_run=False):
         """Intelligent sync - only downloads and processes NEW files."""
-        
+        # Pick up pause/progress changes made through another worker.
+        self._restore_state()
+
         # Check if paused
         if self.is_paused:
             if self.pause_until and datetime.now() >= self.pause_until:
@@ -290,7 +408,7 @@ class PeriodicSyncService:
             self.sync_started_today = False
             
             # Stop any running interval syncs from yesterday
-            schedule.clear('interval-sync')
+            self.scheduler.cancel(JOB_INTERVAL)
             self.logger.info(f"Cleared interval syncs - waiting for {self.sync_start_time} to start new cycle")
         
         # Reset payslip tracking on Tuesdays (start of new week)
@@ -303,30 +421,17 @@ class PeriodicSyncService:
         # Check if we've already processed tomorrow's runsheet
         # Runsheets arrive in the evening for the NEXT day
         # So we should check: have we processed tomorrow's runsheet yet?
-        tomorrow = (now + timedelta(days=1)).strftime('%d-%m-%Y')
-        latest_runsheet = get_latest_runsheet_date()
-        
-        if latest_runsheet:
-            # Convert latest runsheet date to comparable format (handle both / and - separators)
-            separator = '/' if '/' in latest_runsheet else '-'
-            latest_parts = latest_runsheet.split(separator)
-            latest_comparable = f"{latest_parts[2]}{latest_parts[1]}{latest_parts[0]}"
-            
-            tomorrow_parts = tomorrow.split('-')
-            tomorrow_comparable = f"{tomorrow_parts[2]}{tomorrow_parts[1]}{tomorrow_parts[0]}"
-            
-            # If we already have tomorrow's runsheet, we're done until tomorrow evening
-            if latest_comparable >= tomorrow_comparable:
-                self.logger.info(f"Already have tomorrow's runsheet ({latest_runsheet}) - stopping sync until tomorrow evening")
-                schedule.clear('interval-sync')
-                return
-            else:
-                self.logger.info(f"Latest runsheet is {latest_runsheet}, still need tomorrow's ({tomorrow})")
-        else:
-            self.logger.info("No runsheets in database yet")
-        
-        # Clear any existing retry jobs to prevent multiple simultaneous syncs
-        schedule.clear('retry-sync')
+        # The flag is persisted, so once tomorrow's runsheet has been seen
+        # the interval ticks don't query the database again.
+        if self.runsheet_completed_today or self._have_tomorrows_runsheet(now):
+            self.logger.info("Already have tomorrow's runsheet - stopping sync until tomorrow evening")
+            self.scheduler.cancel(JOB_INTERVAL)
+            self.current_state = 'completed'
+            self._save_state()
+            return
+
+        # Clear any pending retry to prevent multiple simultaneous syncs
+        self.scheduler.cancel(JOB_RETRY)
         
         sync_summary = {
             'runsheets_downloaded': 0,
@@ -337,6 +442,9 @@ class PeriodicSyncService:
             'errors': []
         }
         
+        self.current_run_id = self.run_tags.start()
+        sync_summary['run_id'] = self.current_run_id
+
         try:
             self._sync_start_time = datetime.now()
             self.logger.info("Starting intelligent sync - checking for new files")
@@ -675,35 +783,46 @@ class PeriodicSyncService:
             # Ensure state is reset if not explicitly set to completed
             if self.current_state == 'running':
                 self.current_state = 'idle'
+            self.run_tags.stop()
+            self.current_run_id = None
+            self._save_state()
     
+    def _have_tomorrows_runsheet(self, now):
+        """True if the latest runsheet in the DB is dated tomorrow or later."""
+        tomorrow = (now + timedelta(days=1)).strftime('%d-%m-%Y')
+        latest_runsheet = get_latest_runsheet_date()
+        if not latest_runsheet:
+            self.logger.info("No runsheets in database yet")
+            return False
+
+        # Convert latest runsheet date to comparable format (handle both / and - separators)
+        separator = '/' if '/' in latest_runsheet else '-'
+        latest_parts = latest_runsheet.split(separator)
+        latest_comparable = f"{latest_parts[2]}{latest_parts[1]}{latest_parts[0]}"
+
+        tomorrow_parts = tomorrow.split('-')
+        tomorrow_comparable = f"{tomorrow_parts[2]}{tomorrow_parts[1]}{tomorrow_parts[0]}"
+
+        if latest_comparable >= tomorrow_comparable:
+            return True
+        self.logger.info(f"Latest runsheet is {latest_runsheet}, still need tomorrow's ({tomorrow})")
+        return False
+
     def _check_completion_and_stop(self, sync_summary):
         """Check if sync is complete and should stop running until next scheduled time."""
         now = datetime.now()
-        tomorrow = (now + timedelta(days=1)).strftime('%d-%m-%Y')
         
         # Check if we successfully got tomorrow's runsheet
-        if self.runsheet_completed_today:
-            latest_runsheet = get_latest_runsheet_date()
-            if latest_runsheet:
-                # Convert latest runsheet date to comparable format
-                separator = '/' if '/' in latest_runsheet else '-'
-                latest_parts = latest_runsheet.split(separator)
-                latest_comparable = f"{latest_parts[2]}{latest_parts[1]}{latest_parts[0]}"
-                
-                tomorrow_parts = tomorrow.split('-')
-                tomorrow_comparable = f"{tomorrow_parts[2]}{tomorrow_parts[1]}{tomorrow_parts[0]}"
-                
-                # If we have tomorrow's runsheet, stop interval syncing
-                if latest_comparable >= tomorrow_comparable:
-                    self.logger.info(f"✅ SUCCESS: Got tomorrow's runsheet ({latest_runsheet}) - stopping interval sync until next day")
-                    schedule.clear('interval-sync')
-                    self.current_state = 'completed'
-                    return True
+        if self.runsheet_completed_today and self._have_tomorrows_runsheet(now):
+            self.logger.info("✅ SUCCESS: Got tomorrow's runsheet - stopping interval sync until next day")
+            self.scheduler.cancel(JOB_INTERVAL)
+            self.current_state = 'completed'
+            return True
         
         # Check if we successfully got this week's payslip (Tuesday only)
         if now.weekday() == 1 and self.payslip_completed_this_week:  # Tuesday
             self.logger.info(f"✅ SUCCESS: Got this week's payslip - stopping interval sync until runsheet time")
-            schedule.clear('interval-sync')
+            self.scheduler.cancel(JOB_INTERVAL)
             self.current_state = 'completed'
             return True
         
@@ -903,7 +1022,7 @@ class PeriodicSyncService:
             delay = self.retry_delays[self.retry_count]
             self.retry_count += 1
             self.logger.info(f"Scheduling retry {self.retry_count}/{self.max_retries} in {delay} minutes for {operation}")
-            schedule.every(delay).minutes.do(self.sync_latest).tag('retry-sync')
+            self.scheduler.schedule_in(JOB_RETRY, minutes=delay)
         else:
             self.logger.error(f"Max retries ({self.max_retries}) reached for {operation}")
             self.retry_count = 0
@@ -938,6 +1057,7 @@ class PeriodicSyncService:
         """Add sync result to history (keep last 7 days)."""
         history_entry = {
             'timestamp': datetime.now().isoformat(),
+            'run_id': sync_summary.get('run_id'),
             'runsheets': sync_summary['runsheets_downloaded'],
             'payslips': sync_summary['payslips_downloaded'],
             'errors': len(sync_summary['errors']),
@@ -951,12 +1071,16 @@ class PeriodicSyncService:
     
     def get_sync_status(self):
         """Get current sync status for API."""
+        if self.scheduler.active and not self.scheduler.is_leader:
+            # Another worker runs the jobs; report its progress.
+            self._restore_state()
         next_sync = self._estimate_next_sync()
         return {
             'is_running': self.is_running,
             'is_paused': self.is_paused,
             'pause_until': self.pause_until.isoformat() if self.pause_until else None,
             'current_state': self.current_state,
+            'current_run_id': self.current_run_id,
             'last_sync_time': self.last_sync_time.isoformat() if self.last_sync_time else None,
             'sync_interval_minutes': self.sync_interval_minutes,
             'sync_start_time': self.sync_start_time,
@@ -969,7 +1093,9 @@ class PeriodicSyncService:
             'auto_sync_runsheets_enabled': self.auto_sync_runsheets_enabled,
             'auto_sync_payslips_enabled': self.auto_sync_payslips_enabled,
             'latest_runsheet_date': get_latest_runsheet_date(),
-            'latest_payslip_week': get_latest_payslip_week()
+            'latest_payslip_week': get_latest_payslip_week(),
+            'scheduler_leader': self.scheduler.is_leader,
+            'scheduled_jobs': self.scheduler.jobs_status(),
         }
     
     def _get_unprocessed_runsheets(self):
@@ -1006,56 +1132,12 @@ class PeriodicSyncService:
         return unprocessed
     
     def _estimate_next_sync(self):
-        """Estimate when the next sync will occur."""
+        """Return when the next sync will run, from the scheduler's job table."""
         try:
             if not self.is_running:
                 return None
-            
-            # Check if we already have tomorrow's runsheet
-            now = datetime.now()
-            tomorrow = (now + timedelta(days=1)).strftime('%d-%m-%Y')
-            latest_runsheet = get_latest_runsheet_date()
-            
-            if latest_runsheet:
-                # Convert dates to comparable format (handle both / and - separators)
-                separator = '/' if '/' in latest_runsheet else '-'
-                latest_parts = latest_runsheet.split(separator)
-                latest_comparable = f"{latest_parts[2]}{latest_parts[1]}{latest_parts[0]}"
-                
-                tomorrow_parts = tomorrow.split('-')
-                tomorrow_comparable = f"{tomorrow_parts[2]}{tomorrow_parts[1]}{tomorrow_parts[0]}"
-                
-                # If we already have tomorrow's runsheet, next sync is tomorrow at start time
-                if latest_comparable >= tomorrow_comparable:
-                    tomorrow_date = now + timedelta(days=1)
-                    start_time_parts = self.sync_start_time.split(':')
-                    next_sync = tomorrow_date.replace(
-                        hour=int(start_time_parts[0]),
-                        minute=int(start_time_parts[1]),
-                        second=0,
-                        microsecond=0
-                    )
-                    return next_sync.isoformat()
-            
-            # Otherwise, calculate next sync on fixed 15-minute intervals from start time
-            start_time_parts = self.sync_start_time.split(':')
-            start_hour = int(start_time_parts[0])
-            start_minute = int(start_time_parts[1])
-            
-            # Calculate minutes since start time today
-            start_time_today = now.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
-            
-            if now < start_time_today:
-                # Before start time today, next sync is at start time
-                next_sync = start_time_today
-            else:
-                # Past start time, find next 15-minute interval
-                minutes_since_start = int((now - start_time_today).total_seconds() / 60)
-                intervals_passed = minutes_since_start // self.sync_interval_minutes
-                next_interval_minutes = (intervals_passed + 1) * self.sync_interval_minutes
-                next_sync = start_time_today + timedelta(minutes=next_interval_minutes)
-            
-            return next_sync.isoformat()
+            next_sync = self.scheduler.next_run(JOB_NEW_DATA, JOB_RETRY, JOB_INTERVAL, JOB_DAILY)
+            return next_sync.isoformat() if next_sync else None
         except Exception as e:
             self.logger.error(f"Error estimating next sync: {e}")
             return None
@@ -0,0 +1,342 @@
+"""
+Background PDF report rendering with an on-disk result cache.
+
+Each PDF report registers a renderer under a report type (see
+:func:`register`). A request for a report becomes a job keyed by
+``(report type, parameters, data versions)``: the ``data_versions``
+counters of the tables the report reads (services/data_versions.py) are
+part of the key, so a rendered PDF stays valid until one of those tables
+changes and is never served after that.
+
+- A key whose PDF is already in the cache completes at once, without
+  touching the renderer.
+- Otherwise the job runs on a small thread pool (``REPORT_WORKERS``).
+  Concurrent requests for the same key share one job.
+- Finished PDFs are written to the cache directory (``REPORT_CACHE_DIR``,
+  by default ``report_cache/`` beside the database) under their key, via
+  a temp file and rename. Every process serving the database shares
+  them.
+- Job state is kept in memory and written beside the PDF as
+  ``<job_id>.json``, so a poll or download that reaches another worker
+  than the one running the job is answered from the file (and a cached
+  PDF with no state file still downloads).
+- After each render, :func:`evict` removes PDFs older than
+  ``REPORT_CACHE_MAX_AGE_DAYS`` and then the least recently used ones
+  until the cache is under ``REPORT_CACHE_MAX_MB``. A cache hit refreshes
+  the file's mtime.
+
+The synchronous PDF routes call :func:`send_report`, which waits up to
+``REPORT_WAIT_SECONDS`` for the job. The /api/reports/jobs routes submit
+a job and poll it instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from flask import current_app, has_app_context, jsonify, send_file
+
+from .. import database as _db_module
+from ..config import Config
+from ..database import get_db_connection
+from .data_versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+class ReportType(NamedTuple):
+    tables: tuple
+    render: Callable
+    filename: Callable
+
+
+_reports: dict[str, ReportType] = {}
+
+# Job state by key (oldest dropped first); the PDFs themselves live on disk
+MAX_REPORT_JOBS = 100
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register(report_type, tables, render, filename):
+    """Register a PDF report.
+
+    Args:
+        tables: Tables the report reads; their data versions key the cache.
+        render: ``render(params)`` returning the path of a rendered PDF
+            (moved into the cache) or a file object holding one (copied
+            and closed).
+        filename: ``filename(params)`` returning the download name.
+    """
+    _reports[report_type] = ReportType(tuple(tables), render, filename)
+
+
+def cache_dir() -> Path:
+    path = Path(Config.REPORT_CACHE_DIR or os.path.join(
+        os.path.dirname(os.path.abspath(_db_module.DB_PATH)), 'report_cache'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, Config.REPORT_WORKERS), thread_name_prefix='report')
+        return _executor
+
+
+def _job_key(report_type, report, params):
+    """Cache key for a report, or None when data versions are unavailable."""
+    with get_db_connection() as conn:
+        versions = get_versions(conn, *report.tables)
+    if versions is None:
+        return None
+    payload = json.dumps(
+        [os.path.abspath(_db_module.DB_PATH), report_type, params, versions],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _snapshot(job):
+    return {key: value for key, value in job.items() if not key.startswith('_')}
+
+
+def _state_path(job_id):
+    return cache_dir() / f'{job_id}.json'
+
+
+def _save(job):
+    """Write a job's state beside its PDF for the other processes."""
+    path = _state_path(job['job_id'])
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        tmp.write_text(json.dumps(_snapshot(job), default=str))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f'Could not save report job state {job["job_id"]}: {e}')
+
+
+def _load(job_id):
+    """Job state saved by any process, or None."""
+    if not job_id.isalnum():
+        return None
+    try:
+        return json.loads(_state_path(job_id).read_text())
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f'Unreadable report job state {job_id}: {e}')
+    path = result_path(job_id)
+    if path is None:
+        return None
+    return {
+        'job_id': job_id, 'report_type': None, 'params': {}, 'status': 'completed',
+        'cached': True, 'created_at': None, 'finished_at': None, 'size': path.stat().st_size,
+        'render_ms': None, 'error': None, 'filename': f'report_{job_id[:8]}.pdf',
+    }
+
+
+def _update(job_id, **changes):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(changes)
+            _save(job)
+
+
+def _remember(job):
+    _jobs[job['job_id']] = job
+    _jobs.move_to_end(job['job_id'])
+    while len(_jobs) > MAX_REPORT_JOBS:
+        _jobs.popitem(last=False)
+    _save(job)
+
+
+def submit(report_type, params=None):
+    """Start (or reuse) the job for a report. Returns a snapshot of the job.
+
+    Raises:
+        ValueError: for an unknown report type.
+    """
+    report = _reports.get(report_type)
+    if report is None:
+        raise ValueError(f'Unknown report type: {report_type}')
+    params = params or {}
+
+    key = _job_key(report_type, report, params)
+    job_id = key or hashlib.sha256(os.urandom(16)).hexdigest()[:32]
+    path = cache_dir() / f'{job_id}.pdf'
+    now = datetime.now().isoformat()
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None and job['status'] in ('queued', 'running'):
+            return _snapshot(job)
+        if key and path.exists():
+            os.utime(path)
+            job = {
+                'job_id': job_id, 'report_type': report_type, 'params': params,
+                'status': 'completed', 'cached': True, 'created_at': now, 'finished_at': now,
+                'size': path.stat().st_size, 'render_ms': 0, 'error': None,
+                'filename': report.filename(params),
+            }
+            _remember(job)
+            return _snapshot(job)
+
+        job = {
+            'job_id': job_id, 'report_type': report_type, 'params': params,
+            'status': 'queued', 'cached': False, 'created_at': now, 'finished_at': None,
+            'size': None, 'render_ms': None, 'error': None,
+            'filename': report.filename(params),
+        }
+        _remember(job)
+        app = current_app._get_current_object() if has_app_context() else None
+        job['_future'] = _pool().submit(_run, job_id, report, params, path, app)
+        return _snapshot(job)
+
+
+def _run(job_id, report, params, path, app=None):
+    if app is not None:
+        with app.app_context():
+            return _run(job_id, report, params, path)
+
+    _update(job_id, status='running')
+    started = time.perf_counter()
+    tmp = path.with_name(f'{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        result = report.render(params)
+        if isinstance(result, (str, os.PathLike)):
+            shutil.move(os.fspath(result), tmp)
+        else:
+            with result, open(tmp, 'wb') as out:
+                shutil.copyfileobj(result, out)
+        os.replace(tmp, path)
+        render_ms = round((time.perf_counter() - started) * 1000)
+        _update(job_id, status='completed', size=path.stat().st_size, render_ms=render_ms,
+                finished_at=datetime.now().isoformat())
+        logger.info(f'Rendered {job_id} ({path.stat().st_size} bytes) in {render_ms}ms')
+    except Exception as e:
+        logger.error(f'Report job {job_id} failed: {e}', exc_info=True)
+        _update(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return
+    try:
+        evict()
+    except OSError as e:
+        logger.warning(f'Report cache eviction failed: {e}')
+
+
+def get_job(job_id):
+    """Snapshot of a job, or None if unknown (or expired).
+
+    Jobs started by another process are read from their state file.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return _snapshot(job)
+    return _load(job_id)
+
+
+def wait(job_id, timeout=None):
+    """Wait for a job to finish. Returns its snapshot (still running on timeout)."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        future = job.get('_future') if job is not None else None
+    if future is not None:
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeout:
+            pass
+    return get_job(job_id)
+
+
+def result_path(job_id):
+    """Path of a job's cached PDF, or None if it is not (or no longer) cached."""
+    if not job_id.isalnum():
+        return None
+    path = cache_dir() / f'{job_id}.pdf'
+    return path if path.exists() else None
+
+
+def send_job_pdf(job):
+    path = result_path(job['job_id'])
+    if path is None:
+        return jsonify({'success': False, 'error': 'Report is no longer cached - request it again'}), 404
+    return send_file(path, mimetype='application/pdf', as_attachment=True, download_name=job['filename'])
+
+
+def send_report(report_type, params=None):
+    """Render (or reuse) a report and send it as a download.
+
+    Waits up to REPORT_WAIT_SECONDS; a longer render answers 202 with the
+    job to poll at /api/reports/jobs/<job_id>.
+
+    Raises:
+        RuntimeError: if the render failed.
+    """
+    job = submit(report_type, params)
+    if job['status'] != 'completed':
+        job = wait(job['job_id'], timeout=Config.REPORT_WAIT_SECONDS)
+    if job['status'] == 'failed':
+        raise RuntimeError(job['error'])
+    if job['status'] != 'completed':
+        return jsonify({'success': True, **job}), 202
+    return send_job_pdf(job)
+
+
+def evict(max_bytes=None, max_age_seconds=None):
+    """Drop cached PDFs past the age limit, then the least recently used over the size limit.
+
+    Returns the number of files removed.
+    """
+    if max_bytes is None:
+        max_bytes = Config.REPORT_CACHE_MAX_MB * 1024 * 1024
+    if max_age_seconds is None:
+        max_age_seconds = Config.REPORT_CACHE_MAX_AGE_DAYS * 86400
+
+    now = time.time()
+    entries = []
+    removed = 0
+    for path in cache_dir().iterdir():
+        if path.suffix not in ('.pdf', '.json', '.tmp'):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > max_age_seconds:
+            path.unlink(missing_ok=True)
+            removed += 1
+        elif path.suffix == '.pdf':
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        path.with_suffix('.json').unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,304 @@
+"""
+In-memory request metrics.
+
+The request middleware calls :func:`record_request` once per response.
+The aggregator keeps the following per endpoint (``"<METHOD> <endpoint>"``):
+
+- request count and status-code counts;
+- a latency histogram from which p50/p95/p99 are estimated;
+- total, maximum and per-request DB time (seconds spent in SQLite calls,
+  measured by ``app.database``).
+
+The histogram buckets grow geometrically (about 12% per bucket), so
+memory per endpoint is fixed however many requests are recorded, and a
+percentile estimate is within a bucket's width of the true value.
+
+Each gunicorn worker only sees its own requests, so the process-wide
+aggregator also writes its raw counters to ``request_metrics``
+(migration 022) at most every ``SNAPSHOT_INTERVAL`` seconds, and
+:meth:`RequestMetrics.snapshot` merges the rows of every worker still
+running. Other workers' figures can therefore be a few seconds old, and
+a worker's figures go when it exits. :meth:`RequestMetrics.reset` clears
+every worker: the others drop their counters on their next write, so
+requests they served in the seconds after a reset may be left out.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from ..database import get_db_connection
+from .data_versions import bump_version, get_versions
+
+logger = logging.getLogger(__name__)
+
+# Seconds between writes of a worker's counters to the shared table.
+SNAPSHOT_INTERVAL = 5.0
+
+# data_versions counter moved by every reset, so other workers see it.
+RESET_VERSION = 'request_metrics_reset'
+
+
+# Bucket upper bounds in milliseconds: 0.5ms .. ~120s, ~12% apart.
+_BUCKET_GROWTH = 1.12
+_BUCKET_BOUNDS = []
+_bound = 0.5
+while _bound < 120_000:
+    _BUCKET_BOUNDS.append(round(_bound, 3))
+    _bound *= _BUCKET_GROWTH
+del _bound
+
+PERCENTILES = (50, 95, 99)
+
+
+class _EndpointStats:
+    """Counters for one endpoint. Mutated only under the aggregator lock."""
+
+    __slots__ = ('count', 'statuses', 'buckets', 'total_ms', 'max_ms', 'db_ms', 'db_max_ms')
+
+    def __init__(self):
+        self.count = 0
+        self.statuses = {}
+        # One extra bucket for anything slower than the last bound.
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_ms = 0.0
+        self.db_max_ms = 0.0
+
+    def add(self, status_code, duration_ms, db_ms):
+        self.count += 1
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        self.buckets[bisect_left(_BUCKET_BOUNDS, duration_ms)] += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.db_ms += db_ms
+        self.db_max_ms = max(self.db_max_ms, db_ms)
+
+    def state(self):
+        """The raw counters, as stored in ``request_metrics``."""
+        return {
+            'count': self.count,
+            'statuses': {str(code): n for code, n in self.statuses.items()},
+            'buckets': self.buckets,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms,
+            'db_ms': self.db_ms,
+            'db_max_ms': self.db_max_ms,
+        }
+
+    def merge(self, state):
+        """Add another worker's counters (see :meth:`state`)."""
+        self.count += state['count']
+        for code, n in state['statuses'].items():
+            self.statuses[int(code)] = self.statuses.get(int(code), 0) + n
+        self.buckets = [a + b for a, b in zip(self.buckets, state['buckets'])]
+        self.total_ms += state['total_ms']
+        self.max_ms = max(self.max_ms, state['max_ms'])
+        self.db_ms += state['db_ms']
+        self.db_max_ms = max(self.db_max_ms, state['db_max_ms'])
+
+    def percentile(self, pct):
+        """Estimate a latency percentile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100.0
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            if not n:
+                continue
+            if seen + n >= rank:
+                lower = _BUCKET_BOUNDS[index - 1] if index else 0.0
+                upper = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return round(min(estimate, self.max_ms), 2)
+            seen += n
+        return round(self.max_ms, 2)
+
+    def to_dict(self):
+        result = {
+            'count': self.count,
+            'status_counts': {str(code): n for code, n in sorted(self.statuses.items())},
+            'errors': sum(n for code, n in self.statuses.items() if code >= 500),
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'db_total_ms': round(self.db_ms, 2),
+            'db_mean_ms': round(self.db_ms / self.count, 2) if self.count else 0.0,
+            'db_max_ms': round(self.db_max_ms, 2),
+        }
+        for pct in PERCENTILES:
+            result[f'p{pct}_ms'] = self.percentile(pct)
+        return result
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint request aggregator.
+
+    With ``shared=True`` the counters are also written to the
+    ``request_metrics`` table and :meth:`snapshot` covers every worker.
+    """
+
+    def __init__(self, shared=False, interval=SNAPSHOT_INTERVAL):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._started = time.time()
+        self.shared = shared
+        self.interval = interval
+        self._next_save = 0.0
+        self._reset_version = None
+
+    @staticmethod
+    def _pid():
+        return os.getpid()
+
+    def record(self, endpoint, method, status_code, duration_ms, db_ms=0.0):
+        key = f'{method} {endpoint}'
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats()
+            stats.add(status_code, duration_ms, db_ms)
+            save = self.shared and time.monotonic() >= self._next_save
+            if save:
+                self._next_save = time.monotonic() + self.interval
+        if save:
+            self.save()
+
+    def save(self):
+        """Write this worker's counters to ``request_metrics``.
+
+        Returns False if the table could not be written. Counters recorded
+        before another worker's reset are dropped first.
+        """
+        try:
+            with get_db_connection() as conn:
+                versions = get_versions(conn, RESET_VERSION)
+                if versions is None:
+                    return False
+                with self._lock:
+                    if self._reset_version is not None and versions[0] != self._reset_version:
+                        self._endpoints.clear()
+                        self._started = time.time()
+                    self._reset_version = versions[0]
+                    endpoints = {key: stats.state() for key, stats in self._endpoints.items()}
+                    started = self._started
+                conn.execute(
+                    'INSERT INTO request_metrics (pid, started, endpoints) VALUES (?, ?, ?) '
+                    'ON CONFLICT(pid) DO UPDATE SET started = excluded.started, '
+                    'endpoints = excluded.endpoints, updated_at = CURRENT_TIMESTAMP',
+                    (self._pid(), started, json.dumps(endpoints)),
+                )
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.debug(f'Failed to save request metrics: {e}')
+            return False
+
+    def _load_workers(self):
+        """Merge the saved counters of every running worker.
+
+        Returns ``(endpoints, started, pids)``, or None if the table cannot
+        be read. Rows left by exited workers are deleted.
+        """
+        if not self.save():
+            return None
+        try:
+            with get_db_connection() as conn:
+                rows = conn.execute('SELECT pid, started, endpoints FROM request_metrics').fetchall()
+                dead = [row['pid'] for row in rows if not _pid_alive(row['pid'])]
+                if dead:
+                    conn.executemany('DELETE FROM request_metrics WHERE pid = ?', [(pid,) for pid in dead])
+                    conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f'Failed to load request metrics: {e}')
+            return None
+        endpoints = {}
+        rows = [row for row in rows if row['pid'] not in dead]
+        for row in rows:
+            for key, state in json.loads(row['endpoints']).items():
+                endpoints.setdefault(key, _EndpointStats()).merge(state)
+        started = min((row['started'] for row in rows), default=self._started)
+        return endpoints, started, sorted(row['pid'] for row in rows)
+
+    def snapshot(self, sort='p95_ms', limit=None):
+        """Return the aggregated figures, slowest endpoints first.
+
+        Covers every running worker when shared (and the table is
+        readable), otherwise this process only; ``workers`` lists the
+        process ids included.
+
+        Args:
+            sort: Key of the per-endpoint dict to sort by (descending).
+            limit: Return at most this many endpoints.
+        """
+        merged = self._load_workers() if self.shared else None
+        if merged is None:
+            with self._lock:
+                endpoints = [
+                    {'endpoint': key, **stats.to_dict()}
+                    for key, stats in self._endpoints.items()
+                ]
+                started = self._started
+            workers = [self._pid()]
+        else:
+            stats_by_key, started, workers = merged
+            endpoints = [{'endpoint': key, **stats.to_dict()} for key, stats in stats_by_key.items()]
+        if endpoints and not isinstance(endpoints[0].get(sort), (int, float)):
+            sort = 'p95_ms'
+        endpoints.sort(key=lambda e: e[sort], reverse=True)
+        total = sum(e['count'] for e in endpoints)
+        if limit:
+            endpoints = endpoints[:limit]
+        return {
+            'since': started,
+            'uptime_seconds': round(time.time() - started, 1),
+            'total_requests': total,
+            'workers': workers,
+            'endpoints': endpoints,
+        }
+
+    def reset(self):
+        """Clear the counters, in every worker when shared."""
+        with self._lock:
+            self._endpoints.clear()
+            self._started = time.time()
+        if not self.shared:
+            return
+        try:
+            with get_db_connection() as conn:
+                bump_version(conn, RESET_VERSION)
+                conn.execute('DELETE FROM request_metrics')
+                conn.commit()
+                versions = get_versions(conn, RESET_VERSION)
+            with self._lock:
+                self._reset_version = versions[0] if versions else None
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to reset shared request metrics: {e}')
+
+
+request_metrics = RequestMetrics(shared=True)
+
+
+def record_request(endpoint, method, status_code, duration_ms, db_ms=0.0):
+    """Add one completed request to the process-wide aggregator."""
+    try:
+        request_metrics.record(endpoint, method, status_code, duration_ms, db_ms)
+    except Exception as e:
+        # Metrics must never break a response.
+        logger.debug(f'Failed to record request metrics: {e}')
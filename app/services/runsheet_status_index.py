@@ -0,0 +1,195 @@
+"""
+Per-date run sheet status index.
+
+``runsheet_day_status`` (migration 012) holds one pre-aggregated row per
+run sheet date: job counts, actioned jobs, pay totals, mileage, whether
+the day is marked absent in attendance, and the calendar status
+(``completed`` / ``in_progress`` / ``not_started``).
+
+Rows are recomputed by SQLite triggers whenever a job, the day's
+mileage/fuel entry or an attendance record for that date changes. Using
+triggers rather than Python hooks means every writer is covered - the
+model methods, the routes that update ``run_sheet_jobs`` directly, and
+the importer scripts that run in their own process. Each refresh only
+touches the rows for one date, which the ``run_sheet_jobs(date, ...)``
+index makes cheap.
+
+The pay columns on ``run_sheet_jobs`` are added at runtime by the
+payslip sync, so the trigger bodies are generated from the live schema.
+``ensure_day_status_index`` reinstalls them (and back-fills the table)
+whenever the generated SQL no longer matches what is in the database.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_COMPLETED = 'completed'
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_NOT_STARTED = 'not_started'
+
+_COLUMNS = (
+    'date', 'sort_date', 'year', 'month', 'week_of_year', 'weekday',
+    'total_jobs', 'jobs_with_actions', 'jobs_with_pay', 'daily_pay',
+    'customers', 'activities', 'mileage', 'fuel_cost', 'has_mileage',
+    'is_absent', 'status', 'updated_at',
+)
+
+# Columns of run_sheet_jobs whose changes can alter a day's row.
+_WATCHED_JOB_COLUMNS = ('date', 'status', 'customer', 'activity', 'pay_amount')
+
+
+def _table_columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _aggregate_select(job_columns: set, where: str) -> str:
+    """SELECT producing ``runsheet_day_status`` rows for the dates in ``where``."""
+    iso = "substr(r.date, 7, 4) || '-' || substr(r.date, 4, 2) || '-' || substr(r.date, 1, 2)"
+    actioned = "COUNT(CASE WHEN r.status IS NOT NULL AND r.status != 'pending' THEN 1 END)"
+    if 'pay_amount' in job_columns:
+        jobs_with_pay = 'COUNT(r.pay_amount)'
+        daily_pay = 'ROUND(SUM(r.pay_amount), 2)'
+    else:
+        jobs_with_pay = '0'
+        daily_pay = 'NULL'
+    return f"""
+        SELECT
+            r.date,
+            {iso},
+            substr(r.date, 7, 4),
+            substr(r.date, 4, 2),
+            CAST(strftime('%U', {iso}) AS INTEGER),
+            CAST(strftime('%w', {iso}) AS INTEGER),
+            COUNT(*),
+            {actioned},
+            {jobs_with_pay},
+            {daily_pay},
+            GROUP_CONCAT(DISTINCT r.customer),
+            GROUP_CONCAT(DISTINCT r.activity),
+            d.mileage,
+            d.fuel_cost,
+            d.mileage IS NOT NULL,
+            EXISTS (SELECT 1 FROM attendance a WHERE a.date = r.date),
+            CASE
+                WHEN {actioned} = COUNT(*) AND d.mileage IS NOT NULL THEN '{STATUS_COMPLETED}'
+                WHEN {actioned} > 0 OR d.mileage IS NOT NULL THEN '{STATUS_IN_PROGRESS}'
+                ELSE '{STATUS_NOT_STARTED}'
+            END,
+            CURRENT_TIMESTAMP
+        FROM run_sheet_jobs r
+        LEFT JOIN runsheet_daily_data d ON d.date = r.date
+        WHERE {where}
+        GROUP BY r.date
+    """
+
+
+def _refresh_statements(job_columns: set, date_expr: str) -> str:
+    """Trigger body statements that recompute the row for ``date_expr``."""
+    select = _aggregate_select(job_columns, f'r.date = {date_expr}')
+    return (
+        f'DELETE FROM runsheet_day_status WHERE date = {date_expr}; '
+        f"INSERT INTO runsheet_day_status ({', '.join(_COLUMNS)}) {select};"
+    )
+
+
+def _trigger_definitions(conn) -> dict:
+    """Return ``{trigger_name: CREATE TRIGGER sql}`` for the live schema."""
+    job_columns = _table_columns(conn, 'run_sheet_jobs')
+    watched = [c for c in _WATCHED_JOB_COLUMNS if c in job_columns]
+    changed = ' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in watched)
+
+    def refresh(*date_exprs):
+        return ' '.join(_refresh_statements(job_columns, expr) for expr in date_exprs)
+
+    triggers = {
+        'runsheet_day_status_jobs_ai':
+            f'CREATE TRIGGER runsheet_day_status_jobs_ai AFTER INSERT ON run_sheet_jobs '
+            f'BEGIN {refresh("NEW.date")} END',
+        'runsheet_day_status_jobs_ad':
+            f'CREATE TRIGGER runsheet_day_status_jobs_ad AFTER DELETE ON run_sheet_jobs '
+            f'BEGIN {refresh("OLD.date")} END',
+        # Bulk pay syncs rewrite pay_amount on every matched job, mostly to
+        # the same value, so only refresh when a watched value really moved.
+        'runsheet_day_status_jobs_au':
+            f"CREATE TRIGGER runsheet_day_status_jobs_au AFTER UPDATE OF {', '.join(watched)} "
+            f'ON run_sheet_jobs WHEN {changed} '
+            f'BEGIN {refresh("OLD.date", "NEW.date")} END',
+    }
+    # Mileage/fuel and attendance only change the matching date's row.
+    for table, short in (('runsheet_daily_data', 'daily'), ('attendance', 'attendance')):
+        triggers[f'runsheet_day_status_{short}_ai'] = (
+            f'CREATE TRIGGER runsheet_day_status_{short}_ai AFTER INSERT ON {table} '
+            f'BEGIN {refresh("NEW.date")} END'
+        )
+        triggers[f'runsheet_day_status_{short}_ad'] = (
+            f'CREATE TRIGGER runsheet_day_status_{short}_ad AFTER DELETE ON {table} '
+            f'BEGIN {refresh("OLD.date")} END'
+        )
+        triggers[f'runsheet_day_status_{short}_au'] = (
+            f'CREATE TRIGGER runsheet_day_status_{short}_au AFTER UPDATE ON {table} '
+            f'BEGIN {refresh("OLD.date", "NEW.date")} END'
+        )
+    return triggers
+
+
+def install_triggers(conn) -> bool:
+    """Create or replace the sync triggers. Returns True if any changed."""
+    existing = {
+        row[0]: row[1] for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE 'runsheet_day_status_%'"
+        )
+    }
+    wanted = _trigger_definitions(conn)
+    changed = False
+    for name, sql in wanted.items():
+        if existing.get(name) == sql:
+            continue
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(sql)
+        changed = True
+    conn.commit()
+    return changed
+
+
+def rebuild(conn) -> int:
+    """Recompute every row of ``runsheet_day_status``. Returns the row count."""
+    job_columns = _table_columns(conn, 'run_sheet_jobs')
+    conn.execute('DELETE FROM runsheet_day_status')
+    cursor = conn.execute(
+        f"INSERT INTO runsheet_day_status ({', '.join(_COLUMNS)}) "
+        + _aggregate_select(job_columns, 'r.date IS NOT NULL')
+    )
+    conn.commit()
+    logger.info(f'Runsheet day status rebuilt: {cursor.rowcount} dates')
+    return cursor.rowcount
+
+
+def ensure_day_status_index() -> bool:
+    """Install the triggers and back-fill if the schema or data has drifted.
+
+    Called once from ``create_app`` after migrations.
+    """
+    try:
+        with get_db_connection() as conn:
+            if not _table_columns(conn, 'runsheet_day_status'):
+                logger.warning('runsheet_day_status table missing - run migrations')
+                return False
+            changed = install_triggers(conn)
+            indexed = conn.execute('SELECT COUNT(*) FROM runsheet_day_status').fetchone()[0]
+            dates = conn.execute(
+                'SELECT COUNT(DISTINCT date) FROM run_sheet_jobs WHERE date IS NOT NULL'
+            ).fetchone()[0]
+            if changed or indexed != dates:
+                rebuild(conn)
+        return True
+    except sqlite3.Error as e:
+        logger.error(f'Failed to prepare runsheet day status index: {e}', exc_info=True)
+        return False
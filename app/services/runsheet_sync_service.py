@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from app.database import get_db_connection
+from app.services import table_stats
 
 logger = logging.getLogger(__name__)
 
@@ -23,147 +24,112 @@ class RunsheetSyncService:
         Sync payslip data to runsheets after payslip processing.
         Updates pay information only - addresses now handled by improved parsers.
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            logger.info("Syncing payslip data to runsheets...")
-            
-            # Add pay columns if they don't exist (for new installations)
-            pay_columns = [
-                "pay_amount REAL",
-                "pay_rate REAL", 
-                "pay_units REAL",
-                "pay_week INTEGER",
-                "pay_year TEXT",
-                "pay_updated_at TIMESTAMP"
-            ]
-            
-            for column in pay_columns:
-                try:
-                    cursor.execute(f"ALTER TABLE run_sheet_jobs ADD COLUMN {column}")
-                except:
-                    pass  # Column already exists
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
             
-            # Update runsheet jobs with payslip pay data
-            cursor.execute("""
-                UPDATE run_sheet_jobs 
-                SET 
-                    pay_amount = (
-                        SELECT j.amount 
-                        FROM job_items j 
-                        JOIN payslips p ON j.payslip_id = p.id
-                        WHERE j.job_number = run_sheet_jobs.job_number
-                        LIMIT 1
-                    ),
-                    pay_rate = (
-                        SELECT j.rate 
-                        FROM job_items j 
-                        JOIN payslips p ON j.payslip_id = p.id
-                        WHERE j.job_number = run_sheet_jobs.job_number
-                        LIMIT 1
-                    ),
-                    pay_units = (
-                        SELECT j.units 
-                        FROM job_items j 
-                        JOIN payslips p ON j.payslip_id = p.id
-                        WHERE j.job_number = run_sheet_jobs.job_number
-                        LIMIT 1
-                    ),
-                    pay_week = (
-                        SELECT p.week_number 
-                        FROM job_items j 
-                        JOIN payslips p ON j.payslip_id = p.id
+            try:
+                logger.info("Syncing payslip data to runsheets...")
+                
+                # Update runsheet jobs with payslip pay data
+                cursor.execute("""
+                    UPDATE run_sheet_jobs 
+                    SET 
+                        pay_amount = (
+                            SELECT j.amount 
+                            FROM job_items j 
+                            JOIN payslips p ON j.payslip_id = p.id
+                            WHERE j.job_number = run_sheet_jobs.job_number
+                            LIMIT 1
+                        ),
+                        pay_rate = (
+                            SELECT j.rate 
+                            FROM job_items j 
+                            JOIN payslips p ON j.payslip_id = p.id
+                            WHERE j.job_number = run_sheet_jobs.job_number
+                            LIMIT 1
+                        ),
+                        pay_units = (
+                            SELECT j.units 
+                            FROM job_items j 
+                            JOIN payslips p ON j.payslip_id = p.id
+                            WHERE j.job_number = run_sheet_jobs.job_number
+                            LIMIT 1
+                        ),
+                        pay_week = (
+                            SELECT p.week_number 
+                            FROM job_items j 
+                            JOIN payslips p ON j.payslip_id = p.id
+                            WHERE j.job_number = run_sheet_jobs.job_number
+                            LIMIT 1
+                        ),
+                        pay_year = (
+                            SELECT p.tax_year 
+                            FROM job_items j 
+                            JOIN payslips p ON j.payslip_id = p.id
+                            WHERE j.job_number = run_sheet_jobs.job_number
+                            LIMIT 1
+                        ),
+                        pay_updated_at = CURRENT_TIMESTAMP
+                    WHERE run_sheet_jobs.job_number IS NOT NULL
+                    AND EXISTS (
+                        SELECT 1 FROM job_items j 
                         WHERE j.job_number = run_sheet_jobs.job_number
-                        LIMIT 1
-                    ),
-                    pay_year = (
-                        SELECT p.tax_year 
-                        FROM job_items j 
-                        JOIN payslips p ON j.payslip_id = p.id
-                        WHERE j.job_number = run_sheet_jobs.job_number
-                        LIMIT 1
-                    ),
-                    pay_updated_at = CURRENT_TIMESTAMP
-                WHERE run_sheet_jobs.job_number IS NOT NULL
-                AND EXISTS (
-                    SELECT 1 FROM job_items j 
-                    WHERE j.job_number = run_sheet_jobs.job_number
-                )
-            """)
-            
-            pay_updated_count = cursor.rowcount
-            
-            # Note: Address and customer updating removed - now handled by improved parsers
-            # Only sync pay data, let the runsheet parsers handle address extraction
-            address_updated_count = 0
-            conn.commit()
-            
-            # Log results
-            if pay_updated_count > 0:
-                logger.info(f"Updated {pay_updated_count} runsheet jobs with pay information")
-            
-            # Address updates now handled by improved parsers during import
-            if pay_updated_count == 0:
-                logger.info("All runsheet pay data is already up to date")
+                    )
+                """)
+                
+                pay_updated_count = cursor.rowcount
+                
+                # Note: Address and customer updating removed - now handled by improved parsers
+                # Only sync pay data, let the runsheet parsers handle address extraction
+                address_updated_count = 0
+                conn.commit()
+                
+                # Log results
+                if pay_updated_count > 0:
+                    logger.info(f"Updated {pay_updated_count} runsheet jobs with pay information")
+                
+                # Address updates now handled by improved parsers during import
+                if pay_updated_count == 0:
+                    logger.info("All runsheet pay data is already up to date")
+                
+                return {
+                    'pay_updated': pay_updated_count,
+                    'address_updated': address_updated_count,
+                    'success': True
+                }
             
-            return {
-                'pay_updated': pay_updated_count,
-                'address_updated': address_updated_count,
-                'success': True
-            }
-            
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error syncing payslip data: {e}")
-            return {
-                'pay_updated': 0,
-                'address_updated': 0,
-                'success': False,
-                'error': str(e)
-            }
-        finally:
-            conn.close()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error syncing payslip data: {e}")
+                return {
+                    'pay_updated': 0,
+                    'address_updated': 0,
+                    'success': False,
+                    'error': str(e)
+                }
     
     @staticmethod
     def get_sync_statistics():
-        """Get statistics about payslip-runsheet synchronization."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
+        """Get statistics about payslip-runsheet synchronization.
+
+        Reads the trigger-maintained figures in ``table_stats`` instead of
+        scanning run_sheet_jobs.
+        """
         try:
-            # Get pay sync statistics
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_jobs,
-                    COUNT(pay_amount) as jobs_with_pay,
-                    ROUND(AVG(pay_amount), 2) as avg_pay,
-                    ROUND(SUM(pay_amount), 2) as total_pay
-                FROM run_sheet_jobs
-                WHERE job_number IS NOT NULL
-            """)
-            
-            pay_stats = cursor.fetchone()
-            total_jobs, jobs_with_pay, avg_pay, total_pay = pay_stats
-            
-            # Get address statistics
-            cursor.execute("""
-                SELECT 
-                    COUNT(CASE WHEN job_address NOT IN ('N/A', '', 'n/a', 'N/a') AND job_address IS NOT NULL THEN 1 END) as jobs_with_address,
-                    COUNT(CASE WHEN customer NOT IN ('N/A', '', 'n/a', 'N/a') AND customer IS NOT NULL THEN 1 END) as jobs_with_customer
-                FROM run_sheet_jobs
-                WHERE job_number IS NOT NULL
-            """)
-            
-            address_stats = cursor.fetchone()
-            jobs_with_address, jobs_with_customer = address_stats
+            stats = table_stats.get_stats()
+            total_jobs = stats.get('run_sheet_jobs.with_job_number', 0)
+            jobs_with_pay = stats.get('run_sheet_jobs.with_pay', 0)
+            total_pay = stats.get('run_sheet_jobs.pay_total', 0)
+            jobs_with_address = stats.get('run_sheet_jobs.with_address', 0)
+            jobs_with_customer = stats.get('run_sheet_jobs.with_customer', 0)
+            avg_pay = round(total_pay / jobs_with_pay, 2) if jobs_with_pay else 0
             
             return {
                 'total_jobs': total_jobs,
                 'jobs_with_pay': jobs_with_pay,
                 'pay_match_rate': (jobs_with_pay / total_jobs * 100) if total_jobs > 0 else 0,
-                'avg_pay': avg_pay or 0,
-                'total_pay': total_pay or 0,
+                'avg_pay': avg_pay,
+                'total_pay': total_pay,
                 'jobs_with_address': jobs_with_address,
                 'address_completion_rate': (jobs_with_address / total_jobs * 100) if total_jobs > 0 else 0,
                 'jobs_with_customer': jobs_with_customer,
@@ -173,5 +139,3 @@ class RunsheetSyncService:
         except Exception as e:
             logger.error(f"Error getting sync statistics: {e}")
             return None
-        finally:
-            conn.close()
@@ -0,0 +1,133 @@
+"""
+Process startup: prepare the database once, run background services once.
+
+Several processes start the app together - gunicorn workers, a restart
+overlapping the old workers, the importer scripts - and two startup
+jobs must not be repeated in each of them:
+
+- Preparing the database (``init_database``, migrations and the
+  trigger-maintained read tables). :func:`prepare_database` runs under an
+  exclusive lock file next to the database, so one process does the work
+  and the others wait and then find the schema version current (see
+  services/migration_runner.py). It also makes the one-time copy of
+  mileage entries from the legacy wages.db (services/legacy_mileage.py).
+  ``gunicorn.conf.py`` calls it in the master before the workers fork
+  and exports ``DATABASE_PREPARED`` so the workers skip it altogether.
+- Background services (table stats reconcile, file catalogue watcher).
+  :func:`claim_background_services` takes a non-blocking lock and keeps
+  it for the life of the process; only the process holding it starts
+  them. When that worker exits, the lock is released and the next worker
+  to start takes over. Periodic sync is not one of them: it starts in
+  every process and its scheduler lease elects the one that runs jobs
+  (services/sync_scheduler.py).
+
+Without ``fcntl`` (Windows) there is no locking and every process
+prepares the database and runs the services, as before.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+from .. import database
+
+logger = logging.getLogger('app')
+
+# Set by gunicorn.conf.py to the database path it prepared.
+DATABASE_PREPARED_ENV = 'DATABASE_PREPARED'
+
+_background_lock = None
+
+
+def _lock_path(db_path: str, name: str) -> str | None:
+    if fcntl is None or db_path == ':memory:':
+        return None
+    return f'{db_path}.{name}.lock'
+
+
+@contextmanager
+def _exclusive(path: str):
+    with open(path, 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def database_prepared(db_path: str) -> bool:
+    """True if the server process has already prepared ``db_path``."""
+    return os.environ.get(DATABASE_PREPARED_ENV) == os.path.abspath(db_path)
+
+
+def prepare_database(lock: bool = True) -> tuple[bool, int]:
+    """Bring the schema up to date and install the read-table triggers.
+
+    Skips ``init_database`` and the migrations when the schema version is
+    already current, so a restart against an up-to-date database issues
+    no schema DDL. Returns ``(migration_success, migrations_applied)``.
+    """
+    from .migration_runner import MigrationRunner
+    from .job_search_index import ensure_search_index
+    from .runsheet_status_index import ensure_day_status_index
+    from .canonical_customers import ensure_canonical_customers
+    from .data_versions import ensure_data_versions
+    from .table_stats import ensure_table_stats
+    from .legacy_mileage import import_legacy_mileage
+
+    path = _lock_path(database.DB_PATH, 'startup') if lock else None
+    with _exclusive(path) if path else nullcontext():
+        runner = MigrationRunner()
+        if runner.schema_is_current():
+            success, count = True, 0
+        else:
+            database.init_database()
+            success, count = runner.run_migrations()
+
+        # Trigger-maintained read tables: install sync triggers, back-fill if needed
+        ensure_search_index()
+        ensure_day_status_index()
+        ensure_canonical_customers()
+        ensure_data_versions()
+        ensure_table_stats()
+
+        if success:
+            import_legacy_mileage()
+    return success, count
+
+
+def claim_background_services(mode: str = 'auto') -> bool:
+    """True if this process should start the background services.
+
+    ``mode`` is the BACKGROUND_SERVICES setting: 'on' or 'off' force the
+    answer, 'auto' lets the first process to claim the lock have them.
+    """
+    global _background_lock
+    if mode in ('on', 'true', '1'):
+        return True
+    if mode in ('off', 'false', '0'):
+        return False
+    if _background_lock is not None:
+        return True
+
+    path = _lock_path(database.DB_PATH, 'background')
+    if path is None:
+        return True
+    handle = open(path, 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.truncate(0)
+    handle.write(f'{os.getpid()}\n')
+    handle.flush()
+    _background_lock = handle
+    return True
@@ -0,0 +1,315 @@
+"""
+Persistent, single-leader job scheduler for the periodic sync service.
+
+Jobs are named callables registered in-process. Their run times live in
+``scheduler_jobs`` (migration 015), so a restart picks up where the last
+process left off: a pending retry still fires, and tonight's interval
+sync carries on at the same times.
+
+Only one process runs jobs. Each scheduler thread tries to take or renew
+a lease row in ``scheduler_leases``, and only the holder of an unexpired
+lease runs due jobs. With several gunicorn workers, the others wait and
+take over if the leader stops renewing (crash, restart).
+
+The thread sleeps until the earliest next run time instead of polling.
+:meth:`Scheduler.schedule_at` and :meth:`Scheduler.wake` interrupt the
+sleep, so a job scheduled for "now" (new data from an upload, a retry)
+runs immediately in the leader process. A job scheduled from another
+process is picked up on the leader's next lease renewal.
+
+Each job runs at most once per scheduled time: its ``next_run_at`` is
+cleared before it is called, and the job reschedules itself if it should
+repeat.
+
+``scheduler_state`` stores small JSON documents (the sync service's
+progress flags) via :func:`load_state` and :func:`save_state`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from ..database import get_db_connection
+
+logger = logging.getLogger('periodic_sync')
+
+LEASE_SECONDS = 90
+
+
+def _iso(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Shared state documents
+# ---------------------------------------------------------------------------
+
+def load_state(key: str) -> dict | None:
+    """Return the JSON document stored under ``key``, or None."""
+    with get_db_connection() as conn:
+        row = conn.execute(
+            'SELECT value FROM scheduler_state WHERE key = ?', (key,)
+        ).fetchone()
+    if row is None or row['value'] is None:
+        return None
+    return json.loads(row['value'])
+
+
+def save_state(key: str, value: dict):
+    with get_db_connection() as conn:
+        conn.execute(
+            'INSERT INTO scheduler_state (key, value, updated_at) '
+            'VALUES (?, ?, CURRENT_TIMESTAMP) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, '
+            'updated_at = excluded.updated_at',
+            (key, json.dumps(value)),
+        )
+        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Leader lease
+# ---------------------------------------------------------------------------
+
+def acquire_lease(name: str, owner: str, seconds: float) -> bool:
+    """Take or renew the lease ``name`` for ``owner``.
+
+    Succeeds if nobody holds it, ``owner`` already holds it, or the
+    current holder's lease has expired.
+    """
+    now = time.time()
+    with get_db_connection() as conn:
+        conn.execute(
+            'INSERT INTO scheduler_leases (name, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, '
+            'expires_at = excluded.expires_at '
+            'WHERE scheduler_leases.owner = excluded.owner '
+            'OR scheduler_leases.expires_at < ?',
+            (name, owner, now + seconds, now),
+        )
+        conn.commit()
+        row = conn.execute(
+            'SELECT owner FROM scheduler_leases WHERE name = ?', (name,)
+        ).fetchone()
+    return row is not None and row['owner'] == owner
+
+
+def release_lease(name: str, owner: str):
+    with get_db_connection() as conn:
+        conn.execute(
+            'DELETE FROM scheduler_leases WHERE name = ? AND owner = ?', (name, owner)
+        )
+        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+class Scheduler:
+    """Run registered jobs at the times stored in ``scheduler_jobs``.
+
+    Call :meth:`open` to start using the job table without a thread (tests
+    drive :meth:`run_pending` directly), or :meth:`start` to open it and
+    run the scheduler thread. Before either, scheduling calls are ignored.
+    """
+
+    def __init__(self, lease_name: str, lease_seconds: float = LEASE_SECONDS):
+        self.lease_name = lease_name
+        self.lease_seconds = lease_seconds
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.jobs = {}
+        self.active = False
+        self.is_leader = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, func):
+        self.jobs[name] = func
+
+    # -- schedule changes ---------------------------------------------------
+
+    def schedule_at(self, name: str, when: datetime):
+        """Set ``name`` to run at ``when`` (replacing any earlier time)."""
+        if not self.active:
+            return
+        with get_db_connection() as conn:
+            conn.execute(
+                'INSERT INTO scheduler_jobs (name, next_run_at, updated_at) '
+                'VALUES (?, ?, CURRENT_TIMESTAMP) '
+                'ON CONFLICT(name) DO UPDATE SET next_run_at = excluded.next_run_at, '
+                'updated_at = excluded.updated_at',
+                (name, _iso(when)),
+            )
+            conn.commit()
+        self._wake.set()
+
+    def schedule_in(self, name: str, **delta):
+        """Set ``name`` to run after a ``timedelta(**delta)`` from now."""
+        self.schedule_at(name, datetime.now() + timedelta(**delta))
+
+    def cancel(self, name: str):
+        if not self.active:
+            return
+        with get_db_connection() as conn:
+            conn.execute(
+                'UPDATE scheduler_jobs SET next_run_at = NULL, '
+                'updated_at = CURRENT_TIMESTAMP WHERE name = ?',
+                (name,),
+            )
+            conn.commit()
+
+    def wake(self):
+        """Interrupt the scheduler thread's sleep."""
+        self._wake.set()
+
+    # -- queries --------------------------------------------------------------
+
+    def next_run(self, *names: str) -> datetime | None:
+        """Earliest next run time of ``names`` (all jobs if none given)."""
+        if not self.active:
+            return None
+        sql = 'SELECT MIN(next_run_at) FROM scheduler_jobs WHERE next_run_at IS NOT NULL'
+        params = ()
+        if names:
+            sql += f" AND name IN ({', '.join('?' * len(names))})"
+            params = names
+        with get_db_connection() as conn:
+            value = conn.execute(sql, params).fetchone()[0]
+        return datetime.fromisoformat(value) if value else None
+
+    def jobs_status(self) -> list[dict]:
+        if not self.active:
+            return []
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                'SELECT name, next_run_at, last_run_at, last_status '
+                'FROM scheduler_jobs ORDER BY name'
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # -- running ------------------------------------------------------------
+
+    def run_pending(self, now: datetime | None = None) -> list[str]:
+        """Run every job whose time has come. Returns the names run."""
+        if not self.active:
+            return []
+        now = now or datetime.now()
+        with get_db_connection() as conn:
+            due = [
+                row['name'] for row in conn.execute(
+                    'SELECT name FROM scheduler_jobs '
+                    'WHERE next_run_at IS NOT NULL AND next_run_at <= ? '
+                    'ORDER BY next_run_at',
+                    (_iso(now),),
+                )
+            ]
+        ran = []
+        for name in due:
+            func = self.jobs.get(name)
+            with get_db_connection() as conn:
+                # Claim the run: clear the time so the job fires once unless
+                # it reschedules itself.
+                conn.execute(
+                    'UPDATE scheduler_jobs SET next_run_at = NULL, last_run_at = ?, '
+                    'updated_at = CURRENT_TIMESTAMP WHERE name = ?',
+                    (_iso(datetime.now()), name),
+                )
+                conn.commit()
+            if func is None:
+                logger.warning(f'Scheduler: dropping unknown job {name!r}')
+                continue
+            status = self._run_job(name, func)
+            with get_db_connection() as conn:
+                conn.execute(
+                    'UPDATE scheduler_jobs SET last_status = ? WHERE name = ?',
+                    (status, name),
+                )
+                conn.commit()
+            ran.append(name)
+        return ran
+
+    def _run_job(self, name, func) -> str:
+        # Keep the lease alive while a long job (downloads, imports) runs.
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self.lease_seconds / 3):
+                try:
+                    acquire_lease(self.lease_name, self.owner, self.lease_seconds)
+                except sqlite3.Error as e:
+                    logger.warning(f'Scheduler: lease renewal failed: {e}')
+
+        if self._thread is not None:
+            threading.Thread(target=heartbeat, name=f'lease-{name}', daemon=True).start()
+        try:
+            func()
+            return 'ok'
+        except Exception as e:
+            logger.error(f'Scheduler: job {name} failed: {e}', exc_info=True)
+            return f'error: {e}'[:500]
+        finally:
+            done.set()
+
+    def _seconds_until_next(self) -> float:
+        next_at = self.next_run()
+        # Wake at least every third of the lease to renew it and to notice
+        # jobs scheduled by other processes.
+        cap = self.lease_seconds / 3
+        if next_at is None:
+            return cap
+        return max(0.0, min(cap, (next_at - datetime.now()).total_seconds()))
+
+    def _loop(self):
+        while not self._stop.is_set():
+            wait = self.lease_seconds / 3
+            try:
+                leader = acquire_lease(self.lease_name, self.owner, self.lease_seconds)
+                if leader and not self.is_leader:
+                    logger.info(f'Scheduler: {self.owner} is now the sync leader')
+                self.is_leader = leader
+                if leader:
+                    self.run_pending()
+                    wait = self._seconds_until_next()
+            except sqlite3.Error as e:
+                logger.error(f'Scheduler loop error: {e}')
+            self._wake.wait(wait)
+            self._wake.clear()
+        if self.is_leader:
+            try:
+                release_lease(self.lease_name, self.owner)
+            except sqlite3.Error:
+                pass
+        self.is_leader = False
+
+    def open(self):
+        self.active = True
+
+    def start(self) -> bool:
+        """Open the job table and start the scheduler thread (once)."""
+        self.open()
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name=f'scheduler-{self.lease_name}', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.active = False
@@ -0,0 +1,349 @@
+"""
+Maintained database statistics.
+
+``table_stats`` (migration 014) holds one row per named figure: row
+counts, conditional counts (jobs with pay, address or customer), sums
+(pay and net payment totals) and distinct counts (run sheet dates and job
+numbers). The statistics endpoints read those rows instead of scanning
+the base tables.
+
+The figures are kept current by SQLite triggers generated here, so every
+writer is covered: model methods, routes that write SQL directly, and the
+importer scripts running in their own process.
+
+- Plain counts and sums are adjusted by ``NEW`` minus ``OLD``.
+- Distinct counts keep a reference count per value in
+  ``table_stats_keys``. They move only when the first row with a value is
+  added or the last one is removed.
+
+Trigger bodies depend on the live schema (the pay and address columns
+on ``run_sheet_jobs`` are added by the importers), so figures whose
+columns are missing are skipped. :func:`reconcile` recomputes everything
+from the base tables. It runs at startup when needed and periodically
+from a background thread, correcting any drift and picking up schema
+changes.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+
+from ..database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+# (name, table, kind, SQL over row alias {r}, required columns)
+# kind 'count' counts rows where the condition holds, 'sum' adds the value.
+_FIGURES = (
+    ('payslips.rows', 'payslips', 'count', '1', ()),
+    ('payslips.with_net_payment', 'payslips', 'count', '{r}.net_payment IS NOT NULL', ('net_payment',)),
+    ('payslips.net_payment_total', 'payslips', 'sum', '{r}.net_payment', ('net_payment',)),
+    ('job_items.rows', 'job_items', 'count', '1', ()),
+    ('run_sheet_jobs.rows', 'run_sheet_jobs', 'count', '1', ()),
+    ('run_sheet_jobs.with_job_number', 'run_sheet_jobs', 'count',
+     '{r}.job_number IS NOT NULL', ('job_number',)),
+    ('run_sheet_jobs.with_pay', 'run_sheet_jobs', 'count',
+     '{r}.job_number IS NOT NULL AND {r}.pay_amount IS NOT NULL', ('job_number', 'pay_amount')),
+    ('run_sheet_jobs.pay_total', 'run_sheet_jobs', 'sum',
+     'CASE WHEN {r}.job_number IS NOT NULL THEN {r}.pay_amount END', ('job_number', 'pay_amount')),
+    ('run_sheet_jobs.with_address', 'run_sheet_jobs', 'count',
+     "{r}.job_number IS NOT NULL AND {r}.job_address IS NOT NULL "
+     "AND {r}.job_address NOT IN ('N/A', '', 'n/a', 'N/a')", ('job_number', 'job_address')),
+    ('run_sheet_jobs.with_customer', 'run_sheet_jobs', 'count',
+     "{r}.job_number IS NOT NULL AND {r}.customer IS NOT NULL "
+     "AND {r}.customer NOT IN ('N/A', '', 'n/a', 'N/a')", ('job_number', 'customer')),
+    ('attendance.rows', 'attendance', 'count', '1', ()),
+    ('settings.rows', 'settings', 'count', '1', ()),
+)
+
+# (name, table, column): number of distinct non-empty values.
+_DISTINCT = (
+    ('run_sheet_jobs.dates', 'run_sheet_jobs', 'date'),
+    ('run_sheet_jobs.job_numbers', 'run_sheet_jobs', 'job_number'),
+)
+
+
+def _table_columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _live_definitions(conn):
+    """Return ``(figures, distinct)`` whose tables and columns exist."""
+    columns = {}
+    for table in {f[1] for f in _FIGURES} | {d[1] for d in _DISTINCT}:
+        columns[table] = _table_columns(conn, table)
+    figures = [
+        f for f in _FIGURES
+        if columns[f[1]] and all(c in columns[f[1]] for c in f[4])
+    ]
+    distinct = [d for d in _DISTINCT if d[2] in columns[d[1]]]
+    return figures, distinct
+
+
+def _delta(kind, expr, row):
+    sql = expr.format(r=row)
+    if kind == 'count':
+        return f'(CASE WHEN {sql} THEN 1 ELSE 0 END)'
+    return f'COALESCE({sql}, 0)'
+
+
+def _is_sum(name: str) -> bool:
+    return name.endswith('_total')
+
+
+# ---------------------------------------------------------------------------
+# Triggers
+# ---------------------------------------------------------------------------
+
+def _adjust(figures, sign_rows):
+    """UPDATE statement applying ``(sign, row alias)`` deltas to ``figures``."""
+    cases = ' '.join(
+        f"WHEN '{name}' THEN "
+        + ' '.join(f'{sign} {_delta(kind, expr, row)}' for sign, row in sign_rows)
+        for name, _, kind, expr, _ in figures
+    )
+    names = ', '.join(f"'{f[0]}'" for f in figures)
+    return (
+        f'UPDATE table_stats SET value = value + (CASE name {cases} ELSE 0 END), '
+        f'updated_at = CURRENT_TIMESTAMP WHERE name IN ({names});'
+    )
+
+
+def _key_added(name, value):
+    present = f"{value} IS NOT NULL AND {value} != ''"
+    return (
+        f"INSERT INTO table_stats_keys (stat, key, refs) SELECT '{name}', {value}, 1 "
+        f'WHERE {present} ON CONFLICT(stat, key) DO UPDATE SET refs = refs + 1; '
+        f'UPDATE table_stats SET value = value + 1, updated_at = CURRENT_TIMESTAMP '
+        f"WHERE name = '{name}' AND "
+        f"(SELECT refs FROM table_stats_keys WHERE stat = '{name}' AND key = {value}) = 1;"
+    )
+
+
+def _key_removed(name, value):
+    return (
+        f"UPDATE table_stats_keys SET refs = refs - 1 WHERE stat = '{name}' AND key = {value}; "
+        f'UPDATE table_stats SET value = value - 1, updated_at = CURRENT_TIMESTAMP '
+        f"WHERE name = '{name}' AND "
+        f"(SELECT refs FROM table_stats_keys WHERE stat = '{name}' AND key = {value}) <= 0; "
+        f"DELETE FROM table_stats_keys WHERE stat = '{name}' AND key = {value} AND refs <= 0;"
+    )
+
+
+def _trigger_definitions(conn) -> dict:
+    """Return ``{trigger_name: CREATE TRIGGER sql}`` for the live schema."""
+    figures, distinct = _live_definitions(conn)
+    triggers = {}
+    for table in dict.fromkeys([f[1] for f in figures] + [d[1] for d in distinct]):
+        table_figures = [f for f in figures if f[1] == table]
+        table_distinct = [d for d in distinct if d[1] == table]
+
+        insert_body = ' '.join(
+            ([_adjust(table_figures, [('+', 'NEW')])] if table_figures else [])
+            + [_key_added(name, f'NEW.{column}') for name, _, column in table_distinct]
+        )
+        delete_body = ' '.join(
+            ([_adjust(table_figures, [('-', 'OLD')])] if table_figures else [])
+            + [_key_removed(name, f'OLD.{column}') for name, _, column in table_distinct]
+        )
+        triggers[f'table_stats_{table}_ai'] = (
+            f'CREATE TRIGGER table_stats_{table}_ai AFTER INSERT ON {table} BEGIN {insert_body} END'
+        )
+        triggers[f'table_stats_{table}_ad'] = (
+            f'CREATE TRIGGER table_stats_{table}_ad AFTER DELETE ON {table} BEGIN {delete_body} END'
+        )
+
+        # Updates only matter for figures that read columns.
+        updatable = [f for f in table_figures if f[4]]
+        if updatable:
+            watched = list(dict.fromkeys(c for f in updatable for c in f[4]))
+            changed = ' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in watched)
+            triggers[f'table_stats_{table}_au'] = (
+                f"CREATE TRIGGER table_stats_{table}_au AFTER UPDATE OF {', '.join(watched)} "
+                f'ON {table} WHEN {changed} '
+                f"BEGIN {_adjust(updatable, [('+', 'NEW'), ('-', 'OLD')])} END"
+            )
+        for name, _, column in table_distinct:
+            triggers[f'table_stats_{table}_{column}_au'] = (
+                f'CREATE TRIGGER table_stats_{table}_{column}_au AFTER UPDATE OF {column} '
+                f'ON {table} WHEN OLD.{column} IS NOT NEW.{column} '
+                f"BEGIN {_key_removed(name, f'OLD.{column}')} {_key_added(name, f'NEW.{column}')} END"
+            )
+    return triggers
+
+
+def install_triggers(conn) -> bool:
+    """Create or replace the triggers. Returns True if any changed."""
+    existing = {
+        row[0]: row[1] for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE 'table_stats_%'"
+        )
+    }
+    wanted = _trigger_definitions(conn)
+    changed = False
+    for name in existing.keys() - wanted.keys():
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        changed = True
+    for name, sql in wanted.items():
+        if existing.get(name) == sql:
+            continue
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(sql)
+        changed = True
+    conn.commit()
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Computing and reconciling
+# ---------------------------------------------------------------------------
+
+def compute_stats(conn) -> dict:
+    """Compute every figure from the base tables (full scans)."""
+    figures, distinct = _live_definitions(conn)
+    values = {}
+    for table in dict.fromkeys(f[1] for f in figures):
+        table_figures = [f for f in figures if f[1] == table]
+        selects = ', '.join(f'SUM({_delta(kind, expr, "r")})' for _, _, kind, expr, _ in table_figures)
+        row = conn.execute(f'SELECT {selects} FROM {table} r').fetchone()
+        for (name, *_), value in zip(table_figures, row):
+            values[name] = value or 0
+    for name, table, column in distinct:
+        values[name] = conn.execute(
+            f"SELECT COUNT(DISTINCT {column}) FROM {table} "
+            f"WHERE {column} IS NOT NULL AND {column} != ''"
+        ).fetchone()[0]
+    return values
+
+
+def reconcile(conn) -> dict:
+    """Recompute all figures and reference counts, fixing any drift.
+
+    Holds the write lock for the duration so no trigger runs in between.
+
+    Returns:
+        ``{name: (stored, actual)}`` for every figure that had drifted.
+    """
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        stored = dict(conn.execute('SELECT name, value FROM table_stats').fetchall())
+        actual = compute_stats(conn)
+        _, distinct = _live_definitions(conn)
+
+        conn.execute('DELETE FROM table_stats_keys')
+        for name, table, column in distinct:
+            conn.execute(
+                f"INSERT INTO table_stats_keys (stat, key, refs) "
+                f"SELECT ?, {column}, COUNT(*) FROM {table} "
+                f"WHERE {column} IS NOT NULL AND {column} != '' GROUP BY {column}",
+                (name,),
+            )
+        conn.execute('DELETE FROM table_stats WHERE name NOT IN ({})'.format(
+            ', '.join('?' * len(actual)) or "''"), tuple(actual))
+        conn.executemany(
+            'INSERT INTO table_stats (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP) '
+            'ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP',
+            list(actual.items()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    drift = {
+        name: (stored.get(name), value)
+        for name, value in actual.items()
+        if stored.get(name) is None or abs(stored[name] - value) > 0.005
+    }
+    if drift and stored:
+        logger.warning(f'table_stats drift corrected: {drift}')
+    return drift
+
+
+def ensure_table_stats() -> bool:
+    """Install the triggers and back-fill if the schema or data has drifted.
+
+    Called once from ``create_app`` after migrations.
+    """
+    try:
+        with get_db_connection() as conn:
+            if not _table_columns(conn, 'table_stats'):
+                logger.warning('table_stats table missing - run migrations')
+                return False
+            changed = install_triggers(conn)
+            figures, distinct = _live_definitions(conn)
+            stored = {row[0] for row in conn.execute('SELECT name FROM table_stats')}
+            expected = {f[0] for f in figures} | {d[0] for d in distinct}
+            if changed or stored != expected:
+                reconcile(conn)
+        return True
+    except sqlite3.Error as e:
+        logger.error(f'Failed to prepare table stats: {e}', exc_info=True)
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def get_stats(conn=None) -> dict:
+    """Return ``{name: value}`` for every maintained figure.
+
+    Counts are ints and ``*_total`` sums are floats rounded to 2dp. Falls
+    back to :func:`compute_stats` if ``table_stats`` has not been set up.
+    """
+    if conn is None:
+        with get_db_connection() as conn:
+            return get_stats(conn)
+
+    try:
+        rows = conn.execute('SELECT name, value FROM table_stats').fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    values = {row[0]: row[1] for row in rows} if rows else compute_stats(conn)
+    return {
+        name: round(float(value), 2) if _is_sum(name) else int(value)
+        for name, value in values.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Background reconcile
+# ---------------------------------------------------------------------------
+
+_worker = None
+_worker_stop = threading.Event()
+
+
+def _reconcile_loop(interval_seconds):
+    while not _worker_stop.wait(interval_seconds):
+        try:
+            with get_db_connection() as conn:
+                # Picks up columns added since startup (pay sync ALTERs).
+                install_triggers(conn)
+                reconcile(conn)
+        except Exception as e:
+            logger.error(f'table_stats reconcile failed: {e}', exc_info=True)
+
+
+def start_reconcile_worker(interval_seconds: float) -> bool:
+    """Start the periodic reconcile thread (once per process)."""
+    global _worker
+    if interval_seconds <= 0 or (_worker is not None and _worker.is_alive()):
+        return False
+    _worker_stop.clear()
+    _worker = threading.Thread(
+        target=_reconcile_loop, args=(interval_seconds,),
+        name='table-stats-reconcile', daemon=True,
+    )
+    _worker.start()
+    return True
+
+
+def stop_reconcile_worker():
+    _worker_stop.set()
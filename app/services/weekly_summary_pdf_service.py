@@ -6,16 +6,15 @@ Creates professional PDF reports for weekly summaries.
 from pathlib import Path
 from datetime import datetime
 
+from . import pdf_engine
+
 try:
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
     from reportlab.lib.units import inch, mm
     from reportlab.platypus.flowables import HRFlowable
     from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    from reportlab.graphics.shapes import Drawing, Rect
-    from reportlab.graphics import renderPDF
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
@@ -25,107 +24,64 @@ class WeeklySummaryPDFService:
     """Service for generating weekly summary PDF reports."""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet() if REPORTLAB_AVAILABLE else None
+        self.styles = pdf_engine.sample_styles() if REPORTLAB_AVAILABLE else None
         self.setup_custom_styles()
     
     def create_header(self, report_title, period_text):
         """Create standardized TVS TCMS header for all PDFs."""
         if not REPORTLAB_AVAILABLE:
             return []
-        
-        elements = []
-        
-        # Try to load logo
-        logo_path = Path(__file__).parent.parent.parent / 'static' / 'images' / 'tvs-logo.svg'
-        logo_png_path = Path(__file__).parent.parent.parent / 'static' / 'images' / 'logo.png'
-        
-        logo_element = None
-        if logo_png_path.exists():
-            try:
-                logo_element = Image(str(logo_png_path), width=40, height=40)
-            except:
-                pass
-        
-        # Header table with logo, branding and date info
-        if logo_element:
-            header_data = [
-                [logo_element,
-                 Paragraph('<b><font size=14 color="#1a73e8">TVS - Technical Courier Management System</font></b><br/><font size=12>' + report_title + '</font>', self.styles['Normal']), 
-                 Paragraph(f'<b>Period:</b> {period_text}<br/><b>Generated:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}', self.styles['Normal'])]
-            ]
-            header_table = Table(header_data, colWidths=[0.6*inch, 4.4*inch, 3*inch])
-        else:
-            header_data = [
-                [Paragraph('<b><font size=14 color="#1a73e8">TVS - Technical Courier Management System</font></b><br/><font size=12>' + report_title + '</font>', self.styles['Normal']), 
-                 Paragraph(f'<b>Period:</b> {period_text}<br/><b>Generated:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}', self.styles['Normal'])]
-            ]
-            header_table = Table(header_data, colWidths=[5*inch, 3*inch])
-        
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (-1, 0), (-1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 10))
-        
-        return elements
+        return pdf_engine.report_header(report_title, period_text)
     
     def setup_custom_styles(self):
-        """Setup custom paragraph styles for the reports."""
+        """Look up the report's paragraph styles (built once per process)."""
         if not REPORTLAB_AVAILABLE:
             return
             
         # Title style - Modern bold
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
+        self.title_style = pdf_engine.paragraph_style(
+            'CustomTitle', 'Heading1',
             fontSize=28,
             spaceAfter=10,
-            textColor=colors.HexColor('#1a1a1a'),
+            textColor='#1a1a1a',
             fontName='Helvetica-Bold',
             alignment=TA_LEFT
         )
         
         # Subtitle style - Elegant
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=self.styles['Heading2'],
+        self.subtitle_style = pdf_engine.paragraph_style(
+            'CustomSubtitle', 'Heading2',
             fontSize=14,
             spaceAfter=20,
-            textColor=colors.HexColor('#666666'),
+            textColor='#666666',
             fontName='Helvetica',
             alignment=TA_LEFT
         )
         
         # Section header style - Clean and modern
-        self.section_style = ParagraphStyle(
-            'SectionHeader',
-            parent=self.styles['Heading3'],
+        self.section_style = pdf_engine.paragraph_style(
+            'SectionHeader', 'Heading3',
             fontSize=16,
             spaceBefore=15,
             spaceAfter=10,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor='#2c3e50',
             fontName='Helvetica-Bold',
             leftIndent=0
         )
         
         # Body text style
-        self.body_style = ParagraphStyle(
+        self.body_style = pdf_engine.paragraph_style(
             'CustomBody',
-            parent=self.styles['Normal'],
             fontSize=10,
             spaceAfter=6,
-            textColor=colors.HexColor('#333333')
+            textColor='#333333'
         )
         
         # Header info style
-        self.header_info_style = ParagraphStyle(
+        self.header_info_style = pdf_engine.paragraph_style(
             'HeaderInfo',
-            parent=self.styles['Normal'],
             fontSize=10,
-            textColor=colors.HexColor('#666666'),
+            textColor='#666666',
             alignment=TA_RIGHT
         )
     
@@ -149,11 +105,6 @@ class WeeklySummaryPDFService:
             reports_dir.mkdir(exist_ok=True)
             filepath = reports_dir / filename
         
-        # Create PDF document in LANDSCAPE orientation
-        doc = SimpleDocTemplate(str(filepath), pagesize=landscape(A4),
-                               rightMargin=30, leftMargin=30,
-                               topMargin=25, bottomMargin=25)
-        
         story = []
         
         # Add standardized TVS TCMS header
@@ -165,15 +116,15 @@ class WeeklySummaryPDFService:
         
         metrics_data = [[
             Paragraph(f'<b>{summary.get("total_jobs", 0)}</b><br/><font size="7" color="#666">Total Jobs</font>',
-                     ParagraphStyle('Metric', fontSize=16, alignment=TA_CENTER, textColor=colors.HexColor('#2c3e50'), fontName='Helvetica-Bold')),
+                     pdf_engine.paragraph_style('Metric', None, fontSize=16, alignment=TA_CENTER, textColor='#2c3e50', fontName='Helvetica-Bold')),
             Paragraph(f'<b>£{summary.get("total_earnings", 0):,.2f}</b><br/><font size="7" color="#666">Earnings</font>',
-                     ParagraphStyle('Metric', fontSize=16, alignment=TA_CENTER, textColor=colors.HexColor('#27ae60'), fontName='Helvetica-Bold')),
+                     pdf_engine.paragraph_style('Metric', None, fontSize=16, alignment=TA_CENTER, textColor='#27ae60', fontName='Helvetica-Bold')),
             Paragraph(f'<b>{summary.get("completion_rate", 0)}%</b><br/><font size="7" color="#666">Complete</font>',
-                     ParagraphStyle('Metric', fontSize=16, alignment=TA_CENTER, textColor=colors.HexColor('#3498db'), fontName='Helvetica-Bold')),
+                     pdf_engine.paragraph_style('Metric', None, fontSize=16, alignment=TA_CENTER, textColor='#3498db', fontName='Helvetica-Bold')),
             Paragraph(f'<b>{summary.get("total_mileage", 0):.0f}</b><br/><font size="7" color="#666">Miles</font>',
-                     ParagraphStyle('Metric', fontSize=16, alignment=TA_CENTER, textColor=colors.HexColor('#e67e22'), fontName='Helvetica-Bold')),
+                     pdf_engine.paragraph_style('Metric', None, fontSize=16, alignment=TA_CENTER, textColor='#e67e22', fontName='Helvetica-Bold')),
             Paragraph(f'<b>{summary.get("working_days", 0)}</b><br/><font size="7" color="#666">Days</font>',
-                     ParagraphStyle('Metric', fontSize=16, alignment=TA_CENTER, textColor=colors.HexColor('#9b59b6'), fontName='Helvetica-Bold')),
+                     pdf_engine.paragraph_style('Metric', None, fontSize=16, alignment=TA_CENTER, textColor='#9b59b6', fontName='Helvetica-Bold')),
         ]]
         
         metrics_table = Table(metrics_data, colWidths=[1.5*inch]*5)
@@ -301,9 +252,10 @@ class WeeklySummaryPDFService:
         story.append(HRFlowable(width="100%", thickness=0.5, color=colors.HexColor('#dee2e6')))
         story.append(Spacer(1, 5))
         footer_text = f'<font size="7" color="#999999">TVS Driver Services • Weekly Performance Report • Generated {datetime.now().strftime("%d/%m/%Y %H:%M")}</font>'
-        story.append(Paragraph(footer_text, 
-                              ParagraphStyle('Footer', parent=self.styles['Normal'], 
-                                           alignment=TA_CENTER)))
+        story.append(Paragraph(footer_text, pdf_engine.paragraph_style('Footer', alignment=TA_CENTER)))
         
-        doc.build(story)
+        # Render in LANDSCAPE orientation
+        pdf_engine.render(story, filepath, pagesize=landscape(A4),
+                          rightMargin=30, leftMargin=30,
+                          topMargin=25, bottomMargin=25)
         return str(filepath)
@@ -0,0 +1,551 @@
+"""
+WeeklySummaryService - the weekly summary (Sunday to Saturday) as one computation.
+
+/api/weekly-summary, the weekly summary PDF and the tax-year export all
+read a week through :meth:`WeeklySummaryService.get_weeks`, which works
+on any number of weeks at once: each figure (status breakdown,
+deductions, DNCO estimates, daily breakdown, mileage, customers, job
+types, discrepancies) is one query grouped by date over every requested
+week, folded into per-week :class:`WeeklySummary` objects in Python. A
+single week is a batch of one.
+
+Results are memoised per week under the ``data_versions`` of the tables
+they read (services/data_versions.py), so viewing a week and then
+exporting it computes it once, and any change to those tables is seen
+on the next call.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from .. import database as _db_module
+from ..database import get_db_connection
+from ..utils.company_calendar import company_calendar
+from .data_versions import get_versions
+
+logger = logging.getLogger('api')
+
+
+# Tables whose changes invalidate a memoised week.
+_SOURCE_TABLES = ('payslips', 'job_items', 'run_sheet_jobs', 'runsheet_daily_data', 'attendance')
+
+# Weeks per set of grouped queries (7 dates each, under SQLite's 999 parameters)
+BATCH_WEEKS = 100
+
+_CACHE_SIZE = 128
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Status breakdown display order
+_STATUS_ORDER = ('completed', 'extra', 'DNCO', 'PDA Licence', 'SASER Auto Billing', 'missed', 'pending')
+
+# DNCO jobs with no pay history for their customer
+DEFAULT_DNCO_ESTIMATE = 15.0
+
+
+@dataclass(frozen=True)
+class WeekTotals:
+    total_jobs: int
+    total_earnings: float
+    total_mileage: float
+    total_fuel_cost: float
+    working_days: int
+    completion_rate: float
+    discrepancies: int
+    payslip_net_payment: float | None
+    earnings_discrepancy: float
+    missing_mileage_dates: list
+
+
+@dataclass(frozen=True)
+class WeekMetrics:
+    avg_jobs_per_day: float
+    avg_earnings_per_day: float
+    avg_earnings_per_job: float
+    avg_mileage_per_day: float
+    cost_per_mile: float
+    earnings_per_mile: float
+
+
+@dataclass(frozen=True)
+class WeeklySummary:
+    """One week's summary. Shared between callers - use :meth:`to_dict` for a copy."""
+    week_start: str
+    week_end: str
+    week_label: str
+    week_number: int | None
+    tax_year: int | str | None
+    has_payslip: bool
+    summary: WeekTotals
+    status_breakdown: dict
+    daily_breakdown: list
+    mileage_data: list
+    top_customers: list
+    job_types: list
+    metrics: WeekMetrics
+
+    def to_dict(self):
+        """The /api/weekly-summary JSON shape (a deep copy)."""
+        data = asdict(self)
+        del data['has_payslip']
+        return data
+
+
+def _week_dates(start_dt):
+    return [(start_dt + timedelta(days=offset)).strftime('%d/%m/%Y') for offset in range(7)]
+
+
+def _placeholders(values):
+    return ','.join('?' * len(values))
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class WeeklySummaryService:
+    """Service class for the weekly summary."""
+
+    @staticmethod
+    def latest_week_start():
+        """Sunday of the latest payslip's week (company calendar), or None without payslips."""
+        with get_db_connection() as conn:
+            row = conn.execute("""
+                SELECT week_number, tax_year
+                FROM payslips
+                WHERE period_end IS NOT NULL
+                ORDER BY tax_year DESC, week_number DESC
+                LIMIT 1
+            """).fetchone()
+        if not row:
+            return None
+        sunday, _ = company_calendar.get_week_dates(row['week_number'], row['tax_year'])
+        return sunday
+
+    @staticmethod
+    def get_week(start_dt):
+        """The summary of the week starting ``start_dt``, or None if it has no payslip and no jobs."""
+        return WeeklySummaryService.get_weeks([start_dt])[0]
+
+    @staticmethod
+    def get_weeks(start_dts):
+        """Summaries of many weeks, in order (None for weeks with no payslip and no jobs).
+
+        Weeks not already memoised are computed together, ``BATCH_WEEKS``
+        at a time.
+        """
+        starts = [company_calendar.format_date_string(start_dt) for start_dt in start_dts]
+        results = {}
+        with get_db_connection() as conn:
+            # Versions are read before the data: a write in between leaves
+            # the result cached under the older versions, never matched again.
+            versions = get_versions(conn, *_SOURCE_TABLES)
+            keys = {start: (_db_module.DB_PATH, start, versions) for start in starts}
+            if versions is not None:
+                with _cache_lock:
+                    for start, key in keys.items():
+                        if key in _cache:
+                            _cache.move_to_end(key)
+                            results[start] = _cache[key]
+
+            missing = [start for start in dict.fromkeys(starts) if start not in results]
+            # Weeks starting on the same weekday never share a date
+            by_weekday = defaultdict(list)
+            for start in missing:
+                by_weekday[company_calendar.parse_date_string(start).weekday()].append(start)
+            for weeks in by_weekday.values():
+                for batch in _chunks(weeks, BATCH_WEEKS):
+                    results.update(_compute(conn, batch))
+
+        if versions is not None and missing:
+            with _cache_lock:
+                for start in missing:
+                    _cache[keys[start]] = results[start]
+                while len(_cache) > _CACHE_SIZE:
+                    _cache.popitem(last=False)
+        return [results[start] for start in starts]
+
+    @staticmethod
+    def get_tax_year(tax_year):
+        """Summaries of every week of ``tax_year`` that has a payslip, by week number."""
+        with get_db_connection() as conn:
+            rows = conn.execute("""
+                SELECT DISTINCT week_number
+                FROM payslips
+                WHERE tax_year = ? AND week_number IS NOT NULL AND period_end IS NOT NULL
+                ORDER BY week_number
+            """, (str(tax_year),)).fetchall()
+        starts = [company_calendar.get_week_dates(row['week_number'], tax_year)[0] for row in rows]
+        return [summary for summary in WeeklySummaryService.get_weeks(starts) if summary is not None]
+
+    @staticmethod
+    def clear_cache():
+        """Forget every memoised week."""
+        with _cache_lock:
+            _cache.clear()
+
+
+def _compute(conn, starts):
+    """Compute the weeks starting on ``starts`` (DD/MM/YYYY) with one query per figure."""
+    week_of = {}
+    dates_by_week = {}
+    week_end_of = {}
+    for start in starts:
+        dates = _week_dates(company_calendar.parse_date_string(start))
+        dates_by_week[start] = dates
+        week_end_of[start] = dates[-1]
+        for date in dates:
+            week_of[date] = start
+    dates = list(week_of)
+    marks = _placeholders(dates)
+    start_of_end = {end: start for start, end in week_end_of.items()}
+    ends = list(start_of_end)
+
+    # Job statistics by status (summed per week before normalising, as
+    # case variations of a status are separate groups)
+    status_rows = defaultdict(dict)
+    for row in conn.execute(f"""
+        SELECT date, status, COUNT(*) as count,
+               SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as total_pay
+        FROM run_sheet_jobs
+        WHERE date IN ({marks})
+        GROUP BY date, status
+    """, dates):
+        totals = status_rows[week_of[row['date']]].setdefault(row['status'], [0, 0])
+        totals[0] += row['count']
+        totals[1] += row['total_pay'] or 0
+
+    # Deductions from each week's payslip
+    deductions = defaultdict(dict)
+    for row in conn.execute(f"""
+        SELECT p.period_end, ji.client, SUM(ji.amount) as total_amount
+        FROM job_items ji
+        JOIN payslips p ON ji.payslip_id = p.id
+        WHERE p.period_end IN ({_placeholders(ends)})
+        AND ji.client IN ('Deduction', 'Company Margin')
+        GROUP BY p.period_end, ji.client
+    """, ends):
+        deductions[start_of_end[row['period_end']]][row['client']] = abs(row['total_amount'] or 0)
+
+    # DNCO jobs, with the pay history their estimates are drawn from
+    dnco_jobs = defaultdict(list)
+    for row in conn.execute(f"""
+        SELECT date, customer, activity, pay_amount
+        FROM run_sheet_jobs
+        WHERE date IN ({marks})
+        AND (UPPER(status) = 'DNCO')
+    """, dates):
+        dnco_jobs[week_of[row['date']]].append(row)
+    activity_averages, customer_averages = _pay_averages(
+        conn, {job['customer'] for jobs in dnco_jobs.values() for job in jobs if job['customer']})
+
+    daily_rows = defaultdict(dict)
+    for row in conn.execute(f"""
+        SELECT
+            date,
+            COUNT(*) as jobs,
+            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
+            SUM(CASE WHEN status = 'extra' THEN 1 ELSE 0 END) as extra,
+            SUM(CASE WHEN status = 'DNCO' OR status = 'dnco' THEN 1 ELSE 0 END) as dnco,
+            SUM(CASE WHEN status = 'missed' THEN 1 ELSE 0 END) as missed,
+            SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+            SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as earnings
+        FROM run_sheet_jobs
+        WHERE date IN ({marks})
+        GROUP BY date
+    """, dates):
+        daily_rows[week_of[row['date']]][row['date']] = row
+
+    mileage_rows = defaultdict(list)
+    for row in conn.execute(f"""
+        SELECT date, mileage, fuel_cost
+        FROM runsheet_daily_data
+        WHERE date IN ({marks})
+        ORDER BY date
+    """, dates):
+        mileage_rows[week_of[row['date']]].append(row)
+
+    attendance_dates = {
+        row['date'] for row in conn.execute(f"SELECT date FROM attendance WHERE date IN ({marks})", dates)
+    }
+
+    customers = defaultdict(dict)
+    for row in conn.execute(f"""
+        SELECT date, customer, COUNT(*) as jobs,
+               SUM(CASE WHEN pay_amount IS NOT NULL THEN pay_amount ELSE 0 END) as earnings
+        FROM run_sheet_jobs
+        WHERE date IN ({marks})
+        AND customer IS NOT NULL
+        GROUP BY date, customer
+    """, dates):
+        totals = customers[week_of[row['date']]].setdefault(row['customer'], [0, 0])
+        totals[0] += row['jobs']
+        totals[1] += row['earnings'] or 0
+
+    activities = defaultdict(dict)
+    for row in conn.execute(f"""
+        SELECT date, activity, COUNT(*) as count
+        FROM run_sheet_jobs
+        WHERE date IN ({marks})
+        AND activity IS NOT NULL
+        GROUP BY date, activity
+    """, dates):
+        week = activities[week_of[row['date']]]
+        week[row['activity']] = week.get(row['activity'], 0) + row['count']
+
+    # Jobs in payslips but not in runsheets
+    discrepancies = defaultdict(set)
+    for row in conn.execute(f"""
+        SELECT DISTINCT j.date, j.job_number
+        FROM job_items j
+        LEFT JOIN run_sheet_jobs r ON j.job_number = r.job_number
+        WHERE j.date IN ({marks})
+        AND r.job_number IS NULL
+    """, dates):
+        if row['job_number'] is not None:
+            discrepancies[week_of[row['date']]].add(row['job_number'])
+
+    payslips = {}
+    for row in conn.execute(f"""
+        SELECT period_end, week_number, tax_year, net_payment
+        FROM payslips
+        WHERE period_end IN ({_placeholders(ends)})
+        ORDER BY id
+    """, ends):
+        payslips.setdefault(start_of_end[row['period_end']], row)
+
+    return {
+        start: _build_week(
+            start, dates_by_week[start],
+            status_rows.get(start, {}), deductions.get(start, {}),
+            dnco_jobs.get(start, []), activity_averages, customer_averages,
+            daily_rows.get(start, {}), mileage_rows.get(start, []), attendance_dates,
+            customers.get(start, {}), activities.get(start, {}),
+            len(discrepancies.get(start, ())), payslips.get(start),
+        )
+        for start in starts
+    }
+
+
+def _pay_averages(conn, customers):
+    """Average completed-job pay by (customer, activity) and by customer."""
+    by_activity, by_customer = {}, {}
+    for chunk in _chunks(sorted(customers)):
+        marks = _placeholders(chunk)
+        for row in conn.execute(f"""
+            SELECT customer, activity, AVG(pay_amount) as avg_pay
+            FROM run_sheet_jobs
+            WHERE customer IN ({marks})
+            AND pay_amount IS NOT NULL
+            AND pay_amount > 0
+            AND status = 'completed'
+            GROUP BY customer, activity
+        """, chunk):
+            by_activity[(row['customer'], row['activity'])] = row['avg_pay']
+        for row in conn.execute(f"""
+            SELECT customer, AVG(pay_amount) as avg_pay
+            FROM run_sheet_jobs
+            WHERE customer IN ({marks})
+            AND pay_amount IS NOT NULL
+            AND pay_amount > 0
+            AND status = 'completed'
+            GROUP BY customer
+        """, chunk):
+            by_customer[row['customer']] = row['avg_pay']
+    return by_activity, by_customer
+
+
+def _dnco_estimate(jobs, activity_averages, customer_averages):
+    """Estimated lost earnings: customer + activity average, else customer average, else the default."""
+    estimate = 0
+    with_activity = with_customer = with_default = 0
+    for job in jobs:
+        customer, activity, pay_amount = job['customer'], job['activity'], job['pay_amount']
+        if pay_amount and pay_amount > 0:
+            # Actual pay_amount if available (shouldn't happen for DNCO)
+            estimate += pay_amount
+        elif customer and activity and activity_averages.get((customer, activity)):
+            estimate += activity_averages[(customer, activity)]
+            with_activity += 1
+        elif customer and customer_averages.get(customer):
+            estimate += customer_averages[customer]
+            with_customer += 1
+        else:
+            estimate += DEFAULT_DNCO_ESTIMATE
+            with_default += 1
+    estimate = round(estimate, 2)
+    logger.info(f"DNCO Loss Calculation: {len(jobs)} jobs, {with_activity} with customer+activity history, "
+                f"{with_customer} with customer history only, {with_default} with default, Total: £{estimate}")
+    return estimate
+
+
+def _build_week(start, dates, status_rows, deductions, dnco_jobs, activity_averages, customer_averages,
+                daily_rows, mileage_rows, attendance_dates, customers, activities, discrepancies, payslip):
+    start_dt = company_calendar.parse_date_string(start)
+    end_dt = start_dt + timedelta(days=6)
+    week_end = dates[-1]
+
+    status_breakdown = {}
+    total_jobs = 0
+    total_earnings = 0
+    dnco_count = 0
+    for status, (count, pay) in status_rows.items():
+        status = status or 'unknown'
+        # Normalize DNCO to uppercase
+        if status.upper() == 'DNCO':
+            status = 'DNCO'
+            pay = 0  # DNCO jobs should always show £0 earnings
+            dnco_count += count
+        # Aggregate counts if status already exists (handles case variations)
+        if status in status_breakdown:
+            status_breakdown[status]['count'] += count
+            status_breakdown[status]['earnings'] += round(pay, 2)
+        else:
+            status_breakdown[status] = {'count': count, 'earnings': round(pay, 2)}
+        total_jobs += count
+        if status not in ['DNCO', 'missed']:
+            total_earnings += pay
+
+    deduction_amount = deductions.get('Deduction', 0)
+    company_margin_amount = deductions.get('Company Margin', 0)
+    if 'Deduction' in deductions:
+        status_breakdown['PDA Licence'] = {'count': 1, 'earnings': -deduction_amount}
+    if 'Company Margin' in deductions:
+        status_breakdown['SASER Auto Billing'] = {'count': 1, 'earnings': -company_margin_amount}
+    total_earnings -= deduction_amount + company_margin_amount
+
+    status_breakdown = {status: status_breakdown[status] for status in _STATUS_ORDER if status in status_breakdown}
+
+    if dnco_count > 0 and 'DNCO' in status_breakdown:
+        status_breakdown['DNCO']['estimated_loss'] = _dnco_estimate(
+            dnco_jobs, activity_averages, customer_averages)
+
+    # Daily breakdown, Sunday to Saturday, days with jobs only
+    daily_breakdown = []
+    for date_str in dates:
+        row = daily_rows.get(date_str)
+        if row and row['jobs'] > 0:
+            daily_breakdown.append({
+                'date': row['date'],
+                'day_name': datetime.strptime(row['date'], '%d/%m/%Y').strftime('%A'),
+                'jobs': row['jobs'],
+                'completed': row['completed'],
+                'extra': row['extra'],
+                'dnco': row['dnco'],
+                'missed': row['missed'],
+                'pending': row['pending'],
+                'earnings': round(row['earnings'] or 0, 2),
+            })
+
+    # Mileage for days actually worked
+    mileage_data = []
+    mileage_dates = set()
+    total_mileage = 0
+    total_fuel_cost = 0
+    days_with_mileage = 0
+    for row in mileage_rows:
+        date = row['date']
+        mileage = row['mileage'] or 0
+        fuel_cost = row['fuel_cost'] or 0
+        if date in daily_rows and daily_rows[date]['jobs'] > 0:
+            if mileage > 0:
+                days_with_mileage += 1
+                total_mileage += mileage
+                total_fuel_cost += fuel_cost
+            mileage_dates.add(date)
+            mileage_data.append({'date': date, 'mileage': mileage, 'fuel_cost': round(fuel_cost, 2)})
+
+    # Days with jobs but no mileage record (0 miles could be working from
+    # home), excluding days with an attendance entry
+    missing_mileage_dates = [
+        day['date'] for day in daily_breakdown
+        if day['date'] not in attendance_dates and day['date'] not in mileage_dates
+    ]
+
+    # Most jobs first, ties in the order SQLite gave them (name descending)
+    top_customers = [
+        {'customer': customer, 'jobs': jobs, 'earnings': round(earnings, 2)}
+        for customer, (jobs, earnings) in sorted(
+            customers.items(), key=lambda item: (item[1][0], item[0]), reverse=True)[:10]
+    ]
+    job_types = [
+        {'type': activity, 'count': count}
+        for activity, count in sorted(activities.items(), key=lambda item: (item[1], item[0]), reverse=True)[:10]
+    ]
+
+    working_days = len(daily_breakdown)
+    avg_mileage_per_day = round(total_mileage / days_with_mileage, 1) if days_with_mileage > 0 else 0
+
+    # Completion rate: completed + extra + DNCO are successful (DNCO is not
+    # the driver's fault - parts didn't arrive); pending is not yet processed
+    completed_jobs = status_breakdown.get('completed', {}).get('count', 0) + status_breakdown.get('extra', {}).get('count', 0)
+    dnco_jobs_count = status_breakdown.get('DNCO', {}).get('count', 0)
+    processed_jobs = total_jobs - status_breakdown.get('pending', {}).get('count', 0)
+    successful_jobs = completed_jobs + dnco_jobs_count
+    completion_rate = round((successful_jobs / processed_jobs * 100), 1) if processed_jobs > 0 else 0
+
+    # Always use payslip week numbers (not ISO weeks)
+    if payslip:
+        week_number = payslip['week_number']
+        tax_year = payslip['tax_year']
+    elif total_jobs > 0:
+        # Runsheet data but no payslip - use the company calendar
+        try:
+            week_number = company_calendar.get_week_number_from_date(end_dt, 2025)
+            tax_year = 2025
+        except Exception:
+            week_number = None
+            tax_year = None
+    else:
+        return None
+
+    payslip_net_payment = payslip['net_payment'] if payslip else None
+    earnings_discrepancy = 0
+    if payslip_net_payment is not None:
+        earnings_discrepancy = round(total_earnings - payslip_net_payment, 2)
+
+    if week_number:
+        week_label = company_calendar.get_week_label(week_number, tax_year or 2025)
+    else:
+        week_label = f"{start_dt.strftime('%d %b')} - {end_dt.strftime('%d %b %Y')}"
+
+    return WeeklySummary(
+        week_start=start,
+        week_end=week_end,
+        week_label=week_label,
+        week_number=week_number,
+        tax_year=tax_year,
+        has_payslip=payslip is not None,
+        summary=WeekTotals(
+            total_jobs=total_jobs,
+            total_earnings=round(total_earnings, 2),
+            total_mileage=total_mileage,
+            total_fuel_cost=round(total_fuel_cost, 2),
+            working_days=working_days,
+            completion_rate=completion_rate,
+            discrepancies=discrepancies,
+            payslip_net_payment=payslip_net_payment,
+            earnings_discrepancy=earnings_discrepancy,
+            missing_mileage_dates=missing_mileage_dates,
+        ),
+        status_breakdown=status_breakdown,
+        daily_breakdown=daily_breakdown,
+        mileage_data=mileage_data,
+        top_customers=top_customers,
+        job_types=job_types,
+        metrics=WeekMetrics(
+            avg_jobs_per_day=round(total_jobs / working_days, 1) if working_days > 0 else 0,
+            avg_earnings_per_day=round(total_earnings / working_days, 2) if working_days > 0 else 0,
+            avg_earnings_per_job=round(total_earnings / total_jobs, 2) if total_jobs > 0 else 0,
+            avg_mileage_per_day=avg_mileage_per_day,
+            cost_per_mile=round(total_fuel_cost / total_mileage, 3) if total_mileage > 0 else 0,
+            earnings_per_mile=round(total_earnings / total_mileage, 2) if total_mileage > 0 else 0,
+        ),
+    )
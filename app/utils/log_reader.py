@@ -0,0 +1,329 @@
+"""
+Log file reader for the log viewers (sync log panel, future log pages).
+
+Reads only the part of a log that is needed instead of ``readlines()`` on
+the whole file:
+
+- :func:`tail` seeks backwards from the end of the file in fixed-size
+  blocks until it has the last N lines. When the live file is too short it
+  carries on into the rotated files (``periodic_sync.log.1``, ``.2``, ...).
+- :func:`read_since` returns whatever was appended after a cursor from an
+  earlier call, for live tailing while a sync runs. The cursor records the
+  file's inode, so if the file is rotated in between, the rest of the old
+  file is read before the new one.
+
+Both can filter by minimum level and by sync run ID. Filtering works on
+whole records: a header line (which starts with a timestamp) plus any
+continuation lines after it, such as tracebacks or multi-line messages.
+
+Sync runs are tagged by :class:`RunTagFilter`, which prefixes every message
+logged by the thread doing the run with ``[run <id>]``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+}
+
+RUN_TAG = '[run {}]'
+
+_CHUNK_SIZE = 64 * 1024
+_HEADER = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+_LEVEL = re.compile(r' - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ')
+
+
+# ---------------------------------------------------------------------------
+# Run tagging
+# ---------------------------------------------------------------------------
+
+def new_run_id() -> str:
+    return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+class RunTagFilter(logging.Filter):
+    """Logger filter that tags records with the run ID of the logging thread.
+
+    Attach it to a logger and call :meth:`start` when a run begins and
+    :meth:`stop` when it ends. Only records logged by the thread that
+    started the run are tagged, so logging from other threads during the
+    run (API calls, the scheduler) is left alone.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._runs = {}
+
+    def start(self, run_id: str | None = None) -> str:
+        run_id = run_id or new_run_id()
+        self._runs[threading.get_ident()] = run_id
+        return run_id
+
+    def stop(self):
+        self._runs.pop(threading.get_ident(), None)
+
+    def current(self) -> str | None:
+        return self._runs.get(threading.get_ident())
+
+    def filter(self, record):
+        run_id = self._runs.get(record.thread)
+        if run_id and getattr(record, 'run_id', None) is None:
+            record.run_id = run_id
+            record.msg = f'{RUN_TAG.format(run_id)} {record.msg}'
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def rotated_files(path) -> list[Path]:
+    """Return ``path`` and its existing rotated siblings, newest first."""
+    path = Path(path)
+    files = [path] if path.exists() else []
+    index = 1
+    while True:
+        rotated = path.with_name(f'{path.name}.{index}')
+        if not rotated.exists():
+            break
+        files.append(rotated)
+        index += 1
+    return files
+
+
+def _reverse_lines(path, chunk_size=_CHUNK_SIZE):
+    """Yield the lines of ``path`` from last to first, without newlines."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        partial = b''
+        at_end = True
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + partial).split(b'\n')
+            # The first element may be the tail of a line that starts in
+            # an earlier block.
+            partial = lines.pop(0)
+            if at_end:
+                at_end = False
+                if lines and lines[-1] == b'':
+                    lines.pop()  # file ends with a newline
+            for line in reversed(lines):
+                yield line.decode('utf-8', errors='replace').rstrip('\r')
+        if partial:
+            yield partial.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _reverse_records(paths, chunk_size=_CHUNK_SIZE):
+    """Yield records (lists of lines, in file order) from newest to oldest."""
+    pending = []
+    for path in paths:
+        try:
+            for line in _reverse_lines(path, chunk_size):
+                pending.append(line)
+                if _HEADER.match(line):
+                    pending.reverse()
+                    yield pending
+                    pending = []
+        except FileNotFoundError:
+            # Rotated away between listing and opening.
+            continue
+    if pending:
+        pending.reverse()
+        yield pending
+
+
+def _record_matches(record, min_level, run_tag):
+    if min_level is not None:
+        match = _LEVEL.search(record[0])
+        if not match or LEVELS[match.group(1)] < min_level:
+            return False
+    if run_tag is not None and run_tag not in record[0]:
+        return False
+    return True
+
+
+def _parse_level(level):
+    if level is None or level == '':
+        return None
+    value = LEVELS.get(str(level).upper())
+    if value is None:
+        raise ValueError(f'Unknown log level: {level}')
+    return value
+
+
+def tail(path, lines=100, level=None, run_id=None, follow_rotated=True,
+         chunk_size=_CHUNK_SIZE) -> list[str]:
+    """Return the last ``lines`` lines of a log, oldest first.
+
+    Args:
+        path: Log file path.
+        lines: Number of lines wanted.
+        level: Only records at this level or above (e.g. ``'WARNING'``).
+        run_id: Only records tagged with this sync run ID.
+        follow_rotated: Continue into ``path.1``, ``path.2``... when the
+            live file has fewer matching lines.
+
+    Raises:
+        ValueError: if ``level`` is not a logging level name.
+    """
+    if lines <= 0:
+        return []
+    min_level = _parse_level(level)
+    run_tag = RUN_TAG.format(run_id) if run_id else None
+
+    paths = rotated_files(path)
+    if not follow_rotated:
+        paths = paths[:1]
+
+    collected = []
+    count = 0
+    for record in _reverse_records(paths, chunk_size):
+        if not _record_matches(record, min_level, run_tag):
+            continue
+        collected.append(record)
+        count += len(record)
+        if count >= lines:
+            break
+
+    result = [line for record in reversed(collected) for line in record]
+    return result[-lines:]
+
+
+def current_cursor(path) -> str | None:
+    """Return a cursor pointing at the current end of ``path``."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f'{stat.st_ino}:{stat.st_size}'
+
+
+def _parse_cursor(cursor):
+    try:
+        inode, offset = str(cursor).split(':', 1)
+        return int(inode), int(offset)
+    except ValueError:
+        raise ValueError(f'Invalid log cursor: {cursor}') from None
+
+
+def _read_complete_lines(path, offset, max_bytes):
+    """Read whole lines from ``offset``.
+
+    Returns:
+        ``(lines, bytes_consumed, hit_limit)``. A single line longer than
+        ``max_bytes`` is returned cut short rather than stalling the reader.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(max_bytes)
+    hit_limit = len(data) == max_bytes
+    end = data.rfind(b'\n')
+    if end < 0:
+        if not hit_limit:
+            return [], 0, False
+        end = len(data) - 1
+    data = data[:end + 1]
+    body = data[:-1] if data.endswith(b'\n') else data
+    lines = [
+        line.decode('utf-8', errors='replace').rstrip('\r')
+        for line in body.split(b'\n')
+    ]
+    return lines, len(data), hit_limit
+
+
+def read_since(path, cursor=None, level=None, run_id=None,
+               max_bytes=1024 * 1024) -> dict:
+    """Return the lines appended to a log after ``cursor``.
+
+    Args:
+        path: Log file path.
+        cursor: Value returned by an earlier call (or by
+            :func:`current_cursor`). ``None`` reads from the start of the
+            live file.
+        level / run_id: As for :func:`tail`. Continuation lines whose
+            header came before the cursor cannot be matched and are
+            dropped when a filter is set.
+        max_bytes: Upper bound on bytes read per call. Only complete lines
+            are returned. A line still being written is left for the next
+            call.
+
+    Returns:
+        dict with ``lines`` (oldest first), ``cursor`` for the next call,
+        ``rotated`` (the file was rotated or truncated since ``cursor``)
+        and ``more`` (``max_bytes`` was reached before the end).
+    """
+    min_level = _parse_level(level)
+    run_tag = RUN_TAG.format(run_id) if run_id else None
+    path = Path(path)
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {'lines': [], 'cursor': None, 'rotated': False, 'more': False}
+
+    sources = []  # (path, start offset, inode)
+    rotated = False
+    if cursor is None:
+        sources.append((path, 0, stat.st_ino))
+    else:
+        inode, offset = _parse_cursor(cursor)
+        if inode == stat.st_ino and offset <= stat.st_size:
+            sources.append((path, offset, stat.st_ino))
+        else:
+            rotated = True
+            # Finish the file the cursor pointed into, if it is still around.
+            for old in rotated_files(path)[1:]:
+                try:
+                    old_stat = os.stat(old)
+                except FileNotFoundError:
+                    continue
+                if old_stat.st_ino == inode and offset <= old_stat.st_size:
+                    sources.append((old, offset, inode))
+                    break
+            sources.append((path, 0, stat.st_ino))
+
+    lines = []
+    budget = max_bytes
+    next_cursor = f'{stat.st_ino}:{stat.st_size}'
+    more = False
+    for source, offset, inode in sources:
+        try:
+            chunk, consumed, hit_limit = _read_complete_lines(source, offset, budget)
+        except FileNotFoundError:
+            continue
+        lines.extend(chunk)
+        budget -= consumed
+        next_cursor = f'{inode}:{offset + consumed}'
+        if hit_limit or budget <= 0:
+            more = True
+            break
+
+    if min_level is not None or run_tag is not None:
+        records = []
+        for line in lines:
+            if _HEADER.match(line) or not records:
+                records.append([line])
+            else:
+                records[-1].append(line)
+        lines = [
+            line
+            for record in records
+            if _record_matches(record, min_level, run_tag)
+            for line in record
+        ]
+
+    return {'lines': lines, 'cursor': next_cursor, 'rotated': rotated, 'more': more}
@@ -1,6 +1,10 @@
 """
 Enhanced logging utilities for the application.
 Comprehensive logging system with multiple loggers and handlers.
+
+Handlers created here are attached through ``queued_handler``, so file and
+console writes happen on the logging listener thread, not on the request
+thread.
 """
 
 import logging
@@ -9,7 +13,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 import json
-import sys
+
+from ..logging_config import ConsoleHandler, queued_handler
 
 
 class CustomFormatter(logging.Formatter):
@@ -94,11 +99,11 @@ class LoggerManager:
                 )
             
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            logger.addHandler(queued_handler(file_handler))
         
         # Console handler
         if console_output:
-            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler = ConsoleHandler('stdout')
             console_formatter = CustomFormatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
@@ -110,7 +115,7 @@ class LoggerManager:
                 return True
             
             console_handler.addFilter(add_color_flag)
-            logger.addHandler(console_handler)
+            logger.addHandler(queued_handler(console_handler))
         
         logger.setLevel(logging.DEBUG)  # Let handlers control the level
         cls._loggers[name] = logger
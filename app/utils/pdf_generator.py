@@ -3,57 +3,52 @@ PDF Report Generator for Discrepancy Reports
 Creates professional PDF reports with proper formatting, tables, and charts.
 """
 
-import io
 from datetime import datetime
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-import os
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+from ..services import pdf_engine
 
 class DiscrepancyPDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        self.styles = pdf_engine.sample_styles()
         self.setup_custom_styles()
     
     def setup_custom_styles(self):
-        """Setup custom paragraph styles for the report."""
+        """Look up the report's paragraph styles (built once per process)."""
         # Title style - TVS Primary
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
+        self.title_style = pdf_engine.paragraph_style(
+            'CustomTitle', 'Heading1',
             fontSize=18,
             spaceAfter=30,
             alignment=TA_CENTER,
-            textColor=colors.HexColor('#1a365d')  # TVS Dark
+            textColor='#1a365d'  # TVS Dark
         )
         
         # Subtitle style - TVS Secondary
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=self.styles['Heading2'],
+        self.subtitle_style = pdf_engine.paragraph_style(
+            'CustomSubtitle', 'Heading2',
             fontSize=14,
             spaceAfter=20,
             alignment=TA_CENTER,
-            textColor=colors.HexColor('#2c5282')  # TVS Secondary
+            textColor='#2c5282'  # TVS Secondary
         )
         
         # Section header style - TVS Primary
-        self.section_style = ParagraphStyle(
-            'SectionHeader',
-            parent=self.styles['Heading3'],
+        self.section_style = pdf_engine.paragraph_style(
+            'SectionHeader', 'Heading3',
             fontSize=12,
             spaceAfter=10,
             spaceBefore=20,
-            textColor=colors.HexColor('#4a6fa5')  # TVS Primary
+            textColor='#4a6fa5'  # TVS Primary
         )
         
         # Summary box style
-        self.summary_style = ParagraphStyle(
+        self.summary_style = pdf_engine.paragraph_style(
             'Summary',
-            parent=self.styles['Normal'],
             fontSize=10,
             alignment=TA_LEFT,
             leftIndent=20,
@@ -61,19 +56,10 @@ class DiscrepancyPDFGenerator:
         )
     
     def generate_discrepancy_report(self, report_data, filters=None):
-        """Generate a comprehensive discrepancy report PDF."""
-        buffer = io.BytesIO()
-        
-        # Create the PDF document
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
+        """Generate a comprehensive discrepancy report PDF.
+
+        Returns the PDF as a rewound spooled file (see pdf_engine.render).
+        """
         # Build the story (content)
         story = []
         
@@ -91,11 +77,14 @@ class DiscrepancyPDFGenerator:
         story.extend(self._build_recommendations(report_data))
         
         # Build the PDF
-        doc.build(story)
-        
-        # Get the PDF data
-        buffer.seek(0)
-        return buffer.getvalue()
+        return pdf_engine.render(
+            story,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
     
     def _build_header(self, filters):
         """Build the report header section."""
@@ -104,11 +93,10 @@ class DiscrepancyPDFGenerator:
         # Add TVS branding
         tvs_header = Paragraph(
             '<b>TVS Supply Chain Solutions</b><br/>Wages Management System',
-            ParagraphStyle(
+            pdf_engine.paragraph_style(
                 'TVSHeader',
-                parent=self.styles['Normal'],
                 fontSize=10,
-                textColor=colors.HexColor('#4a6fa5'),
+                textColor='#4a6fa5',
                 alignment=TA_CENTER,
                 spaceAfter=15
             )
@@ -180,17 +168,16 @@ class DiscrepancyPDFGenerator:
         match_rate = report_data.get('match_rate', 0)
         if match_rate >= 95:
             status_text = "Excellent data integrity with minimal discrepancies."
-            status_color = colors.HexColor('#48bb78')  # TVS Success Green
+            status_color = '#48bb78'  # TVS Success Green
         elif match_rate >= 85:
             status_text = "Good data integrity with some discrepancies requiring attention."
-            status_color = colors.HexColor('#ed8936')  # TVS Warning Orange
+            status_color = '#ed8936'  # TVS Warning Orange
         else:
             status_text = "Significant discrepancies detected requiring immediate review."
-            status_color = colors.HexColor('#f56565')  # TVS Error Red
+            status_color = '#f56565'  # TVS Error Red
         
-        status_style = ParagraphStyle(
+        status_style = pdf_engine.paragraph_style(
             'Status',
-            parent=self.styles['Normal'],
             fontSize=11,
             textColor=status_color,
             alignment=TA_CENTER,
@@ -291,11 +278,10 @@ class DiscrepancyPDFGenerator:
         
         # Add footer
         footer_text = f"TVS Supply Chain Solutions - Wages Management System | Generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        footer_style = ParagraphStyle(
+        footer_style = pdf_engine.paragraph_style(
             'Footer',
-            parent=self.styles['Normal'],
             fontSize=8,
-            textColor=colors.HexColor('#4a6fa5'),
+            textColor='#4a6fa5',
             alignment=TA_CENTER
         )
         story.append(Paragraph(footer_text, footer_style))
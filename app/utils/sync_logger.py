@@ -8,6 +8,8 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+from .log_reader import RunTagFilter, tail
+
 class SyncLogger:
     def __init__(self, log_file='logs/sync.log'):
         self.log_file = Path(log_file)
@@ -29,9 +31,16 @@ class SyncLogger:
         handler.setFormatter(formatter)
         
         self.logger.addHandler(handler)
+
+        # Tags every line of a sync with "[run <id>]" so the log viewer can
+        # show a single run.
+        self.run_tags = RunTagFilter()
+        self.logger.addFilter(self.run_tags)
+        self.run_id = None
     
     def log_sync_start(self, sync_type="Manual"):
         """Log the start of a sync operation."""
+        self.run_id = self.run_tags.start()
         separator = "=" * 60
         self.logger.info(f"\n{separator}")
         self.logger.info(f"🚀 {sync_type.upper()} SYNC STARTED")
@@ -77,14 +86,13 @@ class SyncLogger:
         
         self.logger.info(f"Total time: {duration:.1f} seconds")
         self.logger.info(separator)
+        self.run_tags.stop()
     
-    def get_recent_logs(self, lines=50):
-        """Get recent log entries."""
-        try:
-            with open(self.log_file, 'r') as f:
-                return f.readlines()[-lines:]
-        except FileNotFoundError:
+    def get_recent_logs(self, lines=50, level=None, run_id=None):
+        """Get recent log entries, optionally for one level or sync run."""
+        if not self.log_file.exists():
             return ["No sync logs found"]
+        return [f'{line}\n' for line in tail(self.log_file, lines, level=level, run_id=run_id)]
 
 # Global instance
 sync_logger = SyncLogger()
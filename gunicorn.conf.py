@@ -0,0 +1,29 @@
+"""
+Gunicorn hooks for TVS TCMS.
+
+Gunicorn reads this file from the working directory. Server settings
+(bind, workers, worker class, timeouts) stay on the command line in the
+systemd unit; this file only adds startup coordination:
+
+- ``on_starting`` prepares the database (migrations and the
+  trigger-maintained read tables) once in the master, before any worker
+  forks, and exports DATABASE_PREPARED so the workers skip that step.
+- Periodic sync starts in every worker, and its scheduler lease picks
+  the one that runs each sync. The stats reconcile worker and the file
+  watcher are started by whichever worker claims them first; see
+  app/services/startup.py.
+"""
+
+import os
+
+
+def on_starting(server):
+    from app import database
+    from app.services.startup import DATABASE_PREPARED_ENV, prepare_database
+
+    success, count = prepare_database()
+    if success:
+        os.environ[DATABASE_PREPARED_ENV] = os.path.abspath(database.DB_PATH)
+        server.log.info(f"Database prepared ({count} migration(s) applied)")
+    else:
+        server.log.error("Database migrations failed - workers will retry at startup")
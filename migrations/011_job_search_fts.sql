@@ -0,0 +1,27 @@
+-- 011_job_search_fts.sql
+-- Full-text search index over run sheet jobs and payslip job items.
+--
+-- The search box used to run LIKE '%q%' across several columns of
+-- job_items and run_sheet_jobs on every keystroke, which is a full table
+-- scan each time. job_search is an FTS5 index holding one row per run
+-- sheet job and one row per payslip job item so that prefix queries are
+-- answered from the index with bm25 ranking and highlight snippets.
+--
+-- rowid encodes the source row: run_sheet_jobs.id * 2 for run sheets and
+-- job_items.id * 2 + 1 for payslips. That lets the sync triggers delete
+-- a single entry by rowid instead of scanning the index.
+--
+-- The sync triggers are installed by app/services/job_search_index.py at
+-- startup because the column names of both source tables differ between
+-- databases created by the importers and databases created by 001, and
+-- that module back-fills the index the first time it runs.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5(
+    job_number,
+    customer,
+    activity,
+    address,
+    postcode,
+    source UNINDEXED,
+    prefix = '2 3'
+);
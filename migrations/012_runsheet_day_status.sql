@@ -0,0 +1,44 @@
+-- 012_runsheet_day_status.sql
+-- One pre-aggregated row per run sheet date.
+--
+-- The runsheet calendar (/api/runsheets/completion-status) and the
+-- runsheet list (/api/runsheets/list) used to GROUP BY every date in
+-- run_sheet_jobs on each request, joining runsheet_daily_data and running
+-- an attendance NOT EXISTS subquery per row. Both now read this table.
+--
+-- Rows are kept current by triggers on run_sheet_jobs, runsheet_daily_data
+-- and attendance, installed by app/services/runsheet_status_index.py at
+-- startup (the pay columns on run_sheet_jobs only exist on databases the
+-- importers have touched, so the trigger bodies are generated from the
+-- live schema). That module also back-fills this table.
+--
+-- date is the run sheet's DD/MM/YYYY string. sort_date, year, month,
+-- week_of_year (strftime %U) and weekday (strftime %w, 0 = Sunday) are
+-- derived from it so the list filters and sorting can use indexes.
+
+CREATE TABLE IF NOT EXISTS runsheet_day_status (
+    date TEXT PRIMARY KEY,
+    sort_date TEXT,
+    year TEXT,
+    month TEXT,
+    week_of_year INTEGER,
+    weekday INTEGER,
+    total_jobs INTEGER NOT NULL DEFAULT 0,
+    jobs_with_actions INTEGER NOT NULL DEFAULT 0,
+    jobs_with_pay INTEGER NOT NULL DEFAULT 0,
+    daily_pay REAL,
+    customers TEXT,
+    activities TEXT,
+    mileage REAL,
+    fuel_cost REAL,
+    has_mileage INTEGER NOT NULL DEFAULT 0,
+    is_absent INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'not_started',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_runsheet_day_status_sort
+    ON runsheet_day_status(is_absent, sort_date);
+
+CREATE INDEX IF NOT EXISTS idx_runsheet_day_status_year_month
+    ON runsheet_day_status(year, month);
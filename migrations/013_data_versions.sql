@@ -0,0 +1,25 @@
+-- 013_data_versions.sql
+-- Change counters for tables that feed cached calculations, plus an
+-- index for date-range lookups on payslips.
+--
+-- data_versions holds one row per tracked table whose version is bumped
+-- by AFTER INSERT/UPDATE/DELETE triggers. A cached result keyed on the
+-- versions it was built from is valid until any of them moves, and
+-- checking that is a primary-key lookup instead of re-reading the data.
+-- The triggers are installed at startup by app/services/data_versions.py
+-- (trigger bodies cannot go through this runner, which splits on
+-- semicolons).
+--
+-- payslips.period_end is DD/MM/YYYY text, so range filters rebuild an ISO
+-- date with substr(). Indexing that exact expression lets SQLite use an
+-- index for those filters. Queries must repeat the expression verbatim
+-- (without wrapping it in date()) for the planner to match it.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_payslips_period_end_iso
+    ON payslips ((substr(period_end, 7, 4) || '-' || substr(period_end, 4, 2) || '-' || substr(period_end, 1, 2)));
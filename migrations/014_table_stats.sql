@@ -0,0 +1,35 @@
+-- 014_table_stats.sql
+-- Maintained row counts and aggregates for the statistics endpoints.
+--
+-- The settings page loads /api/data/stats, /api/data/database/info and
+-- the sync statistics together. Each ran COUNT(*), COUNT(DISTINCT date)
+-- and COUNT(DISTINCT job_number) scans over the full tables. They now
+-- read table_stats, which holds one row per named figure (for example
+-- run_sheet_jobs.rows, run_sheet_jobs.dates, run_sheet_jobs.with_pay).
+--
+-- table_stats is kept current by AFTER INSERT/UPDATE/DELETE triggers
+-- installed by app/services/table_stats.py at startup. The pay and
+-- address columns on run_sheet_jobs only exist on databases the importers
+-- have touched, so the trigger bodies are generated from the live schema.
+-- Distinct counts are maintained through table_stats_keys, which holds a
+-- reference count per distinct value. A figure moves only when a value's
+-- first row is added or its last row is removed.
+--
+-- A background job in the same module periodically recomputes every
+-- figure from the base tables and corrects any drift.
+
+CREATE TABLE IF NOT EXISTS table_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS table_stats_keys (
+    stat TEXT NOT NULL,
+    key TEXT NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat, key)
+) WITHOUT ROWID;
+
+-- MIN/MAX/best-week lookups in PayslipModel.get_summary.
+CREATE INDEX IF NOT EXISTS idx_payslips_net_payment ON payslips(net_payment);
@@ -0,0 +1,40 @@
+-- 015_sync_scheduler.sql
+-- Persistent state for the periodic sync scheduler.
+--
+-- The sync scheduler used to keep its jobs and progress in memory and
+-- poll every minute. A restart lost the day's progress (runsheet done,
+-- payslip week processed, retry counters), and every gunicorn worker ran
+-- its own copy of the schedule.
+--
+-- scheduler_jobs holds one row per named job with its exact next run time
+-- (local ISO timestamp, NULL when not scheduled). scheduler_leases holds
+-- the single-leader lock. Only the process holding an unexpired lease runs
+-- jobs, and other processes take over when the lease lapses.
+-- scheduler_state holds the sync service's progress flags as JSON.
+-- app/services/sync_scheduler.py reads and writes all three tables.
+--
+-- get_latest_runsheet_date() reads the newest date from
+-- runsheet_day_status instead of sorting every run_sheet_jobs row.
+
+CREATE TABLE IF NOT EXISTS scheduler_jobs (
+    name TEXT PRIMARY KEY,
+    next_run_at TEXT,
+    last_run_at TEXT,
+    last_status TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scheduler_state (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_runsheet_day_status_sort_date
+    ON runsheet_day_status(sort_date);
@@ -0,0 +1,59 @@
+-- 016_file_catalogue.sql
+-- Catalogue of the runsheet, payslip and upload directories.
+--
+-- Scanners and importers used to walk the directories on every run
+-- (recursive globs, a stat() per file, `find` for --recent). On the
+-- NAS-mounted archive that takes seconds. They now query this table.
+--
+-- file_catalogue has one row per file: size, mtime, content hash (when
+-- known), detected type (payslip or runsheet), the date parsed from the
+-- file name (YYYY-MM-DD) and the import status (new, imported, no_jobs,
+-- failed). A change of size, mtime or hash resets the status to new.
+--
+-- file_catalogue_dirs records each directory's mtime. A rescan stats the
+-- known directories and only lists the ones whose mtime has changed,
+-- which is when entries were added, removed or renamed. Watchdog events
+-- update single rows between rescans.
+-- app/services/file_catalogue.py reads and writes both tables.
+
+CREATE TABLE IF NOT EXISTS file_catalogue (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    file_type TEXT,
+    file_date TEXT,
+    import_status TEXT NOT NULL DEFAULT 'new',
+    import_error TEXT,
+    imported_at TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_root_mtime
+    ON file_catalogue(root, mtime);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_directory
+    ON file_catalogue(directory);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_type_date
+    ON file_catalogue(file_type, file_date);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_status
+    ON file_catalogue(import_status);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_hash
+    ON file_catalogue(content_hash);
+
+CREATE TABLE IF NOT EXISTS file_catalogue_dirs (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    parent TEXT,
+    mtime REAL,
+    scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_catalogue_dirs_root
+    ON file_catalogue_dirs(root);
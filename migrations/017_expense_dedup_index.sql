@@ -0,0 +1,11 @@
+-- 017_expense_dedup_index.sql
+-- Index for bank statement duplicate detection.
+--
+-- /api/bank-import/parse used to run one LIKE query per statement row to
+-- find expenses already imported. ExpenseModel.transactions_exist now
+-- reads (date, amount, description) for the statement's whole date range
+-- in one query. This index covers that query, so it never touches the
+-- expenses table itself.
+
+CREATE INDEX IF NOT EXISTS idx_expenses_dedup
+    ON expenses(date, amount, description);
@@ -0,0 +1,28 @@
+-- 018_customer_mappings.sql
+-- Customer name mappings, resolved in the database.
+--
+-- customer_mappings maps a raw customer name as the parsers produced it
+-- ("Fujitsu Services Limited - EE - ME") to the name it should be reported
+-- under ("Fujitsu"). The customer mapping page has always read and written
+-- this table, but nothing created it.
+--
+-- Reports used to return raw names and leave the browser to apply the
+-- mappings, so their GROUP BYs could not merge mapped customers.
+-- run_sheet_jobs and job_items now carry a canonical_customer column (the
+-- mapped name, or the raw name when there is no mapping), which reports
+-- group on. The column, its indexes and the triggers that keep it current
+-- on both sides are added at startup by app/services/canonical_customers.py.
+-- job_items names its customer column client on importer-created
+-- databases, and the trigger bodies cannot go through this runner, which
+-- splits on semicolons.
+
+CREATE TABLE IF NOT EXISTS customer_mappings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_customer TEXT NOT NULL UNIQUE,
+    mapped_customer TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_customer_mappings_mapped
+    ON customer_mappings(mapped_customer);
@@ -0,0 +1,102 @@
+-- 019_runtime_schema.sql
+-- Schema that request handlers used to create on the fly.
+--
+-- MileageModel ran CREATE TABLE before every query, PaypointModel created
+-- its tables from the /api/paypoint/initialize route, and the payslip
+-- sync (RunsheetSyncService, RunsheetModel.update_job_pay_info) tried six
+-- ALTER TABLE ... ADD COLUMN statements on every call. All of it lives
+-- here now and is applied once, so request paths issue no DDL.
+--
+-- Most databases already have some of these columns, added by the old
+-- runtime code or by the run sheet importer. The migration runner skips
+-- an ADD COLUMN whose column already exists, so this applies cleanly to
+-- both layouts.
+
+-- run_sheet_jobs: pay data matched from payslips
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_amount REAL;
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_rate REAL;
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_units REAL;
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_week INTEGER;
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_year TEXT;
+ALTER TABLE run_sheet_jobs ADD COLUMN pay_updated_at TIMESTAMP;
+
+-- run_sheet_jobs: route optimisation order, and manual uploads protected
+-- from auto-sync overwrites (both added by the run sheet importer)
+ALTER TABLE run_sheet_jobs ADD COLUMN route_order INTEGER;
+ALTER TABLE run_sheet_jobs ADD COLUMN manually_uploaded INTEGER DEFAULT 0;
+
+-- Mileage log (previously kept in a separate data/database/wages.db)
+CREATE TABLE IF NOT EXISTS mileage_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    start_mileage REAL DEFAULT 0,
+    end_mileage REAL DEFAULT 0,
+    total_miles REAL NOT NULL,
+    fuel_cost REAL DEFAULT 0,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_mileage_date ON mileage_entries(date);
+
+-- Paypoint devices, one row per serial number / TID.
+-- status is 'available', 'deployed' or 'returned'.
+CREATE TABLE IF NOT EXISTS paypoint_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    paypoint_type TEXT NOT NULL,
+    serial_ptid TEXT NOT NULL UNIQUE,
+    trace_stock TEXT NOT NULL,
+    status TEXT DEFAULT 'available',
+    current_job_number TEXT,
+    deployment_date TIMESTAMP,
+    return_date TIMESTAMP,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Devices deployed to jobs
+CREATE TABLE IF NOT EXISTS paypoint_deployments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stock_item_id INTEGER NOT NULL,
+    job_number TEXT NOT NULL,
+    paypoint_type TEXT NOT NULL,
+    serial_ptid TEXT NOT NULL,
+    trace_stock TEXT NOT NULL,
+    deployment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    customer TEXT,
+    location TEXT,
+    installation_notes TEXT,
+    status TEXT DEFAULT 'deployed',
+    FOREIGN KEY (stock_item_id) REFERENCES paypoint_stock(id)
+);
+
+-- Devices returned from jobs
+CREATE TABLE IF NOT EXISTS paypoint_returns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    deployment_id INTEGER NOT NULL,
+    stock_item_id INTEGER NOT NULL,
+    job_number TEXT NOT NULL,
+    paypoint_type TEXT NOT NULL,
+    return_serial_ptid TEXT NOT NULL,
+    return_trace TEXT NOT NULL,
+    return_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    return_reason TEXT,
+    return_notes TEXT,
+    FOREIGN KEY (deployment_id) REFERENCES paypoint_deployments(id),
+    FOREIGN KEY (stock_item_id) REFERENCES paypoint_stock(id)
+);
+
+-- Paypoint audit trail. old_values and new_values are JSON strings.
+CREATE TABLE IF NOT EXISTS paypoint_audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    record_id INTEGER,
+    old_values TEXT,
+    new_values TEXT,
+    user_id TEXT DEFAULT 'system',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,15 @@
+-- 020_legacy_imports.sql
+-- One-time copies of data kept outside the app database.
+--
+-- MileageModel used to keep mileage_entries in data/database/wages.db.
+-- prepare_database copies those entries into the app database the first
+-- time it finds that file (services/legacy_mileage.py) and records the
+-- copy here, so entries deleted later are not brought back on the next
+-- start.
+
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    name TEXT PRIMARY KEY,
+    source TEXT,
+    rows_imported INTEGER DEFAULT 0,
+    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
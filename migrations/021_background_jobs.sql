@@ -0,0 +1,20 @@
+-- 021_background_jobs.sql
+-- State of background jobs that the browser polls for.
+--
+-- Upload batches and runsheet reimport previews run in a thread of the
+-- worker that received the request, but under gunicorn the polls can
+-- reach any worker. Their state lives here instead of in a per-process
+-- dict (services/job_store.py). ``state`` is the JSON the poll returns;
+-- ``payload`` holds data kept for a later request (a parsed month waiting
+-- to be applied).
+
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    payload TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(kind, job_id)
+);
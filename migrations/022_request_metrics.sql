@@ -0,0 +1,14 @@
+-- 022_request_metrics.sql
+-- Per-worker request metrics, so /api/admin/metrics covers every worker.
+--
+-- Each gunicorn worker aggregates its own requests in memory and writes
+-- the raw counters (status counts, latency histogram, totals) here every
+-- few seconds, one row per process id. The metrics endpoint merges the
+-- rows of the workers still running (services/request_metrics.py).
+
+CREATE TABLE IF NOT EXISTS request_metrics (
+    pid INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    endpoints TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
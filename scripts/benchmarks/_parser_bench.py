@@ -0,0 +1,67 @@
+"""
+Helpers shared by the parser micro-benchmarks.
+
+bench_runsheet_parser.py and bench_payslip_parser.py time a production
+script's text parser over a fixture corpus. With ``--against REV`` they
+also load the script as it was at that git revision and time it on the
+same corpus, so any commit can be compared with the working tree.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from _setup import ROOT
+
+
+def build_parser(description, repeat_help):
+    """Argument parser with the ``--repeat`` and ``--against`` options."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--repeat', type=int, default=100, help=repeat_help)
+    parser.add_argument('--against', metavar='REV', help='Also time the parser at this git revision')
+    return parser
+
+
+def load_script(path, name):
+    """Import the script at ``path`` as module ``name``, hiding what it prints."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_script_at(rev, script, name):
+    """Import ``script`` (a path relative to the repository) as of git revision ``rev``."""
+    source = subprocess.run(
+        ['git', 'show', f'{rev}:{script}'],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f'{Path(script).stem}_{name}.py'
+        path.write_text(source)
+        return load_script(path, name)
+
+
+def time_passes(run_pass, items, repeat):
+    """Time ``repeat`` calls of ``run_pass``, each covering ``items`` items.
+
+    Returns p50, p95 and min of the time per item in microseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_pass()
+        samples.append((time.perf_counter() - started) * 1e6 / items)
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[int(len(samples) * 0.95) - 1],
+        'min': samples[0],
+    }
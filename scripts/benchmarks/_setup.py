@@ -0,0 +1,22 @@
+"""
+Import setup shared by the benchmark scripts.
+
+The benchmarks run as plain scripts (``python3 scripts/benchmarks/...``),
+so importing this module first puts the repository root (for ``app``)
+and scripts/production (for the importer scripts) on ``sys.path``. It
+also sets a placeholder SECRET_KEY: the app config refuses to load
+without one, and no benchmark uses it.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+PRODUCTION_SCRIPTS = ROOT / 'scripts' / 'production'
+
+for _path in (PRODUCTION_SCRIPTS, ROOT):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+os.environ.setdefault('SECRET_KEY', 'benchmark-only')
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bank statement import on a synthetic RBS statement.
+
+Builds a throwaway app database with a few recurring templates and a
+year of already-imported expenses, generates a statement (20,000 rows by
+default) and times the three steps of a bank import:
+
+    parse    row-by-row template queries vs templates loaded once, and the
+             csv module vs the pandas path
+    dedup    ExpenseModel.transaction_exists per row vs transactions_exist
+    import   ExpenseModel.add_expense per row vs add_expenses
+
+The per-row variants are the calls the import routes used to make. They
+take minutes on a full-size statement, so they are timed once; the
+others --repeat times. The parsed transactions are checked to be
+identical across all parse paths.
+
+Usage:
+    python3 scripts/benchmarks/bench_bank_import.py
+    python3 scripts/benchmarks/bench_bank_import.py --rows 5000 --repeat 5
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from _setup import ROOT
+
+from app import create_app
+from app.database import get_db_connection, init_database
+from app.models.bank_statement import BankStatementParser
+from app.models.expense import ExpenseModel
+from app.models.recurring_template import RecurringTemplateModel
+
+MIGRATION = ROOT / 'migrations' / '017_expense_dedup_index.sql'
+
+MERCHANTS = [
+    ('SHELL WARRINGTON', 'POS'), ('BP CONNECT M6', 'POS'), ('ESSO PRESTON', 'POS'),
+    ('SCREWFIX DIRECT', 'POS'), ('HALFORDS 0412', 'POS'), ('EE LIMITED', 'DD'),
+    ('SANTANDER VAN FINANCE', 'DPC'), ('ADMIRAL INSURANCE', 'DD'), ('TESCO STORE 2231', 'POS'),
+    ('AMAZON MKTPLACE', 'POS'), ('MCDONALDS 1199', 'POS'), ('CASH WITHDRAWAL', 'C/L'),
+    ('COSTA COFFEE', 'POS'), ('GREGGS PLC', 'POS'), ('PAYPAL *UNKNOWN', 'POS'),
+    ('MICROSOFT*365', 'DD'), ('XERO UK SUBSCRIPTION', 'DD'), ('PARKING NCP', 'POS'),
+    ('VODAFONE MOBILE', 'DD'), ('SAINSBURY FUEL', 'POS'), ('WICKES 093', 'POS'),
+]
+TEMPLATES = [
+    ('Van Finance', 'Vehicle Costs', 289.50, 'SANTANDER VAN'),
+    ('Van Insurance', 'Vehicle Costs', 74.12, 'ADMIRAL'),
+    ('Phone', 'Admin Costs', 32.00, 'EE LIMITED'),
+    ('Office 365', 'Professional Fees', 9.99, 'MICROSOFT'),
+]
+
+
+def build_statement(rows, seed=42):
+    """An RBS CSV statement with ``rows`` transactions over one year."""
+    rng = random.Random(seed)
+    start = date(2025, 4, 6)
+    out = [['Date', 'Type', 'Description', 'Value', 'Balance', 'Account Name', 'Account Number']]
+    for i in range(rows):
+        day = start + timedelta(days=i * 365 // rows)
+        merchant, kind = rng.choice(MERCHANTS)
+        if rng.random() < 0.1:
+            value = round(rng.uniform(50, 900), 2)
+            merchant, kind = 'SASER PAYROLL', 'BAC'
+        else:
+            value = -round(rng.choice([rng.uniform(1, 120), 289.50, 74.12, 32.00, 9.99]), 2)
+        date_str = day.strftime(rng.choice(['%d %b %Y', '%d-%b-%y', '%d/%m/%Y']))
+        out.append([date_str, kind, f' {merchant} {rng.randint(100, 999)}', f'{value:.2f}',
+                    '1000.00', 'MR D HANSON', '12345678'])
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(out)
+    return buffer.getvalue()
+
+
+def seed_database(statement_transactions):
+    """Templates, plus half of the statement already imported as expenses."""
+    categories = {c['name']: c['id'] for c in ExpenseModel.get_categories()}
+    for name, category, amount, pattern in TEMPLATES:
+        RecurringTemplateModel.create_template(name, categories[category], amount, 'monthly', pattern)
+    ExpenseModel.add_expenses([
+        {'date': t['date'], 'category_id': categories['Other Expenses'],
+         'amount': t['amount'], 'description': t['description']}
+        for t in statement_transactions[::2]
+    ])
+
+
+def legacy_parse(content):
+    """The per-row template queries parse_rbs_csv used to make."""
+    transactions = []
+    for row in csv.DictReader(content.strip().split('\n')):
+        date_obj = BankStatementParser._parse_date(row['Date'].strip())
+        value = float(row['Value'].strip())
+        if not date_obj or value >= 0:
+            continue
+        formatted = date_obj.strftime('%Y-%m-%d')
+        description = row['Description'].strip()
+        template_id, confidence = RecurringTemplateModel.match_transaction(
+            description, -value, formatted)
+        template = RecurringTemplateModel.get_template_by_id(template_id) if template_id else None
+        category = BankStatementParser._categorize_transaction(description, row['Type'].strip())
+        if not BankStatementParser._should_exclude(description):
+            transactions.append(BankStatementParser._transaction(
+                formatted, description, -value, row['Type'].strip(), category, template, confidence))
+    return transactions
+
+
+def parse_rows(content):
+    minimum = BankStatementParser.PANDAS_MIN_ROWS
+    BankStatementParser.PANDAS_MIN_ROWS = float('inf')
+    try:
+        return BankStatementParser.parse_rbs_csv(content)
+    finally:
+        BankStatementParser.PANDAS_MIN_ROWS = minimum
+
+
+def parse_pandas(content):
+    minimum = BankStatementParser.PANDAS_MIN_ROWS
+    BankStatementParser.PANDAS_MIN_ROWS = 0
+    try:
+        return BankStatementParser.parse_rbs_csv(content)
+    finally:
+        BankStatementParser.PANDAS_MIN_ROWS = minimum
+
+
+def dedup_per_row(transactions):
+    return [ExpenseModel.transaction_exists(t['date'], t['description'], t['amount'])
+            for t in transactions]
+
+
+def to_expenses(transactions):
+    return [{'date': t['date'], 'category_id': 1, 'amount': t['amount'],
+             'description': t['description']} for t in transactions]
+
+
+def import_per_row(expenses):
+    for e in expenses:
+        ExpenseModel.add_expense(e['date'], e['category_id'], e['amount'], e['description'])
+
+
+def timed(fn, arg, repeat, reset=None):
+    """Wall time in milliseconds per call, and the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+        if reset:
+            reset()
+    samples.sort()
+    return {'p50': statistics.median(samples), 'p95': samples[int(len(samples) * 0.95) - 1]}, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bank statement import')
+    parser.add_argument('--rows', type=int, default=20000, help='Statement rows')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of each batched variant')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('testing', test_config={
+            'TESTING': True, 'DATABASE_PATH': os.path.join(tmp, 'bench.db'),
+            'SECRET_KEY': 'benchmark-only', 'AUTO_SYNC_ENABLED': False,
+        })
+        with app.app_context():
+            init_database()
+            with get_db_connection() as conn:
+                conn.executescript(MIGRATION.read_text())
+
+            content = build_statement(args.rows)
+            seed_database(parse_rows(content))
+            with get_db_connection() as conn:
+                last_id = conn.execute('SELECT MAX(id) FROM expenses').fetchone()[0]
+
+            def reset():
+                with get_db_connection() as conn:
+                    conn.execute('DELETE FROM expenses WHERE id > ?', (last_id,))
+                    conn.commit()
+
+            results = []
+            parsed = {}
+            for label, fn, repeat in [('row queries', legacy_parse, 1), ('csv', parse_rows, args.repeat),
+                                      ('pandas', parse_pandas, args.repeat)]:
+                stats, parsed[label] = timed(fn, content, repeat)
+                results.append(('parse', label, stats))
+            if not parsed['row queries'] == parsed['csv'] == parsed['pandas']:
+                print('WARNING: parse paths disagree')
+            transactions = parsed['csv']
+
+            stats, per_row = timed(dedup_per_row, transactions, 1)
+            results.append(('dedup', 'per row', stats))
+            stats, bulk = timed(ExpenseModel.transactions_exist, transactions, args.repeat)
+            results.append(('dedup', 'one query', stats))
+            if per_row != bulk:
+                print('WARNING: duplicate detection disagrees')
+
+            expenses = to_expenses(transactions)
+            stats, _ = timed(import_per_row, expenses, 1, reset)
+            results.append(('import', 'per row', stats))
+            stats, _ = timed(ExpenseModel.add_expenses, expenses, args.repeat, reset)
+            results.append(('import', 'executemany', stats))
+
+    print(f'Statement: {args.rows} rows, {len(transactions)} expense transactions, '
+          f'{sum(bulk)} already imported')
+    print()
+    print(f'{"step":<8}{"variant":<14}{"p50 ms":>12}{"p95 ms":>12}')
+    print('-' * 46)
+    for step, label, stats in results:
+        print(f'{step:<8}{label:<14}{stats["p50"]:>12.1f}{stats["p95"]:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Render benchmark: a year-long DNCO custom report PDF.
+
+Lays out a year of synthetic DNCO jobs two ways and times each:
+
+- single table: the old route - a fresh sample stylesheet per request,
+  every job in one ``Table``, the PDF built into a ``BytesIO``.
+- engine: services/custom_report_pdf.py - cached styles and header,
+  jobs in ``CHUNK_ROWS``-row tables, output to a spooled temp file.
+
+Peak Python memory (tracemalloc) is reported alongside the time.
+
+Usage:
+    python3 scripts/benchmarks/bench_custom_report_pdf.py
+    python3 scripts/benchmarks/bench_custom_report_pdf.py --jobs 20000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+import _setup  # noqa: F401
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from app.services import custom_report_pdf, pdf_engine
+
+CUSTOMERS = [
+    'Barclays Bank', 'HSBC', 'Fujitsu EE', 'Specsavers', 'Paypoint', 'Xerox',
+    'Astra Zeneca', 'Star Trains', 'John Lewis', 'Kingfisher', 'Verifone',
+    'Computacenter Limited', 'NCR Tesco', 'DHL', 'Secure Retail', 'Vista',
+]
+STREETS = ['High St', 'Station Rd', 'Church Lane', 'Market Sq', 'Mill Road', 'Park Ave']
+TOWNS = ['Warrington', 'Manchester', 'Liverpool', 'Leeds', 'Chester', 'Preston']
+
+
+def build_report(jobs, seed=42):
+    """Report data as the route builds it, ``jobs`` DNCO rows over one year."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(jobs):
+        rows.append({
+            'date': f'{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024',
+            'job': str(40000000 + i),
+            'customer': rng.choice(CUSTOMERS),
+            'address': f'{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}',
+            'amount': round(rng.uniform(8, 40), 2),
+        })
+    return {
+        'summary': {'total_dnco': jobs, 'estimated_loss': round(sum(r['amount'] for r in rows), 2)},
+        'dnco_jobs': rows,
+    }
+
+
+def render_single_table(report_data):
+    """The pre-engine layout: one table, styles rebuilt, in-memory output."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
+    styles = getSampleStyleSheet()
+    elements = [Paragraph('<b>DNCO Report</b>', styles['Normal']), Spacer(1, 5)]
+    jobs_data = [['Date', 'Job Number', 'Customer', 'Address', 'Est. Loss']]
+    for job in report_data['dnco_jobs']:
+        jobs_data.append([job['date'], job['job'], job['customer'][:30], job['address'][:40], f"£{job['amount']:.2f}"])
+    jobs_table = Table(jobs_data, colWidths=[0.9*inch, 1.1*inch, 2*inch, 3*inch, 0.9*inch])
+    jobs_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#343a40')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    elements.append(jobs_table)
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_engine(report_data):
+    spool = custom_report_pdf.build_custom_report_pdf('dnco', report_data, 'Year 2024')
+    spool.seek(0, os.SEEK_END)
+    size = spool.tell()
+    spool.close()
+    return size
+
+
+def measure(label, fn, report_data, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(report_data)
+        times.append(time.perf_counter() - started)
+    size = result if isinstance(result, int) else len(result)
+
+    tracemalloc.start()
+    fn(report_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'  {label:14s} median {statistics.median(times) * 1000:9.1f} ms   '
+          f'min {min(times) * 1000:9.1f} ms   peak {peak / 1e6:7.1f} MB   pdf {size / 1e6:6.2f} MB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--jobs', type=int, default=5000, help='DNCO jobs in the year')
+    parser.add_argument('--repeat', type=int, default=3, help='timed renders per layout')
+    args = parser.parse_args()
+
+    report_data = build_report(args.jobs)
+    print(f'Year-long DNCO report, {args.jobs} jobs '
+          f'({pdf_engine.CHUNK_ROWS} rows per chunk, spool limit {pdf_engine.SPOOL_MAX_BYTES // 1024} KiB)')
+    measure('single table', render_single_table, report_data, args.repeat)
+    measure('engine', render_engine, report_data, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
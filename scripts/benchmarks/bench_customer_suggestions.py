@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: customer mapping suggestions on synthetic customer names.
+
+Generates distinct customer strings shaped like the ones the runsheet
+parsers produce ("Fujitsu Services Limited - EE - ME", "HSBC UK",
+"Computacenter - Astra Zeneca", ...), then times
+CustomerMappingModel._group_similar against the comparison of every pair
+it replaced and checks that both give the same groups. The pairwise
+version is quadratic and is timed once.
+
+Usage:
+    python3 scripts/benchmarks/bench_customer_suggestions.py
+    python3 scripts/benchmarks/bench_customer_suggestions.py --names 2000 --repeat 10
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import _setup  # noqa: F401
+
+from app.models.customer_mapping import CustomerMappingModel
+
+KNOWN = [
+    'Fujitsu', 'Computacenter', 'Xerox', 'HSBC', 'Barclays', 'Specsavers', 'Paypoint',
+    'Verifone', 'Ingenico', 'NCR', 'Diebold Nixdorf', 'Star Trains', 'Astra Zeneca',
+    'John Lewis', 'Kingfisher', 'Secure Retail', 'Vista Retail', 'Boots', 'EE', 'BT',
+]
+SYLLABLES = ['ar', 'bel', 'cor', 'dax', 'en', 'fal', 'gri', 'hal', 'ix', 'jun', 'kel', 'lor',
+             'mar', 'nov', 'or', 'pel', 'quin', 'ros', 'sil', 'tor', 'ul', 'vin', 'wes', 'zan']
+SUFFIXES = ['', ' LIMITED', ' Ltd', ' PLC', ' UK', ' Services Limited', ' Network', ' (UK) Ltd']
+SITES = ['Warrington', 'Manchester', 'Liverpool', 'Leeds', 'Chester', 'Preston', 'Bolton',
+         'Wigan', 'St Helens', 'Runcorn', 'Widnes', 'Crewe', 'Stockport', 'Oldham']
+
+
+def synthetic_customers(count, seed=42):
+    """
+    ``count`` distinct customer names, sorted like get_unique_customers.
+    
+    A few well-known clients with many variants, and a long tail of
+    smaller companies that appear under two or three spellings.
+    """
+    rng = random.Random(seed)
+    tail = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+            for _ in range(count)]
+    names = set()
+    while len(names) < count:
+        if rng.random() < 0.2:
+            stem = f'{rng.choice(KNOWN)} {rng.choice(SITES)}'
+        else:
+            stem = f'{rng.choice(tail)} {rng.choice(["", "Retail", "Group", "Systems"])}'.strip()
+        name = stem + rng.choice(SUFFIXES)
+        if rng.random() < 0.3:
+            name += f' - {rng.choice(KNOWN)}'
+        names.add(name)
+    return sorted(names)
+
+
+def pairwise_suggestions(model, customers):
+    """The every-pair comparison _group_similar replaced."""
+    suggestions = []
+    processed = set()
+    for customer in customers:
+        if customer in processed:
+            continue
+        similar = []
+        base_name = model._extract_base_name(customer)
+        for other_customer in customers:
+            if other_customer != customer and other_customer not in processed:
+                other_base = model._extract_base_name(other_customer)
+                if base_name and other_base and (
+                    base_name.lower() in other_base.lower() or
+                    other_base.lower() in base_name.lower() or
+                    model._similar_names(base_name, other_base)
+                ):
+                    similar.append(other_customer)
+        if similar:
+            all_names = [customer] + similar
+            mapped_name = min(all_names, key=len)
+            suggestions.append({
+                'mapped_customer': mapped_name,
+                'original_customers': [name for name in all_names if name != mapped_name]
+            })
+            processed.add(customer)
+            processed.update(similar)
+    return suggestions
+
+
+def timed(fn, arg, repeat):
+    """Wall time in milliseconds per call, and the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {'p50': statistics.median(samples), 'p95': samples[int(len(samples) * 0.95) - 1]}, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark customer mapping suggestions')
+    parser.add_argument('--names', type=int, default=5000, help='Distinct customer names')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs of the indexed grouping')
+    args = parser.parse_args()
+
+    model = CustomerMappingModel()
+    customers = synthetic_customers(args.names)
+
+    indexed, groups = timed(model._group_similar, customers, args.repeat)
+    pairwise, expected = timed(lambda names: pairwise_suggestions(model, names), customers, 1)
+    if groups != expected:
+        print('WARNING: indexed grouping differs from the pairwise comparison')
+
+    print(f'Customers: {len(customers)}, suggestion groups: {len(groups)}')
+    print()
+    print(f'{"variant":<12}{"p50 ms":>12}{"p95 ms":>12}')
+    print('-' * 36)
+    print(f'{"pairwise":<12}{pairwise["p50"]:>12.1f}{pairwise["p95"]:>12.1f}')
+    print(f'{"indexed":<12}{indexed["p50"]:>12.1f}{indexed["p95"]:>12.1f}')
+    print(f'\nSpeedup (p50): {pairwise["p50"] / indexed["p50"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark: job_search FTS5 index vs the old LIKE '%q%' scans.
+
+Builds a throwaway database with the importer (production) table layout,
+fills it with synthetic run sheet jobs and payslip job items, then times
+the queries behind /api/search and /api/search/job/<job_number> both ways.
+
+Usage:
+    python3 scripts/benchmarks/bench_job_search.py
+    python3 scripts/benchmarks/bench_job_search.py --rows 500000 --repeat 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from _setup import ROOT
+
+from app.services import job_search_index
+
+MIGRATION = ROOT / 'migrations' / '011_job_search_fts.sql'
+
+CUSTOMERS = [
+    'Barclays Bank', 'HSBC', 'Fujitsu EE', 'Specsavers', 'Paypoint', 'Xerox',
+    'Astra Zeneca', 'Star Trains', 'John Lewis', 'Kingfisher', 'Verifone',
+    'Computacenter Limited', 'NCR Tesco', 'DHL', 'Secure Retail', 'Vista',
+]
+ACTIVITIES = [
+    'TECH EXCHANGE', 'NON TECH EXCHANGE', 'REPAIR WITH PARTS', 'INSTALL',
+    'COLLECTION', 'DELIVERY', 'MAINTENANCE', 'SURVEY',
+]
+STREETS = ['High St', 'Station Rd', 'Church Lane', 'Market Sq', 'Mill Road', 'Park Ave']
+TOWNS = ['Warrington', 'Manchester', 'Liverpool', 'Leeds', 'Chester', 'Preston']
+AREAS = ['M', 'WA', 'L', 'LS', 'CH', 'PR']
+
+
+def _postcode(rng):
+    return f'{rng.choice(AREAS)}{rng.randint(1, 40)} {rng.randint(1, 9)}{rng.choice("ABDEFGHJ")}{rng.choice("LNPQRSTU")}'
+
+
+def build_database(path, rows, seed=42):
+    """Create the production layout and fill both job tables with ``rows`` each."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE run_sheet_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, job_number TEXT,
+            customer TEXT, activity TEXT, job_address TEXT, postcode TEXT,
+            status TEXT DEFAULT 'pending'
+        );
+        CREATE TABLE payslips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, tax_year TEXT, week_number INTEGER
+        );
+        CREATE TABLE job_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, payslip_id INTEGER, amount REAL,
+            job_number TEXT, client TEXT, location TEXT, job_type TEXT, date TEXT,
+            postcode TEXT
+        );
+    """)
+    conn.executescript(MIGRATION.read_text())
+
+    conn.executemany(
+        'INSERT INTO payslips (tax_year, week_number) VALUES (?, ?)',
+        [(str(2018 + w // 52), w % 52 + 1) for w in range(520)],
+    )
+    runsheets = []
+    items = []
+    for i in range(rows):
+        job_number = str(40000000 + i)
+        customer = rng.choice(CUSTOMERS)
+        activity = rng.choice(ACTIVITIES)
+        street = f'{rng.randint(1, 200)} {rng.choice(STREETS)}'
+        town = rng.choice(TOWNS)
+        postcode = _postcode(rng)
+        date = f'{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2018, 2026)}'
+        runsheets.append((date, job_number, customer, activity, f'{street}, {town}', postcode))
+        items.append((rng.randint(1, 520), round(rng.uniform(10, 120), 2), job_number,
+                      customer, town, activity, date, postcode))
+    conn.executemany(
+        'INSERT INTO run_sheet_jobs (date, job_number, customer, activity, job_address, postcode) '
+        'VALUES (?, ?, ?, ?, ?, ?)', runsheets,
+    )
+    conn.executemany(
+        'INSERT INTO job_items (payslip_id, amount, job_number, client, location, job_type, date, postcode) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', items,
+    )
+    conn.commit()
+
+    started = time.perf_counter()
+    job_search_index.rebuild(conn)
+    job_search_index.install_triggers(conn)
+    print(f'Index build: {time.perf_counter() - started:.2f}s for {rows * 2:,} entries')
+    return conn
+
+
+def legacy_search(conn, q):
+    like = f'%{q}%'
+    return conn.execute("""
+        SELECT p.tax_year, p.week_number, ji.job_number, ji.client, ji.location,
+               ji.job_type, ji.amount, ji.date, ji.postcode
+        FROM job_items ji
+        JOIN payslips p ON ji.payslip_id = p.id
+        WHERE ji.client LIKE ? OR ji.location LIKE ? OR ji.job_type LIKE ? OR ji.job_number LIKE ?
+        ORDER BY p.tax_year DESC, p.week_number DESC
+        LIMIT 50
+    """, (like, like, like, like)).fetchall()
+
+
+def legacy_job_lookup(conn, job_number):
+    return conn.execute("""
+        SELECT date, customer, job_address, job_number, activity
+        FROM run_sheet_jobs
+        WHERE job_number = ? OR job_number LIKE ? OR CAST(job_number AS TEXT) = ?
+        ORDER BY date DESC
+    """, (job_number, f'%{job_number}%', job_number)).fetchall()
+
+
+def fts_search(conn, q):
+    return job_search_index.search_jobs(conn, q, source='payslip', per_page=50)
+
+
+def fts_job_lookup(conn, job_number):
+    return job_search_index.search_jobs(
+        conn, job_number, source='runsheet', field='job_number', per_page=100,
+    )
+
+
+def time_query(fn, conn, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        for q in queries:
+            started = time.perf_counter()
+            fn(conn, q)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[int(len(samples) * 0.95) - 1],
+        'max': samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the job search index')
+    parser.add_argument('--rows', type=int, default=200000, help='Rows per job table')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetitions per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, 'bench.db'), args.rows)
+
+        # Keystroke-style queries as typed into the search box.
+        text_queries = ['ba', 'barc', 'warr', 'tech ex', 'wa1', 'station rd']
+        job_queries = ['4000', '40012', '4001234', '40123456']
+
+        cases = [
+            ('/api/search        LIKE', legacy_search, text_queries),
+            ('/api/search        FTS5', fts_search, text_queries),
+            ('/api/search/job    LIKE', legacy_job_lookup, job_queries),
+            ('/api/search/job    FTS5', fts_job_lookup, job_queries),
+        ]
+        print()
+        print(f'{"case":<26}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}')
+        print('-' * 56)
+        for label, fn, queries in cases:
+            stats = time_query(fn, conn, queries, args.repeat)
+            print(f'{label:<26}{stats["p50"]:>10.2f}{stats["p95"]:>10.2f}{stats["max"]:>10.2f}')
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
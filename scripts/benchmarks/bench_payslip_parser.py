@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: payslip text parser, per payslip.
+
+Parses the payslip text fixtures in tests/fixtures/payslip_text (three
+weeks of each year from 2021 to 2025) into header, financial summary and
+job items, and reports the time per payslip for each year. With
+--against REV the extractor from that git revision is timed on the same
+text and its output is checked against the current parser's.
+
+Usage:
+    python3 scripts/benchmarks/bench_payslip_parser.py
+    python3 scripts/benchmarks/bench_payslip_parser.py --against HEAD~1 --repeat 200
+"""
+
+from _parser_bench import build_parser, load_script, load_script_at, time_passes
+from _setup import ROOT
+
+SCRIPT = 'scripts/production/extract_payslips.py'
+FIXTURES = ROOT / 'tests' / 'fixtures' / 'payslip_text'
+
+
+def make_extractor(module):
+    """Build a PayslipExtractor with no database from a loaded extract_payslips module."""
+    return object.__new__(module.PayslipExtractor)
+
+
+def load_corpus():
+    """Payslip texts by year."""
+    return {
+        path.stem.split('_')[-1]: path.read_text().split('\f')
+        for path in sorted(FIXTURES.glob('payslips_*.txt'))
+    }
+
+
+def parse(extractor, text):
+    # Older revisions only have the three separate parsers.
+    return (extractor.parse_payslip_header(text), extractor.parse_financial_summary(text),
+            extractor.parse_job_items(text))
+
+
+def parse_current(extractor, text):
+    parsed = extractor.parse_payslip(text)
+    return parsed['header'], parsed['financial'], parsed['job_items']
+
+
+def main():
+    parser = build_parser('Benchmark the payslip text parser', 'Passes over each year')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    current = make_extractor(load_script(ROOT / SCRIPT, 'current'))
+    jobs = sum(len(parse_current(current, text)[2]) for texts in corpus.values() for text in texts)
+    print(f'Corpus: {sum(len(t) for t in corpus.values())} payslips, {jobs} job items')
+
+    cases = [('current', parse_current, current)]
+    if args.against:
+        baseline = make_extractor(load_script_at(args.against, SCRIPT, 'baseline'))
+        for texts in corpus.values():
+            for text in texts:
+                if parse(baseline, text) != parse_current(current, text):
+                    print(f'WARNING: output at {args.against} differs from the current parser')
+                    break
+        cases.insert(0, (args.against, parse, baseline))
+
+    print()
+    print(f'{"year":<8}{"parser":<14}{"p50 us/slip":>14}{"p95 us/slip":>14}')
+    print('-' * 50)
+    totals = {}
+    for year, texts in corpus.items():
+        for label, fn, extractor in cases:
+            stats = time_passes(lambda: [fn(extractor, text) for text in texts], len(texts), args.repeat)
+            totals.setdefault(label, []).append(stats['p50'])
+            print(f'{year:<8}{label:<14}{stats["p50"]:>14.1f}{stats["p95"]:>14.1f}')
+    if args.against:
+        speedup = sum(totals[args.against]) / sum(totals['current'])
+        print(f'\nSpeedup (p50, all years): {speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
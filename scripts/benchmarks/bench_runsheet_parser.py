@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: text runsheet parser, per page.
+
+Parses the sample runsheet pages in tests/fixtures/runsheet_pages.txt with
+RunSheetImporter.parse_multi_driver_page and parse_single_driver_page and
+reports the time per page. With --against REV the importer from that git
+revision is timed on the same pages and its jobs are checked against the
+current parser's.
+
+Usage:
+    python3 scripts/benchmarks/bench_runsheet_parser.py
+    python3 scripts/benchmarks/bench_runsheet_parser.py --against HEAD~1 --repeat 200
+"""
+
+from _parser_bench import build_parser, load_script, load_script_at, time_passes
+from _setup import ROOT
+
+SCRIPT = 'scripts/production/import_run_sheets.py'
+CORPUS = ROOT / 'tests' / 'fixtures' / 'runsheet_pages.txt'
+
+
+def make_importer(module):
+    """Build an unconnected RunSheetImporter from a loaded import_run_sheets module."""
+    # Older revisions have no connect flag, so set up what __init__ would
+    # without opening a database.
+    importer = object.__new__(module.RunSheetImporter)
+    importer.name = 'Daniel Hanson'
+    importer.overwritten_dates = set()
+    importer.activity_patterns = [
+        'TECH EXCHANGE', 'NON TECH EXCHANGE', 'REPAIR WITH PARTS',
+        'REPAIR WITHOUT PARTS', 'CONSUMABLE INSTALL', 'COLLECTION',
+        'DELIVERY', 'INSTALL', 'MAINTENANCE', 'SURVEY', 'INSPECTION',
+        'UPGRADE', 'CONFIGURATION', 'TRAINING', 'CONSULTATION',
+    ]
+    importer.postcode_pattern = module.re.compile(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b')
+    importer.customer_cleanup_patterns = [
+        (r'^Customer Signature\s*', ''),
+        (r'^Customer Print\s*', ''),
+        (r'\*\*\*[^*]*\*\*\*', ''),
+        (r'\s+', ' '),
+        (r'^\s+|\s+$', ''),
+    ]
+    return importer
+
+
+def load_pages():
+    text = CORPUS.read_text()
+    return [page.strip('\n').split('\n') for page in text.split('\f')]
+
+
+def parse_all(importer, pages):
+    return [(importer.parse_multi_driver_page(page), importer.parse_single_driver_page(page))
+            for page in pages]
+
+
+def main():
+    parser = build_parser('Benchmark the text runsheet parser', 'Passes over the corpus')
+    args = parser.parse_args()
+
+    pages = load_pages()
+    current = make_importer(load_script(ROOT / SCRIPT, 'current'))
+    expected = parse_all(current, pages)
+    print(f'Corpus: {len(pages)} pages, {sum(len(multi) for multi, _ in expected)} multi-driver jobs')
+
+    cases = [('current', current)]
+    if args.against:
+        baseline = make_importer(load_script_at(args.against, SCRIPT, 'baseline'))
+        if parse_all(baseline, pages) != expected:
+            print(f'WARNING: jobs parsed at {args.against} differ from the current parser')
+        cases.insert(0, (args.against, baseline))
+
+    print()
+    print(f'{"parser":<14}{"p50 us/page":>14}{"p95 us/page":>14}{"min us/page":>14}')
+    print('-' * 56)
+    results = {}
+    for label, importer in cases:
+        stats = time_passes(lambda: parse_all(importer, pages), len(pages), args.repeat)
+        results[label] = stats
+        print(f'{label:<14}{stats["p50"]:>14.1f}{stats["p95"]:>14.1f}{stats["min"]:>14.1f}')
+    if args.against:
+        print(f'\nSpeedup (p50): {results[args.against]["p50"] / results["current"]["p50"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
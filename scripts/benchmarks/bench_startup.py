@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup profile: where create_app spends its time.
+
+Starts the app in a fresh interpreter under ``python -X importtime``
+twice against a throwaway database: a cold start, which creates the
+schema and applies every migration, and a warm start against the
+now-current schema (what a gunicorn worker or a restart pays). For each
+it reports the create_app wall time, the total import time, the
+top-level imports by cumulative time, and whether the heavy libraries
+were loaded at startup or left for first use.
+
+Usage:
+    python3 scripts/benchmarks/bench_startup.py
+    python3 scripts/benchmarks/bench_startup.py --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+
+# Libraries that should only load when a route needs them
+HEAVY = ['camelot', 'pandas', 'numpy', 'cv2', 'reportlab', 'googleapiclient', 'pdfplumber', 'requests']
+
+START = (
+    "import time; started = time.perf_counter(); "
+    "from app import create_app; create_app('development'); "
+    "print(f'create_app {time.perf_counter() - started:.4f}')"
+)
+
+
+def parse_importtime(stderr):
+    """Return ``[(cumulative_us, depth, module)]`` from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative), depth, name.strip()))
+    return rows
+
+
+def profile_start(db_path):
+    """Start the app once. Returns (create_app seconds, importtime rows)."""
+    env = dict(
+        os.environ,
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'benchmark-only'),
+        DATABASE_PATH=db_path,
+        AUTO_SYNC_ENABLED='false',
+        FILE_CATALOGUE_WATCH='false',
+        TABLE_STATS_RECONCILE_HOURS='0',
+        BACKGROUND_SERVICES='off',
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', START],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    seconds = float(result.stdout.strip().splitlines()[-1].split()[-1])
+    return seconds, parse_importtime(result.stderr)
+
+
+def report(label, seconds, rows, top):
+    loaded = {name for _, _, name in rows}
+    top_level = sorted((row for row in rows if row[1] == 0), reverse=True)
+    print(f'\n{label}')
+    print(f'  create_app:   {seconds * 1000:8.1f} ms')
+    print(f'  imports:      {sum(row[0] for row in top_level) / 1000:8.1f} ms '
+          f'({len(rows)} modules)')
+    print(f'  top {top} top-level imports (cumulative):')
+    for cumulative, _, name in top_level[:top]:
+        print(f'    {cumulative / 1000:8.1f} ms  {name}')
+    print('  heavy libraries:')
+    for name in HEAVY:
+        print(f"    {name:16s} {'loaded at startup' if name in loaded else 'deferred'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--top', type=int, default=15, help='top-level imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        report('Cold start (new database, all migrations)', *profile_start(db_path), args.top)
+        report('Warm start (schema current)', *profile_start(db_path), args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weekly summaries for a whole tax year.
+
+Seeds a temporary database with a year of payslips, run sheet jobs and
+mileage, then times WeeklySummaryService three ways:
+
+- per week: one get_week call per week, memo cleared first (what a
+  year-end export looping over /api/weekly-summary used to cost).
+- batch: get_tax_year, every week in one set of grouped queries.
+- memoised: get_tax_year again with the data unchanged.
+
+Usage:
+    python3 scripts/benchmarks/bench_weekly_summary.py
+    python3 scripts/benchmarks/bench_weekly_summary.py --jobs-per-day 30 --repeat 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import _setup  # noqa: F401
+
+from app import create_app
+from app.database import get_db_connection, init_database
+from app.services.data_versions import ensure_data_versions
+from app.services.weekly_summary_service import WeeklySummaryService
+from app.utils.company_calendar import company_calendar
+
+TAX_YEAR = 2025
+CUSTOMERS = ['Barclays Bank', 'HSBC', 'Fujitsu EE', 'Specsavers', 'Paypoint', 'Xerox',
+             'Astra Zeneca', 'Star Trains', 'John Lewis', 'Kingfisher', 'Verifone', 'NCR Tesco']
+ACTIVITIES = ['INSTALL', 'REPAIR', 'SURVEY', 'COLLECTION', 'SWAP']
+STATUSES = ['completed'] * 8 + ['extra', 'DNCO', 'missed', 'pending']
+
+
+def seed_database(jobs_per_day, seed=42):
+    """A tax year of payslips (with deductions), jobs and mileage."""
+    rng = random.Random(seed)
+    with get_db_connection() as conn:
+        # Importer (production) layout columns
+        conn.execute('ALTER TABLE payslips ADD COLUMN tax_year TEXT')
+        for column in ('client TEXT', 'amount REAL', 'date TEXT'):
+            conn.execute(f'ALTER TABLE job_items ADD COLUMN {column}')
+        job_number = 40000000
+        for week in range(1, 53):
+            sunday, saturday = company_calendar.get_week_dates(week, TAX_YEAR)
+            cursor = conn.execute(
+                "INSERT INTO payslips (week_number, tax_year, period_end, net_payment) VALUES (?, ?, ?, ?)",
+                (week, str(TAX_YEAR), company_calendar.format_date_string(saturday), rng.uniform(500, 1200)),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (payslip_id, client, amount) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, 'Deduction', -12.5), (cursor.lastrowid, 'Company Margin', -8.0)],
+            )
+            for offset in range(1, 6):
+                day = company_calendar.format_date_string(sunday + timedelta(days=offset))
+                rows = []
+                for _ in range(jobs_per_day):
+                    job_number += 1
+                    status = rng.choice(STATUSES)
+                    rows.append((day, str(job_number), rng.choice(CUSTOMERS), rng.choice(ACTIVITIES), status,
+                                 None if status == 'DNCO' else round(rng.uniform(10, 45), 2)))
+                conn.executemany(
+                    "INSERT INTO run_sheet_jobs (date, job_number, customer, activity, status, pay_amount) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT INTO runsheet_daily_data (date, mileage, fuel_cost) VALUES (?, ?, ?)",
+                             (day, rng.randint(20, 160), round(rng.uniform(5, 30), 2)))
+        conn.commit()
+
+
+def timed(fn, repeat, clear=True):
+    """Wall time in milliseconds per call, and the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        if clear:
+            WeeklySummaryService.clear_cache()
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark weekly summaries for a tax year')
+    parser.add_argument('--jobs-per-day', type=int, default=15, help='Run sheet jobs per working day')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app('testing', test_config={
+            'TESTING': True, 'DATABASE_PATH': os.path.join(tmp, 'bench.db'),
+            'SECRET_KEY': 'benchmark-only', 'AUTO_SYNC_ENABLED': False,
+        })
+        with app.app_context():
+            init_database()
+            seed_database(args.jobs_per_day)
+            ensure_data_versions()
+
+            starts = [company_calendar.get_week_dates(week, TAX_YEAR)[0] for week in range(1, 53)]
+            per_week, singles = timed(lambda: [WeeklySummaryService.get_week(start) for start in starts], args.repeat)
+            batch, weeks = timed(lambda: WeeklySummaryService.get_tax_year(TAX_YEAR), args.repeat)
+            memoised, _ = timed(lambda: WeeklySummaryService.get_tax_year(TAX_YEAR), args.repeat, clear=False)
+            if singles != weeks:
+                print('WARNING: batch summaries differ from single weeks')
+
+    print(f'Weeks: {len(weeks)}, jobs: {52 * 5 * args.jobs_per_day}')
+    print()
+    print(f'{"variant":<12}{"p50 ms":>12}')
+    print('-' * 24)
+    print(f'{"per week":<12}{per_week:>12.1f}')
+    print(f'{"batch":<12}{batch:>12.1f}')
+    print(f'{"memoised":<12}{memoised:>12.1f}')
+    print(f'\nSpeedup (batch): {per_week / batch:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
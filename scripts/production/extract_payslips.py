@@ -8,7 +8,7 @@ import re
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import sys
 import os
@@ -16,18 +16,86 @@ import os
 # Add app to path for config import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from app.config import Config
+from app.services import file_catalogue
+
+# Patterns for the payslip text, compiled once at import.
+VAT_NUMBER_RE = re.compile(r'(\d{10})')
+FULL_DATE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})')
+VERIFICATION_NUMBER_RE = re.compile(r'Verification Number[:\s]*(\d+)')
+UTR_NUMBER_RE = re.compile(r'UTR Number[:\s]*(\d+)')
+FILENAME_WEEK_RE = re.compile(r'Week(\d+)[\s_]+(\d{4})')
+
+# The YTD label comes before the plain payment so it is matched as itself.
+FINANCIAL_SUMMARY_RE = re.compile(
+    r'(Total Company Income|Materials|Gross Subcontractor Payment YTD|'
+    r'Gross Subcontractor Payment|Net Payment|Total Paid To Your Bank)'
+    r'\s*£\s*([\d,]+\.?\d*)'
+)
+FINANCIAL_FIELDS = {
+    'Total Company Income': 'total_company_income',
+    'Materials': 'materials',
+    'Gross Subcontractor Payment': 'gross_subcontractor_payment',
+    'Gross Subcontractor Payment YTD': 'gross_subcontractor_payment_ytd',
+    'Net Payment': 'net_payment',
+    'Total Paid To Your Bank': 'total_paid_to_bank',
+}
+
+DEDUCTION_RE = re.compile(r'Daniel Hanson:\s*Deduction')
+DEDUCTION_AMOUNT_RE = re.compile(r'£\(([\d,]+\.?\d*)\)\s+Daniel Hanson:\s*Deduction')
+MARGIN_RE = re.compile(r'Company Margin\s+£\s*\(([\d,]+\.?\d*)\)')
+JOB_LINE_RE = re.compile(r'Daniel Hanson:\s*(?:(\d+)\s*\|)?(.+)')
+RATE_LINE_RE = re.compile(r'^\d+\.\d+\s+£')
+UNITS_RATE_RE = re.compile(r'([\d.]+)\s+£([\d,]+\.?\d*)\s+(?!Rico)')
+UNITS_RATE_RICO_RE = re.compile(r'([\d.]+)\s+£([\d,]+\.?\d*)\s+Rico(?:\s|$)')
+
+CLIENT_RE = re.compile(r'\|\s*([^|]+?)\s*\|')
+LOCATION_RE = re.compile(r'\|[^|]+\|\s*([^|]+?)\s*\|')
+JOB_TYPE_RE = re.compile(r'\|[^|]+\|[^|]+\|\s*([^|]+?)(?:\s*-\s*(?:ND|AP|Priority|4HR|8HR|6HR|Timed)|\s*\|)')
+JOB_DATE_TIME_RE = re.compile(r'(\d{2}/\d{2}/\d{2})\s+(\d{2}:\d{2})')
+RATE_SUFFIX_RE = re.compile(r'\s+\d+\.\d+\s+£[\d,]+\.\d+.*$')
+DATE_SUFFIX_RE = re.compile(r'\s+\d{2}/\d{2}/\d{4}.*$')
+CLIENT_CODE_SUFFIX_RE = re.compile(r'\s+(SCS|TVS|IFM|Limited|Rico)$')
+LOCATION_CODE_RE = re.compile(r'\s+(SCS|TVS|IFM|Rico)\s+')
+LOCATION_CODE_PREFIX_RE = re.compile(r'^\s*(SCS|TVS|IFM|Rico)\s+')
+
+
+PAYSLIP_COLUMNS = (
+    'tax_year', 'week_number', 'verification_number', 'utr_number',
+    'pay_date', 'period_end', 'vat_number', 'total_company_income',
+    'materials', 'gross_subcontractor_payment',
+    'gross_subcontractor_payment_ytd', 'net_payment',
+    'total_paid_to_bank', 'pdf_filename',
+)
+JOB_ITEM_COLUMNS = (
+    'units', 'rate', 'amount', 'description', 'job_number', 'client',
+    'location', 'job_type', 'date', 'time', 'agency', 'weekend_date',
+)
+
 
 class PayslipExtractor:
-    def __init__(self, db_path: str = "data/database/payslips.db"):
+    def __init__(self, db_path: str = "data/database/payslips.db", connect: bool = True):
         self.db_path = db_path
         self.conn = None
-        self.setup_database()
+        if connect:
+            self.setup_database()
     
     def setup_database(self):
-        """Create database tables if they don't exist."""
+        """Create database tables if they don't exist.
+        
+        Checks sqlite_master first so a launch against an existing
+        database issues no DDL.
+        """
         self.conn = sqlite3.connect(self.db_path)
         cursor = self.conn.cursor()
         
+        existing = {
+            row[0] for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('payslips', 'job_items')"
+            )
+        }
+        if len(existing) == 2:
+            return
+        
         # Main payslip summary table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS payslips (
@@ -84,12 +152,23 @@ class PayslipExtractor:
                     text += page_text + "\n"
         return text
     
+    def parse_payslip(self, text: str) -> Dict:
+        """Parse header, financial summary and job items from payslip text.
+        
+        Returns a dict with 'header', 'financial' and 'job_items'.
+        """
+        return {
+            'header': self.parse_payslip_header(text),
+            'financial': self.parse_financial_summary(text),
+            'job_items': self.parse_job_items(text),
+        }
+    
     def parse_payslip_header(self, text: str) -> Dict:
         """Extract header information from payslip."""
         header_data = {}
         
-        # Split into lines for structured parsing
-        lines = text.split('\n')
+        # The header is in the first lines; don't split the rest of the text
+        lines = text.split('\n', 11)
         
         # pdfplumber preserves table structure better
         # Look for the header line with labels and the next line with values
@@ -98,27 +177,25 @@ class PayslipExtractor:
                 # This is the header line, values are on the next line
                 if i + 1 < len(lines):
                     values_line = lines[i + 1]
-                    # Extract values in order: VAT Number, Pay Date, Periods, Period End
-                    parts = values_line.split()
                     
                     # VAT Number (10 digits)
-                    vat_match = re.search(r'(\d{10})', values_line)
+                    vat_match = VAT_NUMBER_RE.search(values_line)
                     if vat_match:
                         header_data['vat_number'] = vat_match.group(1)
                     
                     # Pay Date (DD/MM/YYYY)
-                    pay_dates = re.findall(r'(\d{2}/\d{2}/\d{4})', values_line)
+                    pay_dates = FULL_DATE_RE.findall(values_line)
                     if len(pay_dates) >= 2:
                         header_data['pay_date'] = pay_dates[0]
                         header_data['period_end'] = pay_dates[1]
                     
                     # Verification Number (from label line or values line)
-                    verif_match = re.search(r'Verification Number[:\s]*(\d+)', line + ' ' + values_line)
+                    verif_match = VERIFICATION_NUMBER_RE.search(line + ' ' + values_line)
                     if verif_match:
                         header_data['verification_number'] = verif_match.group(1)
                     
                     # UTR Number
-                    utr_match = re.search(r'UTR Number[:\s]*(\d+)', line + ' ' + values_line)
+                    utr_match = UTR_NUMBER_RE.search(line + ' ' + values_line)
                     if utr_match:
                         header_data['utr_number'] = utr_match.group(1)
                     
@@ -128,79 +205,86 @@ class PayslipExtractor:
     
     def parse_financial_summary(self, text: str) -> Dict:
         """Extract financial summary from payslip."""
-        financial_data = {}
-        
-        # Extract Total Company Income
-        match = re.search(r'Total Company Income\s*£\s*([\d,]+\.?\d*)', text)
-        if match:
-            financial_data['total_company_income'] = float(match.group(1).replace(',', ''))
-        
-        # Extract Materials
-        match = re.search(r'Materials\s*£\s*([\d,]+\.?\d*)', text)
-        if match:
-            financial_data['materials'] = float(match.group(1).replace(',', ''))
+        found = {}
         
-        # Extract Gross Subcontractor Payment (not YTD)
-        matches = re.findall(r'Gross Subcontractor Payment\s*£\s*([\d,]+\.?\d*)', text)
-        if matches:
-            financial_data['gross_subcontractor_payment'] = float(matches[0].replace(',', ''))
+        # One scan for all the labels; the first figure for each one wins.
+        # Labels can be separated from their amounts by a line break, so
+        # this runs over the whole text rather than line by line.
+        for match in FINANCIAL_SUMMARY_RE.finditer(text):
+            field = FINANCIAL_FIELDS[match.group(1)]
+            if field not in found:
+                found[field] = float(match.group(2).replace(',', ''))
         
-        # Extract Gross Subcontractor Payment YTD
-        match = re.search(r'Gross Subcontractor Payment YTD\s*£\s*([\d,]+\.?\d*)', text)
-        if match:
-            financial_data['gross_subcontractor_payment_ytd'] = float(match.group(1).replace(',', ''))
+        return {field: found[field] for field in FINANCIAL_FIELDS.values() if field in found}
+    
+    def tokenise_lines(self, text: str):
+        """Split payslip text into stripped lines and classify them once.
         
-        # Extract Net Payment
-        match = re.search(r'Net Payment\s*£\s*([\d,]+\.?\d*)', text)
-        if match:
-            financial_data['net_payment'] = float(match.group(1).replace(',', ''))
+        Returns (lines, items, rates). ``items`` maps the index of each
+        deduction, company margin and job line to (kind, match). ``rates``
+        maps the index of each line starting with a number and holding a
+        £ amount to (rate line?, units/rate match, units/rate Rico match).
+        Cheap substring checks keep most lines away from the regexes.
+        """
+        lines = [line.strip() for line in text.split('\n')]
+        items = {}
+        rates = {}
         
-        # Extract Total Paid To Your Bank
-        match = re.search(r'Total Paid To Your Bank\s*£\s*([\d,]+\.?\d*)', text)
-        if match:
-            financial_data['total_paid_to_bank'] = float(match.group(1).replace(',', ''))
+        for index, line in enumerate(lines):
+            if not line:
+                continue
+            
+            # Deduction lines don't have job numbers or pipes
+            # Format: "1.00 £(4.00) Daniel Hanson: Deduction 18/10/2025" or "Daniel Hanson: Deduction Rico 26/03/2022"
+            # Or: "Company Margin £ (11.00)"
+            margin = MARGIN_RE.search(line) if 'Company Margin' in line else None
+            if 'Deduction' in line and '|' not in line and DEDUCTION_RE.search(line):
+                items[index] = ('deduction', DEDUCTION_AMOUNT_RE.search(line))
+            elif margin:
+                items[index] = ('margin', margin)
+            elif line.startswith('Daniel Hanson:') and '|' in line:
+                # Format 2022+: "Daniel Hanson: 2609338 | Client..."
+                # Format 2021: "Daniel Hanson: Client..."
+                items[index] = ('job', JOB_LINE_RE.match(line))
+            
+            if line[0] in '0123456789.' and '£' in line:
+                rates[index] = (
+                    RATE_LINE_RE.match(line) is not None,
+                    UNITS_RATE_RE.match(line),
+                    UNITS_RATE_RICO_RE.match(line),
+                )
         
-        return financial_data
+        return lines, items, rates
     
     def parse_job_items(self, text: str) -> List[Dict]:
         """Extract individual job items from payslip."""
         job_items = []
         seen_descriptions = set()  # Track seen jobs to avoid duplicates
         
-        # Pattern to match job entries
-        # This is complex due to the varied format, so we'll use a simpler approach
-        lines = text.split('\n')
+        lines, items, rates = self.tokenise_lines(text)
+        line_count = len(lines)
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Check for deduction lines first (these don't have job numbers or pipes)
-            # Format: "1.00 £(4.00) Daniel Hanson: Deduction 18/10/2025" or "Daniel Hanson: Deduction Rico 26/03/2022"
-            # Or: "Company Margin £ (11.00)"
-            # Important: Deduction lines should NOT have a pipe character after "Daniel Hanson:"
-            deduction_match = re.search(r'Daniel Hanson:\s*Deduction', line) and '|' not in line
-            margin_match = re.search(r'Company Margin\s+£\s*\(([\d,]+\.?\d*)\)', line)
+        for i in sorted(items):
+            kind, match = items[i]
+            line = lines[i]
             
-            if deduction_match or margin_match:
+            if kind in ('deduction', 'margin'):
                 job_item = {}
                 job_item['description'] = line
                 job_item['job_number'] = None
                 
-                if deduction_match:
+                if kind == 'deduction':
                     job_item['client'] = 'Deduction'
-                    # Format: "1.00 £(4.00) Daniel Hanson: Deduction 18/10/2025"
-                    # Extract the amount in parentheses before "Daniel Hanson:"
-                    amount_match = re.search(r'£\(([\d,]+\.?\d*)\)\s+Daniel Hanson:\s*Deduction', line)
-                    if amount_match:
-                        amount_str = amount_match.group(1).replace(',', '')
+                    # Amount in parentheses before "Daniel Hanson:"
+                    if match:
+                        amount_str = match.group(1).replace(',', '')
                         job_item['rate'] = -float(amount_str)
                         job_item['units'] = 1.0
                         job_item['amount'] = job_item['rate']
-                elif margin_match:
+                else:
                     job_item['client'] = 'Company Margin'
                     # Format: "Company Margin £ (11.00)"
-                    amount_str = margin_match.group(1).replace(',', '')
+                    amount_str = match.group(1).replace(',', '')
                     job_item['rate'] = -float(amount_str)
                     job_item['units'] = 1.0
                     job_item['amount'] = job_item['rate']
@@ -211,163 +295,148 @@ class PayslipExtractor:
                     if job_key not in seen_descriptions:
                         seen_descriptions.add(job_key)
                         job_items.append(job_item)
-                
-                i += 1
                 continue
             
-            # Look for job pattern - with or without job number
-            # Format 2022+: "Daniel Hanson: 2609338 | Client..."
-            # Format 2021: "Daniel Hanson: Client..."
-            job_match = re.match(r'Daniel Hanson:\s*(?:(\d+)\s*\|)?(.+)', line)
-            if job_match and '|' in line:
-                job_item = {}
-                if job_match.group(1):
-                    job_item['job_number'] = job_match.group(1)
-                else:
-                    # No job number in 2021 format, use a placeholder
-                    job_item['job_number'] = None
-                
-                # Extract full description (may span multiple lines)
-                # Build description by reading lines until we find units/rate, then continue for location
-                description_parts = [line]
-                j = i + 1
-                rate_line_index = None
+            job_item = {}
+            if match.group(1):
+                job_item['job_number'] = match.group(1)
+            else:
+                # No job number in 2021 format, use a placeholder
+                job_item['job_number'] = None
+            
+            # Extract full description (may span multiple lines)
+            # Build description by reading lines until we find units/rate, then continue for location
+            description_parts = [line]
+            j = i + 1
+            rate_line_index = None
+            
+            # First, find the rate line
+            while j < line_count and j < i + 10:
+                next_line = lines[j]
                 
-                # First, find the rate line
-                while j < len(lines) and j < i + 10:
-                    next_line = lines[j].strip()
-                    
-                    # Check if this is the units/rate line
-                    if re.match(r'^\d+\.\d+\s+£', next_line):
-                        rate_line_index = j
-                        # Add the rate line content (which may include location after the amount)
-                        description_parts.append(next_line)
-                        j += 1
-                        break
-                    
-                    # Stop if we hit the next job
-                    if next_line.startswith('Daniel Hanson:') or re.match(r'^Total Company Income', next_line):
-                        break
-                    
-                    # Include lines before rate line
-                    if next_line:
-                        description_parts.append(next_line)
+                # Check if this is the units/rate line
+                rate = rates.get(j)
+                if rate and rate[0]:
+                    rate_line_index = j
+                    # Add the rate line content (which may include location after the amount)
+                    description_parts.append(next_line)
                     j += 1
+                    break
                 
-                # After finding rate line, continue for 2-3 more lines to get location/job type
-                if rate_line_index:
-                    for k in range(2):
-                        if j < len(lines):
-                            next_line = lines[j].strip()
-                            if next_line and not next_line.startswith('Daniel Hanson:'):
-                                description_parts.append(next_line)
-                                j += 1
-                            else:
-                                break
-                
-                job_item['description'] = ' '.join(description_parts)
-                
-                # Try to parse components from description
-                desc = job_item['description']
-                
-                # Extract client (between first | and second |)
-                client_match = re.search(r'\|\s*([^|]+?)\s*\|', desc)
-                if client_match:
-                    client_text = client_match.group(1).strip()
-                    # Clean up client: remove units/rate pattern and codes
-                    client_text = re.sub(r'\s+\d+\.\d+\s+£[\d,]+\.\d+.*$', '', client_text)  # Remove rate info
-                    client_text = re.sub(r'\s+(SCS|TVS|IFM|Limited|Rico)$', '', client_text)  # Remove trailing codes
-                    client_text = ' '.join(client_text.split())  # Normalize whitespace
-                    if client_text:
-                        job_item['client'] = client_text
-                
-                # Extract location (between second | and third |)
-                location_match = re.search(r'\|[^|]+\|\s*([^|]+?)\s*\|', desc)
-                if location_match:
-                    location_text = location_match.group(1).strip()
-                    # Clean up location: remove units/rate patterns, dates, codes, and extra info
-                    location_text = re.sub(r'\s+\d+\.\d+\s+£[\d,]+\.\d+.*$', '', location_text)  # Remove "1.00 £22.50 ..." pattern
-                    location_text = re.sub(r'\s+\d{2}/\d{2}/\d{4}.*$', '', location_text)  # Remove dates and after
-                    location_text = re.sub(r'\s+(SCS|TVS|IFM|Rico)\s+', ' ', location_text)  # Remove codes (but keep "Limited" as it's part of company names)
-                    location_text = re.sub(r'^\s*(SCS|TVS|IFM|Rico)\s+', '', location_text)  # Remove codes at start
-                    location_text = ' '.join(location_text.split())  # Normalize whitespace
-                    if location_text:
-                        job_item['location'] = location_text
-                
-                # Extract job type (after third |, before date/time info)
-                job_type_match = re.search(r'\|[^|]+\|[^|]+\|\s*([^|]+?)(?:\s*-\s*(?:ND|AP|Priority|4HR|8HR|6HR|Timed)|\s*\|)', desc)
-                if job_type_match:
-                    job_item['job_type'] = job_type_match.group(1).strip()
-                
-                # Extract dates from description (format: DD/MM/YY HH:MM)
-                # Pattern: 16/03/24 09:00 or 16/03/24 09:00 17/03/24 10:30
-                date_matches = re.findall(r'(\d{2}/\d{2}/\d{2})\s+(\d{2}:\d{2})', desc)
-                if date_matches and len(date_matches) > 0:
-                    # First date/time is the job start
-                    job_item['date'] = date_matches[0][0]
-                    job_item['time'] = date_matches[0][1]
-                
-                # Look forward for units and rate
-                # Format varies by year:
-                # 2024-2025: "1.00 £22.50 [rest]" on line i+1 or i+2
-                # 2021-2023: "1.00 £22.50 Rico [rest]" on line i+3 to i+6
-                units_rate_match = None
-                rate_line_content = None
+                # Stop if we hit the next job
+                if next_line.startswith('Daniel Hanson:') or next_line.startswith('Total Company Income'):
+                    break
                 
-                # Try 2024-2025 format first (closer to job line, no Rico)
-                for offset in [1, 2, 3]:
-                    if i + offset < len(lines):
-                        forward_line = lines[i+offset].strip()
-                        # Match: units (decimal) followed by £rate (NOT followed by Rico immediately)
-                        units_rate_match = re.match(r'([\d.]+)\s+£([\d,]+\.?\d*)\s+(?!Rico)', forward_line)
-                        if units_rate_match:
-                            job_item['units'] = float(units_rate_match.group(1))
-                            rate_str = units_rate_match.group(2).replace(',', '')
-                            job_item['rate'] = float(rate_str)
-                            job_item['amount'] = job_item['units'] * job_item['rate']
+                # Include lines before rate line
+                if next_line:
+                    description_parts.append(next_line)
+                j += 1
+            
+            # After finding rate line, continue for 2-3 more lines to get location/job type
+            if rate_line_index:
+                for k in range(2):
+                    if j < line_count:
+                        next_line = lines[j]
+                        if next_line and not next_line.startswith('Daniel Hanson:'):
+                            description_parts.append(next_line)
+                            j += 1
+                        else:
                             break
-                
-                # If not found, try 2021-2023 format (further away, with Rico)
-                if not units_rate_match:
-                    for offset in range(1, 8):
-                        if i + offset < len(lines):
-                            forward_line = lines[i+offset].strip()
-                            # Match: units (decimal) followed by £rate followed by Rico (with or without text after)
-                            units_rate_match = re.match(r'([\d.]+)\s+£([\d,]+\.?\d*)\s+Rico(?:\s|$)', forward_line)
-                            if units_rate_match:
-                                job_item['units'] = float(units_rate_match.group(1))
-                                rate_str = units_rate_match.group(2).replace(',', '')
-                                job_item['rate'] = float(rate_str)
-                                job_item['amount'] = job_item['units'] * job_item['rate']
-                                break
-                
-                # Look forward for agency and date
-                for k in range(i+1, min(i+5, len(lines))):
-                    if re.match(r'^Rico$', lines[k].strip()):
-                        job_item['agency'] = 'Rico'
-                        if k+1 < len(lines):
-                            date_match = re.match(r'(\d{2}/\d{2}/\d{4})', lines[k+1].strip())
-                            if date_match:
-                                job_item['weekend_date'] = date_match.group(1)
+            
+            job_item['description'] = ' '.join(description_parts)
+            
+            # Try to parse components from description
+            desc = job_item['description']
+            
+            # Extract client (between first | and second |)
+            client_match = CLIENT_RE.search(desc)
+            if client_match:
+                client_text = client_match.group(1).strip()
+                # Clean up client: remove units/rate pattern and codes
+                client_text = RATE_SUFFIX_RE.sub('', client_text)  # Remove rate info
+                client_text = CLIENT_CODE_SUFFIX_RE.sub('', client_text)  # Remove trailing codes
+                client_text = ' '.join(client_text.split())  # Normalize whitespace
+                if client_text:
+                    job_item['client'] = client_text
+            
+            # Extract location (between second | and third |)
+            location_match = LOCATION_RE.search(desc)
+            if location_match:
+                location_text = location_match.group(1).strip()
+                # Clean up location: remove units/rate patterns, dates, codes, and extra info
+                location_text = RATE_SUFFIX_RE.sub('', location_text)  # Remove "1.00 £22.50 ..." pattern
+                location_text = DATE_SUFFIX_RE.sub('', location_text)  # Remove dates and after
+                location_text = LOCATION_CODE_RE.sub(' ', location_text)  # Remove codes (but keep "Limited" as it's part of company names)
+                location_text = LOCATION_CODE_PREFIX_RE.sub('', location_text)  # Remove codes at start
+                location_text = ' '.join(location_text.split())  # Normalize whitespace
+                if location_text:
+                    job_item['location'] = location_text
+            
+            # Extract job type (after third |, before date/time info)
+            job_type_match = JOB_TYPE_RE.search(desc)
+            if job_type_match:
+                job_item['job_type'] = job_type_match.group(1).strip()
+            
+            # Extract dates from description (format: DD/MM/YY HH:MM)
+            # Pattern: 16/03/24 09:00 or 16/03/24 09:00 17/03/24 10:30
+            date_match = JOB_DATE_TIME_RE.search(desc)
+            if date_match:
+                # First date/time is the job start
+                job_item['date'] = date_match.group(1)
+                job_item['time'] = date_match.group(2)
+            
+            # Look forward for units and rate
+            # Format varies by year:
+            # 2024-2025: "1.00 £22.50 [rest]" on line i+1 or i+2
+            # 2021-2023: "1.00 £22.50 Rico [rest]" on line i+3 to i+6
+            units_rate_match = None
+            
+            # Try 2024-2025 format first (closer to job line, no Rico)
+            for offset in (1, 2, 3):
+                rate = rates.get(i + offset)
+                if rate and rate[1]:
+                    units_rate_match = rate[1]
+                    break
+            
+            # If not found, try 2021-2023 format (further away, with Rico)
+            if not units_rate_match:
+                for offset in range(1, 8):
+                    rate = rates.get(i + offset)
+                    if rate and rate[2]:
+                        units_rate_match = rate[2]
                         break
-                
-                # Create a unique key for this job to detect duplicates
-                # Include job_number to ensure uniqueness even if other fields match
-                job_key = f"{job_item.get('job_number', '')}|{job_item.get('client', '')}|{job_item.get('location', '')}|{job_item.get('date', '')}|{job_item.get('time', '')}|{job_item.get('amount', 0)}"
-                
-                # Only add if we haven't seen this exact job before
-                if job_key not in seen_descriptions:
-                    seen_descriptions.add(job_key)
-                    job_items.append(job_item)
             
-            i += 1
+            if units_rate_match:
+                job_item['units'] = float(units_rate_match.group(1))
+                rate_str = units_rate_match.group(2).replace(',', '')
+                job_item['rate'] = float(rate_str)
+                job_item['amount'] = job_item['units'] * job_item['rate']
+            
+            # Look forward for agency and date
+            for k in range(i+1, min(i+5, line_count)):
+                if lines[k] == 'Rico':
+                    job_item['agency'] = 'Rico'
+                    if k+1 < line_count:
+                        date_match = FULL_DATE_RE.match(lines[k+1])
+                        if date_match:
+                            job_item['weekend_date'] = date_match.group(1)
+                    break
+            
+            # Create a unique key for this job to detect duplicates
+            # Include job_number to ensure uniqueness even if other fields match
+            job_key = f"{job_item.get('job_number', '')}|{job_item.get('client', '')}|{job_item.get('location', '')}|{job_item.get('date', '')}|{job_item.get('time', '')}|{job_item.get('amount', 0)}"
+            
+            # Only add if we haven't seen this exact job before
+            if job_key not in seen_descriptions:
+                seen_descriptions.add(job_key)
+                job_items.append(job_item)
         
         return job_items
     
     def extract_from_filename(self, filename: str) -> Dict:
         """Extract tax year and week number from filename."""
         # Try format: Week52 2021 or Week52_2021
-        match = re.search(r'Week(\d+)[\s_]+(\d{4})', filename)
+        match = FILENAME_WEEK_RE.search(filename)
         if match:
             return {
                 'week_number': int(match.group(1)),
@@ -375,103 +444,179 @@ class PayslipExtractor:
             }
         return {}
     
+    def read_payslip(self, pdf_path: Path) -> Dict:
+        """Extract and parse one payslip PDF without touching the database.
+        
+        Returns {'payslip': column values, 'job_items': [...]}.
+        """
+        text = self.extract_text_from_pdf(str(pdf_path))
+        parsed = self.parse_payslip(text)
+        
+        # Combine all data
+        payslip_data = {
+            **self.extract_from_filename(pdf_path.name),
+            **parsed['header'],
+            **parsed['financial'],
+            'pdf_filename': pdf_path.name
+        }
+        return {'payslip': payslip_data, 'job_items': parsed['job_items']}
+    
+    def store_payslip(self, payslip_data: Dict, job_items: List[Dict]) -> int:
+        """Write a payslip and its job items, replacing the same tax year and week.
+        
+        Does not commit.
+        """
+        cursor = self.conn.cursor()
+        
+        # First, check if this payslip already exists and delete its old job items
+        cursor.execute("""
+            DELETE FROM job_items 
+            WHERE payslip_id IN (
+                SELECT id FROM payslips 
+                WHERE tax_year = ? AND week_number = ?
+            )
+        """, (payslip_data.get('tax_year'), payslip_data.get('week_number')))
+        
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO payslips ({', '.join(PAYSLIP_COLUMNS)})
+            VALUES ({', '.join('?' * len(PAYSLIP_COLUMNS))})
+        """, tuple(payslip_data.get(column) for column in PAYSLIP_COLUMNS))
+        
+        payslip_id = cursor.lastrowid
+        
+        cursor.executemany(f"""
+            INSERT INTO job_items (payslip_id, {', '.join(JOB_ITEM_COLUMNS)})
+            VALUES (?, {', '.join('?' * len(JOB_ITEM_COLUMNS))})
+        """, [
+            (payslip_id, *(job_item.get(column) for column in JOB_ITEM_COLUMNS))
+            for job_item in job_items
+        ])
+        
+        return payslip_id
+    
     def process_payslip(self, pdf_path) -> Optional[int]:
         """Process a single payslip PDF and insert into database."""
+        return self._process_one(pdf_path)[0]
+    
+    def _process_one(self, pdf_path) -> Tuple[Optional[int], Optional[str]]:
+        """Process a single payslip PDF; returns (payslip id, error)."""
         # Handle both Path and str types
         if isinstance(pdf_path, str):
             pdf_path = Path(pdf_path)
         print(f"Processing: {pdf_path.name}")
         
         try:
-            # Extract text
-            text = self.extract_text_from_pdf(str(pdf_path))
-            
-            # Parse data
-            file_data = self.extract_from_filename(pdf_path.name)
-            header_data = self.parse_payslip_header(text)
-            financial_data = self.parse_financial_summary(text)
-            job_items = self.parse_job_items(text)
-            
-            # Combine all data
-            payslip_data = {
-                **file_data,
-                **header_data,
-                **financial_data,
-                'pdf_filename': pdf_path.name
-            }
-            
-            # Insert payslip summary
-            cursor = self.conn.cursor()
-            
-            # First, check if this payslip already exists and delete its old job items
-            cursor.execute("""
-                DELETE FROM job_items 
-                WHERE payslip_id IN (
-                    SELECT id FROM payslips 
-                    WHERE tax_year = ? AND week_number = ?
-                )
-            """, (payslip_data.get('tax_year'), payslip_data.get('week_number')))
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO payslips (
-                    tax_year, week_number, verification_number, utr_number,
-                    pay_date, period_end, vat_number, total_company_income,
-                    materials, gross_subcontractor_payment,
-                    gross_subcontractor_payment_ytd, net_payment,
-                    total_paid_to_bank, pdf_filename
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                payslip_data.get('tax_year'),
-                payslip_data.get('week_number'),
-                payslip_data.get('verification_number'),
-                payslip_data.get('utr_number'),
-                payslip_data.get('pay_date'),
-                payslip_data.get('period_end'),
-                payslip_data.get('vat_number'),
-                payslip_data.get('total_company_income'),
-                payslip_data.get('materials'),
-                payslip_data.get('gross_subcontractor_payment'),
-                payslip_data.get('gross_subcontractor_payment_ytd'),
-                payslip_data.get('net_payment'),
-                payslip_data.get('total_paid_to_bank'),
-                payslip_data.get('pdf_filename')
-            ))
-            
-            payslip_id = cursor.lastrowid
-            
-            # Insert job items
-            for job_item in job_items:
-                cursor.execute("""
-                    INSERT INTO job_items (
-                        payslip_id, units, rate, amount, description,
-                        job_number, client, location, job_type, date, time, agency, weekend_date
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    payslip_id,
-                    job_item.get('units'),
-                    job_item.get('rate'),
-                    job_item.get('amount'),
-                    job_item.get('description'),
-                    job_item.get('job_number'),
-                    job_item.get('client'),
-                    job_item.get('location'),
-                    job_item.get('job_type'),
-                    job_item.get('date'),
-                    job_item.get('time'),
-                    job_item.get('agency'),
-                    job_item.get('weekend_date')
-                ))
-            
+            data = self.read_payslip(pdf_path)
+            payslip_id = self.store_payslip(data['payslip'], data['job_items'])
             self.conn.commit()
-            print(f"  ✓ Extracted: £{payslip_data.get('net_payment', 0):.2f}, {len(job_items)} jobs")
-            return payslip_id
+            print(f"  ✓ Extracted: £{data['payslip'].get('net_payment', 0):.2f}, {len(data['job_items'])} jobs")
+            self._mark_catalogue(pdf_path, file_catalogue.STATUS_IMPORTED)
+            return payslip_id, None
             
         except Exception as e:
             print(f"  ✗ Error: {e}")
-            return None
+            self._mark_catalogue(pdf_path, file_catalogue.STATUS_FAILED, str(e))
+            return None, str(e)
     
-    def process_all_payslips(self, payslips_dir: str = None, recent_days: int = None):
-        """Process all payslip PDFs in the directory."""
+    def process_payslips(self, pdf_files: List[Path], workers: int = 1,
+                         batch_size: int = 100) -> List[Tuple[Optional[int], Optional[str]]]:
+        """Process several payslips; returns (payslip id, error) per file.
+        
+        With ``workers`` > 1, text extraction and parsing run in a process
+        pool while this extractor writes the results in the order given,
+        committing every ``batch_size`` payslips. The order is what makes
+        the outcome the same as process_payslip on each file in turn: a
+        later file for the same tax year and week still replaces an
+        earlier one.
+        """
+        pdf_files = [Path(f) for f in pdf_files]
+        if workers <= 1 or len(pdf_files) < 2:
+            return [self._process_one(pdf_file) for pdf_file in pdf_files]
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        outcomes = []
+        imported = []
+        failed = []
+        
+        def commit_batch():
+            self.conn.commit()
+            if imported:
+                self._mark_catalogue_many(imported, file_catalogue.STATUS_IMPORTED)
+            for pdf_file, error in failed:
+                self._mark_catalogue(pdf_file, file_catalogue.STATUS_FAILED, error)
+            imported.clear()
+            failed.clear()
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(pdf_files))) as pool:
+            reads = pool.map(_read_payslip_file, [str(f) for f in pdf_files])
+            for pdf_file, (data, error) in zip(pdf_files, reads):
+                print(f"Processing: {pdf_file.name}")
+                payslip_id = None
+                if error is None:
+                    if not self.conn.in_transaction:
+                        self.conn.execute('BEGIN')
+                    # A failed write only loses this payslip, not the batch
+                    self.conn.execute('SAVEPOINT payslip')
+                    try:
+                        payslip_id = self.store_payslip(data['payslip'], data['job_items'])
+                    except Exception as e:
+                        self.conn.execute('ROLLBACK TO SAVEPOINT payslip')
+                        error = str(e)
+                    self.conn.execute('RELEASE SAVEPOINT payslip')
+                
+                outcomes.append((payslip_id, error))
+                if error is None:
+                    print(f"  ✓ Extracted: £{data['payslip'].get('net_payment', 0):.2f}, {len(data['job_items'])} jobs")
+                    imported.append(pdf_file)
+                else:
+                    print(f"  ✗ Error: {error}")
+                    failed.append((pdf_file, error))
+                
+                if len(imported) + len(failed) >= batch_size:
+                    commit_batch()
+        commit_batch()
+        
+        return outcomes
+    
+    def _mark_catalogue(self, pdf_path: Path, status: str, error: str = None):
+        """Record an import outcome in the file catalogue."""
+        try:
+            file_catalogue.mark_status([pdf_path], status, error, conn=self.conn)
+        except sqlite3.OperationalError:
+            pass  # Catalogue table not created yet (app migrations not run)
+    
+    def _mark_catalogue_many(self, pdf_paths: List[Path], status: str):
+        """Record the same import outcome for several files at once."""
+        try:
+            file_catalogue.mark_status(pdf_paths, status, conn=self.conn)
+        except sqlite3.OperationalError:
+            pass
+    
+    def find_payslip_files(self, payslips_path: Path, modified_after: datetime = None) -> List[Path]:
+        """Payslip PDFs under payslips_path, looked up in the file catalogue.
+        
+        The catalogue is brought up to date first (directories whose mtime
+        has not changed are not listed). Falls back to walking the
+        directory if the catalogue table does not exist yet.
+        """
+        payslips_path = Path(payslips_path)
+        root = os.path.abspath(payslips_path)
+        try:
+            file_catalogue.refresh(payslips_path, file_catalogue.PAYSLIP, conn=self.conn)
+            rows = file_catalogue.list_files(root=payslips_path, modified_since=modified_after,
+                                             extensions=['.pdf'], conn=self.conn)
+            return [payslips_path / os.path.relpath(row['path'], root) for row in rows]
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  File catalogue unavailable ({e}), scanning {payslips_path}")
+        
+        pdf_files = sorted(payslips_path.rglob("*.pdf"))
+        if modified_after is not None:
+            pdf_files = [f for f in pdf_files if datetime.fromtimestamp(f.stat().st_mtime) > modified_after]
+        return pdf_files
+    
+    def process_all_payslips(self, payslips_dir: str = None, recent_days: int = None, workers: int = 1):
+        """Process all payslip PDFs in the directory (see process_payslips for workers)."""
         if payslips_dir is None:
             payslips_dir = Config.PAYSLIPS_DIR
         """Process all payslip PDFs in the directory."""
@@ -481,24 +626,19 @@ class PayslipExtractor:
             print(f"Error: Directory {payslips_dir} not found")
             return
         
-        # Find all PDF files
-        pdf_files = sorted(payslips_path.rglob("*.pdf"))
-        
-        # Filter by modification date if recent_days is specified
+        # Find PDF files, modified in the last recent_days if given
         if recent_days is not None:
-            from datetime import datetime, timedelta
+            from datetime import timedelta
             cutoff_time = datetime.now() - timedelta(days=recent_days)
-            original_count = len(pdf_files)
-            pdf_files = [f for f in pdf_files if datetime.fromtimestamp(f.stat().st_mtime) > cutoff_time]
-            print(f"Filtering to files modified in last {recent_days} days: {len(pdf_files)}/{original_count} files")
+            pdf_files = self.find_payslip_files(payslips_path, modified_after=cutoff_time)
+            print(f"Filtering to files modified in last {recent_days} days: {len(pdf_files)} files")
+        else:
+            pdf_files = self.find_payslip_files(payslips_path)
         
         print(f"Found {len(pdf_files)} PDF files")
         print("=" * 60)
         
-        success_count = 0
-        for pdf_file in pdf_files:
-            if self.process_payslip(pdf_file):
-                success_count += 1
+        success_count = sum(1 for payslip_id, _ in self.process_payslips(pdf_files, workers=workers) if payslip_id)
         
         print("=" * 60)
         print(f"Successfully processed: {success_count}/{len(pdf_files)} payslips")
@@ -512,7 +652,6 @@ class PayslipExtractor:
         try:
             # Import here to avoid circular imports
             import sys
-            from pathlib import Path
             
             # Add the app directory to the path
             app_path = Path(__file__).parent.parent / 'app'
@@ -592,22 +731,66 @@ class PayslipExtractor:
             self.conn.close()
 
 
+def _read_payslip_file(pdf_path: str):
+    """Read one payslip in a worker process (see ``process_payslips``).
+    
+    Returns (data, None), or (None, error message) if reading failed.
+    """
+    try:
+        return PayslipExtractor(connect=False).read_payslip(Path(pdf_path)), None
+    except Exception as e:
+        return None, str(e)
+
+
 def main():
     import argparse
     import sys
     
     parser = argparse.ArgumentParser(description='Extract payslip data from PDFs')
     parser.add_argument('--file', type=str, help='Process a single specific file')
+    parser.add_argument('--files', nargs='+', help='Process several specific files in one run')
+    parser.add_argument('--results', type=str, help='With --files: write per-file results as JSON to this path')
     parser.add_argument('--recent', type=int, help='Only process files modified in last N days')
     parser.add_argument('--directory', type=str, help='Directory to process files from')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Extract and parse PDFs in N processes (one process writes to the database)')
     args = parser.parse_args()
     
     extractor = PayslipExtractor()
     
     try:
-        if args.file:
+        if args.files:
+            # Process a batch of files with one extractor (file watcher, batch uploads)
+            results = []
+            to_process = []
+            for name in args.files:
+                file_path = Path(name)
+                result = {'file': name, 'status': 'imported', 'payslip_id': None, 'error': None}
+                results.append(result)
+                if not file_path.exists():
+                    print(f"Error: File not found: {file_path}")
+                    result.update(status='not_found', error=f'File not found: {file_path}')
+                    continue
+                to_process.append(result)
+            outcomes = extractor.process_payslips([r['file'] for r in to_process], workers=args.workers)
+            for result, (payslip_id, error) in zip(to_process, outcomes):
+                name = Path(result['file']).name
+                result['payslip_id'] = payslip_id
+                if payslip_id:
+                    print(f"✓ Successfully processed {name}")
+                else:
+                    print(f"⚠️  Failed to process {name}")
+                    result.update(status='error', error=error or f'Failed to process {name}')
+            processed = sum(1 for r in results if r['status'] == 'imported')
+            if processed:
+                extractor._sync_to_runsheets()
+            if args.results:
+                with open(args.results, 'w') as f:
+                    json.dump(results, f)
+            print(f"\nProcessed {processed}/{len(args.files)} files")
+            sys.exit(0 if processed == len(results) else 1)
+        elif args.file:
             # Process single file
-            from pathlib import Path
             file_path = Path(args.file)
             if not file_path.exists():
                 print(f"Error: File not found: {file_path}")
@@ -627,7 +810,7 @@ def main():
         else:
             # Process all payslips (with optional filters)
             payslips_dir = args.directory if args.directory else Config.PAYSLIPS_DIR
-            extractor.process_all_payslips(payslips_dir, recent_days=args.recent)
+            extractor.process_all_payslips(payslips_dir, recent_days=args.recent, workers=args.workers)
             extractor.get_summary_stats()
     finally:
         extractor.close()
@@ -10,14 +10,17 @@ import sqlite3
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 import csv
+import json
 import logging
 import sys
 
 # Add app to path for config import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from app.config import Config
+from app.services import file_catalogue
 
 # Add production directory to path for Camelot parser
 sys.path.insert(0, str(Path(__file__).parent))
@@ -31,13 +34,145 @@ except ImportError as e:
     print("   Falling back to text-based parsing (pdfplumber/PyPDF2)")
 
 
+# Patterns used by the text parsers, compiled once at import. The customer
+# parsers run them against every line of every job block.
+JOB_NUMBER_RE = re.compile(r'Job #\s*(\d+)')
+HEADER_DATE_RE = re.compile(r'Date\s+(\d{2}/\d{2}/\d{4})')
+HEADER_DRIVER_RE = re.compile(r'Driver\s+([^J]+?)(?:\s+Jobs)')
+HEADER_JOBS_ON_RUN_RE = re.compile(r'Jobs on Run\s+(\d+)')
+
+POSTCODE_RE = re.compile(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b')
+LEADING_NUMBER_SPACE_RE = re.compile(r'^[0-9]+\s*')
+TRAILING_DASH_RE = re.compile(r'\s*-\s*$')
+LEADING_NON_WORD_RE = re.compile(r'^[^\w]+')
+LEADING_PUNCTUATION_RE = re.compile(r'^[-,\s]+')
+TRAILING_PUNCTUATION_RE = re.compile(r'[-,\s]+$')
+NUMBERED_CONTACT_RE = re.compile(r'^\d+[A-Z][a-z]')
+LEADING_DOTS_DIGITS_RE = re.compile(r'^[.\d\s]*')
+DOUBLE_COMMA_RE = re.compile(r',\s*,')
+LEADING_COMMA_RE = re.compile(r'^,\s*')
+TRAILING_COMMA_RE = re.compile(r'\s*,$')
+WHITESPACE_RE = re.compile(r'\s+')
+REPEATED_COMMA_RE = re.compile(r',\s*,+')
+DMY_DATE_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+JOB_NUMBER_CELL_RE = re.compile(r'^[A-Z]*\d{5,}')
+PHONE_CONTACT_RE = re.compile(r'^\d{11}[A-Z][A-Z\s]+$')
+ITEM_CODE_RE = re.compile(r'^[A-Z]{3}\d+$')
+LEADING_DATE_RE = re.compile(r'^\d{2}/\d{2}/\d{4}')
+LEADING_PHONE_RE = re.compile(r'^\d{11}')
+PHONE_STORE_RE = re.compile(r'^\d{11}[A-Z\s]+STORE')
+LEADING_PHONE_SPACE_RE = re.compile(r'^\d{11}\s*')
+DIGITS_RE = re.compile(r'^\d+$')
+NUMBERED_UPPER_CONTACT_RE = re.compile(r'^\d+[A-Z][A-Z\s]+$')
+LEADING_DIGITS_SPACES_RE = re.compile(r'^[\d\s]+')
+SPACED_NUMBERED_CONTACT_RE = re.compile(r'^\d+\s+[A-Za-z][A-Za-z0-9\s\-]+\s*$')
+LEADING_PHONE_NUMBER_RE = re.compile(r'^[\d\s]{10,}\s*')
+NUMBERED_NAME_RE = re.compile(r'^\d+[A-Za-z][A-Za-z0-9\s]+$')
+LONG_NUMBER_PREFIX_RE = re.compile(r'^\d{8,}')
+REFERENCE_CODE_RE = re.compile(r'\b(C\d+|NLC\d+)\b')
+LEADING_REFERENCE_CODE_RE = re.compile(r'^(C\d+|NLC\d+)')
+LEADING_PHONE_DIGITS_RE = re.compile(r'^[\d\s]{10,}')
+LEADING_NUMBER_RE = re.compile(r'^[0-9]+')
+LEADING_CODE_RE = re.compile(r'^[A-Z0-9\s\.]+(?=\w)')
+OTS_PREFIX_RE = re.compile(r'^Y\s*\(OTS\)\s*')
+TRAILING_TIMESTAMP_RE = re.compile(r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}.*$')
+TRAILING_SLA_RE = re.compile(r'A:\s*\d+HR.*$')
+TRAILING_PART_RE = re.compile(r'PART\d+=.*$')
+UPPER_CODE_RE = re.compile(r'^[A-Z]{2,}\s*$')
+POSTCODE_LINE_RE = re.compile(r'^[A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2}$')
+LEADING_C_REFERENCE_RE = re.compile(r'^C\d+')
+LEADING_DOTS_RE = re.compile(r'^\.+')
+PERSON_NAME_RE = re.compile(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$')
+STORE_NUMBER_RE = re.compile(r'^[A-Za-z]+\s+\d{4}')
+NUMBERED_EMAIL_CONTACT_RE = re.compile(r'^\d+[A-Za-z][A-Za-z0-9\s@.]+$')
+INTERNATIONAL_PHONE_RE = re.compile(r'^\+44\d+')
+LONG_NUMBER_RE = re.compile(r'^\d{8,}$')
+PHONE_NUMBER_RE = re.compile(r'^\d{10,}$')
+LEADING_PHONE_OR_DATE_RE = re.compile(r'^[\d\s/]{8,}\s*')
+NOT_AVAILABLE_RE = re.compile(r'^N/A')
+NUMBER_LINE_RE = re.compile(r'^\d+\s*$')
+NUMBERED_UPPER_DOTTED_CONTACT_RE = re.compile(r'^\d+[A-Z][A-Z\s\.]+$')
+NUMBERED_DOTTED_NAME_RE = re.compile(r'^\d+[A-Za-z][A-Za-z0-9\s\.]+$')
+DOTS_RE = re.compile(r'\.+')
+
+ADDRESS_SKIP_PATTERNS = [
+    re.compile(r'^\d{8,}$'),  # Long numbers
+    re.compile(r'^[A-Z]{2,}\d+$'),  # Store codes
+    re.compile(r'^\+?\d{10,}$'),  # Phone numbers
+    re.compile(r'^MANAGER$'),
+    re.compile(r'^tbc[A-Z]'),  # Contact names like "tbcWILLIAM"
+]
+
+# Customer-specific job parsers, checked in order against the upper-cased
+# customer name. An entry matches when all of its substrings appear in the
+# name; a plain string must equal the whole name. Customers that match
+# nothing use parse_generic_job.
+CUSTOMER_PARSERS = [
+    (('POSTURITE',), 'parse_posturite_job'),
+    (('EPAY',), 'parse_epay_job'),
+    (('XEROX',), 'parse_xerox_job'),
+    (('ASTRA ZENECA',), 'parse_astra_zeneca_job'),
+    (('STAR TRAINS',), 'parse_star_trains_job'),
+    (('BANKS', 'FUJITSU'), 'parse_fujitsu_banks_job'),
+    (('EE - ME', 'FUJITSU'), 'parse_fujitsu_ee_me_job'),
+    (('EE - P2PE', 'FUJITSU'), 'parse_fujitsu_ee_p2pe_job'),
+    (('EE', 'FUJITSU'), 'parse_fujitsu_ee_job'),
+    (('SPECSAVERS', 'FUJITSU'), 'parse_specsavers_job'),
+    (('HSBC',), 'parse_hsbc_job'),
+    ('COMPUTACENTER LIMITED', 'parse_computacenter_limited_job'),
+    (('JOHN LEWIS',), 'parse_john_lewis_job'),
+    (('PAYPOINT',), 'parse_paypoint_job'),
+    (('VISTA',), 'parse_vista_job'),
+    (('KINGFISHER',), 'parse_kingfisher_job'),
+    (('SECURE RETAIL',), 'parse_secure_retail_job'),
+    (('NCR TESCO',), 'parse_ncr_tesco_job'),
+    (('DHL SUPPLY CHAIN',), 'parse_dhl_job'),
+    (('HORIZON PROJECT',), 'parse_horizon_project_job'),
+    (('SMART CT',), 'parse_smart_ct_job'),
+    (('RHENUS',), 'parse_rhenus_job'),
+    (('VERIFONE',), 'parse_verifone_job'),
+    (('COGNIZANT',), 'parse_cognizant_job'),
+    (('LEXMARK',), 'parse_tech_job'),
+    (('FUJITSU',), 'parse_tech_job'),
+    (('COMPUTACENTER',), 'parse_tech_job'),
+    (('CXM',), 'parse_tech_job'),
+]
+
+# Lines after a "Job #" line that belong to its job block
+MULTI_DRIVER_JOB_LINES = 34
+SINGLE_DRIVER_JOB_LINES = 19
+
+# run_sheet_jobs columns added after the table was first created
+RUN_SHEET_ADDED_COLUMNS = {
+    'status': "TEXT DEFAULT 'pending'",
+    'route_order': 'INTEGER',
+    'manually_uploaded': 'INTEGER DEFAULT 0',
+}
+
+
+@lru_cache(maxsize=1024)
+def customer_parser_name(customer: str) -> str:
+    """Name of the RunSheetImporter method for an upper-cased customer name."""
+    for keys, method in CUSTOMER_PARSERS:
+        if isinstance(keys, str):
+            if customer == keys:
+                return method
+        elif all(key in customer for key in keys):
+            return method
+    return 'parse_generic_job'
+
+
+
 class RunSheetImporter:
-    def __init__(self, db_path: str = "data/database/payslips.db", name: str = "Daniel Hanson"):
+    def __init__(self, db_path: str = "data/database/payslips.db", name: str = "Daniel Hanson",
+                 connect: bool = True):
         self.db_path = db_path
         self.conn = None
         self.name = name
         self.setup_logging()
-        self.setup_database()
+        if connect:
+            self.setup_database()
         
         # Track dates that have been overwritten in this session
         self.overwritten_dates = set()
@@ -51,7 +186,7 @@ class RunSheetImporter:
         ]
         
         # UK postcode validation pattern
-        self.postcode_pattern = re.compile(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b')
+        self.postcode_pattern = POSTCODE_RE
         
         # Customer name cleaning patterns
         self.customer_cleanup_patterns = [
@@ -63,51 +198,45 @@ class RunSheetImporter:
         ]
     
     def setup_database(self):
-        """Create run_sheet_jobs table if it doesn't exist."""
+        """Create run_sheet_jobs and add missing columns.
+        
+        Reads the table's columns first so a launch against an up-to-date
+        database issues no DDL.
+        """
         self.conn = sqlite3.connect(self.db_path)
         cursor = self.conn.cursor()
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(run_sheet_jobs)")}
+        
+        if not columns:
+            # Create table for run sheet jobs
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS run_sheet_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT,
+                    driver TEXT,
+                    jobs_on_run INTEGER,
+                    job_number TEXT,
+                    customer TEXT,
+                    activity TEXT,
+                    priority TEXT,
+                    job_address TEXT,
+                    postcode TEXT,
+                    notes TEXT,
+                    source_file TEXT,
+                    status TEXT DEFAULT 'pending',
+                    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(date, job_number)
+                )
+            """)
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(run_sheet_jobs)")}
         
-        # Create table for run sheet jobs
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS run_sheet_jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                driver TEXT,
-                jobs_on_run INTEGER,
-                job_number TEXT,
-                customer TEXT,
-                activity TEXT,
-                priority TEXT,
-                job_address TEXT,
-                postcode TEXT,
-                notes TEXT,
-                source_file TEXT,
-                status TEXT DEFAULT 'pending',
-                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(date, job_number)
-            )
-        """)
-        
-        # Add status column if it doesn't exist (for existing databases)
-        try:
-            cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN status TEXT DEFAULT 'pending'")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
-        
-        # Add route_order column if it doesn't exist (for route optimization)
-        try:
-            cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN route_order INTEGER")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
-        
-        # Add manually_uploaded column to protect manual uploads from auto-sync overwrites
-        try:
-            cursor.execute("ALTER TABLE run_sheet_jobs ADD COLUMN manually_uploaded INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
+        # Columns added after the table was first created: status for
+        # existing databases, route_order for route optimization and
+        # manually_uploaded to protect manual uploads from auto-sync
+        # overwrites. The app database gets them from migration 019.
+        for column, definition in RUN_SHEET_ADDED_COLUMNS.items():
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE run_sheet_jobs ADD COLUMN {column} {definition}")
         
         self.conn.commit()
     
@@ -128,9 +257,9 @@ class RunSheetImporter:
             customer = re.sub(pattern, replacement, customer)
         
         # Remove common artifacts
-        customer = re.sub(r'^[0-9]+\s*', '', customer)  # Remove leading numbers
-        customer = re.sub(r'\s*-\s*$', '', customer)  # Remove trailing dash
-        customer = re.sub(r'^[^\w]+', '', customer)  # Remove leading non-word chars
+        customer = LEADING_NUMBER_SPACE_RE.sub('', customer)  # Remove leading numbers
+        customer = TRAILING_DASH_RE.sub('', customer)  # Remove trailing dash
+        customer = LEADING_NON_WORD_RE.sub('', customer)  # Remove leading non-word chars
         
         return customer.strip()
     
@@ -176,27 +305,19 @@ class RunSheetImporter:
             return ""
         
         # Remove leading dots and numbers
-        clean_line = re.sub(r'^[.\d\s]*', '', line).strip()
+        clean_line = LEADING_DOTS_DIGITS_RE.sub('', line).strip()
         
         # Remove common artifacts
-        clean_line = re.sub(r'^[-,\s]+', '', clean_line)  # Leading punctuation
-        clean_line = re.sub(r'[-,\s]+$', '', clean_line)  # Trailing punctuation
+        clean_line = LEADING_PUNCTUATION_RE.sub('', clean_line)  # Leading punctuation
+        clean_line = TRAILING_PUNCTUATION_RE.sub('', clean_line)  # Trailing punctuation
         
         # Remove contact names that start with numbers
-        if re.match(r'^\d+[A-Z][a-z]', clean_line):  # e.g., "1Ellie"
+        if NUMBERED_CONTACT_RE.match(clean_line):  # e.g., "1Ellie"
             return ""
         
         # Skip lines that are clearly not address parts
-        skip_patterns = [
-            r'^\d{8,}$',  # Long numbers
-            r'^[A-Z]{2,}\d+$',  # Store codes
-            r'^\+?\d{10,}$',  # Phone numbers
-            r'^MANAGER$',
-            r'^tbc[A-Z]',  # Contact names like "tbcWILLIAM"
-        ]
-        
-        for pattern in skip_patterns:
-            if re.match(pattern, clean_line):
+        for pattern in ADDRESS_SKIP_PATTERNS:
+            if pattern.match(clean_line):
                 return ""
         
         return clean_line
@@ -216,10 +337,10 @@ class RunSheetImporter:
         address = ', '.join(valid_lines)
         
         # Clean up common issues
-        address = re.sub(r',\s*,', ',', address)  # Double commas
-        address = re.sub(r'^,\s*', '', address)  # Leading comma
-        address = re.sub(r'\s*,$', '', address)  # Trailing comma
-        address = re.sub(r'\s+', ' ', address)  # Multiple spaces
+        address = DOUBLE_COMMA_RE.sub(',', address)  # Double commas
+        address = LEADING_COMMA_RE.sub('', address)  # Leading comma
+        address = TRAILING_COMMA_RE.sub('', address)  # Trailing comma
+        address = WHITESPACE_RE.sub(' ', address)  # Multiple spaces
         
         return address.strip()
     
@@ -270,8 +391,8 @@ class RunSheetImporter:
         if cleaned_job.get('job_address'):
             address = cleaned_job['job_address']
             # Remove excessive commas and spaces
-            address = re.sub(r',\s*,+', ',', address)
-            address = re.sub(r'\s+', ' ', address)
+            address = REPEATED_COMMA_RE.sub(',', address)
+            address = WHITESPACE_RE.sub(' ', address)
             cleaned_job['job_address'] = address.strip()
         
         # Validate and clean postcode
@@ -398,11 +519,11 @@ class RunSheetImporter:
             cell_str = str(cell).strip()
             
             # Date pattern: DD/MM/YY or DD/MM/YYYY or YYYY-MM-DD
-            if re.match(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', cell_str) or re.match(r'\d{4}-\d{2}-\d{2}', cell_str):
+            if DMY_DATE_RE.match(cell_str) or ISO_DATE_RE.match(cell_str):
                 job['date'] = cell_str
             
             # Job number pattern: digits, possibly with prefix
-            elif re.match(r'^[A-Z]*\d{5,}', cell_str):
+            elif JOB_NUMBER_CELL_RE.match(cell_str):
                 job['job_number'] = cell_str
             
             # Skip if it's the name
@@ -452,35 +573,48 @@ class RunSheetImporter:
                 return True
         return False
     
-    def parse_multi_driver_page(self, lines: List[str]) -> List[Dict]:
-        """Parse multi-driver runsheet format with customer-specific parsing."""
-        jobs = []
-        
-        # Extract header info (date, driver, jobs on run)
+    def parse_page_header(self, lines: List[str]) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        """Return the (date, driver, jobs on run) from a page's header line."""
         header_date = None
         header_driver = None
         jobs_on_run = None
         
         for line in lines[:5]:
             if 'Date' in line and 'Driver' in line and 'Jobs on Run' in line:
-                date_match = re.search(r'Date\s+(\d{2}/\d{2}/\d{4})', line)
+                date_match = HEADER_DATE_RE.search(line)
                 if date_match:
                     header_date = date_match.group(1)
                 
-                driver_match = re.search(r'Driver\s+([^J]+?)(?:\s+Jobs)', line)
+                driver_match = HEADER_DRIVER_RE.search(line)
                 if driver_match:
                     header_driver = driver_match.group(1).strip()
                 
-                jobs_match = re.search(r'Jobs on Run\s+(\d+)', line)
+                jobs_match = HEADER_JOBS_ON_RUN_RE.search(line)
                 if jobs_match:
                     jobs_on_run = int(jobs_match.group(1))
                 break
         
+        return header_date, header_driver, jobs_on_run
+    
+    def split_job_blocks(self, lines: List[str], max_lines: int) -> Iterator[Tuple[str, List[str]]]:
+        """Yield each "Job #" line with the stripped lines of its block.
+        
+        A block ends at the next "Job #" line or after ``max_lines`` lines.
+        The page is stripped and scanned once.
+        """
+        stripped = [line.strip() for line in lines]
+        starts = [i for i, line in enumerate(stripped) if line.startswith('Job #')]
+        for n, i in enumerate(starts):
+            end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+            yield lines[i], stripped[i + 1:min(end, i + 1 + max_lines)]
+    
+    def parse_multi_driver_page(self, lines: List[str]) -> List[Dict]:
+        """Parse multi-driver runsheet format with customer-specific parsing."""
+        jobs = []
+        header_date, header_driver, jobs_on_run = self.parse_page_header(lines)
+        
         # Find job entries
-        for i, line in enumerate(lines):
-            if not line.strip().startswith('Job #'):
-                continue
-            
+        for line, job_lines in self.split_job_blocks(lines, MULTI_DRIVER_JOB_LINES):
             job = {
                 'date': header_date,
                 'driver': header_driver,
@@ -488,77 +622,16 @@ class RunSheetImporter:
             }
             
             # Extract job number
-            job_match = re.search(r'Job #\s*(\d+)', line)
+            job_match = JOB_NUMBER_RE.search(line)
             if job_match:
                 job['job_number'] = job_match.group(1)
             
-            # Get job content for customer-specific parsing
-            job_lines = []
-            for j in range(i+1, min(i+35, len(lines))):  # Increased from 25 to 35 to capture postcodes
-                curr_line = lines[j].strip()
-                if curr_line.startswith('Job #'):
-                    break
-                job_lines.append(curr_line)
-            
-            # First, get the customer to determine parsing method
+            # The customer decides which parser reads the rest of the block
             customer = self.extract_customer_from_lines(job_lines)
             if customer:
                 job['customer'] = customer
-                
-                # Use customer-specific parsing
-                if 'POSTURITE' in customer.upper():
-                    self.parse_posturite_job(job, job_lines)
-                elif 'EPAY' in customer.upper():
-                    self.parse_epay_job(job, job_lines)
-                elif 'XEROX' in customer.upper():
-                    self.parse_xerox_job(job, job_lines)
-                elif 'ASTRA ZENECA' in customer.upper():
-                    self.parse_astra_zeneca_job(job, job_lines)
-                elif 'STAR TRAINS' in customer.upper():
-                    self.parse_star_trains_job(job, job_lines)
-                elif 'BANKS' in customer.upper() and 'FUJITSU' in customer.upper():
-                    self.parse_fujitsu_banks_job(job, job_lines)
-                elif 'EE - ME' in customer.upper() and 'FUJITSU' in customer.upper():
-                    self.parse_fujitsu_ee_me_job(job, job_lines)
-                elif 'EE - P2PE' in customer.upper() and 'FUJITSU' in customer.upper():
-                    self.parse_fujitsu_ee_p2pe_job(job, job_lines)
-                elif 'EE' in customer.upper() and 'FUJITSU' in customer.upper():
-                    self.parse_fujitsu_ee_job(job, job_lines)
-                elif 'SPECSAVERS' in customer.upper() and 'FUJITSU' in customer.upper():
-                    self.parse_specsavers_job(job, job_lines)
-                elif 'HSBC' in customer.upper():
-                    self.parse_hsbc_job(job, job_lines)
-                elif customer.upper() == 'COMPUTACENTER LIMITED':
-                    self.parse_computacenter_limited_job(job, job_lines)
-                elif 'JOHN LEWIS' in customer.upper():
-                    self.parse_john_lewis_job(job, job_lines)
-                elif 'PAYPOINT' in customer.upper():
-                    self.parse_paypoint_job(job, job_lines)
-                elif 'VISTA' in customer.upper():
-                    self.parse_vista_job(job, job_lines)
-                elif 'KINGFISHER' in customer.upper():
-                    self.parse_kingfisher_job(job, job_lines)
-                elif 'SECURE RETAIL' in customer.upper():
-                    self.parse_secure_retail_job(job, job_lines)
-                elif 'NCR TESCO' in customer.upper():
-                    self.parse_ncr_tesco_job(job, job_lines)
-                elif 'DHL SUPPLY CHAIN' in customer.upper():
-                    self.parse_dhl_job(job, job_lines)
-                elif 'HORIZON PROJECT' in customer.upper():
-                    self.parse_horizon_project_job(job, job_lines)
-                elif 'SMART CT' in customer.upper():
-                    self.parse_smart_ct_job(job, job_lines)
-                elif 'RHENUS' in customer.upper():
-                    self.parse_rhenus_job(job, job_lines)
-                elif 'VERIFONE' in customer.upper():
-                    self.parse_verifone_job(job, job_lines)
-                elif 'COGNIZANT' in customer.upper():
-                    self.parse_cognizant_job(job, job_lines)
-                elif 'LEXMARK' in customer.upper() or 'FUJITSU' in customer.upper() or 'COMPUTACENTER' in customer.upper() or 'CXM' in customer.upper():
-                    self.parse_tech_job(job, job_lines)
-                else:
-                    # Generic parsing for unknown customers
-                    self.parse_generic_job(job, job_lines)
+                parse_job = getattr(self, customer_parser_name(customer.upper()))
+                parse_job(job, job_lines)
             
             # Validate and add job
             if self.validate_job(job):
@@ -605,20 +678,20 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('DESK INSTALL') or line.startswith('CHAIR SP') or
-                re.match(r'^[A-Z]{3}\d+$', line) or  # DEL codes
+                ITEM_CODE_RE.match(line) or  # DEL codes
                 line.startswith('ND ') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line)):  # dates
+                LEADING_DATE_RE.match(line)):  # dates
                 continue
             
             # Extract contact name (after phone number)
-            if re.match(r'^\d{11}[A-Z][A-Z\s]+$', line):  # e.g., "07709858783JOANNE CARR"
-                contact_name = re.sub(r'^\d{11}', '', line).strip()
+            if PHONE_CONTACT_RE.match(line):  # e.g., "07709858783JOANNE CARR"
+                contact_name = LEADING_PHONE_RE.sub('', line).strip()
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -667,21 +740,21 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('COLLECTION') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line)):  # dates
+                LEADING_DATE_RE.match(line)):  # dates
                 continue
             
             # Start collecting address after phone number line
-            if re.match(r'^\d{11}[A-Z\s]+STORE', line):  # e.g., "07873640608 FOUNDRY ARMS STORE"
+            if PHONE_STORE_RE.match(line):  # e.g., "07873640608 FOUNDRY ARMS STORE"
                 collecting_address = True
                 # Extract store name from this line
-                store_name = re.sub(r'^\d{11}\s*', '', line).strip()
+                store_name = LEADING_PHONE_SPACE_RE.sub('', line).strip()
                 if store_name:
                     address_parts.append(store_name)
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -744,13 +817,13 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or line.startswith('NON TECH EXCHANGE') or
-                re.match(r'^\d+$', line) or  # Pure numbers
+                DIGITS_RE.match(line) or  # Pure numbers
                 line.startswith('ND ') or line.startswith('Priority MC') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line)):  # dates
+                LEADING_DATE_RE.match(line)):  # dates
                 continue
             
             # Start collecting address after contact name or company identifier
-            if (re.match(r'^\d+[A-Z][A-Z\s]+$', line) or  # e.g., "3AISTE STATKEVICIUTE"
+            if (NUMBERED_UPPER_CONTACT_RE.match(line) or  # e.g., "3AISTE STATKEVICIUTE"
                 'UK FOODS STORE LIMITED' in line or
                 'WM MORRISON SUPERMARKETS PLC' in line or  # Specific for Computacenter
                 'SUPERMARKETS PLC' in line or
@@ -759,26 +832,26 @@ class RunSheetImporter:
                 collecting_address = True
                 # If this line contains company info, add it (clean phone numbers)
                 if any(company in line for company in ['UK FOODS STORE LIMITED', 'WM MORRISON SUPERMARKETS PLC', 'SUPERMARKETS PLC', 'ORANGE (', 'ERNEST JONES']):
-                    clean_line = re.sub(r'^[\d\s]+', '', line).strip(' .,')  # Remove phone numbers (with spaces)
+                    clean_line = LEADING_DIGITS_SPACES_RE.sub('', line).strip(' .,')  # Remove phone numbers (with spaces)
                     if clean_line and clean_line not in address_parts:
                         address_parts.append(clean_line)
                 # Special handling for Computacenter/Morrison format
-                elif 'WM MORRISON' in line and re.search(r'^[\d\s]+', line):
+                elif 'WM MORRISON' in line and LEADING_DIGITS_SPACES_RE.search(line):
                     # This is the phone number + WM MORRISON line
-                    clean_line = re.sub(r'^[\d\s]+', '', line).strip(' .,')
+                    clean_line = LEADING_DIGITS_SPACES_RE.sub('', line).strip(' .,')
                     if clean_line and clean_line not in address_parts:
                         address_parts.append(clean_line)
                 # Special handling for Fujitsu/Orange format - clean phone numbers
-                elif 'ORANGE (' in line and re.search(r'^[\d\s]+', line):
+                elif 'ORANGE (' in line and LEADING_DIGITS_SPACES_RE.search(line):
                     # This is the phone number + ORANGE line
-                    clean_line = re.sub(r'^[\d\s]+', '', line).strip(' .,')
+                    clean_line = LEADING_DIGITS_SPACES_RE.sub('', line).strip(' .,')
                     if clean_line and clean_line not in address_parts:
                         address_parts.append(clean_line)
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -856,19 +929,19 @@ class RunSheetImporter:
             # Skip activity, dates and codes
             if (line.startswith('DELIVERY') or line.startswith('REPAIR WITH PARTS') or
                 line.startswith('REPAIR WITHOUT PARTS') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+\s+[A-Za-z][A-Za-z0-9\s\-]+\s*$', line):  # Contact name pattern (allows space after number)
+            if SPACED_NUMBERED_CONTACT_RE.match(line):  # Contact name pattern (allows space after number)
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -887,7 +960,7 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line)
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line)
                     if clean_line and clean_line not in address_parts:
                         address_parts.append(clean_line)
         
@@ -914,19 +987,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('COLLECTION') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern like "1Lydia Ritter"
+            if NUMBERED_NAME_RE.match(line):  # Contact name pattern like "1Lydia Ritter"
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -940,7 +1013,7 @@ class RunSheetImporter:
                     not line.startswith('***') and  # Skip instructions
                     not line.startswith('Customer') and
                     not line.startswith('Collect items') and  # Skip collection instructions
-                    not re.match(r'^\d{8,}', line) and  # Skip long numbers
+                    not LONG_NUMBER_PREFIX_RE.match(line) and  # Skip long numbers
                     len(address_parts) < 6):  # Allow more address parts for Astra Zeneca
                     
                     clean_line = line.strip(' .,')
@@ -975,7 +1048,7 @@ class RunSheetImporter:
         
         # First pass: check if we have reference codes in the data
         for line in job_lines:
-            if re.search(r'\b(C\d+|NLC\d+)\b', line):
+            if REFERENCE_CODE_RE.search(line):
                 has_reference_codes = True
                 break
         
@@ -986,17 +1059,17 @@ class RunSheetImporter:
                 continue
             
             # Look for reference number (C5325810 or NLC3497 format) to know we're getting to address section
-            if re.match(r'^(C\d+|NLC\d+)', line.strip()):
+            if LEADING_REFERENCE_CODE_RE.match(line.strip()):
                 found_reference = True
                 continue
             
             # Also look for reference number embedded in the line
-            if re.search(r'\b(C\d+|NLC\d+)\b', line):
+            if REFERENCE_CODE_RE.search(line):
                 found_reference = True
                 # Continue processing this line as it contains address data
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 job['postcode'] = postcode.replace(' ', ' ').strip()
@@ -1014,31 +1087,31 @@ class RunSheetImporter:
                     # Apply aggressive cleaning only if we have reference codes (single-line format)
                     if has_reference_codes:
                         # Clean phone numbers from start (0161 822 2094)
-                        clean_line = re.sub(r'^[\d\s]{10,}', '', clean_line)
+                        clean_line = LEADING_PHONE_DIGITS_RE.sub('', clean_line)
                         
                         # Clean contact prefixes (0MANCHESTER VICTORIA)
-                        clean_line = re.sub(r'^[0-9]+', '', clean_line)
+                        clean_line = LEADING_NUMBER_RE.sub('', clean_line)
                         
                         # Clean reference codes and dots
-                        clean_line = re.sub(r'^[A-Z0-9\s\.]+(?=\w)', '', clean_line)
+                        clean_line = LEADING_CODE_RE.sub('', clean_line)
                         
                         # Remove reference numbers from anywhere in the line
-                        clean_line = re.sub(r'\b(C\d+|NLC\d+)\b', '', clean_line)
+                        clean_line = REFERENCE_CODE_RE.sub('', clean_line)
                         
                         # Remove Y (OTS) prefix
-                        clean_line = re.sub(r'^Y\s*\(OTS\)\s*', '', clean_line)
+                        clean_line = OTS_PREFIX_RE.sub('', clean_line)
                         
                         # Remove timestamps and scheduling info (2/12/2025 14:00, A: 6HR, PART2=)
-                        clean_line = re.sub(r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}.*$', '', clean_line)
-                        clean_line = re.sub(r'A:\s*\d+HR.*$', '', clean_line)
-                        clean_line = re.sub(r'PART\d+=.*$', '', clean_line)
+                        clean_line = TRAILING_TIMESTAMP_RE.sub('', clean_line)
+                        clean_line = TRAILING_SLA_RE.sub('', clean_line)
+                        clean_line = TRAILING_PART_RE.sub('', clean_line)
                     
                     clean_line = clean_line.strip(' .,')
                     
                     if clean_line and len(clean_line) > 2:
                         # Skip lines that are just contact names or codes
-                        if (not re.match(r'^[A-Z]{2,}\s*$', clean_line) and  # Skip pure uppercase codes
-                            not re.match(r'^[A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2}$', clean_line)):  # Skip postcodes
+                        if (not UPPER_CODE_RE.match(clean_line) and  # Skip pure uppercase codes
+                            not POSTCODE_LINE_RE.match(clean_line)):  # Skip postcodes
                             address_parts.append(clean_line)
         
         if address_parts:
@@ -1060,12 +1133,12 @@ class RunSheetImporter:
                 continue
             
             # Look for reference number (C5325859 format) to know we're getting to address section
-            if re.match(r'^C\d+', line.strip()):
+            if LEADING_C_REFERENCE_RE.match(line.strip()):
                 found_reference = True
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 job['postcode'] = postcode.replace(' ', ' ').strip()
@@ -1077,16 +1150,16 @@ class RunSheetImporter:
                 # Skip very short lines or pure numbers
                 if len(clean_line) > 2 and not clean_line.isdigit():
                     # Clean contact prefixes (1Jonathan O'Malley)
-                    clean_line = re.sub(r'^[0-9]+', '', clean_line)
+                    clean_line = LEADING_NUMBER_RE.sub('', clean_line)
                     
                     # Clean dots and reference codes (.RBSG)
-                    clean_line = re.sub(r'^\.+', '', clean_line)
+                    clean_line = LEADING_DOTS_RE.sub('', clean_line)
                     
                     clean_line = clean_line.strip(' .,')
                     
                     if clean_line and len(clean_line) > 1:
                         # Skip pure contact names but keep company names and addresses
-                        if not re.match(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$', clean_line):  # Skip "Jonathan O'Malley" format
+                        if not PERSON_NAME_RE.match(clean_line):  # Skip "Jonathan O'Malley" format
                             address_parts.append(clean_line)
         
         if address_parts:
@@ -1112,9 +1185,9 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('NON TECH EXCHANGE') or line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Look for ORANGE store pattern
@@ -1127,7 +1200,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -1142,7 +1215,7 @@ class RunSheetImporter:
                 
                 # Skip contact names and instructions
                 if (clean_line and len(clean_line) > 2 and 
-                    not re.match(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$', clean_line) and  # Skip "John Smith" format
+                    not PERSON_NAME_RE.match(clean_line) and  # Skip "John Smith" format
                     not clean_line.startswith('***') and  # Skip instructions
                     not clean_line.startswith('Customer') and
                     not '@' in clean_line and  # Skip email addresses
@@ -1174,9 +1247,9 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('NON TECH EXCHANGE') or line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Look for EE store patterns (EE -, Market Walk, etc.)
@@ -1188,7 +1261,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -1202,7 +1275,7 @@ class RunSheetImporter:
                 clean_line = line.strip(' .,')
                 
                 if (clean_line and len(clean_line) > 2 and 
-                    not re.match(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$', clean_line) and
+                    not PERSON_NAME_RE.match(clean_line) and
                     not clean_line.startswith('***') and
                     not clean_line.startswith('Customer') and
                     not '@' in clean_line and
@@ -1234,9 +1307,9 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('NON TECH EXCHANGE') or line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Look for EE P2PE patterns (EE -, payment terminals, etc.)
@@ -1248,7 +1321,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -1262,7 +1335,7 @@ class RunSheetImporter:
                 clean_line = line.strip(' .,')
                 
                 if (clean_line and len(clean_line) > 2 and 
-                    not re.match(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$', clean_line) and
+                    not PERSON_NAME_RE.match(clean_line) and
                     not clean_line.startswith('***') and
                     not clean_line.startswith('Customer') and
                     not '@' in clean_line and
@@ -1294,13 +1367,13 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or line.startswith('NON TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Extract postcode first
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -1310,7 +1383,7 @@ class RunSheetImporter:
                 continue
             
             # Look for Specsavers store pattern (e.g., "Rochdale 0337")
-            if re.match(r'^[A-Za-z]+\s+\d{4}', line.strip()):
+            if STORE_NUMBER_RE.match(line.strip()):
                 collecting_address = True
                 clean_line = line.strip()
                 if clean_line and clean_line not in address_parts:
@@ -1323,7 +1396,7 @@ class RunSheetImporter:
                 
                 # Skip contact names, instructions, and very short lines
                 if (clean_line and len(clean_line) > 2 and 
-                    not re.match(r'^[A-Z][a-z]+\s+[A-Z][\'a-z]+$', clean_line) and  # Skip "John Smith" format
+                    not PERSON_NAME_RE.match(clean_line) and  # Skip "John Smith" format
                     not clean_line.startswith('***') and  # Skip instructions
                     not clean_line.startswith('Customer') and
                     not '@' in clean_line and  # Skip email addresses
@@ -1355,19 +1428,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+[A-Za-z][A-Za-z0-9\s@.]+$', line):  # Contact name pattern (allows email)
+            if NUMBERED_EMAIL_CONTACT_RE.match(line):  # Contact name pattern (allows email)
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1388,8 +1461,8 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines (including +44 format)
-                    clean_line = re.sub(r'^\+44\d+', '', clean_line)  # +442033597118 format
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line)  # Original format
+                    clean_line = INTERNATIONAL_PHONE_RE.sub('', clean_line)  # +442033597118 format
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line)  # Original format
                     if clean_line and clean_line not in address_parts:
                         address_parts.append(clean_line)
         
@@ -1429,20 +1502,20 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('NON TECH EXCHANGE') or line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line) or
-                re.match(r'^\d{8,}$', line)):  # long numbers
+                ITEM_CODE_RE.match(line) or
+                LONG_NUMBER_RE.match(line)):  # long numbers
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern like "1Martina Baker"
+            if NUMBERED_NAME_RE.match(line):  # Contact name pattern like "1Martina Baker"
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1457,12 +1530,12 @@ class RunSheetImporter:
                     not line.startswith('Customer') and
                     not line.startswith('RSG-VA') and  # Skip RSG instructions
                     not line.startswith('(') and  # Skip codes like "(008102783"
-                    not re.match(r'^\d{10,}$', line) and  # Skip lines that are ONLY long numbers
+                    not PHONE_NUMBER_RE.match(line) and  # Skip lines that are ONLY long numbers
                     len(address_parts) < 4):  # Limit address parts for Computacenter Limited
                     
                     clean_line = line.strip(' .,')
                     # Clean long phone numbers from the beginning of lines (but keep short numbers like "210")
-                    clean_line = re.sub(r'^[\d\s/]{8,}\s*', '', clean_line).strip()
+                    clean_line = LEADING_PHONE_OR_DATE_RE.sub('', clean_line).strip()
                     if clean_line and clean_line not in address_parts and len(clean_line) > 3:
                         address_parts.append(clean_line)
         
@@ -1489,19 +1562,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('Priority MC') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1519,7 +1592,7 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Remove N/A prefix if present
-                    clean_line = re.sub(r'^N/A', '', clean_line).strip()
+                    clean_line = NOT_AVAILABLE_RE.sub('', clean_line).strip()
                     if clean_line and clean_line not in address_parts and len(clean_line) > 3:
                         address_parts.append(clean_line)
         
@@ -1559,19 +1632,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or line.startswith('DELIVERY') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('Priority MC') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1613,19 +1686,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name (Vista has simple "1 " pattern)
-            if re.match(r'^\d+\s*$', line) or re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBER_LINE_RE.match(line) or NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1667,19 +1740,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+\s*$', line) or re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBER_LINE_RE.match(line) or NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1696,7 +1769,7 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line).strip()
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line).strip()
                     if clean_line and clean_line not in address_parts and len(clean_line) > 3:
                         address_parts.append(clean_line)
         
@@ -1723,19 +1796,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or line.startswith('DELIVERY') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+\s*$', line) or re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBER_LINE_RE.match(line) or NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1752,11 +1825,11 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line).strip()
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line).strip()
                     # Skip unwanted lines but keep business names
                     if (clean_line and clean_line not in address_parts and len(clean_line) > 3 and
                         not line.startswith('Page ') and  # Skip page numbers
-                        not re.match(r'^\d+[A-Z][A-Z\s\.]+$', line)):  # Skip contact names like "1RAMAZAN YA....AR"
+                        not NUMBERED_UPPER_DOTTED_CONTACT_RE.match(line)):  # Skip contact names like "1RAMAZAN YA....AR"
                         address_parts.append(clean_line)
         
         if address_parts:
@@ -1782,19 +1855,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('TECH EXCHANGE') or line.startswith('DELIVERY') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+\s*$', line) or re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBER_LINE_RE.match(line) or NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1837,19 +1910,19 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('COLLECTION') or line.startswith('DELIVERY') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('ND ') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name
-            if re.match(r'^\d+\s*$', line) or re.match(r'^\d+[A-Za-z][A-Za-z0-9\s]+$', line):  # Contact name pattern
+            if NUMBER_LINE_RE.match(line) or NUMBERED_NAME_RE.match(line):  # Contact name pattern
                 collecting_address = True
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1867,7 +1940,7 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line).strip()
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line).strip()
                     if clean_line and clean_line not in address_parts and len(clean_line) > 3:
                         address_parts.append(clean_line)
         
@@ -1907,30 +1980,30 @@ class RunSheetImporter:
             
             # Skip activity and codes
             if (line.startswith('IMAC DELIVERY') or line.startswith('TECH EXCHANGE') or
-                re.match(r'^\d{2}/\d{2}/\d{4}', line) or  # dates
+                LEADING_DATE_RE.match(line) or  # dates
                 line.startswith('Priority MC') or
-                re.match(r'^[A-Z]{3}\d+$', line)):  # codes
+                ITEM_CODE_RE.match(line)):  # codes
                 continue
             
             # Start collecting address after contact name (Horizon has "0ALISHA........ ISLAM........ " pattern)
-            if (re.match(r'^\d+\s*$', line) or 
-                re.match(r'^\d+[A-Za-z][A-Za-z0-9\s\.]+$', line) or  # Allow dots in names
+            if (NUMBER_LINE_RE.match(line) or 
+                NUMBERED_DOTTED_NAME_RE.match(line) or  # Allow dots in names
                 'ALISHA' in line.upper() or 'TALISHA' in line.upper()):  # Specific for this job
                 collecting_address = True
                 # If this line contains the name, clean and add it immediately
                 if 'ALISHA' in line.upper():
                     clean_name = line.strip(' .,')
-                    clean_name = re.sub(r'^[\d\s]{10,}\s*', '', clean_name).strip()
+                    clean_name = LEADING_PHONE_NUMBER_RE.sub('', clean_name).strip()
                     clean_name = clean_name.replace('ALISHA', 'TALISHA').replace('alisha', 'TALISHA')
-                    clean_name = re.sub(r'\.+', '', clean_name)
-                    clean_name = re.sub(r'\s+', ' ', clean_name).strip()
+                    clean_name = DOTS_RE.sub('', clean_name)
+                    clean_name = WHITESPACE_RE.sub(' ', clean_name).strip()
                     if clean_name and len(clean_name) > 3:
                         address_parts.append(clean_name)
                 continue
             
             if collecting_address:
                 # Look for postcode first
-                postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+                postcode_match = POSTCODE_RE.search(line)
                 if postcode_match:
                     postcode = postcode_match.group(1)
                     if len(postcode) >= 6 and ' ' not in postcode:
@@ -1949,13 +2022,13 @@ class RunSheetImporter:
                     
                     clean_line = line.strip(' .,')
                     # Clean phone numbers from the beginning of lines
-                    clean_line = re.sub(r'^[\d\s]{10,}\s*', '', clean_line).strip()
+                    clean_line = LEADING_PHONE_NUMBER_RE.sub('', clean_line).strip()
                     # Convert ALISHA to TALISHA for this specific job
                     if 'ALISHA' in clean_line.upper():
                         clean_line = clean_line.replace('ALISHA', 'TALISHA').replace('alisha', 'TALISHA')
                         # Clean up dots and extra spaces
-                        clean_line = re.sub(r'\.+', '', clean_line)
-                        clean_line = re.sub(r'\s+', ' ', clean_line).strip()
+                        clean_line = DOTS_RE.sub('', clean_line)
+                        clean_line = WHITESPACE_RE.sub(' ', clean_line).strip()
                     # Extract BURNLEY from lines like "BURNLEY BB103EY"
                     if 'BURNLEY' in clean_line.upper() and 'BB10' in clean_line:
                         clean_line = 'BURNLEY'
@@ -1980,7 +2053,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -1992,12 +2065,12 @@ class RunSheetImporter:
             if (clean_line and len(clean_line) > 3 and
                 not clean_line.startswith('TECH EXCHANGE') and
                 not clean_line.isdigit() and
-                not re.match(r'^[A-Z]{3}\d+$', clean_line) and  # Skip codes like WOT1000358
-                not re.match(r'^\d{11}', clean_line) and  # Skip phone numbers
+                not ITEM_CODE_RE.match(clean_line) and  # Skip codes like WOT1000358
+                not LEADING_PHONE_RE.match(clean_line) and  # Skip phone numbers
                 'Contact Phone' not in clean_line):
                 
                 # Clean up the line
-                clean_line = re.sub(r'^[\d\s]+', '', clean_line)  # Remove leading numbers
+                clean_line = LEADING_DIGITS_SPACES_RE.sub('', clean_line)  # Remove leading numbers
                 clean_line = clean_line.strip(' .,')
                 
                 if clean_line and clean_line not in address_parts and len(clean_line) > 3:
@@ -2021,7 +2094,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -2033,7 +2106,7 @@ class RunSheetImporter:
             if (clean_line and len(clean_line) > 3 and
                 not clean_line.startswith('DELIVERY') and
                 not clean_line.isdigit() and
-                not re.match(r'^\d{11}', clean_line) and  # Skip phone numbers
+                not LEADING_PHONE_RE.match(clean_line) and  # Skip phone numbers
                 'Contact Phone' not in clean_line):
                 
                 clean_line = clean_line.strip(' .,')
@@ -2059,7 +2132,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -2071,7 +2144,7 @@ class RunSheetImporter:
             if (clean_line and len(clean_line) > 3 and
                 not clean_line.startswith('DELIVERY') and
                 not clean_line.isdigit() and
-                not re.match(r'^\d{11}', clean_line) and  # Skip phone numbers
+                not LEADING_PHONE_RE.match(clean_line) and  # Skip phone numbers
                 'Contact Phone' not in clean_line):
                 
                 clean_line = clean_line.strip(' .,')
@@ -2097,7 +2170,7 @@ class RunSheetImporter:
                 continue
             
             # Extract postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match and not postcode:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -2109,7 +2182,7 @@ class RunSheetImporter:
             if (clean_line and len(clean_line) > 3 and
                 not clean_line.startswith('DELIVERY') and
                 not clean_line.isdigit() and
-                not re.match(r'^\d{11}', clean_line) and  # Skip phone numbers
+                not LEADING_PHONE_RE.match(clean_line) and  # Skip phone numbers
                 'Contact Phone' not in clean_line):
                 
                 clean_line = clean_line.strip(' .,')
@@ -2138,7 +2211,7 @@ class RunSheetImporter:
                 continue
                 
             # Look for postcode
-            postcode_match = re.search(r'\b([A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2})\b', line)
+            postcode_match = POSTCODE_RE.search(line)
             if postcode_match:
                 postcode = postcode_match.group(1)
                 if len(postcode) >= 6 and ' ' not in postcode:
@@ -2161,31 +2234,10 @@ class RunSheetImporter:
         """Parse single-driver runsheet format (original logic)."""
         jobs = []
         
-        # Extract header info (date, driver, jobs on run)
-        header_date = None
-        header_driver = None
-        jobs_on_run = None
-        
-        for line in lines[:5]:
-            if 'Date' in line and 'Driver' in line and 'Jobs on Run' in line:
-                date_match = re.search(r'Date\s+(\d{2}/\d{2}/\d{4})', line)
-                if date_match:
-                    header_date = date_match.group(1)
-                
-                driver_match = re.search(r'Driver\s+([^J]+?)(?:\s+Jobs)', line)
-                if driver_match:
-                    header_driver = driver_match.group(1).strip()
-                
-                jobs_match = re.search(r'Jobs on Run\s+(\d+)', line)
-                if jobs_match:
-                    jobs_on_run = int(jobs_match.group(1))
-                break
+        header_date, header_driver, jobs_on_run = self.parse_page_header(lines)
         
         # Find job entry
-        for i, line in enumerate(lines):
-            if not line.strip().startswith('Job #'):
-                continue
-            
+        for line, job_lines in self.split_job_blocks(lines, SINGLE_DRIVER_JOB_LINES):
             job = {
                 'date': header_date,
                 'driver': header_driver,
@@ -2193,18 +2245,12 @@ class RunSheetImporter:
             }
             
             # Extract job number
-            job_match = re.search(r'Job #\s*(\d+)', line)
+            job_match = JOB_NUMBER_RE.search(line)
             if job_match:
                 job['job_number'] = job_match.group(1)
             
             # Simple parsing for single-driver format
-            for j in range(i+1, min(i+20, len(lines))):
-                curr_line = lines[j].strip()
-                
-                # Stop at next job
-                if curr_line.startswith('Job #'):
-                    break
-                
+            for curr_line in job_lines:
                 # Customer
                 if curr_line.startswith('Customer Signature') or curr_line.startswith('Customer Print'):
                     customer = self.clean_customer_name(curr_line)
@@ -2256,13 +2302,9 @@ class RunSheetImporter:
         # Ensure file_path is a Path object (handles both string and Path inputs)
         file_path = Path(file_path)
         
-        # Check if this file has already been imported
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM run_sheet_jobs WHERE source_file = ?", (file_path.name,))
-        already_imported = cursor.fetchone()[0] > 0
-        
-        if already_imported and not overwrite:
+        if self.is_imported(file_path) and not overwrite:
             # Skip already imported files unless overwrite is enabled
+            self._mark_catalogue(file_path, file_catalogue.STATUS_IMPORTED)
             return 0
         
         if base_path:
@@ -2272,140 +2314,286 @@ class RunSheetImporter:
             print(f"Processing: {file_path.name}")
         
         try:
-            # Determine file type and parse
-            if file_path.suffix.lower() == '.pdf':
-                jobs = self.parse_pdf_run_sheet(str(file_path))
-            elif file_path.suffix.lower() in ['.csv', '.txt']:
-                jobs = self.parse_csv_run_sheet(str(file_path))
-            else:
+            jobs = self.parse_run_sheet(file_path)
+            if jobs is None:
                 print(f"  ⚠️  Unsupported file type: {file_path.suffix}")
                 return 0
             
             if not jobs:
                 print(f"  ⚠️  No jobs found for {self.name}")
+                self._mark_catalogue(file_path, file_catalogue.STATUS_NO_JOBS)
                 return 0
             
-            # Check if any dates in this file have already been overwritten
-            unique_dates = list(set(job.get('date') for job in jobs if job.get('date')))
-            if not overwrite and any(date in self.overwritten_dates for date in unique_dates):
-                overlapping_dates = [d for d in unique_dates if d in self.overwritten_dates]
-                print(f"  ⚠️  Skipping file - dates {overlapping_dates} were already overwritten in this session")
-                return 0
-            
-            # If overwrite is enabled, delete existing jobs for these dates
-            if overwrite:
-                if unique_dates:
-                    print(f"  Overwrite mode: Deleting existing jobs for {len(unique_dates)} date(s)")
-                    self.delete_jobs_for_dates(unique_dates)
-            
-            # Insert jobs into database
-            cursor = self.conn.cursor()
-            imported = 0
-            skipped_count = 0
-            
-            for job in jobs:
-                try:
-                    # Skip RICO Depots entries
-                    customer = job.get('customer', '')
-                    activity = job.get('activity', '')
-                    address = job.get('job_address', '')
-                    
-                    if ('RICO' in customer or 'RICO' in activity or 'RICO' in address):
-                        print(f"  Skipping RICO Depots job {job.get('job_number')} - {customer}")
-                        skipped_count += 1
-                        continue
-                    
-                    # Check if this date has been manually uploaded - if so, skip it
-                    cursor.execute("""
-                        SELECT manually_uploaded FROM run_sheet_jobs 
-                        WHERE date = ? 
-                        LIMIT 1
-                    """, (job.get('date'),))
-                    
-                    date_check = cursor.fetchone()
-                    if date_check and date_check[0] == 1:
-                        print(f"  Skipping date {job.get('date')} - manually uploaded, protected from auto-sync")
-                        skipped_count += 1
-                        continue
-                    
-                    # Check if job already exists
-                    cursor.execute("""
-                        SELECT id, status FROM run_sheet_jobs 
-                        WHERE date = ? AND job_number = ?
-                    """, (job.get('date'), job.get('job_number')))
-                    
-                    existing_job = cursor.fetchone()
-                    
-                    if existing_job:
-                        # Job exists - update only basic fields, preserve status
-                        job_id, existing_status = existing_job
-                        cursor.execute("""
-                            UPDATE run_sheet_jobs SET
-                                driver = ?, jobs_on_run = ?, customer = ?, activity = ?, 
-                                priority = ?, job_address = ?, postcode = ?, notes = ?, 
-                                source_file = ?, imported_at = CURRENT_TIMESTAMP
-                            WHERE id = ?
-                        """, (
-                            job.get('driver'),
-                            job.get('jobs_on_run'),
-                            job.get('customer'),
-                            job.get('activity'),
-                            job.get('priority'),
-                            job.get('job_address'),
-                            job.get('postcode'),
-                            job.get('notes'),
-                            file_path.name,
-                            job_id
-                        ))
-                        print(f"  Updated job {job.get('job_number')} (preserved status: {existing_status})")
-                    else:
-                        # Check if this job was previously deleted
-                        cursor.execute("""
-                            SELECT id FROM deleted_jobs 
-                            WHERE job_number = ? AND date = ?
-                        """, (job.get('job_number'), job.get('date')))
-                        
-                        if cursor.fetchone():
-                            print(f"  Skipping job {job.get('job_number')} - previously deleted by user")
-                            skipped_count += 1
-                            continue
-                        
-                        # New job - insert with default pending status
-                        cursor.execute("""
-                            INSERT INTO run_sheet_jobs (
-                                date, driver, jobs_on_run, job_number, customer, activity, 
-                                priority, job_address, postcode, notes, source_file, status
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-                        """, (
-                            job.get('date'),
-                            job.get('driver'),
-                            job.get('jobs_on_run'),
-                            job.get('job_number'),
-                            job.get('customer'),
-                            job.get('activity'),
-                            job.get('priority'),
-                            job.get('job_address'),
-                            job.get('postcode'),
-                            job.get('notes'),
-                            file_path.name
-                        ))
-                        print(f"  Added new job {job.get('job_number')} (status: pending)")
-                    
-                    imported += 1
-                except sqlite3.IntegrityError:
-                    # Duplicate - skip
-                    pass
-            
-            self.conn.commit()
+            imported = self.store_jobs(file_path, jobs, overwrite)
             print(f"  ✓ Imported {imported} jobs")
+            self._mark_catalogue(file_path, file_catalogue.STATUS_IMPORTED if imported
+                                 else file_catalogue.STATUS_NO_JOBS)
             return imported
             
         except Exception as e:
             import traceback
             print(f"  ✗ Error: {e}")
             print(f"  Traceback: {traceback.format_exc()}")
+            self._mark_catalogue(file_path, file_catalogue.STATUS_FAILED, str(e))
             return 0
     
+    def _mark_catalogue(self, file_path: Path, status: str, error: str = None):
+        """Record an import outcome in the file catalogue."""
+        try:
+            file_catalogue.mark_status([file_path], status, error, conn=self.conn)
+        except sqlite3.OperationalError:
+            pass  # Catalogue table not created yet (app migrations not run)
+    
+    def find_run_sheet_files(self, run_sheets_path: Path, modified_after: datetime = None,
+                             date_from: str = None, date_to: str = None) -> List[Path]:
+        """Run sheet files under run_sheets_path, looked up in the file catalogue.
+        
+        The catalogue is brought up to date first (directories whose mtime
+        has not changed are not listed). Dates are YYYY-MM-DD and match the
+        date in the file name. Falls back to walking the directory if the
+        catalogue table does not exist yet.
+        """
+        run_sheets_path = Path(run_sheets_path)
+        root = os.path.abspath(run_sheets_path)
+        try:
+            file_catalogue.refresh(run_sheets_path, file_catalogue.RUNSHEET, conn=self.conn)
+            rows = file_catalogue.list_files(root=run_sheets_path, modified_since=modified_after,
+                                             date_from=date_from, date_to=date_to, conn=self.conn)
+            return [run_sheets_path / os.path.relpath(row['path'], root) for row in rows]
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  File catalogue unavailable ({e}), scanning {run_sheets_path}")
+        
+        files = []
+        for file_path in run_sheets_path.rglob('*'):
+            if not file_path.is_file() or file_path.name.startswith('._'):
+                continue
+            if file_path.suffix.lower() not in file_catalogue.EXTENSIONS:
+                continue
+            if modified_after and datetime.fromtimestamp(file_path.stat().st_mtime) <= modified_after:
+                continue
+            if date_from or date_to:
+                file_date = file_catalogue.parse_file_date(file_path.name)
+                if not file_date or (date_from and file_date < date_from) or (date_to and file_date > date_to):
+                    continue
+            files.append(file_path)
+        return sorted(files)
+    
+    def is_imported(self, file_path: Path) -> bool:
+        """True if jobs from this file are already in the database."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM run_sheet_jobs WHERE source_file = ?", (Path(file_path).name,))
+        return cursor.fetchone()[0] > 0
+    
+    def parse_run_sheet(self, file_path: Path) -> Optional[List[Dict]]:
+        """Parse a run sheet into job dicts without touching the database.
+        
+        Returns None for unsupported file types.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == '.pdf':
+            return self.parse_pdf_run_sheet(str(file_path))
+        if file_path.suffix.lower() in ['.csv', '.txt']:
+            return self.parse_csv_run_sheet(str(file_path))
+        return None
+    
+    def store_jobs(self, file_path: Path, jobs: List[Dict], overwrite: bool = False) -> int:
+        """Write parsed jobs for one file and commit. Returns jobs imported."""
+        file_path = Path(file_path)
+        # Check if any dates in this file have already been overwritten
+        unique_dates = list(set(job.get('date') for job in jobs if job.get('date')))
+        if not overwrite and any(date in self.overwritten_dates for date in unique_dates):
+            overlapping_dates = [d for d in unique_dates if d in self.overwritten_dates]
+            print(f"  ⚠️  Skipping file - dates {overlapping_dates} were already overwritten in this session")
+            return 0
+        
+        # If overwrite is enabled, delete existing jobs for these dates
+        if overwrite:
+            if unique_dates:
+                print(f"  Overwrite mode: Deleting existing jobs for {len(unique_dates)} date(s)")
+                self.delete_jobs_for_dates(unique_dates)
+        
+        # Insert jobs into database
+        cursor = self.conn.cursor()
+        imported = 0
+        skipped_count = 0
+        
+        for job in jobs:
+            try:
+                # Skip RICO Depots entries
+                customer = job.get('customer', '')
+                activity = job.get('activity', '')
+                address = job.get('job_address', '')
+                
+                if ('RICO' in customer or 'RICO' in activity or 'RICO' in address):
+                    print(f"  Skipping RICO Depots job {job.get('job_number')} - {customer}")
+                    skipped_count += 1
+                    continue
+                
+                # Check if this date has been manually uploaded - if so, skip it
+                cursor.execute("""
+                    SELECT manually_uploaded FROM run_sheet_jobs 
+                    WHERE date = ? 
+                    LIMIT 1
+                """, (job.get('date'),))
+                
+                date_check = cursor.fetchone()
+                if date_check and date_check[0] == 1:
+                    print(f"  Skipping date {job.get('date')} - manually uploaded, protected from auto-sync")
+                    skipped_count += 1
+                    continue
+                
+                # Check if job already exists
+                cursor.execute("""
+                    SELECT id, status FROM run_sheet_jobs 
+                    WHERE date = ? AND job_number = ?
+                """, (job.get('date'), job.get('job_number')))
+                
+                existing_job = cursor.fetchone()
+                
+                if existing_job:
+                    # Job exists - update only basic fields, preserve status
+                    job_id, existing_status = existing_job
+                    cursor.execute("""
+                        UPDATE run_sheet_jobs SET
+                            driver = ?, jobs_on_run = ?, customer = ?, activity = ?, 
+                            priority = ?, job_address = ?, postcode = ?, notes = ?, 
+                            source_file = ?, imported_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    """, (
+                        job.get('driver'),
+                        job.get('jobs_on_run'),
+                        job.get('customer'),
+                        job.get('activity'),
+                        job.get('priority'),
+                        job.get('job_address'),
+                        job.get('postcode'),
+                        job.get('notes'),
+                        file_path.name,
+                        job_id
+                    ))
+                    print(f"  Updated job {job.get('job_number')} (preserved status: {existing_status})")
+                else:
+                    # Check if this job was previously deleted
+                    cursor.execute("""
+                        SELECT id FROM deleted_jobs 
+                        WHERE job_number = ? AND date = ?
+                    """, (job.get('job_number'), job.get('date')))
+                    
+                    if cursor.fetchone():
+                        print(f"  Skipping job {job.get('job_number')} - previously deleted by user")
+                        skipped_count += 1
+                        continue
+                    
+                    # New job - insert with default pending status
+                    cursor.execute("""
+                        INSERT INTO run_sheet_jobs (
+                            date, driver, jobs_on_run, job_number, customer, activity, 
+                            priority, job_address, postcode, notes, source_file, status
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                    """, (
+                        job.get('date'),
+                        job.get('driver'),
+                        job.get('jobs_on_run'),
+                        job.get('job_number'),
+                        job.get('customer'),
+                        job.get('activity'),
+                        job.get('priority'),
+                        job.get('job_address'),
+                        job.get('postcode'),
+                        job.get('notes'),
+                        file_path.name
+                    ))
+                    print(f"  Added new job {job.get('job_number')} (status: pending)")
+                
+                imported += 1
+            except sqlite3.IntegrityError:
+                # Duplicate - skip
+                pass
+        
+        self.conn.commit()
+        return imported
+    
+    def import_files(self, file_paths: List[Path], overwrite: bool = False, workers: int = 1) -> List[Dict]:
+        """Import several files, parsing them in a process pool.
+        
+        PDF parsing dominates the cost of an import, so files are parsed in
+        up to ``workers`` processes while this importer writes each file's
+        jobs in turn (in the order given, same as importing one by one).
+        Returns one result dict per file: file, status (imported,
+        already_imported, no_jobs, unsupported, not_found, error), jobs,
+        dates and error.
+        """
+        results = []
+        to_parse = []
+        for name in file_paths:
+            file_path = Path(name)
+            result = {'file': str(name), 'status': None, 'jobs': 0, 'dates': [], 'error': None}
+            results.append(result)
+            if not file_path.exists():
+                result['status'] = 'not_found'
+                result['error'] = f'File not found: {file_path}'
+            elif self.is_imported(file_path) and not overwrite:
+                result['status'] = 'already_imported'
+            else:
+                to_parse.append(result)
+        
+        if workers > 1 and len(to_parse) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, len(to_parse))) as pool:
+                futures = [pool.submit(_parse_run_sheet_file, r['file'], self.name) for r in to_parse]
+                parsed = []
+                for future in futures:
+                    try:
+                        parsed.append((future.result(), None))
+                    except Exception as e:
+                        parsed.append((None, e))
+        else:
+            parsed = []
+            for r in to_parse:
+                try:
+                    parsed.append((self.parse_run_sheet(Path(r['file'])), None))
+                except Exception as e:
+                    parsed.append((None, e))
+        
+        for result, (jobs, error) in zip(to_parse, parsed):
+            file_path = Path(result['file'])
+            print(f"Processing: {file_path.name}")
+            if error is not None:
+                result['status'] = 'error'
+                result['error'] = str(error)
+                print(f"  ✗ Error: {error}")
+                continue
+            if jobs is None:
+                result['status'] = 'unsupported'
+                print(f"  ⚠️  Unsupported file type: {file_path.suffix}")
+                continue
+            if not jobs:
+                result['status'] = 'no_jobs'
+                print(f"  ⚠️  No jobs found for {self.name}")
+                continue
+            try:
+                result['jobs'] = self.store_jobs(file_path, jobs, overwrite)
+            except Exception as e:
+                self.conn.rollback()
+                result['status'] = 'error'
+                result['error'] = str(e)
+                print(f"  ✗ Error: {e}")
+                continue
+            result['dates'] = sorted({job['date'] for job in jobs if job.get('date')})
+            result['status'] = 'imported' if result['jobs'] else 'no_jobs'
+            print(f"  ✓ Imported {result['jobs']} jobs")
+        
+        catalogue_status = {
+            'imported': file_catalogue.STATUS_IMPORTED,
+            'already_imported': file_catalogue.STATUS_IMPORTED,
+            'no_jobs': file_catalogue.STATUS_NO_JOBS,
+            'error': file_catalogue.STATUS_FAILED,
+        }
+        for result in results:
+            if result['status'] in catalogue_status:
+                self._mark_catalogue(result['file'], catalogue_status[result['status']], result['error'])
+        return results
+    
     def import_all_run_sheets(self, run_sheets_dir: str = None):
         """Import all run sheet files from directory."""
         # Use Config.RUNSHEETS_DIR from .env if no directory specified
@@ -2423,13 +2611,7 @@ class RunSheetImporter:
         print()
         
         # Find all supported files (including subdirectories)
-        files = []
-        for ext in ['*.pdf', '*.PDF', '*.csv', '*.CSV', '*.txt', '*.TXT']:
-            files.extend(run_sheets_path.glob(ext))
-            files.extend(run_sheets_path.glob(f'**/{ext}'))  # Check subdirectories
-        
-        # Remove duplicates
-        files = list(set(files))
+        files = self.find_run_sheet_files(run_sheets_path)
         
         if not files:
             print(f"No run sheet files found in {run_sheets_path}/")
@@ -2574,6 +2756,11 @@ class RunSheetImporter:
             self.conn.close()
 
 
+def _parse_run_sheet_file(file_path: str, name: str) -> Optional[List[Dict]]:
+    """Parse one run sheet in a worker process (see ``import_files``)."""
+    return RunSheetImporter(name=name, connect=False).parse_run_sheet(Path(file_path))
+
+
 def main():
     """Run import."""
     import sys
@@ -2585,6 +2772,9 @@ def main():
     parser.add_argument('--recent-minutes', type=int, help='Import run sheets modified in the last N minutes')
     parser.add_argument('--unprocessed', action='store_true', help='Import only files not yet processed (tracked in database)')
     parser.add_argument('--file', type=str, help='Import a specific run sheet file')
+    parser.add_argument('--files', nargs='+', help='Import several specific run sheet files in one run')
+    parser.add_argument('--workers', type=int, default=1, help='With --files: parse in N worker processes')
+    parser.add_argument('--results', type=str, help='With --files: write per-file results as JSON to this path')
     parser.add_argument('--date', type=str, help='Import files for specific date (YYYY-MM-DD)')
     parser.add_argument('--date-range', nargs=2, metavar=('START', 'END'), help='Import files for date range (YYYY-MM-DD YYYY-MM-DD)')
     parser.add_argument('--force-reparse', action='store_true', help='Force re-parsing of existing files')
@@ -2594,7 +2784,25 @@ def main():
     importer = RunSheetImporter(name=args.name)
     
     try:
-        if args.file:
+        if args.files:
+            # Import a batch of files with one importer (file watcher, batch uploads)
+            results = importer.import_files(args.files, overwrite=args.overwrite,
+                                            workers=args.workers)
+            for result in results:
+                if result['status'] == 'imported':
+                    print(f"✓ Imported {result['jobs']} jobs from {Path(result['file']).name}")
+                elif result['error']:
+                    print(f"Error: {result['error']}")
+            if args.results:
+                with open(args.results, 'w') as f:
+                    json.dump(results, f)
+
+            imported = sum(r['jobs'] for r in results)
+            failed = sum(1 for r in results if r['status'] in ('not_found', 'error'))
+            print(f"\nImported {imported} jobs from {len(args.files)} files")
+            # Same exit codes as --file: 2 = ran OK but nothing new
+            sys.exit(1 if failed else (0 if imported else 2))
+        elif args.file:
             # Import single file
             file_path = Path(args.file)
             if not file_path.exists():
@@ -2634,14 +2842,10 @@ def main():
             
             # Find all PDF files
             run_sheets_path = Path(Config.RUNSHEETS_DIR)
-            all_files = []
-            for file_path in run_sheets_path.rglob('*.pdf'):
-                # Skip macOS resource fork files
-                if file_path.name.startswith('._'):
-                    continue
-                # Only include if not already processed
-                if file_path.name not in processed_files:
-                    all_files.append(file_path)
+            all_files = [
+                file_path for file_path in importer.find_run_sheet_files(run_sheets_path)
+                if file_path.suffix.lower() == '.pdf' and file_path.name not in processed_files
+            ]
             
             print(f"Found {len(all_files)} unprocessed files to import")
             
@@ -2670,15 +2874,11 @@ def main():
             
             print(f"Only importing files modified after {cutoff_date.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            # Use Python method for minute-based filtering (find doesn't support minutes)
             run_sheets_path = Path(Config.RUNSHEETS_DIR)
-            files = []
-            for file_path in run_sheets_path.rglob('*.pdf'):
-                # Skip macOS resource fork files
-                if file_path.name.startswith('._'):
-                    continue
-                if datetime.fromtimestamp(file_path.stat().st_mtime) > cutoff_date:
-                    files.append(file_path)
+            files = [
+                file_path for file_path in importer.find_run_sheet_files(run_sheets_path, modified_after=cutoff_date)
+                if file_path.suffix.lower() == '.pdf'
+            ]
             
             print(f"Found {len(files)} recent files")
             
@@ -2689,35 +2889,18 @@ def main():
             print(f"\nImported {imported} jobs from {len(files)} files")
             
         elif args.recent:
-            # Only import recent files - use find command for performance
+            # Only import recent files
             from datetime import datetime, timedelta
-            import subprocess
             cutoff_date = datetime.now() - timedelta(days=args.recent)
             
             print(f"Only importing files modified after {cutoff_date.strftime('%Y-%m-%d')}")
             
-            # Use find command for fast file discovery (much faster than Python rglob)
+            # Modification times come from the file catalogue, not a directory walk
             run_sheets_path = Path(Config.RUNSHEETS_DIR)
-            
-            # Find files modified in last N days using system find command
-            try:
-                result = subprocess.run(
-                    ['find', str(run_sheets_path), '-name', '*.pdf', '-not', '-name', '._*', '-mtime', f'-{args.recent + 1}', '-type', 'f'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                file_paths = [Path(p.strip()) for p in result.stdout.split('\n') if p.strip()]
-            except:
-                # Fallback to Python method if find fails
-                files = []
-                for file_path in run_sheets_path.rglob('*.pdf'):
-                    # Skip macOS resource fork files
-                    if file_path.name.startswith('._'):
-                        continue
-                    if datetime.fromtimestamp(file_path.stat().st_mtime) > cutoff_date:
-                        files.append(file_path)
-                file_paths = files
+            file_paths = [
+                file_path for file_path in importer.find_run_sheet_files(run_sheets_path, modified_after=cutoff_date)
+                if file_path.suffix.lower() == '.pdf'
+            ]
             
             print(f"Found {len(file_paths)} recent files")
             files = file_paths
@@ -2733,19 +2916,18 @@ def main():
             from datetime import datetime
             try:
                 target_date = datetime.strptime(args.date, '%Y-%m-%d')
-                date_str = target_date.strftime('%d-%m-%Y')  # Convert to DD-MM-YYYY for filename
                 
                 print(f"Importing runsheets for date: {target_date.strftime('%d/%m/%Y')}")
                 
                 # Find files with this date in the filename
                 run_sheets_path = Path(Config.RUNSHEETS_DIR)
-                files = []
-                for file_path in run_sheets_path.rglob('*.pdf'):
-                    # Skip macOS resource fork files
-                    if file_path.name.startswith('._'):
-                        continue
-                    if date_str in file_path.name or target_date.strftime('%d/%m/%Y') in file_path.name:
-                        files.append(file_path)
+                files = [
+                    file_path for file_path in importer.find_run_sheet_files(
+                        run_sheets_path,
+                        date_from=target_date.strftime('%Y-%m-%d'),
+                        date_to=target_date.strftime('%Y-%m-%d'))
+                    if file_path.suffix.lower() == '.pdf'
+                ]
                 
                 print(f"Found {len(files)} files for {target_date.strftime('%d/%m/%Y')}")
                 
@@ -2761,7 +2943,7 @@ def main():
                 
         elif args.date_range:
             # Import files for date range
-            from datetime import datetime, timedelta
+            from datetime import datetime
             try:
                 start_date = datetime.strptime(args.date_range[0], '%Y-%m-%d')
                 end_date = datetime.strptime(args.date_range[1], '%Y-%m-%d')
@@ -2772,24 +2954,15 @@ def main():
                 
                 print(f"Importing runsheets from {start_date.strftime('%d/%m/%Y')} to {end_date.strftime('%d/%m/%Y')}")
                 
-                # Generate all dates in range
-                current_date = start_date
-                target_dates = []
-                while current_date <= end_date:
-                    target_dates.append(current_date.strftime('%d-%m-%Y'))
-                    current_date += timedelta(days=1)
-                
-                # Find files with these dates in the filename
+                # Find files with dates in this range in the filename
                 run_sheets_path = Path(Config.RUNSHEETS_DIR)
-                files = []
-                for file_path in run_sheets_path.rglob('*.pdf'):
-                    # Skip macOS resource fork files
-                    if file_path.name.startswith('._'):
-                        continue
-                    for date_str in target_dates:
-                        if date_str in file_path.name:
-                            files.append(file_path)
-                            break
+                files = [
+                    file_path for file_path in importer.find_run_sheet_files(
+                        run_sheets_path,
+                        date_from=start_date.strftime('%Y-%m-%d'),
+                        date_to=end_date.strftime('%Y-%m-%d'))
+                    if file_path.suffix.lower() == '.pdf'
+                ]
                 
                 print(f"Found {len(files)} files in date range")
                 
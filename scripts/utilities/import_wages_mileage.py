@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Copy mileage entries from the old data/database/wages.db into the app database.
+
+MileageModel used to keep mileage_entries in its own wages.db. The table now
+lives in the main database (migration 019), and the app copies the old entries
+across by itself the first time it starts with wages.db in place
+(app/services/legacy_mileage.py). Use this to preview that copy, to import a
+wages.db kept somewhere else, or to copy again with --force. Entries already in
+the main database for a date are kept.
+"""
+
+import sys
+from pathlib import Path
+import argparse
+
+# Add parent directory to path to import database utilities
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from app.services.legacy_mileage import LEGACY_DB, import_legacy_mileage
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy mileage entries from the legacy wages.db')
+    parser.add_argument('--legacy-db', default=str(LEGACY_DB), help='Path to the old wages.db')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be copied')
+    parser.add_argument('--force', action='store_true', help='Copy again even if already imported')
+    args = parser.parse_args()
+
+    if not Path(args.legacy_db).exists():
+        print(f"ℹ️  No legacy database at {args.legacy_db}, nothing to import")
+        return
+
+    copied = import_legacy_mileage(args.legacy_db, force=args.force, dry_run=args.dry_run)
+    if copied is None:
+        print("ℹ️  Already imported - use --force to copy again")
+    elif args.dry_run:
+        print(f"🔍 Dry run - {copied} entries would be copied")
+    else:
+        print(f"✅ Imported {copied} mileage entries")
+
+
+if __name__ == '__main__':
+    main()
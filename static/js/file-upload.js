@@ -299,8 +299,12 @@ class FileUploadManager {
             
             const result = await uploadPromise;
             
-            // Stage 2: Processing (40-80%)
-            this.updateProgressStage('Extracting jobs...', 40, 80, 2000);
+            // Stage 2: Processing (40-80%) - follow the background batch job
+            if (result.job_id) {
+                result.processing_results = await this.pollUploadJob(result.job_id, result.processing_results);
+            } else {
+                this.updateProgressStage('Extracting jobs...', 40, 80, 2000);
+            }
             
             // Stage 3: Complete (80-100%)
             this.updateProgressStage('Import complete!', 80, 100, 500);
@@ -325,6 +329,29 @@ class FileUploadManager {
         }
     }
     
+    async pollUploadJob(jobId, fallbackResults) {
+        // Poll /api/upload/jobs/<id> until the batch import finishes
+        for (let attempt = 0; attempt < 600; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            let job;
+            try {
+                const response = await fetch(`/api/upload/jobs/${jobId}`);
+                if (!response.ok) break;
+                job = (await response.json()).job;
+            } catch (error) {
+                console.error('Upload job poll failed:', error);
+                break;
+            }
+            const done = job.total ? job.processed / job.total : 0;
+            this.updateProgress(40 + done * 40, `Extracting jobs... (${job.processed}/${job.total})`);
+            if (job.status === 'completed') return job.results;
+            if (job.status === 'failed') {
+                return fallbackResults.map(item => ({file: item.file, result: {success: false, error: job.error}}));
+            }
+        }
+        return fallbackResults;
+    }
+    
     showProgress() {
         const progressContainer = document.getElementById('uploadProgress');
         progressContainer.style.display = 'block';
@@ -5,6 +5,7 @@
 
 // Tax year configuration
 const TAX_YEAR = '2026-27';
+const HMRC_TAX_YEAR = '2026/2027';
 const TAX_YEAR_START = new Date('2026-04-06');
 const TAX_YEAR_END = new Date('2027-04-05');
 
@@ -51,6 +52,7 @@ const QUARTERS = [
 // State
 let connectionStatus = null;
 let obligations = null;
+let dashboard = null;
 let currentQuarter = null;
 
 // Initialize on page load
@@ -73,9 +75,9 @@ async function initializePage() {
     // Setup event listeners
     setupEventListeners();
     
-    // Load obligations if connected
+    // Load everything the page shows from HMRC if connected
     if (connectionStatus && connectionStatus.connected) {
-        await loadObligations();
+        await loadDashboard();
     }
 }
 
@@ -114,20 +116,45 @@ async function loadConnectionStatus() {
     }
 }
 
-async function loadObligations() {
+// Query string for the HMRC read endpoints. The NINO and Business ID are
+// the ones saved in HMRC settings; in sandbox the server falls back to the
+// active test user when they are missing.
+function hmrcQuery() {
+    const params = new URLSearchParams({ tax_year: HMRC_TAX_YEAR });
+    const nino = localStorage.getItem('hmrc_nino');
+    const businessId = localStorage.getItem('hmrc_business_id');
+    if (nino) params.set('nino', nino);
+    if (businessId) params.set('business_id', businessId);
+    return params.toString();
+}
+
+async function loadDashboard() {
+    // One request; the server fetches obligations, BSAS, losses etc. concurrently
     try {
-        const response = await fetch('/api/hmrc/obligations');
+        const response = await fetch(`/api/hmrc/dashboard?${hmrcQuery()}`);
         const data = await response.json();
         
-        if (data.success) {
-            obligations = data.data;
+        if (!data.success) {
+            console.error('Error loading HMRC dashboard:', data.error);
+            return;
+        }
+        dashboard = data.data;
+        if (dashboard.obligations && dashboard.obligations.success) {
+            obligations = dashboard.obligations.data;
             updateQuarterlyCardsWithObligations();
         }
     } catch (error) {
-        console.error('Error loading obligations:', error);
+        console.error('Error loading HMRC dashboard:', error);
     }
 }
 
+// Items in an HMRC list response, or 0 if the call failed
+function dashboardCount(section, key) {
+    const result = dashboard && dashboard[section];
+    if (!result || !result.success || !result.data) return 0;
+    return (result.data[key] || []).length;
+}
+
 function determineCurrentQuarter() {
     const today = new Date();
     
@@ -456,43 +483,61 @@ function showSubmissionDetails(quarter) {
     // TODO: Implement submission details view
 }
 
-function showFinalDeclaration() {
+async function showFinalDeclaration() {
     const modal = new bootstrap.Modal(document.getElementById('finalDeclarationModal'));
     const modalContent = document.getElementById('finalDeclarationContent');
     
-    // Load final declaration content
+    modalContent.innerHTML = '<div class="text-center py-4"><span class="spinner-border"></span></div>';
+    modal.show();
+    
+    let status = null;
+    try {
+        const response = await fetch(`/api/hmrc/final-declaration/status?${hmrcQuery()}`);
+        const data = await response.json();
+        if (data.success) {
+            status = data.data;
+        } else {
+            console.error('Error loading final declaration status:', data.error);
+        }
+    } catch (error) {
+        console.error('Error loading final declaration status:', error);
+    }
+    
+    const submitted = status ? status.quarters_submitted : [];
+    const checklist = [
+        ...['Q1', 'Q2', 'Q3', 'Q4'].map(q => [`${q} Submitted`, submitted.includes(q)]),
+        ['BSAS Adjustments Reviewed', dashboardCount('bsas', 'businessSources') > 0],
+        ['Losses Declared', dashboardCount('losses', 'losses') > 0]
+    ];
+    
+    let declaration = '';
+    if (status && status.declaration_status === 'submitted' && status.declaration) {
+        declaration = `
+            <div class="alert alert-success">
+                <i class="fas fa-check-circle me-2"></i>Final declaration submitted.
+                Receipt: <code>${status.declaration.hmrc_receipt_id || 'N/A'}</code>
+            </div>`;
+    } else if (status && status.hmrc && status.hmrc.calculations && status.hmrc.calculations.success) {
+        const calculations = (status.hmrc.calculations.data || {}).calculations || [];
+        declaration = `<p class="text-muted">HMRC has ${calculations.length} tax calculation(s) for ${HMRC_TAX_YEAR}.</p>`;
+    }
+    
     modalContent.innerHTML = `
         <div class="alert alert-info">
             <strong><i class="fas fa-info-circle me-2"></i>Final Declaration Requirements</strong>
             <p class="mb-0 mt-2">All four quarterly updates must be submitted before you can complete your final declaration.</p>
         </div>
-        
+        ${declaration}
         <h6 class="mb-3">Checklist</h6>
         <ul class="list-group mb-4">
+            ${checklist.map(([label, done]) => `
             <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>Q1 Submitted
-            </li>
-            <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>Q2 Submitted
-            </li>
-            <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>Q3 Submitted
-            </li>
-            <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>Q4 Submitted
-            </li>
-            <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>BSAS Adjustments Reviewed
-            </li>
-            <li class="list-group-item">
-                <i class="fas fa-square text-muted me-2"></i>Losses Declared
-            </li>
+                <i class="fas ${done ? 'fa-check-square text-success' : 'fa-square text-muted'} me-2"></i>${label}
+            </li>`).join('')}
         </ul>
         
         <p class="text-muted">Once all requirements are met, you'll be able to submit your final declaration.</p>
     `;
-    
-    modal.show();
 }
 
 // Helper function for CSRF headers
@@ -27,9 +27,6 @@ document.addEventListener('DOMContentLoaded', function() {
  */
 async function initializePaypoint() {
     try {
-        // Initialize database tables first
-        await initializeTables();
-        
         // Load initial data
         await loadSummary();
         await loadDevices();
@@ -135,26 +132,6 @@ async function fetchJobDetails(jobNumber) {
     }
 }
 
-/**
- * Initialize database tables
- */
-async function initializeTables() {
-    try {
-        const response = await fetch('/api/paypoint/initialize', {
-            method: 'POST',
-            headers: getJSONHeaders()
-        });
-        
-        const data = await response.json();
-        if (!data.success) {
-            throw new Error(data.error || 'Failed to initialize tables');
-        }
-    } catch (error) {
-        console.error('Error initializing tables:', error);
-        // Don't throw here as tables might already exist
-    }
-}
-
 /**
  * Load summary statistics
  */
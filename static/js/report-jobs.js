@@ -0,0 +1,40 @@
+/**
+ * PDF report downloads that outlast the request.
+ *
+ * The PDF routes wait REPORT_WAIT_SECONDS for the render; a longer one
+ * answers 202 with a job instead of the file (app/services/report_jobs.py).
+ * resolveReportJob() polls that job and returns the download response, so
+ * callers can treat the result like the original PDF response.
+ */
+
+const REPORT_JOB_POLL_MS = 1000;
+const REPORT_JOB_TIMEOUT_MS = 5 * 60 * 1000;
+
+function reportJobError(message, status) {
+    return new Response(JSON.stringify({ success: false, error: message }), {
+        status: status,
+        headers: { 'Content-Type': 'application/json' }
+    });
+}
+
+async function resolveReportJob(response) {
+    if (response.status !== 202) {
+        return response;
+    }
+
+    const { job_id: jobId } = await response.json();
+    const deadline = Date.now() + REPORT_JOB_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, REPORT_JOB_POLL_MS));
+
+        const poll = await fetch(`/api/reports/jobs/${jobId}`);
+        const job = await poll.json();
+        if (!poll.ok || job.status === 'failed') {
+            return reportJobError(job.error || 'Report failed', poll.ok ? 500 : poll.status);
+        }
+        if (job.status === 'completed') {
+            return fetch(`/api/reports/jobs/${jobId}/download`);
+        }
+    }
+    return reportJobError('Report is still rendering - try again in a minute', 504);
+}
@@ -1227,6 +1227,7 @@ function generateMonthlyMileageReport(format = 'csv') {
         headers: getJSONHeaders(),
         body: JSON.stringify({ format: format })
     })
+        .then(resolveReportJob)
         .then(response => {
             if (response.headers.get('content-type')?.includes('text/csv') || 
                 response.headers.get('content-type')?.includes('application/pdf')) {
@@ -1267,6 +1268,7 @@ function generateHighMileageDays(format = 'csv') {
         headers: getJSONHeaders(),
         body: JSON.stringify({ format: format })
     })
+        .then(resolveReportJob)
         .then(response => {
             if (response.headers.get('content-type')?.includes('text/csv') || 
                 response.headers.get('content-type')?.includes('application/pdf')) {
@@ -1344,6 +1346,7 @@ function generateMissingMileageReport(format = 'csv') {
         headers: getJSONHeaders(),
         body: JSON.stringify({ format: format })
     })
+        .then(resolveReportJob)
         .then(response => {
             if (response.headers.get('content-type')?.includes('text/csv') || 
                 response.headers.get('content-type')?.includes('application/pdf')) {
@@ -1431,7 +1434,7 @@ async function generateDiscrepancyPDF() {
             method: 'POST',
             headers: getJSONHeaders(),
             body: JSON.stringify({ year, month })
-        });
+        }).then(resolveReportJob);
         
         if (response.ok) {
             // Download the PDF file
@@ -2263,7 +2266,7 @@ async function exportCustomReportPDF() {
                 week: week,
                 month: month
             })
-        });
+        }).then(resolveReportJob);
         
         if (response.ok) {
             // Get the PDF blob
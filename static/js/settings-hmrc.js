@@ -836,9 +836,12 @@ function updateFinalDeclarationMode(isAmendment) {
 
 async function loadFinalDeclarationStatus() {
     const taxYear = document.getElementById('finalDeclTaxYear').value;
+    const params = new URLSearchParams({ tax_year: taxYear });
+    const nino = hmrcConfig.nino || document.getElementById('ninoInput').value;
+    if (nino) params.set('nino', nino);
     
     try {
-        const response = await fetch(`/api/hmrc/final-declaration/status?tax_year=${taxYear}`);
+        const response = await fetch(`/api/hmrc/final-declaration/status?${params}`);
         const data = await response.json();
         
         if (data.success) {
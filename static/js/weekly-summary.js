@@ -553,6 +553,7 @@ window.exportWeeklySummaryPDF = function() {
             week_start: currentWeekStart
         })
     })
+    .then(resolveReportJob)
     .then(response => {
         if (!response.ok) {
             throw new Error('Failed to generate PDF');
@@ -84,3 +84,18 @@ def auth_client(client):
 def runner(app):
     """Flask CLI runner."""
     return app.test_cli_runner()
+
+
+@pytest.fixture(autouse=True)
+def _reset_hmrc_caches():
+    """Keep cached HMRC tokens, GET responses, rate-limit state and tax-year
+    aggregates from leaking between tests."""
+    from app.services.hmrc_auth import clear_token_cache
+    from app.services.hmrc_cumulative_calculator import clear_aggregate_cache
+    from app.services.hmrc_http import rate_limiter, response_cache
+
+    yield
+    clear_token_cache()
+    response_cache.clear()
+    rate_limiter.reset()
+    clear_aggregate_cache()
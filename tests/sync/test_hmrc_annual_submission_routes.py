@@ -38,7 +38,7 @@ def patched_client(app):
         ), patch(
             'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
             return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
-        ), patch('app.services.hmrc_client.requests') as mock_requests:
+        ), patch.object(client, 'session') as mock_requests:
             yield client, mock_requests
 
 
@@ -219,7 +219,7 @@ class TestGetAnnualSummary:
                 client.auth_service,
                 'get_valid_access_token',
                 return_value=None,
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.get_annual_summary('AA123456A', 'X1', '2025-26')
         assert result['success'] is False
         mock_requests.get.assert_not_called()
@@ -326,7 +326,7 @@ class TestUpdateAnnualSummary:
                 client.auth_service,
                 'get_valid_access_token',
                 return_value=None,
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.update_annual_summary(
                     'AA123456A', 'X1', '2025-26', _sample_annual_data(),
                 )
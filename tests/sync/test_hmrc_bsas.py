@@ -24,9 +24,7 @@ def patched_client(app):
         ), patch(
             'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
             return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
-        ), patch(
-            'app.services.hmrc_client.requests'
-        ) as mock_requests:
+        ), patch.object(client, 'session') as mock_requests:
             yield client, mock_requests
 
 
@@ -337,3 +337,69 @@ def test_quarter_end_date_rejects_unknown_period_id():
 
     with pytest.raises(ValueError):
         quarter_end_date('2025-26', 'Q5')
+
+
+# ---------------------------------------------------------------------------
+# tax-year aggregate memoisation
+# ---------------------------------------------------------------------------
+
+def test_aggregate_is_reused_until_source_data_changes(app, monkeypatch):
+    from app.services import hmrc_cumulative_calculator as calc
+
+    with app.app_context():
+        _seed_full_year(app, 2025)
+
+        calls = []
+        real_aggregate = calc._aggregate
+        monkeypatch.setattr(
+            calc, '_aggregate',
+            lambda *a: calls.append(a) or real_aggregate(*a),
+        )
+
+        preview = calc.calculate_cumulative_totals('2025-26', period_id='Q2')
+        submit = calc.calculate_cumulative_totals('2025-26', period_id='Q2')
+        calc.calculate_cumulative_totals('2025-26', period_id='Q4')
+        assert preview == submit
+        assert len(calls) == 1
+
+        _add_expense('2025-05-20', 'Vehicle Costs', 10)
+        after = calc.calculate_cumulative_totals('2025-26', period_id='Q2')
+        assert len(calls) == 2
+        assert after['periodExpenses']['travelCosts'] == 60.0
+
+
+def test_aggregate_follows_category_box_changes(app):
+    from app.services.hmrc_cumulative_calculator import calculate_cumulative_totals
+
+    with app.app_context():
+        _seed_full_year(app, 2025)
+        before = calculate_cumulative_totals('2025-26', period_id='Q1')
+        assert before['periodExpenses'] == {'travelCosts': 50.0}
+
+        with get_db_connection() as conn:
+            conn.execute(
+                "UPDATE expense_categories SET hmrc_box = 'Admin costs' "
+                "WHERE name = 'Vehicle Costs'"
+            )
+            conn.commit()
+
+        after = calculate_cumulative_totals('2025-26', period_id='Q1')
+        assert after['periodExpenses'] == {'adminCosts': 50.0}
+
+
+def test_box_totals_mapping_matches_expense_mapping():
+    from app.services.hmrc_mapper import HMRCMapper
+
+    expenses = [
+        {'hmrc_box': 'Vehicle costs', 'amount': 12.345},
+        {'hmrc_box': 'Vehicle costs', 'amount': 7.655},
+        {'hmrc_box': 'Admin costs', 'amount': 3},
+        {'hmrc_box': 'Something new', 'amount': 4},
+        {'hmrc_box': None, 'amount': 1},
+        {'hmrc_box': 'Phone costs', 'amount': 0},
+    ]
+    pairs = [(e['hmrc_box'], e['amount']) for e in expenses]
+    assert (
+        HMRCMapper.map_box_totals_to_hmrc_format(pairs)
+        == HMRCMapper.map_expenses_to_hmrc_format(expenses)
+    )
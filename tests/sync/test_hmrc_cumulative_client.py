@@ -1,6 +1,6 @@
 """HMRCClient cumulative endpoint tests.
 
-These tests mock requests.* and the OAuth/fraud-header layers so we can
+These tests mock the HTTP session and the OAuth/fraud-header layers so we can
 verify the URL, HTTP method, headers, and body that HMRCClient sends -
 without ever touching the real sandbox.
 """
@@ -35,9 +35,7 @@ def patched_client(app):
         ), patch(
             'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
             return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
-        ), patch(
-            'app.services.hmrc_client.requests'
-        ) as mock_requests:
+        ), patch.object(client, 'session') as mock_requests:
             yield client, mock_requests
 
 
@@ -178,7 +176,7 @@ class TestSubmitCumulativePeriod:
             client = HMRCClient()
             with patch.object(
                 client.auth_service, 'get_valid_access_token', return_value=None
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.submit_cumulative_period(
                     'AA123456A', 'X1', '2025-26', CUMULATIVE_PAYLOAD
                 )
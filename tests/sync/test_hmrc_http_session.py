@@ -0,0 +1,360 @@
+"""HMRCClient HTTP layer tests against a local stub HMRC server.
+
+Unlike the endpoint tests, nothing below mocks the transport: requests go
+through the real pooled session (``app.services.hmrc_http``) to a
+``ThreadingHTTPServer`` on localhost that scripts HMRC's responses. Only
+the OAuth token and fraud headers are stubbed.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.config import Config
+from app.services import hmrc_http
+
+
+NINO = 'AA123456A'
+
+
+class StubHMRC:
+    """Records requests and replays queued ``(status, body, headers)`` responses."""
+
+    def __init__(self):
+        self.requests = []
+        self.client_ports = set()
+        self.queue = {}
+        self.delay = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                time.sleep(stub.delay)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                stub.requests.append((self.command, self.path, dict(self.headers), body))
+                stub.client_ports.add(self.client_address[1])
+                queued = stub.queue.get((self.command, self.path.split('?')[0]))
+                status, payload, headers = (
+                    queued.pop(0) if queued else (200, {'ok': True}, {})
+                )
+                data = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def respond(self, method, path, *responses):
+        self.queue.setdefault((method, path), []).extend(responses)
+
+    def hits(self, method, path):
+        return sum(1 for m, p, _, _ in self.requests if m == method and p.split('?')[0] == path)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubHMRC()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def hmrc_client(app, stub):
+    """HMRCClient pointed at the stub with a fast retry policy."""
+    from app.services.hmrc_client import HMRCClient
+
+    config = Config()
+    config.HMRC_HTTP_BACKOFF = 0
+    config.HMRC_HTTP_RETRIES = 2
+
+    with app.test_request_context('/'):
+        hmrc = HMRCClient()
+        hmrc.base_url = stub.url
+        hmrc.session = hmrc_http.build_session(config)
+        with patch.object(
+            hmrc.auth_service, 'get_valid_access_token', return_value='stub-token',
+        ), patch(
+            'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
+            return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
+        ):
+            yield hmrc
+        hmrc.session.close()
+
+
+# ---------------------------------------------------------------------------
+# Pooling and retries
+# ---------------------------------------------------------------------------
+
+def test_requests_reuse_one_connection(hmrc_client, stub):
+    for _ in range(5):
+        assert hmrc_client.test_connection()['success'] is True
+
+    assert stub.hits('GET', '/hello/user') == 5
+    assert len(stub.client_ports) == 1
+
+
+def test_429_is_retried_after_retry_after(hmrc_client, stub):
+    stub.respond(
+        'GET', '/hello/user',
+        (429, {'code': 'MESSAGE_THROTTLED_OUT'}, {'Retry-After': '0'}),
+    )
+
+    result = hmrc_client.test_connection()
+
+    assert result['success'] is True
+    assert stub.hits('GET', '/hello/user') == 2
+
+
+def test_throttled_post_is_replayed(hmrc_client, stub):
+    path = f'/individuals/losses/{NINO}/brought-forward-losses'
+    stub.respond(
+        'POST', path,
+        (429, {'code': 'MESSAGE_THROTTLED_OUT'}, {'Retry-After': '0'}),
+        (201, {'lossId': 'L1'}, {}),
+    )
+
+    result = hmrc_client.create_loss(NINO, '2024-25', 'self-employment', 'X1', 100.0)
+
+    assert result['success'] is True
+    assert result['data'] == {'lossId': 'L1'}
+    assert stub.hits('POST', path) == 2
+
+
+def test_gateway_error_on_post_is_not_replayed(hmrc_client, stub):
+    path = f'/individuals/losses/{NINO}/brought-forward-losses'
+    stub.respond('POST', path, (503, {'code': 'SERVICE_UNAVAILABLE'}, {}))
+
+    result = hmrc_client.create_loss(NINO, '2024-25', 'self-employment', 'X1', 100.0)
+
+    assert result['success'] is False
+    assert result['status_code'] == 503
+    assert stub.hits('POST', path) == 1
+
+
+def test_exhausted_retries_return_last_response(hmrc_client, stub):
+    stub.respond(
+        'GET', '/hello/user',
+        *[(503, {'code': 'SERVICE_UNAVAILABLE'}, {})] * 3,
+    )
+
+    result = hmrc_client.test_connection()
+
+    assert result['success'] is False
+    assert stub.hits('GET', '/hello/user') == 3
+
+
+# ---------------------------------------------------------------------------
+# GET cache
+# ---------------------------------------------------------------------------
+
+def test_business_details_are_cached_until_a_write(hmrc_client, stub):
+    list_path = f'/individuals/business/details/{NINO}/list'
+    stub.respond('GET', list_path, (200, {'listOfBusinesses': ['first']}, {}))
+    stub.respond('GET', list_path, (200, {'listOfBusinesses': ['second']}, {}))
+
+    first = hmrc_client.get_business_details(NINO)
+    first['data']['listOfBusinesses'].append('mutated by caller')
+    again = hmrc_client.get_business_details(NINO)
+
+    assert stub.hits('GET', list_path) == 1
+    assert again['data'] == {'listOfBusinesses': ['first']}
+
+    hmrc_client.create_amend_quarterly_period_type(NINO, 'X1', 'calendar')
+    after_write = hmrc_client.get_business_details(NINO)
+
+    assert stub.hits('GET', list_path) == 2
+    assert after_write['data'] == {'listOfBusinesses': ['second']}
+
+
+def test_write_in_another_worker_retires_cached_reads(hmrc_client, stub):
+    from app.database import get_db_connection
+    from app.services.data_versions import bump_version
+
+    list_path = f'/individuals/business/details/{NINO}/list'
+    hmrc_client.get_business_details(NINO)
+    hmrc_client.get_business_details(NINO)
+    assert stub.hits('GET', list_path) == 1
+
+    # What another worker's record_write() leaves behind: its own cache is
+    # cleared, this process only sees the shared counter move.
+    with get_db_connection() as conn:
+        bump_version(conn, hmrc_http.WRITE_VERSION)
+        conn.commit()
+    hmrc_client.get_business_details(NINO)
+
+    assert stub.hits('GET', list_path) == 2
+
+
+def test_obligations_cache_is_keyed_by_params(hmrc_client, stub):
+    path = f'/individuals/business/self-employment/{NINO}/obligations'
+
+    hmrc_client.get_obligations(NINO, from_date='2024-04-06', to_date='2025-04-05')
+    hmrc_client.get_obligations(NINO, from_date='2024-04-06', to_date='2025-04-05')
+    hmrc_client.get_obligations(NINO, from_date='2025-04-06', to_date='2026-04-05')
+
+    assert stub.hits('GET', path) == 2
+
+
+def test_errors_and_uncached_endpoints_always_hit_hmrc(hmrc_client, stub):
+    list_path = f'/individuals/business/details/{NINO}/list'
+    stub.respond('GET', list_path, (404, {'code': 'MATCHING_RESOURCE_NOT_FOUND'}, {}))
+
+    assert hmrc_client.get_business_details(NINO)['success'] is False
+    assert hmrc_client.get_business_details(NINO)['success'] is True
+    hmrc_client.retrieve_calculation(NINO, 'calc-1')
+    hmrc_client.retrieve_calculation(NINO, 'calc-1')
+
+    assert stub.hits('GET', list_path) == 2
+    assert stub.hits('GET', f'/individuals/calculations/{NINO}/self-assessment/calc-1') == 2
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting and fan-out
+# ---------------------------------------------------------------------------
+
+def test_rate_limiter_spaces_calls_per_key():
+    limiter = hmrc_http.RateLimiter(rate=20, burst=1)
+
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire('/individuals/losses')
+    limiter.acquire('/individuals/calculations')
+
+    # Three waits of 1/20s on the losses bucket; the other key is free.
+    assert 0.14 <= time.monotonic() - started < 0.5
+
+
+def test_fetch_concurrently_overlaps_calls(hmrc_client, stub):
+    stub.delay = 0.3
+    calls = {
+        'losses': lambda: hmrc_client.list_losses(NINO),
+        'bsas': lambda: hmrc_client.list_bsas_summaries(NINO, '2024-25'),
+        'calculations': lambda: hmrc_client.list_calculations(NINO, '2024/2025'),
+        'broken': lambda: 1 / 0,
+    }
+
+    started = time.monotonic()
+    results = hmrc_client.fetch_concurrently(calls)
+    elapsed = time.monotonic() - started
+
+    assert list(results) == ['losses', 'bsas', 'calculations', 'broken']
+    assert all(results[name]['success'] for name in ('losses', 'bsas', 'calculations'))
+    assert results['broken'] == {'success': False, 'error': 'division by zero'}
+    assert elapsed < 0.8
+
+
+def test_dashboard_fans_out_with_per_request_fraud_headers(app, auth_client, stub):
+    from app.services.hmrc_auth import HMRCAuthService
+
+    stub.delay = 0.2
+    with patch.object(Config, 'HMRC_API_BASE_URL', stub.url), patch.object(
+        HMRCAuthService, 'get_valid_access_token', return_value='stub-token',
+    ):
+        started = time.monotonic()
+        response = auth_client.get(
+            f'/api/hmrc/dashboard?tax_year=2024/2025&nino={NINO}&business_id=X1'
+        )
+        elapsed = time.monotonic() - started
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert set(data['data']) == {
+        'obligations', 'final_declaration_obligations', 'businesses',
+        'calculations', 'bsas', 'losses', 'periods_of_account',
+    }
+    assert all(section['success'] for section in data['data'].values())
+    assert len(stub.requests) == 7
+    # Seven calls at 0.2s each, four workers: two waves, not seven.
+    assert elapsed < 1.0
+    for _, _, headers, _ in stub.requests:
+        assert headers['Authorization'] == 'Bearer stub-token'
+        assert headers['Gov-Client-Connection-Method'] == 'WEB_APP_VIA_SERVER'
+
+
+def test_final_declaration_status_includes_hmrc_when_nino_given(app, auth_client, stub):
+    from app.services.hmrc_auth import HMRCAuthService
+
+    with patch.object(Config, 'HMRC_API_BASE_URL', stub.url), patch.object(
+        HMRCAuthService, 'get_valid_access_token', return_value='stub-token',
+    ):
+        without = auth_client.get('/api/hmrc/final-declaration/status?tax_year=2024/2025')
+        with_nino = auth_client.get(
+            f'/api/hmrc/final-declaration/status?tax_year=2024/2025&nino={NINO}'
+        )
+
+    assert 'hmrc' not in without.get_json()['data']
+    hmrc = with_nino.get_json()['data']['hmrc']
+    assert set(hmrc) == {'final_declaration_obligations', 'calculations'}
+    assert len(stub.requests) == 2
+
+
+# ---------------------------------------------------------------------------
+# Access token cache
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def auth_service(app):
+    from app.services.hmrc_auth import HMRCAuthService
+
+    plain = MagicMock()
+    plain.encrypt.side_effect = lambda value: value
+    plain.decrypt.side_effect = lambda value: value
+    with app.app_context(), patch('app.services.hmrc_auth.get_encryption', return_value=plain):
+        yield HMRCAuthService()
+
+
+def test_access_token_is_decrypted_once(auth_service):
+    auth_service._store_tokens({'access_token': 'tok-1', 'refresh_token': 'ref-1'})
+
+    with patch.object(
+        auth_service, 'get_stored_credentials', wraps=auth_service.get_stored_credentials,
+    ) as stored:
+        assert auth_service.get_valid_access_token() == 'tok-1'
+        assert auth_service.get_valid_access_token() == 'tok-1'
+
+    stored.assert_not_called()
+
+
+def test_cached_token_is_refreshed_near_expiry_and_dropped_on_revoke(auth_service):
+    from app.services.hmrc_auth import clear_token_cache
+
+    # Inside the five minute refresh margin: never served from the cache.
+    auth_service._store_tokens(
+        {'access_token': 'old', 'refresh_token': 'ref-1', 'expires_in': 120},
+    )
+    with patch.object(
+        auth_service, 'refresh_access_token',
+        return_value={'success': True, 'data': {'access_token': 'new'}},
+    ) as refresh:
+        assert auth_service.get_valid_access_token() == 'new'
+    refresh.assert_called_once_with('ref-1')
+
+    auth_service._store_tokens({'access_token': 'fresh', 'refresh_token': 'ref-2'})
+    clear_token_cache()
+    assert auth_service.get_valid_access_token() == 'fresh'
+
+    auth_service.revoke_credentials()
+    assert auth_service.get_valid_access_token() is None
@@ -34,9 +34,7 @@ def patched_client(app):
         ), patch(
             'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
             return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
-        ), patch(
-            'app.services.hmrc_client.requests'
-        ) as mock_requests:
+        ), patch.object(client, 'session') as mock_requests:
             yield client, mock_requests
 
 
@@ -205,7 +203,7 @@ class TestGetLateAccountingDateRule:
                 client.auth_service,
                 'get_valid_access_token',
                 return_value=None,
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.get_late_accounting_date_rule(
                     'AA123456A', 'X1', '2025-26',
                 )
@@ -369,7 +367,7 @@ class TestDisapplyLateAccountingDateRule:
                 client.auth_service,
                 'get_valid_access_token',
                 return_value=None,
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.disapply_late_accounting_date_rule(
                     'AA123456A', 'X1', '2025-26',
                 )
@@ -512,7 +510,7 @@ class TestWithdrawLateAccountingDateRuleDisapplication:
                 client.auth_service,
                 'get_valid_access_token',
                 return_value=None,
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.withdraw_late_accounting_date_rule_disapplication(
                     'AA123456A', 'X1', '2025-26',
                 )
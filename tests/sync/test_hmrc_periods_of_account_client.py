@@ -1,6 +1,6 @@
 """HMRCClient Periods of Account endpoint tests.
 
-These tests mock requests.* and the OAuth/fraud-header layers so we can
+These tests mock the HTTP session and the OAuth/fraud-header layers so we can
 verify URL, HTTP method, headers and body that HMRCClient sends - without
 ever touching the real sandbox.
 
@@ -37,9 +37,7 @@ def patched_client(app):
         ), patch(
             'app.services.hmrc_fraud_headers.build_fraud_prevention_headers',
             return_value={'Gov-Client-Connection-Method': 'WEB_APP_VIA_SERVER'},
-        ), patch(
-            'app.services.hmrc_client.requests'
-        ) as mock_requests:
+        ), patch.object(client, 'session') as mock_requests:
             yield client, mock_requests
 
 
@@ -151,7 +149,7 @@ class TestCreatePeriodOfAccount:
             client = HMRCClient()
             with patch.object(
                 client.auth_service, 'get_valid_access_token', return_value=None
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.create_period_of_account(
                     'AA123456A', 'X1', PERIOD_PAYLOAD
                 )
@@ -330,7 +328,7 @@ class TestListPeriodsOfAccount:
             client = HMRCClient()
             with patch.object(
                 client.auth_service, 'get_valid_access_token', return_value=None
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.list_periods_of_account('AA123456A', 'X1')
 
         assert result['success'] is False
@@ -479,7 +477,7 @@ class TestUpdatePeriodOfAccount:
             client = HMRCClient()
             with patch.object(
                 client.auth_service, 'get_valid_access_token', return_value=None
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.update_period_of_account(
                     'AA123456A', 'X1', 'POA-1', PERIOD_PAYLOAD
                 )
@@ -626,7 +624,7 @@ class TestDeletePeriodOfAccount:
             client = HMRCClient()
             with patch.object(
                 client.auth_service, 'get_valid_access_token', return_value=None
-            ), patch('app.services.hmrc_client.requests') as mock_requests:
+            ), patch.object(client, 'session') as mock_requests:
                 result = client.delete_period_of_account(
                     'AA123456A', 'X1', 'POA-1'
                 )
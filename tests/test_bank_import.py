@@ -0,0 +1,153 @@
+"""Tests for the bank statement import: parsing, duplicate detection, bulk insert."""
+
+import io
+
+import pytest
+
+from app.models.bank_statement import BankStatementParser
+from app.models.expense import ExpenseModel
+from app.models.recurring_template import RecurringTemplateModel
+
+HEADER = 'Date,Type,Description,Value,Balance,Account Name,Account Number'
+
+STATEMENT = '\n'.join([
+    HEADER,
+    '06 Apr 2025,DPC,SANTANDER VAN FINANCE 4471,-289.50,100.00,MR D HANSON,123',
+    '07-Apr-25,POS, SHELL WARRINGTON ,-61.20,100.00,MR D HANSON,123',
+    '08/04/2025,DD,ADMIRAL INSURANCE,-74.00,100.00,MR D HANSON,123',
+    '09 Apr 2025,DD,LOCAL BROADBAND CO,-25.00,100.00,MR D HANSON,123',
+    '09 Apr 2025,POS,TESCO STORE 2231,-12.40,100.00,MR D HANSON,123',
+    '10 Apr 2025,BAC,SASER PAYROLL,950.00,100.00,MR D HANSON,123',
+    'not a date,POS,SHELL,-1.00,100.00,MR D HANSON,123',
+    '11 Apr 2025,POS,COSTA COFFEE,oops,100.00,MR D HANSON,123',
+    '12 Apr 2025,POS,"GREGGS, HIGH ST",-3.15,100.00,MR D HANSON,123',
+    '13 Apr 2025,DD,SANTANDER LOAN,-289.50,100.00,MR D HANSON,123',
+])
+
+TEMPLATES = [
+    {'id': 7, 'name': 'Van Finance', 'merchant_pattern': 'Santander Van', 'expected_amount': 289.5,
+     'tolerance_amount': 5.0, 'next_expected_date': '2025-04-07', 'category_name': 'Vehicle Costs',
+     'auto_import': 1},
+    {'id': 9, 'name': 'Insurance', 'merchant_pattern': 'ADMIRAL', 'expected_amount': 75.0,
+     'tolerance_amount': 5.0, 'next_expected_date': None, 'category_name': 'Vehicle Costs',
+     'auto_import': 0},
+]
+
+
+@pytest.fixture
+def pandas_path(monkeypatch):
+    pytest.importorskip('pandas')
+    monkeypatch.setattr(BankStatementParser, 'PANDAS_MIN_ROWS', 0)
+
+
+def _parse_rows(monkeypatch, content, templates):
+    monkeypatch.setattr(BankStatementParser, 'PANDAS_MIN_ROWS', float('inf'))
+    return BankStatementParser.parse_rbs_csv(content, templates)
+
+
+def test_statement_is_parsed_against_templates_loaded_once(monkeypatch):
+    transactions = _parse_rows(monkeypatch, STATEMENT, TEMPLATES)
+
+    assert [t['description'] for t in transactions] == [
+        'SANTANDER VAN FINANCE 4471', 'SHELL WARRINGTON', 'ADMIRAL INSURANCE',
+        'LOCAL BROADBAND CO', 'GREGGS, HIGH ST', 'SANTANDER LOAN']
+    van, shell, admiral, broadband, greggs, loan = transactions
+    assert (van['template_id'], van['confidence'], van['auto_import']) == (7, 110, 1)
+    assert (admiral['template_id'], admiral['confidence']) == (9, 80)
+    assert (shell['date'], shell['category'], shell['template_id']) == ('2025-04-07', 'Fuel', None)
+    assert broadband['category'] == 'Admin Costs'
+    assert (greggs['category'], greggs['selected']) == (None, False)
+    # Partial pattern word, amount and date: 25 + 40 + 10.
+    assert (loan['template_id'], loan['confidence'], loan['category']) == (7, 75, 'Vehicle Costs')
+
+    # match_transaction keeps its (id, score) contract.
+    assert RecurringTemplateModel.match_transaction(
+        'SANTANDER VAN FINANCE', 289.5, '2025-04-06', TEMPLATES) == (7, 110)
+    assert RecurringTemplateModel.match_transaction('GREGGS', 3.15, '2025-04-06', TEMPLATES) == (None, 0)
+
+
+def test_pandas_path_matches_the_csv_path(monkeypatch, pandas_path):
+    lines = [HEADER] + STATEMENT.split('\n')[1:] * 50
+    content = '\n'.join(lines)
+    with_pandas = BankStatementParser.parse_rbs_csv(content, TEMPLATES)
+
+    assert with_pandas == _parse_rows(monkeypatch, content, TEMPLATES)
+    assert len(with_pandas) == 300
+    assert type(with_pandas[0]['amount']) is float
+    assert type(with_pandas[0]['confidence']) is int
+
+
+def test_pandas_path_falls_back_on_ragged_rows(monkeypatch, pandas_path):
+    content = STATEMENT + '\n14 Apr 2025,POS,SHELL,-9.00,100.00,MR D HANSON,123,extra'
+    assert BankStatementParser.parse_rbs_csv(content, []) == _parse_rows(monkeypatch, content, [])
+
+
+def test_transactions_exist_matches_per_row_check(app):
+    with app.app_context():
+        ExpenseModel.add_expenses([
+            {'date': '2025-04-06', 'category_id': 1, 'amount': 289.5, 'description': 'VAN FINANCE'},
+            {'date': '2025-04-07', 'category_id': 1, 'amount': 61.2,
+             'description': 'Shell Warrington - fuel - van'},
+            {'date': '2025-04-08', 'category_id': 1, 'amount': 74, 'description': None},
+        ])
+        candidates = [
+            {'date': '2025-04-06', 'amount': 289.5, 'description': 'VAN FINANCE'},
+            {'date': '2025-04-06', 'amount': 289.51, 'description': 'VAN FINANCE'},
+            {'date': '2025-04-06', 'amount': 289.5, 'description': 'van finance'},
+            {'date': '2025-04-07', 'amount': 61.2, 'description': 'SHELL WARRINGTON'},
+            {'date': '2025-04-07', 'amount': 61.2, 'description': 'Shell Warrington - fuel'},
+            {'date': '2025-04-07', 'amount': 61.2, 'description': 'Shell'},
+            {'date': '2025-04-08', 'amount': 74.0, 'description': ''},
+        ]
+
+        expected = [ExpenseModel.transaction_exists(t['date'], t['description'], t['amount'])
+                    for t in candidates]
+        assert ExpenseModel.transactions_exist(candidates) == expected
+        assert expected == [True, False, False, True, True, False, False]
+        assert ExpenseModel.transactions_exist([]) == []
+
+
+def test_add_expenses_is_all_or_nothing(app):
+    with app.app_context():
+        rows = [{'date': '2025-04-06', 'category_id': 1, 'amount': 10.0, 'description': 'a'},
+                {'date': '2025-04-07', 'category_id': 1, 'amount': None, 'description': 'b'}]
+        with pytest.raises(Exception):
+            ExpenseModel.add_expenses(rows)
+        assert ExpenseModel.get_expenses() == []
+
+        assert ExpenseModel.add_expenses(rows[:1]) == 1
+        assert ExpenseModel.get_expenses()[0]['tax_year'] == '2025/2026'
+
+
+def test_parse_then_import_round_trip(auth_client, app):
+    with app.app_context():
+        categories = {c['name']: c['id'] for c in ExpenseModel.get_categories()}
+        template_id = RecurringTemplateModel.create_template(
+            'Van Finance', categories['Vehicle Costs'], 289.5, 'monthly', 'SANTANDER VAN')
+
+    def parse():
+        response = auth_client.post('/api/bank-import/parse', data={
+            'file': (io.BytesIO(STATEMENT.encode()), 'statement.csv')},
+            content_type='multipart/form-data')
+        return response.get_json()
+
+    parsed = parse()
+    assert parsed['success'] and parsed['summary']['duplicate_count'] == 0
+    transactions = parsed['transactions']
+    transactions[0]['notes'] = 'April'
+    transactions.append(dict(transactions[1], date='31/02/2025'))
+
+    result = auth_client.post('/api/bank-import/import', json={'transactions': transactions}).get_json()
+    assert result['success']
+    assert result['imported_count'] == 5
+    assert result['errors'] == ['Error importing SHELL WARRINGTON: day is out of range for month']
+
+    with app.app_context():
+        descriptions = sorted(e['description'] for e in ExpenseModel.get_expenses())
+        assert 'SANTANDER VAN FINANCE 4471 - April' in descriptions
+        template = RecurringTemplateModel.get_template_by_id(template_id)
+        assert template['last_matched_date'] == '2025-04-13'
+
+    again = parse()
+    assert again['summary']['duplicate_count'] == 5
+    assert [t['description'] for t in again['transactions']] == ['GREGGS, HIGH ST']
@@ -0,0 +1,211 @@
+"""Tests for customer mapping suggestions, resolution and canonical names."""
+
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.database import get_db_connection
+from app.models.customer_mapping import CustomerMappingModel
+from app.services import canonical_customers
+
+MIGRATION = Path(__file__).parent.parent / 'migrations' / '018_customer_mappings.sql'
+
+
+def _pairwise_suggestions(model, customers):
+    """The every-pair comparison the indexed grouping replaced, kept as the spec."""
+    suggestions = []
+    processed = set()
+    for customer in customers:
+        if customer in processed:
+            continue
+        similar = []
+        base_name = model._extract_base_name(customer)
+        for other_customer in customers:
+            if other_customer != customer and other_customer not in processed:
+                other_base = model._extract_base_name(other_customer)
+                if base_name and other_base and (
+                    base_name.lower() in other_base.lower() or
+                    other_base.lower() in base_name.lower() or
+                    model._similar_names(base_name, other_base)
+                ):
+                    similar.append(other_customer)
+        if similar:
+            all_names = [customer] + similar
+            mapped_name = min(all_names, key=len)
+            suggestions.append({
+                'mapped_customer': mapped_name,
+                'original_customers': [name for name in all_names if name != mapped_name]
+            })
+            processed.add(customer)
+            processed.update(similar)
+    return suggestions
+
+
+@pytest.fixture
+def model():
+    return CustomerMappingModel()
+
+
+def test_groups_similar_customers(model):
+    customers = sorted([
+        'Fujitsu Services Limited - EE - ME', 'Fujitsu Retail', 'FUJITSU UK',
+        'Greene King', 'EE', 'BT Openreach', 'Xerox (UK) Ltd', 'Xerox', ' LTD', 'Acme',
+    ])
+    assert model._group_similar(customers) == [
+        # 'ee' is inside 'greene king' and the greedy pass takes both
+        # candidates of the first customer, as the pairwise comparison did.
+        {'mapped_customer': 'EE', 'original_customers': ['Greene King']},
+        {'mapped_customer': 'FUJITSU UK',
+         'original_customers': ['Fujitsu Retail', 'Fujitsu Services Limited - EE - ME']},
+        {'mapped_customer': 'Xerox', 'original_customers': ['Xerox (UK) Ltd']},
+    ]
+    assert model._group_similar([]) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_the_pairwise_comparison(model, seed):
+    rng = random.Random(seed)
+    parts = ['ee', 'bt', 'fuji', 'fujitsu', 'green', 'greene', 'star', 'trains', 'retail',
+             'group', 'ncr', 'boots', 'xe', 'xerox', 'ar', 'bel']
+    suffixes = ['', ' Limited', ' LTD', ' plc', ' UK', ' Services', ' - EE', ' - Site 2']
+    names = set()
+    while len(names) < 300:
+        words = [rng.choice(parts) for _ in range(rng.randint(0, 3))]
+        names.add((' '.join(words) if rng.random() < 0.7 else ''.join(words)).title()
+                  + rng.choice(suffixes))
+    customers = sorted(names)
+
+    assert model._group_similar(customers) == _pairwise_suggestions(model, customers)
+
+
+# ---------------------------------------------------------------------------
+# Canonical customer names
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def production_conn():
+    """In-memory DB with the importer-created layout (job_items.client)."""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE run_sheet_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, job_number TEXT, customer TEXT
+        );
+        CREATE TABLE job_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, payslip_id INTEGER, amount REAL, client TEXT
+        );
+        INSERT INTO run_sheet_jobs (date, customer) VALUES
+            ('01/07/2025', 'Fujitsu Services Limited'), ('01/07/2025', NULL);
+        INSERT INTO job_items (amount, client) VALUES (25.0, 'Fujitsu Services Limited');
+    """)
+    conn.executescript(MIGRATION.read_text())
+    conn.execute(
+        "INSERT INTO customer_mappings (original_customer, mapped_customer) "
+        "VALUES ('Fujitsu Services Limited', 'Fujitsu')"
+    )
+    yield conn
+    conn.close()
+
+
+def _canonical(conn, table):
+    return [row[0] for row in conn.execute(f'SELECT canonical_customer FROM {table} ORDER BY id')]
+
+
+def _prepare(conn):
+    sources = canonical_customers.source_columns(conn)
+    canonical_customers._prepare_columns(conn, sources)
+    canonical_customers.install_triggers(conn, sources)
+    canonical_customers.rebuild(conn, sources)
+    return sources
+
+
+def test_canonical_names_follow_jobs_and_mappings(production_conn):
+    conn = production_conn
+    assert _prepare(conn) == {'run_sheet_jobs': 'customer', 'job_items': 'client'}
+    assert _canonical(conn, 'run_sheet_jobs') == ['Fujitsu', None]
+    assert _canonical(conn, 'job_items') == ['Fujitsu']
+
+    conn.execute("INSERT INTO run_sheet_jobs (customer) VALUES ('FUJITSU UK'), ('Xerox')")
+    conn.execute("INSERT INTO job_items (client) VALUES ('FUJITSU UK')")
+    conn.execute("UPDATE run_sheet_jobs SET customer = 'Fujitsu Services Limited' WHERE id = 2")
+    assert _canonical(conn, 'run_sheet_jobs') == ['Fujitsu', 'Fujitsu', 'FUJITSU UK', 'Xerox']
+
+    conn.execute(
+        "INSERT INTO customer_mappings (original_customer, mapped_customer) "
+        "VALUES ('FUJITSU UK', 'Fujitsu')"
+    )
+    assert _canonical(conn, 'run_sheet_jobs') == ['Fujitsu', 'Fujitsu', 'Fujitsu', 'Xerox']
+    assert _canonical(conn, 'job_items') == ['Fujitsu', 'Fujitsu']
+
+    conn.execute(
+        "UPDATE customer_mappings SET original_customer = 'Xerox' "
+        "WHERE original_customer = 'FUJITSU UK'"
+    )
+    assert _canonical(conn, 'run_sheet_jobs') == ['Fujitsu', 'Fujitsu', 'FUJITSU UK', 'Fujitsu']
+
+    conn.execute("DELETE FROM customer_mappings WHERE original_customer = 'Fujitsu Services Limited'")
+    assert _canonical(conn, 'run_sheet_jobs') == [
+        'Fujitsu Services Limited', 'Fujitsu Services Limited', 'FUJITSU UK', 'Fujitsu']
+    assert _canonical(conn, 'job_items') == ['Fujitsu Services Limited', 'FUJITSU UK']
+
+    # Reinstalling is a no-op, and rebuild only touches stale rows.
+    sources = canonical_customers.source_columns(conn)
+    assert not canonical_customers.install_triggers(conn, sources)
+    assert canonical_customers.rebuild(conn, sources) == 0
+
+
+def _add_runsheet_job(customer, job_number):
+    with get_db_connection() as conn:
+        conn.execute(
+            'INSERT INTO run_sheet_jobs (date, job_number, customer, activity) '
+            "VALUES ('01/07/2025', ?, ?, 'Install')", (job_number, customer))
+        conn.commit()
+
+
+def test_mapping_cache_and_bulk_resolve(auth_client, app):
+    with app.app_context():
+        model = CustomerMappingModel()
+        assert model.get_mapping_table() == {}
+        assert model.add_mapping('Fujitsu Services Limited', 'Fujitsu')['success']
+        table = model.get_mapping_table()
+        assert table == {'Fujitsu Services Limited': 'Fujitsu'}
+        assert model.get_mapping_table() is table
+
+        # A write from another connection moves the version and the cache.
+        with get_db_connection() as conn:
+            conn.execute(
+                "INSERT INTO customer_mappings (original_customer, mapped_customer) "
+                "VALUES ('FUJITSU UK', 'Fujitsu')")
+            conn.commit()
+        assert model.get_mapped_customer('FUJITSU UK') == 'Fujitsu'
+
+    data = auth_client.post('/api/customer-mapping/resolve', json={
+        'customers': ['FUJITSU UK', 'Xerox', 'Fujitsu Services Limited', '']}).get_json()
+    assert data['success'] and data['mapped_count'] == 2
+    assert data['mappings'] == {'FUJITSU UK': 'Fujitsu', 'Xerox': 'Xerox',
+                                'Fujitsu Services Limited': 'Fujitsu', '': ''}
+
+    response = auth_client.post('/api/customer-mapping/resolve', json={'customers': 'Xerox'})
+    assert response.status_code == 400
+
+
+def test_reports_group_on_the_mapped_name(auth_client, app):
+    with app.app_context():
+        # Columns the run sheet importer adds to the migration-001 layout.
+        with get_db_connection() as conn:
+            conn.execute('ALTER TABLE run_sheet_jobs ADD COLUMN job_address TEXT')
+            conn.commit()
+        for number, customer in enumerate(['Fujitsu Services Limited', 'FUJITSU UK', 'Xerox']):
+            _add_runsheet_job(customer, str(number))
+        model = CustomerMappingModel()
+        model.add_mapping('Fujitsu Services Limited', 'Fujitsu')
+        model.add_mapping('FUJITSU UK', 'Fujitsu')
+
+    data = auth_client.get('/api/customers').get_json()
+    assert data['data'] == [{'name': 'Fujitsu', 'job_count': 2}, {'name': 'Xerox', 'job_count': 1}]
+
+    for name in ('Fujitsu', 'FUJITSU UK'):
+        data = auth_client.get('/api/customer_parsing', query_string={'customer': name}).get_json()
+        assert data['customer'] == 'Fujitsu'
+        assert sorted(job['job_number'] for job in data['jobs']) == ['0', '1']
@@ -0,0 +1,217 @@
+"""Tests for the file catalogue of the document folders."""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.services import file_catalogue
+from app.services.file_catalogue import CatalogueWatcher
+
+
+@pytest.fixture
+def archive(app, tmp_path, monkeypatch):
+    """A runsheet and a payslip folder registered as the catalogue roots."""
+    runsheets = tmp_path / 'runsheets'
+    payslips = tmp_path / 'payslips'
+    (runsheets / '2026' / '04-April').mkdir(parents=True)
+    payslips.mkdir()
+    monkeypatch.setattr(file_catalogue, 'default_roots', lambda: [
+        (str(runsheets), file_catalogue.RUNSHEET),
+        (str(payslips), file_catalogue.PAYSLIP),
+    ])
+    with app.app_context():
+        yield runsheets, payslips
+
+
+def _write(path, content=b'%PDF-1.4', mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def _rows(**filters):
+    return {Path(r['path']).name: r for r in file_catalogue.list_files(**filters)}
+
+
+def test_parse_file_date_and_detect_type():
+    assert file_catalogue.parse_file_date('DH_27-04-2026.pdf') == '2026-04-27'
+    assert file_catalogue.parse_file_date('DH_27-04-2026_20260427_120000.pdf') == '2026-04-27'
+    assert file_catalogue.parse_file_date('export 2026-04-27.csv') == '2026-04-27'
+    assert file_catalogue.parse_file_date('Week52 2021.pdf') is None
+    assert file_catalogue.detect_type('Week52 2021.pdf') == file_catalogue.PAYSLIP
+    assert file_catalogue.detect_type('DH_27-04-2026.pdf') == file_catalogue.RUNSHEET
+    assert file_catalogue.detect_type('scan.pdf') is None
+
+
+def test_refresh_only_lists_changed_directories(archive):
+    runsheets, _ = archive
+    month = runsheets / '2026' / '04-April'
+    _write(month / 'DH_27-04-2026.pdf')
+    _write(month / '._DH_27-04-2026.pdf')       # resource fork: ignored
+    _write(month / 'notes.docx')                 # not a catalogued type
+
+    stats = file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)
+    assert (stats['added'], stats['dirs_listed']) == (1, 3)
+    row = _rows()['DH_27-04-2026.pdf']
+    assert (row['file_type'], row['file_date'], row['import_status']) == ('runsheet', '2026-04-27', 'new')
+
+    # Nothing changed: every directory is stat'ed, none is listed.
+    stats = file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)
+    assert (stats['dirs_checked'], stats['dirs_listed'], stats['added']) == (3, 0, 0)
+
+    _write(month / 'DH_28-04-2026.pdf')
+    (month / 'DH_27-04-2026.pdf').unlink()
+    stats = file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)
+    assert (stats['dirs_listed'], stats['added'], stats['removed']) == (1, 1, 1)
+    assert list(_rows()) == ['DH_28-04-2026.pdf']
+
+
+def test_full_rescan_sees_files_rewritten_in_place(archive):
+    runsheets, _ = archive
+    month = runsheets / '2026' / '04-April'
+    pdf = _write(month / 'DH_27-04-2026.pdf', mtime=1_000_000)
+    file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)
+    file_catalogue.mark_status([pdf], file_catalogue.STATUS_IMPORTED)
+
+    dir_mtime = os.stat(month).st_mtime
+    _write(pdf, b'%PDF-1.4 corrected', mtime=2_000_000)
+    os.utime(month, (dir_mtime, dir_mtime))
+
+    assert file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)['updated'] == 0
+    assert file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET, full=True)['updated'] == 1
+    assert _rows()['DH_27-04-2026.pdf']['import_status'] == 'new'
+
+
+def test_missing_root_keeps_its_rows(archive, tmp_path):
+    runsheets, _ = archive
+    _write(runsheets / 'DH_27-04-2026.pdf')
+    file_catalogue.refresh(runsheets)
+    (runsheets / 'DH_27-04-2026.pdf').unlink()
+    runsheets.rename(tmp_path / 'unmounted')
+
+    assert file_catalogue.refresh(runsheets)['missing'] is True
+    assert list(_rows()) == ['DH_27-04-2026.pdf']
+
+
+def test_same_content_keeps_import_status(archive):
+    _, payslips = archive
+    pdf = _write(payslips / 'Week12 2026.pdf', mtime=1_000_000)
+    file_catalogue.record_file(pdf, content_hash='abc')
+    file_catalogue.mark_status([pdf], file_catalogue.STATUS_IMPORTED)
+
+    # Copied again with a new mtime but identical content.
+    os.utime(pdf, (2_000_000, 2_000_000))
+    file_catalogue.record_file(pdf, content_hash='abc')
+    assert _rows()['Week12 2026.pdf']['import_status'] == 'imported'
+
+    file_catalogue.record_file(pdf, content_hash='def')
+    row = _rows()['Week12 2026.pdf']
+    assert (row['import_status'], row['file_type']) == ('new', 'payslip')
+    assert [r['name'] for r in file_catalogue.find_by_hash('def')] == ['Week12 2026.pdf']
+
+
+def test_list_files_filters(archive):
+    runsheets, payslips = archive
+    _write(runsheets / '2026' / '04-April' / 'DH_27-04-2026.pdf', mtime=1_000_000)
+    _write(runsheets / '2026' / '04-April' / 'DH_28-04-2026.pdf', mtime=2_000_000)
+    _write(runsheets / '2026' / '05-May' / 'DH_01-05-2026.csv', mtime=3_000_000)
+    _write(payslips / 'Week12 2026.pdf', mtime=3_000_000)
+    file_catalogue.refresh_all()
+
+    assert list(_rows(root=runsheets / '2026' / '04-April')) == [
+        'DH_27-04-2026.pdf', 'DH_28-04-2026.pdf']
+    assert list(_rows(file_type='runsheet', modified_since=datetime.fromtimestamp(1_500_000))) == [
+        'DH_28-04-2026.pdf', 'DH_01-05-2026.csv']
+    assert list(_rows(date_from='2026-04-28', date_to='2026-05-01')) == [
+        'DH_28-04-2026.pdf', 'DH_01-05-2026.csv']
+    assert list(_rows(root=runsheets, extensions=['.csv'])) == ['DH_01-05-2026.csv']
+
+    file_catalogue.mark_status([payslips / 'Week12 2026.pdf'], file_catalogue.STATUS_FAILED, 'bad pdf')
+    failed = _rows(statuses=['failed'])
+    assert failed['Week12 2026.pdf']['import_error'] == 'bad pdf'
+
+
+def test_watcher_applies_collected_events(archive):
+    runsheets, _ = archive
+    watcher = CatalogueWatcher()
+    old = _write(runsheets / 'DH_27-04-2026.pdf')
+    file_catalogue.refresh(runsheets, file_catalogue.RUNSHEET)
+
+    new = _write(runsheets / 'DH_28-04-2026.pdf')
+    watcher.changed(str(new))
+    watcher.changed(str(new))
+    watcher.changed(str(runsheets / 'notes.docx'))
+    old.unlink()
+    watcher.deleted(str(old))
+
+    assert watcher.flush() == 2
+    assert list(_rows()) == ['DH_28-04-2026.pdf']
+    assert watcher.flush() == 0
+
+
+def test_scan_directories_reads_the_catalogue(auth_client, archive):
+    runsheets, payslips = archive
+    _write(runsheets / '2026' / '04-April' / 'DH_27-04-2026.pdf')
+    _write(payslips / 'Week12 2026.pdf')
+
+    data = auth_client.get('/api/upload/scan-directories').get_json()
+    assert data['total_files'] == 2
+    entry = data['directories'][str(runsheets)][0]
+    assert entry['relative_path'] == os.path.join('2026', '04-April', 'DH_27-04-2026.pdf')
+    assert (entry['date'], entry['import_status']) == ('2026-04-27', 'new')
+
+
+def test_processor_skips_content_imported_before_a_restart(archive):
+    from app.services.file_processor import RealTimeFileProcessor
+
+    _, payslips = archive
+    first = _write(payslips / 'Week12 2026.pdf', b'%PDF-1.4 week 12')
+    copy = _write(payslips / 'Week12 2026 (1).pdf', b'%PDF-1.4 week 12')
+    digest = RealTimeFileProcessor._file_hash(first)
+    file_catalogue.record_file(first, content_hash=digest)
+    file_catalogue.mark_status([first], file_catalogue.STATUS_IMPORTED)
+
+    processor = RealTimeFileProcessor(workers=1, settle_seconds=0)
+    processor.enqueue(copy)
+    processor.check_pending(now=0)
+    assert processor.check_pending(now=1) == 0
+    assert processor.get_status()['duplicates_skipped'] == 1
+
+
+# ---------------------------------------------------------------------------
+# Importer scripts
+# ---------------------------------------------------------------------------
+
+def test_runsheet_importer_finds_files_through_the_catalogue(tmp_path):
+    from tests.test_upload_batch import _load_runsheet_module
+
+    module = _load_runsheet_module()
+    runsheets = tmp_path / 'runsheets'
+    _write(runsheets / '2026' / '04-April' / 'DH_27-04-2026.pdf')
+    _write(runsheets / '2026' / '04-April' / 'DH_28-04-2026.pdf')
+    _write(runsheets / 'DH_01-05-2026.csv')
+
+    db_path = tmp_path / 'jobs.db'
+    importer = module.RunSheetImporter(db_path=str(db_path))
+    try:
+        # Without the catalogue table the importer walks the directory.
+        walked = importer.find_run_sheet_files(runsheets, date_from='2026-04-28')
+        assert sorted(p.name for p in walked) == ['DH_01-05-2026.csv', 'DH_28-04-2026.pdf']
+
+        migration = Path(__file__).resolve().parent.parent / 'migrations' / '016_file_catalogue.sql'
+        importer.conn.executescript(migration.read_text())
+        found = importer.find_run_sheet_files(runsheets, date_from='2026-04-28')
+        assert sorted(p.name for p in found) == ['DH_01-05-2026.csv', 'DH_28-04-2026.pdf']
+        assert all(p.relative_to(runsheets) for p in found)
+
+        importer._mark_catalogue(found[0], 'failed', 'no table')
+        status = importer.conn.execute(
+            'SELECT import_status FROM file_catalogue WHERE name = ?', (found[0].name,)
+        ).fetchone()[0]
+        assert status == 'failed'
+    finally:
+        importer.close()
@@ -0,0 +1,174 @@
+"""Tests for the debounced, batched file processing queue."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.services.file_processor import RealTimeFileProcessor
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    proc = RealTimeFileProcessor(workers=1, queue_size=3, batch_size=10,
+                                 settle_seconds=2.0, batch_wait_seconds=0)
+    calls = []
+
+    def fake_import(script, file_paths, timeout):
+        calls.append((Path(script).name, sorted(p.name for p in file_paths)))
+        return {str(p): {'file': str(p), 'status': 'error' if 'bad' in p.name else 'imported'}
+                for p in file_paths}
+
+    monkeypatch.setattr(proc, '_run_import', fake_import)
+    monkeypatch.setattr(proc, '_notify_sync', lambda: None)
+    monkeypatch.setattr(proc, '_catalogue_record', lambda path, digest: None)
+    monkeypatch.setattr(proc, '_catalogue_mark', lambda results: None)
+    proc.import_calls = calls
+    return proc
+
+
+def _pdf(directory, name, content):
+    path = directory / name
+    path.write_bytes(b'%PDF-' + content)
+    return path
+
+
+def test_file_is_queued_only_after_it_stops_changing(processor, tmp_path):
+    path = _pdf(tmp_path, 'runsheet_01.pdf', b'part')
+    assert processor.enqueue(path)
+    assert processor.enqueue(path)  # repeated events collapse into one entry
+
+    assert processor.check_pending(now=0) == 0      # first sighting
+    with open(path, 'ab') as f:
+        f.write(b' more')                           # still being written
+    os.utime(path, (1, 1))
+    assert processor.check_pending(now=1.5) == 0    # changed: timer restarts
+    assert processor.check_pending(now=3.0) == 0    # only 1.5s stable
+    assert processor.check_pending(now=3.6) == 1
+
+    status = processor.get_status()
+    assert (status['pending'], status['queue_depth']) == (0, 1)
+
+
+def test_duplicate_content_is_skipped(processor, tmp_path):
+    first = _pdf(tmp_path, 'payslip_a.pdf', b'same')
+    second = _pdf(tmp_path, 'payslip_b.pdf', b'same')
+    processor.enqueue(first)
+    processor.enqueue(second)
+    processor.check_pending(now=0)
+
+    assert processor.check_pending(now=5) == 1
+    assert processor.get_status()['duplicates_skipped'] == 1
+
+
+def test_full_queue_leaves_files_pending(processor, tmp_path):
+    for n in range(5):
+        processor.enqueue(_pdf(tmp_path, f'runsheet_{n}.pdf', str(n).encode()))
+    processor.check_pending(now=0)
+
+    assert processor.check_pending(now=5) == 3
+    status = processor.get_status()
+    assert (status['queue_depth'], status['pending']) == (3, 2)
+
+    processor.process_batch(processor._next_batch(timeout=0.1))
+    assert processor.check_pending(now=6) == 2
+
+
+def test_burst_is_imported_in_one_run_per_type(processor, tmp_path):
+    names = ['runsheet_1.pdf', 'runsheet_2.pdf', 'payslip_1.pdf']
+    for n, name in enumerate(names):
+        processor.enqueue(_pdf(tmp_path, name, str(n).encode()))
+    processor.check_pending(now=0)
+    processor.check_pending(now=5)
+
+    batch = processor._next_batch(timeout=0.1)
+    assert processor.process_batch(batch) == 3
+    assert sorted(processor.import_calls) == [
+        ('extract_payslips.py', ['payslip_1.pdf']),
+        ('import_run_sheets.py', ['runsheet_1.pdf', 'runsheet_2.pdf']),
+    ]
+
+    status = processor.get_status()
+    assert status['processed'] == 3
+    assert status['batches'] == 1
+    assert status['files_per_minute'] > 0
+    assert processor.wait_idle(timeout=1)
+
+
+def test_failed_file_can_be_retried(processor, tmp_path, monkeypatch):
+    monkeypatch.setattr(processor, '_process_runsheets', lambda paths: {str(p): False for p in paths})
+    path = _pdf(tmp_path, 'runsheet_x.pdf', b'x')
+    processor.enqueue(path)
+    processor.check_pending(now=0)
+    processor.check_pending(now=5)
+    assert processor.process_batch(processor._next_batch(timeout=0.1)) == 0
+
+    # The same content is accepted again once the failure is fixed.
+    processor.enqueue(path)
+    processor.check_pending(now=10)
+    assert processor.check_pending(now=15) == 1
+    assert processor.get_status()['failed'] == 1
+
+
+def test_one_bad_file_fails_only_itself(processor, tmp_path, monkeypatch):
+    marked = {}
+    monkeypatch.setattr(processor, '_catalogue_mark', marked.update)
+    good = _pdf(tmp_path, 'payslip_good.pdf', b'good')
+    bad = _pdf(tmp_path, 'payslip_bad.pdf', b'bad')
+    for path in (good, bad):
+        processor.enqueue(path)
+    processor.check_pending(now=0)
+    processor.check_pending(now=5)
+
+    assert processor.process_batch(processor._next_batch(timeout=0.1)) == 1
+    assert processor.import_calls == [('extract_payslips.py', ['payslip_bad.pdf', 'payslip_good.pdf'])]
+    assert marked == {str(good): True, str(bad): False}
+    status = processor.get_status()
+    assert (status['processed'], status['failed']) == (1, 1)
+
+    # Only the failed file's content may be imported again.
+    processor.enqueue(_pdf(tmp_path, 'payslip_good_copy.pdf', b'good'))
+    processor.enqueue(_pdf(tmp_path, 'payslip_bad_copy.pdf', b'bad'))
+    processor.check_pending(now=10)
+    assert processor.check_pending(now=15) == 1
+
+
+def test_importer_results_are_read_per_file(tmp_path, monkeypatch):
+    processor = RealTimeFileProcessor(workers=1)
+    files = [_pdf(tmp_path, 'runsheet_a.pdf', b'a'), _pdf(tmp_path, 'runsheet_b.pdf', b'b')]
+
+    def fake_run(args, **kwargs):
+        # The importer writes per-file results and exits non-zero for the batch.
+        results_path = args[args.index('--results') + 1]
+        with open(results_path, 'w') as f:
+            json.dump([{'file': str(files[0]), 'status': 'already_imported'}], f)
+
+        class Result:
+            returncode = 1
+            stdout = ''
+            stderr = 'Traceback: boom'
+        return Result()
+
+    monkeypatch.setattr('subprocess.run', fake_run)
+    assert processor._process_runsheets(files) == {str(files[0]): True, str(files[1]): False}
+
+
+def test_payslip_importer_writes_results_for_files_run(tmp_path):
+    # The command line the watcher runs, against the real extractor.
+    (tmp_path / 'data' / 'database').mkdir(parents=True)
+    results_path = tmp_path / 'results.json'
+    missing = str(tmp_path / 'missing.pdf')
+    process = subprocess.run(
+        [sys.executable, str(_ROOT / 'scripts' / 'production' / 'extract_payslips.py'),
+         '--files', missing, '--results', str(results_path)],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+
+    assert process.returncode == 1, process.stderr
+    [result] = json.loads(results_path.read_text())
+    assert (result['file'], result['status']) == (missing, 'not_found')
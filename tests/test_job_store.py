@@ -0,0 +1,31 @@
+"""Tests for the shared background job store."""
+
+from app.services import job_store
+
+
+def test_jobs_are_updated_and_trimmed(app):
+    with app.app_context():
+        for n in range(3):
+            job_store.create('test', f'job{n}', {'status': 'queued', 'n': n}, keep=2)
+
+        assert job_store.get('test', 'job0') is None
+        job_store.update('test', 'job1', status='running', done=1)
+        assert job_store.get('test', 'job1') == {'status': 'running', 'n': 1, 'done': 1}
+        # Other kinds are trimmed separately
+        job_store.create('other', 'job0', {'status': 'queued'}, keep=1)
+        assert job_store.get('test', 'job2') == {'status': 'queued', 'n': 2}
+
+        job_store.update('test', 'unknown', status='running')
+        job_store.update('test', None, status='running')
+        assert job_store.get('test', 'unknown') is None
+
+
+def test_a_completed_job_is_claimed_once(app):
+    with app.app_context():
+        job_store.create('test', 'job', {'status': 'running'})
+        assert job_store.claim('test', 'job') == ({'status': 'running'}, None)
+
+        job_store.update('test', 'job', payload=[['a.pdf', [{'job_number': '1'}]]], status='completed')
+        assert job_store.get('test', 'job') == {'status': 'completed'}
+        assert job_store.claim('test', 'job') == ({'status': 'completed'}, [['a.pdf', [{'job_number': '1'}]]])
+        assert job_store.claim('test', 'job') == (None, None)
@@ -0,0 +1,204 @@
+"""Tests for app.utils.log_reader and the sync log endpoint."""
+
+import logging
+import os
+
+import pytest
+
+from app.utils import log_reader
+from app.utils.log_reader import RunTagFilter, read_since, tail
+
+
+def _write(path, lines):
+    with open(path, 'a', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + '\n')
+
+
+def _entry(n, level='INFO', msg=None):
+    return f'2026-01-01 10:00:{n % 60:02d},000 - {level} - {msg or f"line {n}"}'
+
+
+# ---------------------------------------------------------------------------
+# tail
+# ---------------------------------------------------------------------------
+
+def test_tail_matches_readlines_across_block_boundaries(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(path, [_entry(i, msg='x' * (i % 37) + f' {i} 📥') for i in range(500)])
+    expected = path.read_text(encoding='utf-8').splitlines()
+
+    for chunk_size in (7, 64, 4096):
+        assert tail(path, 100, chunk_size=chunk_size) == expected[-100:]
+    assert tail(path, 10_000) == expected
+
+
+def test_tail_follows_rotated_files(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(tmp_path / 'sync.log.2', [_entry(i) for i in range(0, 3)])
+    _write(tmp_path / 'sync.log.1', [_entry(i) for i in range(3, 6)])
+    _write(path, [_entry(i) for i in range(6, 8)])
+
+    assert tail(path, 5) == [_entry(i) for i in range(3, 8)]
+    assert tail(path, 5, follow_rotated=False) == [_entry(6), _entry(7)]
+
+
+def test_tail_level_filter_keeps_continuation_lines(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(path, [
+        _entry(1),
+        _entry(2, 'ERROR', 'boom'),
+        'Traceback (most recent call last):',
+        '  ValueError: bad',
+        _entry(3, 'WARNING', 'careful'),
+        _entry(4),
+    ])
+
+    assert tail(path, 10, level='warning') == [
+        _entry(2, 'ERROR', 'boom'),
+        'Traceback (most recent call last):',
+        '  ValueError: bad',
+        _entry(3, 'WARNING', 'careful'),
+    ]
+    with pytest.raises(ValueError):
+        tail(path, 10, level='LOUD')
+
+
+def test_run_tag_filter_and_run_id_filter(tmp_path):
+    path = tmp_path / 'sync.log'
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger = logging.getLogger('tests.log_reader.runs')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    tags = RunTagFilter()
+    logger.addFilter(tags)
+    try:
+        logger.info('before any run')
+        tags.start('run-a')
+        logger.info('first run working')
+        tags.stop()
+        tags.start('run-b')
+        logger.error('second run failed')
+        tags.stop()
+        logger.info('after runs')
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    run_a = tail(path, 50, run_id='run-a')
+    assert len(run_a) == 1 and run_a[0].endswith('[run run-a] first run working')
+    assert tail(path, 50, run_id='run-b', level='INFO')[0].endswith('[run run-b] second run failed')
+    assert tail(path, 50, run_id='run-c') == []
+
+
+# ---------------------------------------------------------------------------
+# read_since
+# ---------------------------------------------------------------------------
+
+def test_read_since_returns_only_new_complete_lines(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(path, [_entry(1)])
+    cursor = log_reader.current_cursor(path)
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(_entry(2) + '\n' + 'half a li')
+    result = read_since(path, cursor)
+    assert result['lines'] == [_entry(2)]
+    assert not result['rotated']
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('ne\n')
+    result = read_since(path, result['cursor'])
+    assert result['lines'] == ['half a line']
+
+    assert read_since(path, result['cursor'])['lines'] == []
+
+
+def test_read_since_finishes_old_file_after_rotation(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(path, [_entry(1)])
+    cursor = log_reader.current_cursor(path)
+    _write(path, [_entry(2)])
+
+    os.rename(path, tmp_path / 'sync.log.1')
+    _write(path, [_entry(3)])
+
+    result = read_since(path, cursor)
+    assert result['rotated'] is True
+    assert result['lines'] == [_entry(2), _entry(3)]
+    assert read_since(path, result['cursor'])['lines'] == []
+
+
+def test_read_since_respects_max_bytes(tmp_path):
+    path = tmp_path / 'sync.log'
+    _write(path, [_entry(i) for i in range(20)])
+
+    seen = []
+    cursor = None
+    for _ in range(50):
+        result = read_since(path, cursor, max_bytes=100)
+        seen.extend(result['lines'])
+        cursor = result['cursor']
+        if not result['more']:
+            break
+    assert seen == [_entry(i) for i in range(20)]
+
+
+# ---------------------------------------------------------------------------
+# endpoint
+# ---------------------------------------------------------------------------
+
+def test_sync_log_endpoint_tail_and_since(auth_client, tmp_path, monkeypatch):
+    from app.routes import api_data
+
+    path = tmp_path / 'sync.log'
+    _write(path, [_entry(i) for i in range(150)])
+    monkeypatch.setattr(api_data, 'SYNC_LOG_PATH', path)
+
+    data = auth_client.get('/api/data/sync-log').get_json()
+    assert data['success'] is True
+    assert data['lines'] == [_entry(i) for i in range(50, 150)]
+    assert data['log'].splitlines() == data['lines']
+
+    _write(path, [_entry(150, 'ERROR', 'failed'), _entry(151)])
+    data = auth_client.get(
+        '/api/data/sync-log', query_string={'since': data['cursor'], 'level': 'ERROR'}
+    ).get_json()
+    assert data['lines'] == [_entry(150, 'ERROR', 'failed')]
+
+    response = auth_client.get('/api/data/sync-log?level=nope')
+    assert response.status_code == 400
+
+
+def test_sync_log_endpoint_filters_a_periodic_sync_run(auth_client, tmp_path, monkeypatch):
+    from app.routes import api_data
+    from app.services.periodic_sync import periodic_sync_service
+
+    assert api_data.SYNC_LOG_PATH.name == 'periodic_sync.log'
+    path = tmp_path / 'periodic_sync.log'
+    monkeypatch.setattr(api_data, 'SYNC_LOG_PATH', path)
+
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    sync_logger = periodic_sync_service.logger
+    sync_logger.addHandler(handler)
+    monkeypatch.setattr(sync_logger, 'level', logging.INFO)
+    try:
+        run_id = periodic_sync_service.run_tags.start('20260101-100000')
+        sync_logger.info('Starting intelligent sync')
+        sync_logger.info('Sync complete')
+        periodic_sync_service.run_tags.stop()
+        sync_logger.info('Between runs')
+    finally:
+        sync_logger.removeHandler(handler)
+        handler.close()
+    # The run began before the last rotation
+    os.rename(path, tmp_path / 'periodic_sync.log.1')
+    _write(path, [_entry(0, msg='[run 20260102-100000] Starting intelligent sync')])
+
+    lines = auth_client.get('/api/data/sync-log', query_string={'run_id': run_id}).get_json()['lines']
+    assert len(lines) == 2
+    assert all(f'[run {run_id}]' in line for line in lines)
+    assert lines[1].endswith('Sync complete')
@@ -0,0 +1,124 @@
+"""Tests for parallel payslip extraction with a single writer."""
+
+import importlib.util
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parent.parent
+_SCRIPTS = _ROOT / 'scripts' / 'production'
+_TEXT = _ROOT / 'tests' / 'fixtures' / 'payslip_text'
+if str(_SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS))
+
+
+def _load_payslip_module():
+    # Registered in sys.modules so the process pool can pickle its worker.
+    if 'extract_payslips' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('extract_payslips', _SCRIPTS / 'extract_payslips.py')
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['extract_payslips'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['extract_payslips']
+
+
+@pytest.fixture
+def module(monkeypatch):
+    module = _load_payslip_module()
+
+    def fake_extract(self, pdf_path):
+        # The "PDFs" hold payslip text; the pool's forked workers see this patch.
+        text = Path(pdf_path).read_text()
+        if 'BROKEN' in text:
+            raise ValueError('No /Root object! - Is this really a PDF?')
+        return text
+
+    monkeypatch.setattr(module.PayslipExtractor, 'extract_text_from_pdf', fake_extract)
+    return module
+
+
+@pytest.fixture
+def payslips(tmp_path):
+    weeks = {year: (_TEXT / f'payslips_{year}.txt').read_text().split('\f') for year in (2024, 2025)}
+    folder = tmp_path / 'payslips'
+    folder.mkdir()
+    files = []
+    for name, text in [
+        ('Week10 2024.pdf', weeks[2024][0]),
+        ('Week11 2024.pdf', weeks[2024][1]),
+        ('Week12 2024.pdf', 'BROKEN'),
+        ('Week10 2024 (1).pdf', weeks[2025][0]),   # same week again: replaces the first
+        ('Week13 2024.pdf', weeks[2024][2]),
+        ('Week14 2024.pdf', weeks[2025][1]),
+    ]:
+        path = folder / name
+        path.write_text(text)
+        files.append(path)
+    return files
+
+
+def _extract(module, db_path, files, **kwargs):
+    extractor = module.PayslipExtractor(db_path=str(db_path))
+    try:
+        outcomes = extractor.process_payslips(files, **kwargs)
+    finally:
+        extractor.close()
+    with sqlite3.connect(db_path) as conn:
+        columns = ', '.join(('id',) + module.PAYSLIP_COLUMNS)
+        payslips = conn.execute(f'SELECT {columns} FROM payslips ORDER BY id').fetchall()
+        items = conn.execute('SELECT * FROM job_items ORDER BY id').fetchall()
+    return outcomes, payslips, items
+
+
+def test_workers_write_the_same_rows_as_the_serial_path(module, payslips, tmp_path):
+    serial = _extract(module, tmp_path / 'serial.db', payslips)
+    parallel = _extract(module, tmp_path / 'parallel.db', payslips, workers=3, batch_size=2)
+
+    assert parallel == serial
+    outcomes, rows, items = parallel
+    assert outcomes[2] == (None, 'No /Root object! - Is this really a PDF?')
+    assert [row[-1] for row in rows] == ['Week11 2024.pdf', 'Week10 2024 (1).pdf',
+                                         'Week13 2024.pdf', 'Week14 2024.pdf']
+    assert len(items) > 50
+
+
+def test_failed_write_only_loses_that_payslip(module, payslips, tmp_path, monkeypatch):
+    store = module.PayslipExtractor.store_payslip
+
+    def flaky_store(self, payslip_data, job_items):
+        payslip_id = store(self, payslip_data, job_items)
+        if payslip_data['pdf_filename'] == 'Week11 2024.pdf':
+            raise sqlite3.IntegrityError('disk full')
+        return payslip_id
+
+    monkeypatch.setattr(module.PayslipExtractor, 'store_payslip', flaky_store)
+    outcomes, rows, items = _extract(module, tmp_path / 'jobs.db', payslips, workers=2, batch_size=10)
+
+    assert [payslip_id is None for payslip_id, _ in outcomes] == [False, True, True, False, False, False]
+    assert outcomes[1][1] == 'disk full'
+    assert 'Week11 2024.pdf' not in [row[-1] for row in rows]
+    assert {item[1] for item in items} == {row[0] for row in rows}
+
+
+def test_files_run_reports_each_files_error(module, payslips, tmp_path, monkeypatch):
+    # The command line the watcher and batch uploads use.
+    (tmp_path / 'data' / 'database').mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(module.PayslipExtractor, '_sync_to_runsheets', lambda self: None)
+    results_path = tmp_path / 'results.json'
+    files = [str(payslips[1]), str(payslips[2]), str(tmp_path / 'missing.pdf')]
+    monkeypatch.setattr(sys, 'argv', ['extract_payslips.py', '--files', *files, '--results', str(results_path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        module.main()
+
+    assert exit_info.value.code == 1
+    results = json.loads(results_path.read_text())
+    assert [r['file'] for r in results] == files
+    assert [r['status'] for r in results] == ['imported', 'error', 'not_found']
+    assert results[0]['payslip_id'] is not None
+    assert results[1]['error'] == 'No /Root object! - Is this really a PDF?'
+    assert results[2]['error'] == f'File not found: {files[2]}'
@@ -0,0 +1,70 @@
+"""Golden-output tests for the payslip text parser.
+
+``tests/fixtures/payslip_text/payslips_<year>.txt`` hold pdfplumber-style
+text for three weeks of each year from 2021 to 2025 (separated by form
+feeds), covering the 2021 layout without job numbers, the 2022-2023 Rico
+layout and the 2024+ layout. ``golden.json`` was produced by the parser
+before it was precompiled. Only update it for an intended parser change.
+"""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parent.parent
+_FIXTURES = _ROOT / 'tests' / 'fixtures' / 'payslip_text'
+_SCRIPTS = _ROOT / 'scripts' / 'production'
+if str(_SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS))
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    spec = importlib.util.spec_from_file_location('payslip_extractor', _SCRIPTS / 'extract_payslips.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return object.__new__(module.PayslipExtractor)
+
+
+GOLDEN = json.loads((_FIXTURES / 'golden.json').read_text())
+
+
+@pytest.mark.parametrize('name', sorted(GOLDEN))
+def test_payslips_parse_to_the_golden_output(extractor, name):
+    weeks = (_FIXTURES / name).read_text().split('\f')
+    assert len(weeks) == len(GOLDEN[name])
+    for text, expected in zip(weeks, GOLDEN[name]):
+        assert extractor.parse_payslip(text) == {
+            'header': expected['header'],
+            'financial': expected['financial'],
+            'job_items': expected['job_items'],
+        }
+        assert extractor.parse_job_items(text) == expected['job_items']
+
+
+def test_financial_labels_are_matched_once_each(extractor):
+    text = ('Gross Subcontractor Payment YTD £ 9,000.00\n'
+            'Gross Subcontractor Payment £ 500.00\n'
+            'Net Payment\n£ 450.00\n'
+            'Net Payment £ 1.00\n')
+    assert extractor.parse_financial_summary(text) == {
+        'gross_subcontractor_payment': 500.0,
+        'gross_subcontractor_payment_ytd': 9000.0,
+        'net_payment': 450.0,
+    }
+
+
+def test_tokenise_classifies_each_line_once(extractor):
+    lines, items, rates = extractor.tokenise_lines(
+        'Daniel Hanson: 2609338 | Paypoint | Co-op | INSTALL\n'
+        ' 1.00 £22.50 Warrington \n'
+        '1.00 £(4.00) Daniel Hanson: Deduction 18/10/2025\n'
+        'Company Margin £ (11.00)\n'
+    )
+    assert lines[1] == '1.00 £22.50 Warrington'
+    assert {i: kind for i, (kind, _) in items.items()} == {0: 'job', 2: 'deduction', 3: 'margin'}
+    assert sorted(rates) == [1, 2]
+    assert rates[1][0] and rates[1][1].group(2) == '22.50'
@@ -0,0 +1,52 @@
+"""Tests for the shared PDF engine: cached styles, chunked tables, streamed output."""
+
+from app.config import Config
+from app.database import get_db_connection
+from app.services import pdf_engine
+from app.services.pdf_report_service import MileagePDFReportService
+from app.services.weekly_summary_pdf_service import WeeklySummaryPDFService
+
+
+def test_styles_are_built_once_per_process():
+    first, second = WeeklySummaryPDFService(), WeeklySummaryPDFService()
+    assert first.styles is second.styles is pdf_engine.sample_styles()
+    assert first.title_style is second.title_style
+    assert first.title_style.fontSize == 28
+    # Same name, different attributes: a separate style.
+    assert MileagePDFReportService().title_style.fontSize == 24
+    assert pdf_engine.table_style(pdf_engine.HEADER_COMMANDS) is pdf_engine.table_style(pdf_engine.HEADER_COMMANDS)
+
+
+def test_long_tables_are_chunked_with_a_header_each():
+    rows = [[str(i), 'x'] for i in range(450)]
+    tables = pdf_engine.data_tables(['No', 'Value'], rows, [50, 50], (('GRID', (0, 0), (-1, -1), 0.5, '#808080'),),
+                                    chunk_rows=200)
+
+    assert [len(table._cellvalues) for table in tables] == [201, 201, 51]
+    assert all(table._cellvalues[0] == ['No', 'Value'] for table in tables)
+    assert tables[-1]._cellvalues[-1] == ['449', 'x']
+    assert pdf_engine.data_tables(['No'], [], [50], ()) == []
+
+
+def test_custom_report_pdf_is_streamed(auth_client, app, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'REPORT_CACHE_DIR', str(tmp_path))
+    with app.app_context():
+        with get_db_connection() as conn:
+            # Importer (production) layout column used by the DNCO report
+            conn.execute('ALTER TABLE run_sheet_jobs ADD COLUMN job_address TEXT')
+            conn.executemany(
+                "INSERT INTO run_sheet_jobs (date, job_number, customer, job_address, status, pay_amount) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(f'{day:02d}/03/2024', f'J{day}', 'Acme', '1 High St', 'DNCO', None) for day in range(1, 29)]
+                + [('01/02/2024', 'P1', 'Acme', '1 High St', 'completed', 20.0)],
+            )
+            conn.commit()
+
+    response = auth_client.post('/api/data/reports/custom/pdf', json={'report_type': 'dnco', 'year': '2024'})
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/pdf'
+    assert 'dnco_report_2024.pdf' in response.headers['Content-Disposition']
+    assert response.get_data().startswith(b'%PDF-')
+    response.close()
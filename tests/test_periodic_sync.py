@@ -100,29 +100,12 @@ def mock_latest_payslip_week(monkeypatch):
 
 @pytest.fixture
 def silent_schedule(monkeypatch):
-    """No-op out the ``schedule`` library so tests don't touch the scheduler."""
-    import app.services.periodic_sync as ps_mod
+    """No-op out the job scheduler so tests don't touch the job table."""
+    from app.services.sync_scheduler import Scheduler
 
-    class _Fake:
-        def clear(self, *a, **kw):
-            pass
-
-        def every(self, *a, **kw):
-            return self
-
-        def day(self, *a, **kw):
-            return self
-
-        def at(self, *a, **kw):
-            return self
-
-        def do(self, *a, **kw):
-            return self
-
-        def run_pending(self, *a, **kw):
-            pass
-
-    monkeypatch.setattr(ps_mod, 'schedule', _Fake())
+    monkeypatch.setattr(Scheduler, 'schedule_at', lambda self, *a, **kw: None)
+    monkeypatch.setattr(Scheduler, 'cancel', lambda self, *a, **kw: None)
+    monkeypatch.setattr(Scheduler, 'run_pending', lambda self, *a, **kw: [])
 
 
 # ---------------------------------------------------------------------------
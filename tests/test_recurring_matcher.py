@@ -0,0 +1,116 @@
+"""Tests for the indexed recurring template matcher."""
+
+import random
+from datetime import datetime, timedelta
+
+from app.models.expense import ExpenseModel
+from app.models.recurring_template import RecurringTemplateModel, TemplateMatcher
+
+
+def _reference_match(description, amount, date, templates):
+    """The per-template scoring loop the matcher replaced, kept as the spec."""
+    best_match = None
+    best_score = 0
+    for template in templates:
+        score = 0
+        pattern = template['merchant_pattern'].upper()
+        desc_upper = description.upper()
+        if pattern in desc_upper:
+            score += 50
+        elif any(word in desc_upper for word in pattern.split()):
+            score += 25
+        amount_diff = abs(amount - template['expected_amount'])
+        if amount_diff <= template['tolerance_amount']:
+            score += 30
+            if amount_diff == 0:
+                score += 10
+        if template['next_expected_date']:
+            try:
+                expected = datetime.strptime(template['next_expected_date'], '%Y-%m-%d')
+                actual = datetime.strptime(date, '%Y-%m-%d')
+                days_diff = abs((actual - expected).days)
+                if days_diff <= 3:
+                    score += 20
+                elif days_diff <= 7:
+                    score += 10
+            except Exception:
+                pass
+        if score > best_score:
+            best_score = score
+            best_match = template['id']
+    if best_score >= 60:
+        return best_match, best_score
+    return None, 0
+
+
+WORDS = ['EE', 'FREE', 'SANTANDER', 'VAN', 'VANGUARD', 'ADMIRAL', 'SKY', 'O2', 'BT', 'SHELL']
+
+
+def _random_templates(rng):
+    templates = []
+    for n in range(12):
+        pattern = ' '.join(rng.sample(WORDS, rng.randint(0, 3)))
+        if rng.random() < 0.2:
+            pattern = pattern.lower() + ' '
+        templates.append({
+            'id': n + 1, 'name': f'T{n}', 'merchant_pattern': pattern,
+            'expected_amount': rng.choice([9.99, 32.0, 74.12, 289.5, 0.1 + 0.2]),
+            'tolerance_amount': rng.choice([0, 0.3, 5.0]),
+            'next_expected_date': rng.choice([None, '', 'soon', '2025-04-10', '2025-04-30']),
+        })
+    return templates
+
+
+def test_matcher_scores_exactly_like_the_per_template_loop():
+    rng = random.Random(7)
+    for _ in range(20):
+        templates = _random_templates(rng)
+        matcher = TemplateMatcher(templates)
+        for _ in range(300):
+            description = ' '.join(rng.choice(WORDS + ['LTD', 'PAYMENT', 'x']) + rng.choice(['', '9', 'S'])
+                                   for _ in range(rng.randint(0, 4))).lower()
+            amount = rng.choice([9.99, 32.0, 74.12, 289.5, 0.3, 74.42, 289.2, 5.0, 12.34])
+            day = datetime(2025, 4, 1) + timedelta(days=rng.randint(0, 40))
+            date = rng.choice([day.strftime('%Y-%m-%d'), day.strftime('%d/%m/%Y')])
+
+            template, score = matcher.match(description, amount, date)
+            expected = _reference_match(description, amount, date, templates)
+            assert ((template['id'] if template else None), score) == expected
+
+
+def test_match_all_and_due_between():
+    templates = [
+        {'id': 1, 'name': 'Van', 'merchant_pattern': 'SANTANDER VAN', 'expected_amount': 289.5,
+         'tolerance_amount': 5.0, 'next_expected_date': '2025-04-07'},
+        {'id': 2, 'name': 'Phone', 'merchant_pattern': 'EE', 'expected_amount': 32.0,
+         'tolerance_amount': 1.0, 'next_expected_date': '2025-05-01'},
+        {'id': 3, 'name': 'Broken', 'merchant_pattern': 'X', 'expected_amount': 1.0,
+         'tolerance_amount': 0, 'next_expected_date': 'not a date'},
+    ]
+    matcher = TemplateMatcher(templates)
+    results = matcher.match_all([
+        ('Santander Van Finance', 289.5, '2025-04-06'),
+        ('FREE PARKING', 32.0, '2025-05-02'),   # substring, as before: 'EE' is in 'FREE'
+        ('Greggs', 3.15, '2025-04-06'),
+    ])
+    assert [(t and t['id'], score) for t, score in results] == [(1, 110), (2, 110), (None, 0)]
+
+    due = matcher.due_between(datetime(2025, 4, 6, 12), datetime(2025, 4, 13, 12))
+    assert [t['id'] for t in due] == [1]
+
+
+def test_routes_use_the_matcher(auth_client, app):
+    with app.app_context():
+        category_id = {c['name']: c['id'] for c in ExpenseModel.get_categories()}['Vehicle Costs']
+        template_id = RecurringTemplateModel.create_template(
+            'Van Finance', category_id, 289.5, 'monthly', 'SANTANDER VAN')
+        next_date = RecurringTemplateModel.get_template_by_id(template_id)['next_expected_date']
+
+    data = auth_client.post('/api/recurring/match-transaction', json={
+        'description': 'SANTANDER VAN FINANCE', 'amount': '289.50', 'date': next_date}).get_json()
+    assert data['matched'] and data['confidence'] == 110
+    assert data['template']['category_name'] == 'Vehicle Costs'
+
+    data = auth_client.post('/api/recurring/match-transaction', json={
+        'description': 'GREGGS', 'amount': 3, 'date': next_date}).get_json()
+    assert (data['matched'], data['confidence']) == (False, 0)
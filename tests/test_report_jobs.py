@@ -0,0 +1,159 @@
+"""Tests for background PDF report jobs and their data-versioned cache."""
+
+import io
+import os
+import time
+
+import pytest
+
+from app.config import Config
+from app.database import get_db_connection
+from app.services import data_versions, report_jobs
+
+
+@pytest.fixture
+def report(app, tmp_path, monkeypatch):
+    """A stub report over run_sheet_jobs that counts its renders."""
+    monkeypatch.setattr(Config, 'REPORT_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(report_jobs, '_jobs', report_jobs.OrderedDict())
+    renders = []
+
+    def render(params):
+        renders.append(params)
+        return io.BytesIO(b'%PDF-1.4 ' + repr(params).encode())
+
+    monkeypatch.setitem(report_jobs._reports, 'stub', report_jobs.ReportType(
+        ('run_sheet_jobs',), render, lambda params: f"stub_{params.get('year', 'all')}.pdf"))
+
+    with app.app_context():
+        data_versions.ensure_data_versions()
+        yield renders
+
+
+def _add_job(job_number):
+    with get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO run_sheet_jobs (date, job_number, customer, status) VALUES ('01/03/2024', ?, 'Acme', 'completed')",
+            (job_number,),
+        )
+        conn.commit()
+
+
+def _finish(report_type, params=None):
+    job = report_jobs.submit(report_type, params)
+    return report_jobs.wait(job['job_id'], timeout=30)
+
+
+def test_repeat_request_is_served_from_cache(report):
+    first = _finish('stub', {'year': '2024'})
+    second = _finish('stub', {'year': '2024'})
+
+    assert first['status'] == second['status'] == 'completed'
+    assert not first['cached'] and second['cached']
+    assert second['job_id'] == first['job_id']
+    assert len(report) == 1
+    assert report_jobs.result_path(first['job_id']).read_bytes().startswith(b'%PDF-')
+
+    # Other parameters are a different report.
+    assert _finish('stub', {'year': '2023'})['job_id'] != first['job_id']
+    assert len(report) == 2
+
+
+def test_data_change_invalidates_cached_report(report):
+    before = _finish('stub', {'year': '2024'})
+    _add_job('J1')
+    after = _finish('stub', {'year': '2024'})
+
+    assert after['job_id'] != before['job_id']
+    assert not after['cached']
+    assert len(report) == 2
+
+
+def test_failed_render_is_reported(report, monkeypatch):
+    def broken(params):
+        raise ValueError('no data')
+
+    monkeypatch.setitem(report_jobs._reports, 'broken', report_jobs.ReportType(('run_sheet_jobs',), broken, str))
+    job = _finish('broken')
+
+    assert job['status'] == 'failed'
+    assert job['error'] == 'no data'
+    assert report_jobs.result_path(job['job_id']) is None
+    with pytest.raises(ValueError):
+        report_jobs.submit('no-such-report')
+
+
+def test_evict_drops_old_then_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'REPORT_CACHE_DIR', str(tmp_path))
+    now = time.time()
+    for name, age in (('old', 30 * 86400), ('a', 300), ('b', 200), ('c', 100)):
+        path = tmp_path / f'{name}.pdf'
+        path.write_bytes(b'x' * 1000)
+        os.utime(path, (now - age, now - age))
+    (tmp_path / 'keep.txt').write_text('not a report')
+
+    assert report_jobs.evict(max_bytes=2000, max_age_seconds=86400) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['b.pdf', 'c.pdf', 'keep.txt']
+
+
+def test_job_endpoints(auth_client, report):
+    response = auth_client.post('/api/reports/jobs', json={'report_type': 'stub', 'params': {'year': '2024'}})
+    assert response.status_code in (200, 202)
+    job_id = response.get_json()['job_id']
+    report_jobs.wait(job_id, timeout=30)
+
+    status = auth_client.get(f'/api/reports/jobs/{job_id}')
+    assert status.status_code == 200
+    assert status.get_json()['status'] == 'completed'
+
+    download = auth_client.get(f'/api/reports/jobs/{job_id}/download')
+    assert download.status_code == 200
+    assert download.mimetype == 'application/pdf'
+    assert 'stub_2024.pdf' in download.headers['Content-Disposition']
+    assert download.get_data().startswith(b'%PDF-')
+    download.close()
+
+    assert auth_client.get('/api/reports/jobs/unknown').status_code == 404
+    assert auth_client.post('/api/reports/jobs', json={'report_type': 'nope'}).status_code == 400
+
+
+def test_jobs_are_answered_by_other_workers(auth_client, report, monkeypatch):
+    job = _finish('stub', {'year': '2024'})
+    job_id = job['job_id']
+    # Another worker: none of this process's jobs in memory
+    monkeypatch.setattr(report_jobs, '_jobs', report_jobs.OrderedDict())
+
+    status = auth_client.get(f'/api/reports/jobs/{job_id}').get_json()
+    assert status['status'] == 'completed' and status['filename'] == 'stub_2024.pdf'
+
+    download = auth_client.get(f'/api/reports/jobs/{job_id}/download')
+    assert download.status_code == 200
+    assert 'stub_2024.pdf' in download.headers['Content-Disposition']
+    download.close()
+
+    # A cached PDF without its state file still downloads
+    report_jobs._state_path(job_id).unlink()
+    download = auth_client.get(f'/api/reports/jobs/{job_id}/download')
+    assert download.status_code == 200
+    assert download.get_data().startswith(b'%PDF-')
+    download.close()
+
+
+def test_running_job_state_is_shared(report, monkeypatch):
+    started = report_jobs.threading.Event()
+    release = report_jobs.threading.Event()
+
+    def slow(params):
+        started.set()
+        release.wait(10)
+        return io.BytesIO(b'%PDF-1.4 slow')
+
+    monkeypatch.setitem(report_jobs._reports, 'slow', report_jobs.ReportType(('run_sheet_jobs',), slow, str))
+    job = report_jobs.submit('slow')
+    started.wait(10)
+    try:
+        assert report_jobs._load(job['job_id'])['status'] == 'running'
+    finally:
+        release.set()
+    report_jobs.wait(job['job_id'], timeout=30)
+    assert report_jobs._load(job['job_id'])['status'] == 'completed'
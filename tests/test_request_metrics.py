@@ -0,0 +1,177 @@
+"""Tests for queued logging and the in-memory request metrics."""
+
+import logging
+import os
+import threading
+
+import pytest
+
+from app.logging_config import flush_logs, queued_handler
+from app.services.request_metrics import RequestMetrics, request_metrics
+
+
+class _OtherWorker(RequestMetrics):
+    """A second worker, saved under a live pid other than ours."""
+
+    @staticmethod
+    def _pid():
+        return os.getppid()
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics(app):
+    # The shared aggregator stores its counters in the test database.
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+# ---------------------------------------------------------------------------
+# queued logging
+# ---------------------------------------------------------------------------
+
+class _SlowListHandler(logging.Handler):
+    def __init__(self, release):
+        super().__init__()
+        self.release = release
+        self.lines = []
+
+    def emit(self, record):
+        self.release.wait(5)
+        self.lines.append(self.format(record))
+
+
+def test_queued_handler_does_not_block_the_caller():
+    release = threading.Event()
+    target = _SlowListHandler(release)
+    target.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    logger = logging.getLogger('tests.queued')
+    logger.propagate = False
+    handler = queued_handler(target)
+    logger.addHandler(handler)
+    try:
+        # The target blocks until released, so this would hang if emitted inline.
+        logger.warning('hello %s', 'world')
+        assert target.lines == []
+        release.set()
+        assert flush_logs()
+        assert target.lines == ['WARNING hello world']
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_queued_handler_respects_target_level():
+    release = threading.Event()
+    release.set()
+    target = _SlowListHandler(release)
+    target.setLevel(logging.ERROR)
+    logger = logging.getLogger('tests.queued_level')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = queued_handler(target)
+    logger.addHandler(handler)
+    try:
+        logger.info('skipped')
+        logger.error('kept')
+        assert flush_logs()
+        assert target.lines == ['kept']
+    finally:
+        logger.removeHandler(handler)
+
+
+# ---------------------------------------------------------------------------
+# aggregator
+# ---------------------------------------------------------------------------
+
+def test_percentiles_and_status_counts():
+    metrics = RequestMetrics()
+    for ms in range(1, 101):
+        metrics.record('payslips.list', 'GET', 200 if ms <= 98 else 500, float(ms), db_ms=1.0)
+
+    (stats,) = metrics.snapshot()['endpoints']
+    assert stats['endpoint'] == 'GET payslips.list'
+    assert stats['count'] == 100
+    assert stats['status_counts'] == {'200': 98, '500': 2}
+    assert stats['errors'] == 2
+    assert stats['max_ms'] == 100.0
+    assert stats['db_total_ms'] == 100.0
+    # Histogram buckets are ~12% wide.
+    assert stats['p50_ms'] == pytest.approx(50, rel=0.12)
+    assert stats['p95_ms'] == pytest.approx(95, rel=0.12)
+    assert stats['p99_ms'] == pytest.approx(99, rel=0.12)
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+
+
+def test_snapshot_sorts_slowest_first_and_limits():
+    metrics = RequestMetrics()
+    metrics.record('fast', 'GET', 200, 2.0)
+    metrics.record('slow', 'GET', 200, 900.0)
+    metrics.record('medium', 'POST', 201, 40.0)
+
+    snapshot = metrics.snapshot(limit=2)
+    assert [e['endpoint'] for e in snapshot['endpoints']] == ['GET slow', 'POST medium']
+    assert snapshot['total_requests'] == 3
+
+
+# ---------------------------------------------------------------------------
+# middleware + endpoint
+# ---------------------------------------------------------------------------
+
+def test_requests_are_recorded_with_db_time(auth_client):
+    response = auth_client.get('/api/expenses/categories')
+    assert response.status_code == 200
+    assert 'db;dur=' in response.headers['Server-Timing']
+
+    response = auth_client.get('/api/admin/metrics?limit=50')
+    assert response.status_code == 200
+    endpoints = {e['endpoint']: e for e in response.get_json()['metrics']['endpoints']}
+
+    expenses = [e for key, e in endpoints.items() if key.startswith('GET ') and 'expenses' in key]
+    assert expenses
+    assert expenses[0]['count'] >= 1
+    assert expenses[0]['db_total_ms'] > 0
+
+
+def test_metrics_endpoint_requires_login(client):
+    response = client.get('/api/admin/metrics')
+    assert response.status_code in (302, 401)
+
+
+def test_metrics_reset(auth_client):
+    auth_client.get('/api/expenses/categories')
+    assert auth_client.post('/api/admin/metrics/reset').get_json()['success'] is True
+    snapshot = request_metrics.snapshot()
+    # Only the reset call itself (recorded after the reset) can remain.
+    assert all(e['endpoint'].endswith('api_reset_metrics') for e in snapshot['endpoints'])
+
+
+def test_snapshot_merges_running_workers(app):
+    other = _OtherWorker(shared=True)
+    other.record('payslips.list', 'GET', 200, 900.0)
+    other.record('payslips.list', 'GET', 500, 10.0)
+    assert other.save()
+    request_metrics.record('payslips.list', 'GET', 200, 20.0)
+
+    snapshot = request_metrics.snapshot()
+
+    assert snapshot['workers'] == sorted([os.getpid(), os.getppid()])
+    (stats,) = [e for e in snapshot['endpoints'] if e['endpoint'] == 'GET payslips.list']
+    assert stats['count'] == 3
+    assert stats['status_counts'] == {'200': 2, '500': 1}
+    assert stats['max_ms'] == 900.0
+
+
+def test_reset_clears_other_workers(auth_client):
+    other = _OtherWorker(shared=True)
+    other.record('payslips.list', 'GET', 200, 900.0)
+    assert other.save()
+
+    assert auth_client.post('/api/admin/metrics/reset').get_json()['success'] is True
+    # The other worker drops its counters on its next write, then carries on.
+    assert other.save()
+    other.record('payslips.list', 'GET', 200, 5.0)
+    assert other.save()
+
+    snapshot = request_metrics.snapshot()
+    (stats,) = [e for e in snapshot['endpoints'] if e['endpoint'] == 'GET payslips.list']
+    assert (stats['count'], stats['max_ms']) == (1, 5.0)
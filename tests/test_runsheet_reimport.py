@@ -0,0 +1,119 @@
+"""Tests for the two-phase runsheet reimport: background preview, then apply."""
+
+import time
+
+import pytest
+
+from app.database import get_db_connection
+from app.routes import api_runsheet_testing as rt
+
+PARSED = {
+    'DH_01-07-2025.pdf': [
+        {'date': '01/07/2025', 'job_number': '100', 'customer': 'Fujitsu', 'activity': 'Install',
+         'job_address': '1 High St', 'postcode': 'M1 1AA'},
+        {'date': '01/07/2025', 'job_number': '101', 'customer': 'Xerox', 'activity': 'DNCO',
+         'job_address': '', 'postcode': ''},
+        {'date': '01/07/2025', 'job_number': '102', 'customer': 'Xerox', 'activity': 'Repair',
+         'job_address': '2 Low St', 'postcode': 'M2 2BB'},
+    ],
+    'DH_02-07-2025.pdf': [
+        {'date': '02/07/2025', 'job_number': '200', 'customer': 'PP Audit', 'activity': 'Audit'},
+        {'date': '02/07/2025', 'job_number': '201', 'customer': 'NCR', 'activity': 'Swap',
+         'job_address': '3 Mid St', 'postcode': 'M3 3CC'},
+    ],
+    'DH_03-07-2025.pdf': [
+        {'date': '03/07/2025', 'job_number': '300', 'customer': 'NCR', 'activity': 'Swap'},
+    ],
+}
+
+
+@pytest.fixture
+def runsheets(app, tmp_path, monkeypatch):
+    """A month of fake runsheet files whose parse results are canned."""
+    for name in PARSED:
+        (tmp_path / name).write_bytes(b'%PDF')
+    parsed = []
+
+    def parse_pdf(self, pdf_path):
+        parsed.append(pdf_path)
+        return [dict(job) for job in PARSED[pdf_path.rsplit('/', 1)[-1]]]
+
+    monkeypatch.setattr(rt.camelot_parser_class(), 'parse_pdf', parse_pdf)
+    monkeypatch.setattr(rt, 'REIMPORT_DIR', tmp_path)
+    monkeypatch.setattr(rt, 'REIMPORT_WORKERS', 1)
+    rt._parsed_files.clear()
+
+    with app.app_context():
+        with get_db_connection() as conn:
+            # Columns the run sheet importer adds to the migration-001 layout.
+            for column in ('driver', 'job_address', 'source_file'):
+                conn.execute(f'ALTER TABLE run_sheet_jobs ADD COLUMN {column} TEXT')
+            conn.execute(
+                "INSERT INTO run_sheet_jobs (date, job_number, customer, activity, status) "
+                "VALUES ('01/07/2025', '100', 'Old name', 'Install', 'completed')")
+            conn.execute("INSERT INTO attendance (date, reason) VALUES ('03/07/2025', 'Holiday')")
+            conn.commit()
+    return tmp_path, parsed
+
+
+def _preview(client):
+    response = client.post('/api/runsheet-testing/reimport-preview', json={'year': '2025', 'month': '07'})
+    assert response.status_code == 202
+    token = response.get_json()['token']
+    for _ in range(100):
+        data = client.get(f'/api/runsheet-testing/reimport-preview/{token}').get_json()
+        if data['status'] not in ('queued', 'running'):
+            return data
+        time.sleep(0.05)
+    raise AssertionError('preview did not finish')
+
+
+def test_preview_then_apply_parses_each_runsheet_once(auth_client, app, runsheets):
+    tmp_path, parsed = runsheets
+
+    preview = _preview(auth_client)
+    assert preview['status'] == 'completed'
+    assert (preview['parsed_files'], preview['total_files']) == (2, 2)
+    assert [job['job_number'] for job in preview['new_jobs']] == ['102', '201']
+    assert preview['existing_jobs_count'] == 1
+    assert preview['skipped_dnco'] == 1
+    assert preview['skipped_days'] == [{'date': '03/07/2025', 'reason': 'Holiday'}]
+    assert '_parsed' not in preview
+
+    result = auth_client.post('/api/runsheet-testing/reimport', json={
+        'token': preview['token'], 'selected_jobs': ['201']}).get_json()
+    assert result['success']
+    assert (result['jobs_updated'], result['jobs_added'], result['jobs_skipped']) == (1, 1, 1)
+    assert result['files_processed'] == 2
+    assert len(parsed) == 2
+
+    with app.app_context():
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                'SELECT job_number, customer, status, source_file FROM run_sheet_jobs ORDER BY job_number'
+            ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ('100', 'Fujitsu', 'completed', 'DH_01-07-2025.pdf'),
+        ('201', 'NCR', 'pending', 'DH_02-07-2025.pdf'),
+    ]
+
+    # A preview is applied at most once.
+    again = auth_client.post('/api/runsheet-testing/reimport', json={'token': preview['token']})
+    assert again.status_code == 404
+
+    # Unchanged files are not parsed again, by the next preview or by /compare.
+    assert _preview(auth_client)['new_jobs'][0]['job_number'] == '102'
+    compare = auth_client.post('/api/runsheet-testing/compare', json={
+        'pdf_path': str(tmp_path / 'DH_02-07-2025.pdf')}).get_json()
+    assert compare['summary']['in_both'] == 1
+    assert len(parsed) == 2
+
+
+def test_reimport_requires_a_completed_preview(auth_client, runsheets):
+    response = auth_client.post('/api/runsheet-testing/reimport', json={'year': '2025', 'month': '07'})
+    assert response.status_code == 400
+
+    token = rt.create_reimport_preview('2025', '07', [])
+    response = auth_client.post('/api/runsheet-testing/reimport', json={'token': token})
+    assert response.status_code == 409
+    assert auth_client.get('/api/runsheet-testing/reimport-preview/nope').status_code == 404
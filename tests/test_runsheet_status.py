@@ -0,0 +1,188 @@
+"""Tests for the trigger-maintained ``runsheet_day_status`` table."""
+
+import pytest
+
+from app.database import get_db_connection
+from app.models.runsheet import RunsheetModel
+from app.services import runsheet_status_index
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _execute(sql, params=()):
+    with get_db_connection() as conn:
+        cur = conn.execute(sql, params)
+        conn.commit()
+        return cur.lastrowid
+
+
+def _add_job(date, job_number, status='pending', customer='Barclays'):
+    return _execute(
+        'INSERT INTO run_sheet_jobs (date, job_number, customer, activity, status) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (date, job_number, customer, 'Install', status),
+    )
+
+
+def _set_mileage(date, mileage):
+    RunsheetModel.update_job_statuses([], date=date, mileage=mileage)
+
+
+def _status(date):
+    return RunsheetModel.get_completion_status().get(date)
+
+
+def _legacy_completion_status():
+    """The per-request aggregation get_completion_status used to run."""
+    with get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT r.date, COUNT(*) AS total_jobs,
+                   COUNT(CASE WHEN r.status IS NOT NULL AND r.status != 'pending' THEN 1 END) AS jobs_with_actions,
+                   CASE WHEN d.mileage IS NOT NULL THEN 1 ELSE 0 END AS has_mileage
+            FROM run_sheet_jobs r
+            LEFT JOIN runsheet_daily_data d ON r.date = d.date
+            GROUP BY r.date, d.mileage
+        """).fetchall()
+    result = {}
+    for date, total, actioned, has_mileage in rows:
+        if actioned == total and has_mileage:
+            status = 'completed'
+        elif actioned > 0 or has_mileage:
+            status = 'in_progress'
+        else:
+            status = 'not_started'
+        result[date] = {
+            'status': status, 'total_jobs': total,
+            'jobs_with_actions': actioned, 'has_mileage': has_mileage,
+        }
+    return result
+
+
+@pytest.fixture
+def importer_columns(app):
+    """Add the run_sheet_jobs columns the importers create."""
+    with app.app_context():
+        for column in ('job_address TEXT', 'price_agreed REAL'):
+            _execute(f'ALTER TABLE run_sheet_jobs ADD COLUMN {column}')
+        runsheet_status_index.ensure_day_status_index()
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Completion status
+# ---------------------------------------------------------------------------
+
+def test_status_follows_job_and_mileage_changes(app):
+    with app.app_context():
+        first = _add_job('01/07/2025', '1')
+        second = _add_job('01/07/2025', '2')
+        assert _status('01/07/2025')['status'] == 'not_started'
+        assert _status('01/07/2025')['total_jobs'] == 2
+
+        RunsheetModel.update_job_status(first, 'completed')
+        assert _status('01/07/2025')['status'] == 'in_progress'
+        assert _status('01/07/2025')['jobs_with_actions'] == 1
+
+        RunsheetModel.update_job_statuses([{'job_id': second, 'status': 'DNCO'}])
+        assert _status('01/07/2025')['status'] == 'in_progress'
+
+        _set_mileage('01/07/2025', 84.0)
+        assert _status('01/07/2025') == {
+            'status': 'completed', 'total_jobs': 2,
+            'jobs_with_actions': 2, 'has_mileage': 1,
+        }
+
+
+def test_extra_and_deleted_jobs(app, importer_columns):
+    with app.app_context():
+        done = _add_job('02/07/2025', '1', status='completed')
+        _set_mileage('02/07/2025', 10.0)
+        assert _status('02/07/2025')['status'] == 'completed'
+
+        extra = RunsheetModel.add_extra_job('02/07/2025', '99', 'Tesco', status='pending')
+        assert _status('02/07/2025')['status'] == 'in_progress'
+
+        RunsheetModel.delete_job(extra)
+        assert _status('02/07/2025')['status'] == 'completed'
+
+        RunsheetModel.delete_job(done)
+        assert _status('02/07/2025') is None
+
+
+def test_matches_legacy_aggregation(app):
+    with app.app_context():
+        _add_job('03/07/2025', '1', status='completed')
+        _add_job('03/07/2025', '2', status='missed')
+        _add_job('04/07/2025', '3')
+        _add_job('05/07/2025', '4', status='extra')
+        _set_mileage('03/07/2025', 50.0)
+        _set_mileage('04/07/2025', 12.0)
+
+        assert RunsheetModel.get_completion_status() == _legacy_completion_status()
+
+
+def test_rebuild_backfills_from_scratch(app):
+    with app.app_context():
+        _add_job('06/07/2025', '1', status='completed')
+        _add_job('07/07/2025', '2')
+        _execute('DELETE FROM runsheet_day_status')
+        assert RunsheetModel.get_completion_status() == {}
+
+        assert runsheet_status_index.ensure_day_status_index() is True
+        assert RunsheetModel.get_completion_status() == _legacy_completion_status()
+
+
+# ---------------------------------------------------------------------------
+# Runsheet list
+# ---------------------------------------------------------------------------
+
+def test_list_excludes_absent_days_and_filters(app):
+    with app.app_context():
+        _add_job('07/07/2025', '1', customer='HSBC')   # Monday
+        _add_job('08/07/2025', '2')                    # Tuesday
+        _add_job('08/07/2025', '3', customer='Xerox')
+        _add_job('01/08/2025', '4')
+
+        result = RunsheetModel.get_runsheets_list()
+        assert [r['date'] for r in result['runsheets']] == ['01/08/2025', '08/07/2025', '07/07/2025']
+        assert result['total'] == 3
+
+        july = RunsheetModel.get_runsheets_list(filter_year='2025', filter_month='07')
+        assert {r['date'] for r in july['runsheets']} == {'07/07/2025', '08/07/2025'}
+
+        tuesdays = RunsheetModel.get_runsheets_list(filter_day='2')
+        assert [r['date'] for r in tuesdays['runsheets']] == ['08/07/2025']
+        assert tuesdays['runsheets'][0]['job_count'] == 2
+
+        by_jobs = RunsheetModel.get_runsheets_list(sort_column='job_count', sort_order='desc')
+        assert by_jobs['runsheets'][0]['date'] == '08/07/2025'
+
+        _execute("INSERT INTO attendance (date, reason) VALUES ('08/07/2025', 'Holiday')")
+        assert '08/07/2025' not in {r['date'] for r in RunsheetModel.get_runsheets_list()['runsheets']}
+
+        _execute("DELETE FROM attendance WHERE date = '08/07/2025'")
+        assert '08/07/2025' in {r['date'] for r in RunsheetModel.get_runsheets_list()['runsheets']}
+
+
+def test_pay_totals_from_migrated_pay_columns(app):
+    with app.app_context():
+        _add_job('09/07/2025', '1')
+        _add_job('09/07/2025', '2')
+        # Migration 019 adds the pay columns, so the triggers installed at
+        # startup already watch pay_amount.
+
+        _execute("UPDATE run_sheet_jobs SET pay_amount = 12.5 WHERE job_number = '1'")
+        row = RunsheetModel.get_runsheets_list()['runsheets'][0]
+        assert row['daily_pay'] == 12.5
+        assert row['jobs_with_pay'] == 1
+
+
+def test_completion_status_endpoint(app, auth_client):
+    with app.app_context():
+        _add_job('10/07/2025', '1', status='completed')
+
+    data = auth_client.get('/api/runsheets/completion-status').get_json()
+    assert data['success'] is True
+    assert data['data']['10/07/2025']['status'] == 'in_progress'
@@ -0,0 +1,69 @@
+"""Golden-output tests for the text runsheet parser.
+
+``tests/fixtures/runsheet_pages.txt`` holds sample pages (separated by form
+feeds) with jobs for every customer parser. The expected jobs in
+``runsheet_pages_golden.json`` were produced by the parser before dispatch
+was made table-driven. Only update them for an intended parser change.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from tests.test_upload_batch import _load_runsheet_module
+
+_FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+def _pages():
+    text = (_FIXTURES / 'runsheet_pages.txt').read_text()
+    return [page.strip('\n').split('\n') for page in text.split('\f')]
+
+
+@pytest.fixture(scope='module')
+def module():
+    return _load_runsheet_module()
+
+
+@pytest.fixture
+def importer(module):
+    return module.RunSheetImporter(connect=False)
+
+
+def test_pages_parse_to_the_golden_jobs(importer):
+    golden = json.loads((_FIXTURES / 'runsheet_pages_golden.json').read_text())
+    pages = _pages()
+    assert len(pages) == len(golden)
+    for page, expected in zip(pages, golden):
+        assert importer.parse_multi_driver_page(page) == expected['multi_driver']
+        assert importer.parse_single_driver_page(page) == expected['single_driver']
+
+
+@pytest.mark.parametrize('customer, method', [
+    ('Fujitsu Services Limited - EE - ME', 'parse_fujitsu_ee_me_job'),
+    ('Fujitsu Services Limited - EE', 'parse_fujitsu_ee_job'),
+    ('Fujitsu - Star Trains', 'parse_star_trains_job'),
+    ('Fujitsu - Specsavers', 'parse_specsavers_job'),
+    ('Fujitsu Retail', 'parse_tech_job'),
+    ('Computacenter Limited', 'parse_computacenter_limited_job'),
+    ('Computacenter Limited (UK)', 'parse_tech_job'),
+    ('Computacenter - Astra Zeneca', 'parse_astra_zeneca_job'),
+    ('Xerox (UK) Ltd', 'parse_xerox_job'),
+    ('Acme Widgets', 'parse_generic_job'),
+])
+def test_customer_dispatch(module, customer, method):
+    assert module.customer_parser_name(customer.upper()) == method
+
+
+def test_job_blocks_end_at_next_job_or_window(importer):
+    lines = ['Date 27/04/2026 Driver Daniel Hanson Jobs on Run 2',
+             ' Job # 1 ', ' Customer Signature HSBC ',
+             'Job # 2'] + [f'line {n}' for n in range(10)]
+
+    blocks = list(importer.split_job_blocks(lines, 4))
+    assert blocks == [
+        (' Job # 1 ', ['Customer Signature HSBC']),
+        ('Job # 2', ['line 0', 'line 1', 'line 2', 'line 3']),
+    ]
+    assert importer.parse_page_header(lines) == ('27/04/2026', 'Daniel Hanson', 2)
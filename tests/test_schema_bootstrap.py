@@ -0,0 +1,85 @@
+"""Tests for the one-time schema bootstrap: migrations apply once and requests issue no DDL."""
+
+import logging
+
+from app import database
+from app.database import get_db_connection
+from app.services.migration_runner import MigrationRunner
+
+
+def _user_version():
+    with get_db_connection() as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def test_schema_version_short_circuits_later_runs(app):
+    with app.app_context():
+        runner = MigrationRunner()
+        assert _user_version() == len(runner._get_migration_files())
+        assert runner.schema_is_current()
+
+        database.start_query_timer()
+        try:
+            assert runner.run_migrations() == (True, 0)
+            assert database.query_timer_ddl() == 0
+        finally:
+            database.stop_query_timer()
+
+
+def test_add_column_migration_tolerates_existing_columns(app):
+    with app.app_context():
+        with get_db_connection() as conn:
+            # As if the old runtime code had already added every pay column.
+            conn.execute("DELETE FROM migrations WHERE filename = '019_runtime_schema.sql'")
+            conn.execute('PRAGMA user_version = 0')
+            conn.commit()
+
+        assert MigrationRunner().run_migrations() == (True, 1)
+        with get_db_connection() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(run_sheet_jobs)')}
+        assert {'pay_amount', 'pay_updated_at', 'route_order', 'manually_uploaded'} <= columns
+
+
+def test_ddl_during_a_request_is_counted_and_logged(app, caplog):
+    with app.app_context():
+        database.start_query_timer()
+        try:
+            with caplog.at_level(logging.WARNING, logger='app.database'):
+                with get_db_connection() as conn:
+                    conn.execute('CREATE TEMP TABLE scratch (id INTEGER)')
+                    conn.execute('SELECT 1').fetchone()
+            assert database.query_timer_ddl() == 1
+        finally:
+            database.stop_query_timer()
+    assert 'DDL issued while serving a request' in caplog.text
+
+
+def test_hot_paths_issue_no_ddl(auth_client, app, caplog):
+    with app.app_context():
+        with get_db_connection() as conn:
+            # Payslip columns the extractor creates on its own databases.
+            conn.execute('ALTER TABLE payslips ADD COLUMN tax_year TEXT')
+            for column in ('amount REAL', 'rate REAL', 'units REAL'):
+                conn.execute(f'ALTER TABLE job_items ADD COLUMN {column}')
+            conn.execute("INSERT INTO payslips (id, week_number, tax_year) VALUES (1, 14, '2025')")
+            conn.execute("INSERT INTO job_items (payslip_id, job_number, amount, rate, units) "
+                         "VALUES (1, '500', 25.0, 25.0, 1)")
+            conn.execute("INSERT INTO run_sheet_jobs (date, job_number, customer) "
+                         "VALUES ('01/07/2025', '500', 'NCR')")
+            conn.commit()
+
+    with caplog.at_level(logging.WARNING, logger='app.database'):
+        created = auth_client.post('/api/mileage/entries', json={'date': '2025-07-01', 'total_miles': 42})
+        assert created.get_json()['success'] is True
+        assert auth_client.get('/api/mileage/entries?year=2025').get_json()['success'] is True
+        assert auth_client.get('/api/mileage/summary').get_json()['success'] is True
+        assert auth_client.get('/api/mileage/missing-report?year=2025').get_json()['success'] is True
+        assert auth_client.post('/api/paypoint/initialize').get_json()['success'] is True
+        assert auth_client.post('/api/sync/payslip-to-runsheets').get_json()['success'] is True
+        assert auth_client.post('/api/runsheets/update-pay-info').get_json()['success'] is True
+
+    assert 'DDL issued' not in caplog.text
+    with app.app_context():
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT pay_amount, pay_week FROM run_sheet_jobs WHERE job_number = '500'").fetchone()
+    assert tuple(row) == (25.0, 14)
@@ -0,0 +1,233 @@
+"""Tests for the full-text job search index and the /api/search routes."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.database import get_db_connection
+from app.services import job_search_index as jsi
+
+
+MIGRATION = Path(__file__).resolve().parent.parent / 'migrations' / '011_job_search_fts.sql'
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _add_runsheet_job(date, job_number, customer, activity, location, postcode):
+    with get_db_connection() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO run_sheet_jobs (date, job_number, customer, activity, location, postcode)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (date, job_number, customer, activity, location, postcode),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+def _add_job_item(job_number, customer, location, postcode, pay):
+    with get_db_connection() as conn:
+        payslip_id = conn.execute(
+            'INSERT INTO payslips (week_number, period_end) VALUES (?, ?)',
+            (12, '21/06/2025'),
+        ).lastrowid
+        cur = conn.execute(
+            """
+            INSERT INTO job_items (payslip_id, job_number, customer, location, postcode, pay)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (payslip_id, job_number, customer, location, postcode, pay),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+def _search(text, **kwargs):
+    with get_db_connection() as conn:
+        return jsi.search_jobs(conn, text, **kwargs)
+
+
+@pytest.fixture
+def production_conn():
+    """In-memory DB with the importer-created (production) table layout."""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE run_sheet_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, job_number TEXT,
+            customer TEXT, activity TEXT, job_address TEXT, postcode TEXT,
+            status TEXT DEFAULT 'pending'
+        );
+        CREATE TABLE payslips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, tax_year TEXT, week_number INTEGER
+        );
+        CREATE TABLE job_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, payslip_id INTEGER, amount REAL,
+            job_number TEXT, client TEXT, location TEXT, job_type TEXT, date TEXT
+        );
+    """)
+    conn.executescript(MIGRATION.read_text())
+    yield conn
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Query building
+# ---------------------------------------------------------------------------
+
+def test_build_match_query_quotes_prefix_terms():
+    assert jsi.build_match_query('m1 1a') == '"m1"* "1a"*'
+
+
+def test_build_match_query_neutralises_fts_syntax():
+    # Operators and quotes typed by the user must not reach FTS5 raw.
+    assert jsi.build_match_query('foo" OR bar*') == '"foo"* "OR"* "bar"*'
+
+
+def test_build_match_query_empty():
+    assert jsi.build_match_query('  %% ') is None
+
+
+def test_build_match_query_rejects_unknown_field():
+    with pytest.raises(ValueError):
+        jsi.build_match_query('x', field='notes')
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance (migration-001 layout used by the app fixture)
+# ---------------------------------------------------------------------------
+
+def test_inserts_are_indexed_by_trigger(app):
+    with app.app_context():
+        _add_runsheet_job('01/07/2025', '41234567', 'Barclays Bank', 'Install', 'High St', 'M1 1AA')
+        _add_job_item('41234567', 'Barclays Bank', 'High St', 'M1 1AA', 25.0)
+
+        result = _search('barc')
+        assert {r['source'] for r in result['results']} == {'runsheet', 'payslip'}
+        assert _search('m1 1a')['results']
+
+
+def test_updates_and_deletes_keep_index_in_sync(app):
+    with app.app_context():
+        job_id = _add_runsheet_job('01/07/2025', '555', 'Tesco', 'Repair', 'Main Rd', 'LS1 1AA')
+
+        with get_db_connection() as conn:
+            conn.execute("UPDATE run_sheet_jobs SET customer = 'Sainsburys' WHERE id = ?", (job_id,))
+            conn.commit()
+        assert not _search('tesco')['results']
+        assert _search('sainsb')['results'][0]['customer'] == 'Sainsburys'
+
+        with get_db_connection() as conn:
+            conn.execute('DELETE FROM run_sheet_jobs WHERE id = ?', (job_id,))
+            conn.commit()
+        assert not _search('sainsb')['results']
+
+
+def test_ensure_search_index_backfills_existing_rows(app):
+    with app.app_context():
+        _add_runsheet_job('01/07/2025', '777', 'Specsavers', 'Install', 'Mall', 'B1 1AA')
+        with get_db_connection() as conn:
+            conn.execute('DELETE FROM job_search')
+            conn.commit()
+        assert not _search('specs')['results']
+
+        assert jsi.ensure_search_index() is True
+        assert _search('specs')['results'][0]['job_number'] == '777'
+
+
+# ---------------------------------------------------------------------------
+# Ranking, pagination, snippets
+# ---------------------------------------------------------------------------
+
+def test_exact_job_number_ranks_first(app):
+    with app.app_context():
+        _add_runsheet_job('01/07/2025', '12345678', 'A', 'X', 'Y', 'Z1 1ZZ')
+        _add_runsheet_job('02/07/2025', '1234', 'B', 'X', 'Y', 'Z1 1ZZ')
+
+        results = _search('1234', field='job_number')['results']
+        assert [r['job_number'] for r in results] == ['1234', '12345678']
+
+
+def test_pagination(app):
+    with app.app_context():
+        for i in range(5):
+            _add_runsheet_job('01/07/2025', f'9000{i}', 'Paypoint', 'Install', 'Shop', 'L1 1AA')
+
+        first = _search('paypoint', per_page=2)
+        assert len(first['results']) == 2 and first['has_more'] is True
+        last = _search('paypoint', per_page=2, page=3)
+        assert len(last['results']) == 1 and last['has_more'] is False
+
+        seen = {r['job_number'] for p in (1, 2, 3) for r in _search('paypoint', per_page=2, page=p)['results']}
+        assert len(seen) == 5
+
+
+def test_snippet_is_html_escaped(app):
+    with app.app_context():
+        _add_runsheet_job('01/07/2025', '1', '<script>Evil</script> Corp', 'X', 'Y', 'Z1 1ZZ')
+
+        snippet = _search('corp')['results'][0]['snippet']
+        assert '<script>' not in snippet
+        assert '&lt;script&gt;' in snippet
+        assert '<mark>Corp</mark>' in snippet
+
+
+# ---------------------------------------------------------------------------
+# Production (importer-created) column layout
+# ---------------------------------------------------------------------------
+
+def test_production_layout_triggers_and_hydration(production_conn):
+    conn = production_conn
+    jsi.install_triggers(conn)
+    conn.execute(
+        "INSERT INTO run_sheet_jobs (date, job_number, customer, activity, job_address, postcode) "
+        "VALUES ('03/07/2025', '4321', 'Fujitsu EE', 'Tech Exchange', '1 Station Rd', 'WA1 1AA')"
+    )
+    payslip_id = conn.execute("INSERT INTO payslips (tax_year, week_number) VALUES ('2025', 14)").lastrowid
+    conn.execute(
+        "INSERT INTO job_items (payslip_id, amount, job_number, client, location, job_type, date) "
+        "VALUES (?, 42.5, '4321', 'Fujitsu EE', 'Warrington', 'Tech Exchange', '03/07/25')",
+        (payslip_id,),
+    )
+    conn.commit()
+
+    runsheet = jsi.search_jobs(conn, 'station', source='runsheet')['results'][0]
+    assert runsheet['address'] == '1 Station Rd'
+
+    payslip = jsi.search_jobs(conn, 'tech exch', source='payslip')['results'][0]
+    assert payslip['client'] == 'Fujitsu EE'
+    assert payslip['tax_year'] == '2025' and payslip['week_number'] == 14
+    assert payslip['amount'] == 42.5
+
+    # Status updates do not touch indexed columns and must not re-index.
+    conn.execute("UPDATE run_sheet_jobs SET status = 'completed'")
+    assert jsi.rebuild(conn) == 2
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+def test_api_search_returns_paginated_envelope(app, auth_client):
+    with app.app_context():
+        _add_job_item('888', 'Xerox', 'Leeds', 'LS2 2BB', 30.0)
+
+    data = auth_client.get('/api/search?q=xer').get_json()
+    assert data['success'] is True
+    assert data['data'][0]['job_number'] == '888'
+    assert data['page'] == 1 and data['has_more'] is False
+
+
+def test_api_search_job_number(app, auth_client):
+    with app.app_context():
+        _add_runsheet_job('04/07/2025', '24681357', 'HSBC', 'Repair', 'Bank St', 'S1 1AA')
+
+    data = auth_client.get('/api/search/job/2468').get_json()
+    assert data['found'] is True
+    assert data['runsheets'][0]['customer'] == 'HSBC'
+    assert data['runsheets'][0]['status'] == 'Repair'
+    assert data['payslips'] == []
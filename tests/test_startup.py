@@ -0,0 +1,125 @@
+"""Tests for startup coordination: one-time database preparation, one background process, lazy imports."""
+
+import fcntl
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import database
+from app.database import get_db_connection
+from app.services import legacy_mileage, startup
+
+
+def test_prepare_database_skips_migrations_when_schema_is_current(app, monkeypatch):
+    def fail():
+        raise AssertionError('init_database should not run against a current schema')
+
+    with app.app_context():
+        monkeypatch.setattr(database, 'init_database', fail)
+        assert startup.prepare_database() == (True, 0)
+    assert os.path.exists(f'{database.DB_PATH}.startup.lock')
+
+
+def test_prepare_database_copies_legacy_mileage_once(app, tmp_path, monkeypatch):
+    legacy_db = tmp_path / 'wages.db'
+    with sqlite3.connect(legacy_db) as legacy:
+        legacy.execute("CREATE TABLE mileage_entries (id INTEGER PRIMARY KEY, date TEXT, start_mileage REAL, "
+                       "end_mileage REAL, total_miles REAL, fuel_cost REAL, notes TEXT, created_at TEXT, updated_at TEXT)")
+        legacy.executemany("INSERT INTO mileage_entries (date, total_miles, fuel_cost) VALUES (?, ?, ?)",
+                           [('01/03/2024', 40, 8.5), ('02/03/2024', 55, 11.0)])
+    monkeypatch.setattr(legacy_mileage, 'LEGACY_DB', legacy_db)
+
+    with app.app_context():
+        with get_db_connection() as conn:
+            conn.execute("INSERT INTO mileage_entries (date, total_miles) VALUES ('02/03/2024', 60)")
+            conn.commit()
+        startup.prepare_database()
+
+        with get_db_connection() as conn:
+            rows = conn.execute('SELECT date, total_miles FROM mileage_entries ORDER BY date').fetchall()
+            assert [tuple(row) for row in rows] == [('01/03/2024', 40), ('02/03/2024', 60)]
+            # Deleted after the copy, and not brought back by the next start
+            conn.execute("DELETE FROM mileage_entries WHERE date = '01/03/2024'")
+            conn.commit()
+        startup.prepare_database()
+        with get_db_connection() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM mileage_entries').fetchone()[0] == 1
+        assert legacy_mileage.import_legacy_mileage(force=True, dry_run=True) == 1
+
+
+def test_background_services_are_claimed_by_one_process(app, monkeypatch):
+    monkeypatch.setattr(startup, '_background_lock', None)
+    try:
+        assert startup.claim_background_services('auto') is True
+        assert startup.claim_background_services('auto') is True
+
+        # Another process opening the same lock file cannot take it.
+        with open(f'{database.DB_PATH}.background.lock', 'a') as other:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    finally:
+        startup._background_lock.close()
+
+    assert startup.claim_background_services('off') is False
+    assert startup.claim_background_services('on') is True
+
+
+def test_workers_skip_a_database_prepared_by_the_server(app, monkeypatch):
+    from app import create_app
+
+    def fail(lock=True):
+        raise AssertionError('the server process already prepared this database')
+
+    monkeypatch.setattr(startup, 'prepare_database', fail)
+    monkeypatch.setenv(startup.DATABASE_PREPARED_ENV, os.path.abspath(app.config['DATABASE_PATH']))
+    create_app('testing', test_config={
+        'TESTING': True,
+        'DATABASE_PATH': app.config['DATABASE_PATH'],
+        'SECRET_KEY': 'test-secret-key',
+        'AUTO_SYNC_ENABLED': False,
+    })
+
+
+def test_periodic_sync_starts_in_workers_without_the_background_lock(app, monkeypatch):
+    from app import create_app
+    from app.services.periodic_sync import periodic_sync_service
+
+    started = []
+    monkeypatch.setattr(periodic_sync_service, 'start_periodic_sync', lambda: started.append(os.getpid()))
+    monkeypatch.setenv(startup.DATABASE_PREPARED_ENV, os.path.abspath(app.config['DATABASE_PATH']))
+    # A worker that lost the background lock: its scheduler lease still
+    # lets it wake the sync, so the service has to start here too.
+    create_app('testing', test_config={
+        'TESTING': False,
+        'DATABASE_PATH': app.config['DATABASE_PATH'],
+        'SECRET_KEY': 'test-secret-key',
+        'AUTO_SYNC_ENABLED': True,
+        'BACKGROUND_SERVICES': 'off',
+    })
+
+    assert started == [os.getpid()]
+
+
+def test_heavy_libraries_are_not_imported_at_startup(tmp_path):
+    check = (
+        "import sys; from app import create_app; create_app('development'); "
+        "print('loaded:', *(m for m in ('camelot', 'pandas', 'reportlab', 'googleapiclient') if m in sys.modules))"
+    )
+    env = dict(
+        os.environ,
+        SECRET_KEY='test-secret-key',
+        DATABASE_PATH=str(tmp_path / 'startup.db'),
+        AUTO_SYNC_ENABLED='false',
+        FILE_CATALOGUE_WATCH='false',
+        TABLE_STATS_RECONCILE_HOURS='0',
+        BACKGROUND_SERVICES='off',
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', check], cwd=Path(__file__).parent.parent,
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == 'loaded:'
@@ -0,0 +1,185 @@
+"""Tests for the persistent sync scheduler and the sync service's saved state."""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import sync_scheduler
+from app.services.sync_scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler(app):
+    with app.app_context():
+        sched = Scheduler('test-scheduler')
+        sched.open()
+        yield sched
+        sched.stop()
+
+
+@pytest.fixture
+def sync_service(app):
+    """A PeriodicSyncService using the test database, without its thread."""
+    from app.services import periodic_sync as ps_mod
+
+    with app.app_context():
+        service = ps_mod.PeriodicSyncService()
+        service.scheduler.open()
+        service.is_running = True
+        yield service
+        service.is_running = False
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+def test_run_pending_runs_due_jobs_once(scheduler):
+    calls = []
+    scheduler.register('due', lambda: calls.append('due'))
+    scheduler.register('later', lambda: calls.append('later'))
+    now = datetime(2026, 4, 21, 19, 0)
+    scheduler.schedule_at('due', now - timedelta(minutes=1))
+    scheduler.schedule_at('later', now + timedelta(minutes=15))
+
+    assert scheduler.run_pending(now) == ['due']
+    assert scheduler.run_pending(now) == []
+    assert calls == ['due']
+    assert scheduler.next_run() == now + timedelta(minutes=15)
+
+    status = {job['name']: job for job in scheduler.jobs_status()}
+    assert status['due']['next_run_at'] is None
+    assert status['due']['last_status'] == 'ok'
+
+
+def test_job_can_reschedule_itself_and_failures_are_recorded(scheduler):
+    now = datetime(2026, 4, 21, 19, 0)
+
+    def repeat():
+        scheduler.schedule_at('repeat', now + timedelta(minutes=15))
+
+    def boom():
+        raise RuntimeError('no network')
+
+    scheduler.register('repeat', repeat)
+    scheduler.register('boom', boom)
+    scheduler.schedule_at('repeat', now)
+    scheduler.schedule_at('boom', now)
+
+    assert sorted(scheduler.run_pending(now)) == ['boom', 'repeat']
+    assert scheduler.next_run('repeat') == now + timedelta(minutes=15)
+    status = {job['name']: job for job in scheduler.jobs_status()}
+    assert status['boom']['last_status'] == 'error: no network'
+
+
+def test_job_times_survive_a_new_scheduler(scheduler):
+    when = datetime(2026, 4, 21, 19, 30)
+    scheduler.schedule_at('retry-sync', when)
+
+    restarted = Scheduler('test-scheduler')
+    restarted.open()
+    assert restarted.next_run('retry-sync') == when
+
+
+def test_lease_has_a_single_holder(app, monkeypatch):
+    with app.app_context():
+        assert sync_scheduler.acquire_lease('sync', 'worker-a', 60)
+        assert not sync_scheduler.acquire_lease('sync', 'worker-b', 60)
+        assert sync_scheduler.acquire_lease('sync', 'worker-a', 60)
+
+        # Worker a stops renewing: b takes over once the lease lapses.
+        real_time = sync_scheduler.time.time
+        monkeypatch.setattr(sync_scheduler.time, 'time', lambda: real_time() + 120)
+        assert sync_scheduler.acquire_lease('sync', 'worker-b', 60)
+        assert not sync_scheduler.acquire_lease('sync', 'worker-a', 60)
+
+
+def test_scheduling_wakes_the_thread(app):
+    with app.app_context():
+        # A long lease means the loop would otherwise sleep for minutes.
+        sched = Scheduler('test-wake', lease_seconds=600)
+        ran = threading.Event()
+        sched.register('now', ran.set)
+        sched.start()
+        try:
+            for _ in range(50):
+                if sched.is_leader:
+                    break
+                threading.Event().wait(0.05)
+            assert sched.is_leader
+            sched.schedule_at('now', datetime.now())
+            assert ran.wait(5)
+        finally:
+            sched.stop()
+
+
+# ---------------------------------------------------------------------------
+# PeriodicSyncService on the scheduler
+# ---------------------------------------------------------------------------
+
+def test_sync_state_is_restored_by_another_instance(sync_service):
+    from app.services.periodic_sync import PeriodicSyncService
+
+    sync_service.last_check_date = '2026-04-21'
+    sync_service.runsheet_completed_today = True
+    sync_service.retry_count = 2
+    sync_service.last_sync_time = datetime(2026, 4, 21, 19, 15)
+    sync_service.sync_history = [{'run_id': 'a', 'success': True}]
+    sync_service._save_state()
+
+    other = PeriodicSyncService()
+    other.scheduler.open()
+    other._restore_state()
+    assert other.last_check_date == '2026-04-21'
+    assert other.runsheet_completed_today is True
+    assert other.retry_count == 2
+    assert other.last_sync_time == datetime(2026, 4, 21, 19, 15)
+    assert other.sync_history == [{'run_id': 'a', 'success': True}]
+
+
+def test_timed_pause_schedules_exact_resume(sync_service):
+    from app.services.periodic_sync import JOB_RESUME
+
+    sync_service.pause_sync(duration_minutes=30)
+    assert sync_service.scheduler.next_run(JOB_RESUME) == sync_service.pause_until.replace(microsecond=0)
+
+    sync_service.scheduler.run_pending(sync_service.pause_until + timedelta(seconds=1))
+    assert sync_service.is_paused is False
+    assert sync_service.scheduler.next_run(JOB_RESUME) is None
+
+
+def test_retry_is_booked_after_the_backoff_delay(sync_service):
+    from app.services.periodic_sync import JOB_RETRY
+
+    before = datetime.now()
+    sync_service._handle_retry('sync_general')
+    retry_at = sync_service.scheduler.next_run(JOB_RETRY)
+    assert timedelta(minutes=4) < retry_at - before <= timedelta(minutes=5)
+    assert sync_service.retry_count == 1
+
+
+def test_new_data_runs_a_sync_check_immediately(sync_service):
+    from app.services.periodic_sync import JOB_NEW_DATA
+
+    calls = []
+    sync_service.scheduler.register(JOB_NEW_DATA, lambda: calls.append('sync'))
+    assert sync_service.notify_new_data('upload') is True
+    sync_service.scheduler.run_pending()
+    assert calls == ['sync']
+
+
+def test_completed_day_skips_runsheet_query(sync_service, monkeypatch):
+    from app.services import periodic_sync as ps_mod
+
+    def fail():
+        raise AssertionError('latest runsheet should not be queried')
+
+    monkeypatch.setattr(ps_mod, 'get_latest_runsheet_date', fail)
+    monkeypatch.setattr(ps_mod, 'get_latest_payslip_week', lambda: None)
+    sync_service.last_check_date = datetime.now().strftime('%Y-%m-%d')
+    sync_service.runsheet_completed_today = True
+    sync_service._save_state()
+
+    sync_service.sync_latest()
+    assert sync_service.current_state == 'completed'
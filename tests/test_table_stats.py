@@ -0,0 +1,120 @@
+"""Tests for the trigger-maintained table_stats figures."""
+
+import pytest
+
+from app.database import get_db_connection
+from app.services import table_stats
+
+
+def _execute(sql, params=()):
+    with get_db_connection() as conn:
+        conn.execute(sql, params)
+        conn.commit()
+
+
+def _stats():
+    return table_stats.get_stats()
+
+
+def _actual():
+    with get_db_connection() as conn:
+        return {
+            name: round(float(value), 2) if name.endswith('_total') else int(value)
+            for name, value in table_stats.compute_stats(conn).items()
+        }
+
+
+@pytest.fixture
+def importer_columns(app):
+    """Add the run_sheet_jobs column the importers create."""
+    with app.app_context():
+        _execute('ALTER TABLE run_sheet_jobs ADD COLUMN job_address TEXT')
+        table_stats.ensure_table_stats()
+    return app
+
+
+def test_counts_follow_inserts_updates_and_deletes(importer_columns):
+    with importer_columns.app_context():
+        for date, job, customer in (
+            ('01/07/2025', '100', 'Acme'),
+            ('01/07/2025', '101', 'N/A'),
+            ('02/07/2025', '100', ''),
+            ('03/07/2025', None, 'Acme'),
+        ):
+            _execute(
+                'INSERT INTO run_sheet_jobs (date, job_number, customer) VALUES (?, ?, ?)',
+                (date, job, customer),
+            )
+        stats = _stats()
+        assert stats['run_sheet_jobs.rows'] == 4
+        assert stats['run_sheet_jobs.dates'] == 3
+        assert stats['run_sheet_jobs.job_numbers'] == 2
+        assert stats['run_sheet_jobs.with_job_number'] == 3
+        assert stats['run_sheet_jobs.with_customer'] == 1
+
+        _execute("UPDATE run_sheet_jobs SET pay_amount = 12.5 WHERE job_number = '100'")
+        _execute("UPDATE run_sheet_jobs SET job_address = '1 High St' WHERE job_number = '101'")
+        stats = _stats()
+        assert stats['run_sheet_jobs.with_pay'] == 2
+        assert stats['run_sheet_jobs.pay_total'] == 25.0
+        assert stats['run_sheet_jobs.with_address'] == 1
+
+        # Moving the only job off 03/07 removes that date, adding one keeps 01/07.
+        _execute("UPDATE run_sheet_jobs SET date = '01/07/2025' WHERE date = '03/07/2025'")
+        assert _stats()['run_sheet_jobs.dates'] == 2
+
+        _execute("DELETE FROM run_sheet_jobs WHERE date = '02/07/2025'")
+        stats = _stats()
+        assert stats['run_sheet_jobs.dates'] == 1
+        assert stats['run_sheet_jobs.job_numbers'] == 2
+        assert stats['run_sheet_jobs.pay_total'] == 12.5
+
+        assert _stats() == _actual()
+
+
+def test_payslip_and_job_item_counts(app):
+    with app.app_context():
+        _execute('INSERT INTO payslips (week_number, net_payment) VALUES (1, 500)')
+        _execute('INSERT INTO payslips (week_number, net_payment) VALUES (2, 250.25)')
+        _execute('INSERT INTO payslips (week_number, net_payment) VALUES (3, NULL)')
+        _execute('INSERT INTO job_items (payslip_id, job_number) VALUES (1, ?)', ('100',))
+
+        stats = _stats()
+        assert stats['payslips.rows'] == 3
+        assert stats['payslips.with_net_payment'] == 2
+        assert stats['payslips.net_payment_total'] == 750.25
+        assert stats['job_items.rows'] == 1
+
+        _execute('UPDATE payslips SET net_payment = 100 WHERE week_number = 3')
+        _execute('DELETE FROM payslips WHERE week_number = 1')
+        assert _stats()['payslips.net_payment_total'] == 350.25
+        assert _stats() == _actual()
+
+
+def test_reconcile_corrects_drift(app):
+    with app.app_context():
+        _execute('INSERT INTO run_sheet_jobs (date, job_number) VALUES (?, ?)', ('01/07/2025', '1'))
+        _execute("UPDATE table_stats SET value = 99 WHERE name = 'run_sheet_jobs.rows'")
+        _execute("DELETE FROM table_stats_keys WHERE stat = 'run_sheet_jobs.dates'")
+
+        with get_db_connection() as conn:
+            drift = table_stats.reconcile(conn)
+        assert drift['run_sheet_jobs.rows'] == (99, 1)
+
+        # Reference counts were rebuilt too, so later deletes stay exact.
+        _execute('DELETE FROM run_sheet_jobs')
+        assert _stats()['run_sheet_jobs.dates'] == 0
+        assert _stats() == _actual()
+
+
+def test_stats_endpoints_read_maintained_counts(auth_client, app):
+    with app.app_context():
+        _execute('INSERT INTO payslips (week_number, net_payment) VALUES (1, 500)')
+        for job in ('1', '2'):
+            _execute('INSERT INTO run_sheet_jobs (date, job_number) VALUES (?, ?)', ('01/07/2025', job))
+
+    data = auth_client.get('/api/data/stats').get_json()['data']
+    assert (data['payslips'], data['runsheets'], data['jobs']) == (1, 1, 2)
+
+    records = auth_client.get('/api/data/database/info').get_json()['data']['records']
+    assert records == {'payslips': 1, 'runsheets': 2, 'jobs': 2, 'attendance': 0}
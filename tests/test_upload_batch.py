@@ -0,0 +1,212 @@
+"""Tests for batch processing of manual uploads."""
+
+import importlib.util
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.database import get_db_connection
+from app.routes import api_upload
+
+_ROOT = Path(__file__).resolve().parent.parent
+_SCRIPTS = _ROOT / 'scripts' / 'production'
+if str(_SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS))
+
+
+def _load_runsheet_module():
+    # Registered in sys.modules so the process pool can pickle its worker.
+    if 'import_run_sheets' not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            'import_run_sheets', _SCRIPTS / 'import_run_sheets.py')
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['import_run_sheets'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['import_run_sheets']
+
+
+# ---------------------------------------------------------------------------
+# RunSheetImporter.import_files
+# ---------------------------------------------------------------------------
+
+def _csv(directory, name, rows):
+    path = directory / name
+    lines = ['driver,date,job_number,customer,activity']
+    lines += [f'Daniel Hanson,{date},{job},Acme,INSTALL' for date, job in rows]
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_import_files_reports_each_file(tmp_path, workers):
+    module = _load_runsheet_module()
+    first = _csv(tmp_path, 'DH_01-07-2025.csv', [('01/07/2025', '100'), ('01/07/2025', '101')])
+    second = _csv(tmp_path, 'DH_02-07-2025.csv', [('02/07/2025', '200')])
+    unsupported = tmp_path / 'notes.docx'
+    unsupported.write_text('x')
+
+    db_path = tmp_path / 'jobs.db'
+    with sqlite3.connect(db_path) as conn:
+        # Created by the app, not the importer
+        conn.execute('CREATE TABLE deleted_jobs (id INTEGER PRIMARY KEY, job_number TEXT, date TEXT)')
+    importer = module.RunSheetImporter(db_path=str(db_path))
+    try:
+        files = [str(first), str(second), str(unsupported), str(tmp_path / 'missing.csv')]
+        results = importer.import_files(files, workers=workers)
+        assert [(r['status'], r['jobs'], r['dates']) for r in results] == [
+            ('imported', 2, ['01/07/2025']),
+            ('imported', 1, ['02/07/2025']),
+            ('unsupported', 0, []),
+            ('not_found', 0, []),
+        ]
+
+        again = importer.import_files([str(first)], workers=workers)
+        assert again[0]['status'] == 'already_imported'
+    finally:
+        importer.close()
+
+
+# ---------------------------------------------------------------------------
+# Batch upload processing
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def upload_db(app):
+    """Add the run_sheet_jobs columns the runsheet importer creates."""
+    with app.app_context():
+        with get_db_connection() as conn:
+            for column in ('source_file TEXT', 'imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'):
+                conn.execute(f'ALTER TABLE run_sheet_jobs ADD COLUMN {column}')
+            conn.commit()
+    return app
+
+
+@pytest.fixture
+def fake_importers(monkeypatch, tmp_path):
+    """Replace the importer subprocesses with canned per-file results.
+
+    Runsheet "imports" insert one job per file so the manual-upload
+    marking has rows to update.
+    """
+    calls = []
+    outcomes = {}
+
+    def fake_run(cmd, **kwargs):
+        script = Path(cmd[1]).name
+        files = cmd[cmd.index('--files') + 1:cmd.index('--results')]
+        calls.append((script, [Path(f).name for f in files], cmd))
+        results = []
+        for f in files:
+            status, extra = outcomes.get((script, Path(f).name), ('imported', {}))
+            result = {'file': f, 'status': status, 'error': None, **extra}
+            if script == 'import_run_sheets.py' and status == 'imported':
+                date = result.setdefault('dates', ['27/04/2026'])[0]
+                result.setdefault('jobs', 1)
+                with get_db_connection() as conn:
+                    conn.execute(
+                        'INSERT INTO run_sheet_jobs (date, job_number, source_file) VALUES (?, ?, ?)',
+                        (date, Path(f).stem, Path(f).name),
+                    )
+                    conn.commit()
+            results.append(result)
+        with open(cmd[cmd.index('--results') + 1], 'w') as fh:
+            json.dump(results, fh)
+
+        class Completed:
+            returncode = 0
+            stdout = stderr = ''
+        return Completed()
+
+    nas = tmp_path / 'nas'
+    monkeypatch.setattr(api_upload.subprocess, 'run', fake_run)
+    monkeypatch.setattr('app.config.Config.RUNSHEETS_DIR', str(nas))
+    return calls, outcomes, nas
+
+
+def _uploaded(tmp_path, *names):
+    files = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b'%PDF-1.4 ' + name.encode())
+        files.append({'original_name': name, 'saved_name': name, 'path': str(path)})
+    return files
+
+
+def test_runsheets_are_imported_in_one_run_and_marked_together(upload_db, fake_importers, tmp_path):
+    calls, outcomes, nas = fake_importers
+    outcomes[('import_run_sheets.py', 'DH_28-04-2026.pdf')] = ('imported', {'dates': ['28/04/2026']})
+    outcomes[('import_run_sheets.py', 'DH_29-04-2026.pdf')] = ('already_imported', {})
+    files = _uploaded(tmp_path, 'DH_27-04-2026.pdf', 'DH_28-04-2026.pdf', 'DH_29-04-2026.pdf')
+
+    with upload_db.app_context():
+        results = api_upload.process_uploaded_files_batch(files, 'runsheets', overwrite=True)
+        with get_db_connection() as conn:
+            marked = conn.execute(
+                'SELECT COUNT(*) FROM run_sheet_jobs WHERE manually_uploaded = 1'
+            ).fetchone()[0]
+
+    assert len(calls) == 1
+    script, names, cmd = calls[0]
+    assert script == 'import_run_sheets.py'
+    assert names == ['DH_27-04-2026.pdf', 'DH_28-04-2026.pdf', 'DH_29-04-2026.pdf']
+    assert '--overwrite' in cmd and '--workers' in cmd
+    assert marked == 2
+
+    by_file = {r['file']: r['result'] for r in results}
+    assert by_file['DH_27-04-2026.pdf']['success'] is True
+    assert by_file['DH_29-04-2026.pdf']['success'] is False
+    assert 'Already imported' in by_file['DH_29-04-2026.pdf']['error']
+    assert (nas / '2026' / '04-April' / 'DH_28-04-2026.pdf').exists()
+    assert by_file['DH_28-04-2026.pdf']['nas_path'].endswith('DH_28-04-2026.pdf')
+
+
+def test_unknown_files_fall_back_from_payslip_to_runsheet(upload_db, fake_importers, tmp_path):
+    calls, outcomes, nas = fake_importers
+    outcomes[('extract_payslips.py', 'scan.pdf')] = ('error', {'error': 'not a payslip'})
+    files = _uploaded(tmp_path, 'payslip_wk12.pdf', 'scan.pdf', 'runsheet_a.pdf')
+
+    with upload_db.app_context():
+        results = api_upload.process_uploaded_files_batch(files, 'general')
+
+    assert [(script, names) for script, names, _ in calls] == [
+        ('extract_payslips.py', ['payslip_wk12.pdf', 'scan.pdf']),
+        ('import_run_sheets.py', ['scan.pdf', 'runsheet_a.pdf']),
+    ]
+    assert all(r['result']['success'] for r in results)
+
+
+def test_upload_returns_job_id_to_poll(upload_db, auth_client, fake_importers, tmp_path, monkeypatch):
+    from app.services.periodic_sync import periodic_sync_service
+
+    monkeypatch.setattr(api_upload, 'get_upload_path', lambda file_type='general': tmp_path)
+    notified = []
+    monkeypatch.setattr(periodic_sync_service, 'notify_new_data', notified.append)
+
+    response = auth_client.post('/api/upload/files', data={
+        'files': [(open(_uploaded(tmp_path, 'DH_27-04-2026.pdf')[0]['path'], 'rb'), 'DH_27-04-2026.pdf')],
+        'type': 'runsheets',
+    }, content_type='multipart/form-data')
+    job_id = response.get_json()['job_id']
+    assert job_id
+
+    for _ in range(100):
+        job = auth_client.get(f'/api/upload/jobs/{job_id}').get_json()['job']
+        if job['status'] == 'completed':
+            break
+        time.sleep(0.05)
+    assert job['status'] == 'completed'
+    assert (job['total'], job['processed'], job['succeeded']) == (1, 1, 1)
+    assert job['results'][0]['result']['jobs'] == 1
+    assert notified == ['upload']
+
+    # The job lives in the database, so a poll reaching another worker sees it too
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT state FROM background_jobs WHERE kind = 'upload' AND job_id = ?",
+                           (job_id,)).fetchone()
+    assert json.loads(row['state']) == job
+
+    assert auth_client.get('/api/upload/jobs/unknown').status_code == 404
@@ -0,0 +1,125 @@
+"""Tests for WeeklySummaryService and the endpoints built on it."""
+
+from datetime import timedelta
+
+import pytest
+
+from app.config import Config
+from app.database import get_db_connection
+from app.services import data_versions
+from app.services.weekly_summary_service import WeeklySummaryService
+from app.utils.company_calendar import company_calendar
+
+
+def _day(week, offset):
+    sunday, _ = company_calendar.get_week_dates(week, 2025)
+    return company_calendar.format_date_string(sunday + timedelta(days=offset))
+
+
+@pytest.fixture
+def weeks(app):
+    """Payslips for weeks 10 and 11 of 2025, run sheet jobs in weeks 10-12."""
+    with app.app_context():
+        with get_db_connection() as conn:
+            # Importer (production) layout columns
+            conn.execute('ALTER TABLE payslips ADD COLUMN tax_year TEXT')
+            for column in ('client TEXT', 'amount REAL', 'date TEXT'):
+                conn.execute(f'ALTER TABLE job_items ADD COLUMN {column}')
+            for week, net in ((10, 100.0), (11, 80.0)):
+                conn.execute(
+                    "INSERT INTO payslips (id, week_number, tax_year, period_end, net_payment) VALUES (?, ?, '2025', ?, ?)",
+                    (week, week, _day(week, 6), net),
+                )
+            conn.execute("INSERT INTO job_items (payslip_id, client, amount) VALUES (10, 'Deduction', -12.5)")
+            conn.executemany(
+                "INSERT INTO run_sheet_jobs (date, job_number, customer, activity, status, pay_amount) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (_day(10, 1), '1001', 'Acme', 'INSTALL', 'completed', 40.0),
+                    (_day(10, 1), '1002', 'Acme', 'INSTALL', 'DNCO', None),
+                    (_day(10, 2), '1003', 'Bolt', 'REPAIR', 'completed', 30.0),
+                    (_day(10, 2), '1004', 'Bolt', 'SURVEY', 'dnco', None),
+                    (_day(10, 3), '1005', None, None, 'missed', None),
+                    (_day(11, 1), '1101', 'Acme', 'INSTALL', 'completed', 20.0),
+                    (_day(12, 4), '1201', 'Bolt', 'REPAIR', 'completed', 25.0),
+                ],
+            )
+            conn.execute("INSERT INTO runsheet_daily_data (date, mileage, fuel_cost) VALUES (?, 50, 10.0)", (_day(10, 1),))
+            conn.execute("INSERT INTO attendance (date, reason) VALUES (?, 'Holiday')", (_day(10, 3),))
+            conn.commit()
+        data_versions.ensure_data_versions()
+        WeeklySummaryService.clear_cache()
+        yield {week: company_calendar.get_week_dates(week, 2025)[0] for week in (9, 10, 11, 12)}
+        WeeklySummaryService.clear_cache()
+
+
+def test_week_summary(weeks):
+    summary = WeeklySummaryService.get_week(weeks[10])
+
+    assert summary.week_number == 10 and summary.has_payslip
+    assert list(summary.status_breakdown) == ['completed', 'DNCO', 'PDA Licence', 'missed']
+    # Acme INSTALL history averages 30, Bolt has no SURVEY history so its average (27.50) applies
+    assert summary.status_breakdown['DNCO'] == {'count': 2, 'earnings': 0, 'estimated_loss': 57.5}
+    assert summary.summary.total_jobs == 5
+    assert summary.summary.total_earnings == 57.5
+    assert summary.summary.earnings_discrepancy == -42.5
+    # Day 3 has an attendance entry, so only day 2 lacks mileage
+    assert summary.summary.missing_mileage_dates == [_day(10, 2)]
+    assert summary.metrics.cost_per_mile == 0.2
+    assert summary.top_customers == [
+        {'customer': 'Bolt', 'jobs': 2, 'earnings': 30.0},
+        {'customer': 'Acme', 'jobs': 2, 'earnings': 40.0},
+    ]
+    assert summary.to_dict()['summary']['working_days'] == 3
+    assert 'has_payslip' not in summary.to_dict()
+
+
+def test_batch_matches_single_weeks(weeks):
+    starts = [weeks[week] for week in (9, 10, 11, 12)]
+    batch = WeeklySummaryService.get_weeks(starts)
+    WeeklySummaryService.clear_cache()
+    single = [WeeklySummaryService.get_week(start) for start in starts]
+
+    assert batch == single
+    assert batch[0] is None  # no payslip and no jobs
+    assert not batch[3].has_payslip and batch[3].summary.total_jobs == 1
+    assert [summary.week_number for summary in WeeklySummaryService.get_tax_year(2025)] == [10, 11]
+
+
+def test_summary_is_memoised_until_data_changes(weeks):
+    first = WeeklySummaryService.get_week(weeks[11])
+    assert WeeklySummaryService.get_week(weeks[11]) is first
+
+    with get_db_connection() as conn:
+        conn.execute("INSERT INTO run_sheet_jobs (date, job_number, customer, status, pay_amount) "
+                     "VALUES (?, '1102', 'Acme', 'completed', 15.0)", (_day(11, 2),))
+        conn.commit()
+
+    second = WeeklySummaryService.get_week(weeks[11])
+    assert second is not first
+    assert second.summary.total_jobs == 2
+
+
+def test_weekly_summary_endpoints(auth_client, weeks, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'REPORT_CACHE_DIR', str(tmp_path))
+    week_start = weeks[10].strftime('%Y-%m-%d')
+
+    data = auth_client.get(f'/api/weekly-summary?week_start={week_start}').get_json()
+    assert data['week_number'] == 10
+    assert data['summary']['total_jobs'] == 5
+    assert auth_client.get('/api/weekly-summary').get_json()['week_number'] == 11
+    assert auth_client.get(f"/api/weekly-summary?week_start={weeks[9].strftime('%Y-%m-%d')}").get_json()['redirect']
+
+    year = auth_client.get('/api/weekly-summary/year?tax_year=2025').get_json()
+    assert [week['week_number'] for week in year['weeks']] == [10, 11]
+    assert year['weeks'][0] == data
+
+    response = auth_client.post('/api/weekly-summary/export-pdf', json={'week_start': week_start})
+    assert response.status_code == 200
+    assert 'weekly_summary_week10.pdf' in response.headers['Content-Disposition']
+    assert response.get_data().startswith(b'%PDF-')
+    response.close()
+
+    # Week 12 has jobs but no payslip
+    missing = auth_client.post('/api/weekly-summary/export-pdf', json={'week_start': weeks[12].strftime('%Y-%m-%d')})
+    assert missing.status_code == 404